@@ -0,0 +1,66 @@
+# PAQUETES EL CLUB v1.0 - ALEMBIC SCRIPT TEMPLATE
+# Template para generar archivos de migración
+
+"""align_default_rates_with_env
+
+Revision ID: a4d7e2c9f153
+Revises: f2c6a9e4d187
+Create Date: 2025-11-10 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4d7e2c9f153'
+down_revision = 'f2c6a9e4d187'
+branch_labels = None
+depends_on = None
+
+
+# Valores sembrados por 61567198240c que nunca se usaron para cobrar
+SEEDED_BASE_PRICES = {
+    'NORMAL': 1800,
+    'EXTRA_DIMENSIONADO': 2500,
+}
+
+ALIGN_RATE_SQL = sa.text("""
+    UPDATE rates
+    SET base_price = :new_price, updated_at = now()
+    WHERE rate_type = 'package_type'
+      AND name = :name
+      AND is_active = true
+      AND base_price = :old_price
+""")
+
+
+def _env_base_prices():
+    return {
+        'NORMAL': settings.base_delivery_rate_normal,
+        'EXTRA_DIMENSIONADO': settings.base_delivery_rate_extra_dimensioned,
+    }
+
+
+def upgrade() -> None:
+    """
+    Alinear las tarifas base sembradas con las de .env.
+
+    Hasta que RateProvider tomó la tabla rates como fuente, los cobros usaban
+    BASE_DELIVERY_RATE_NORMAL / BASE_DELIVERY_RATE_EXTRA_DIMENSIONED y las
+    filas sembradas (1800 / 2500) no se aplicaban. Para que el despliegue no
+    cambie precios sin intervención, las filas activas que conservan el valor
+    sembrado pasan a los valores de .env; las que un operador ya modificó se
+    respetan.
+    """
+    env_prices = _env_base_prices()
+    for name, seeded in SEEDED_BASE_PRICES.items():
+        op.execute(ALIGN_RATE_SQL.bindparams(new_price=env_prices[name], name=name, old_price=seeded))
+
+
+def downgrade() -> None:
+    env_prices = _env_base_prices()
+    for name, seeded in SEEDED_BASE_PRICES.items():
+        op.execute(ALIGN_RATE_SQL.bindparams(new_price=seeded, name=name, old_price=env_prices[name]))
@@ -0,0 +1,59 @@
+# PAQUETES EL CLUB v1.0 - ALEMBIC SCRIPT TEMPLATE
+# Template para generar archivos de migración
+
+"""add_package_version_and_notification_outbox
+
+Revision ID: a7c4e2f9b315
+Revises: e3a1c7d90b42
+Create Date: 2025-11-10 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'a7c4e2f9b315'
+down_revision = 'e3a1c7d90b42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    - packages.version: contador para control optimista de concurrencia
+      (UPDATE ... WHERE id = :id AND version = :v).
+    - package_notification_outbox: notificaciones de cambio de estado
+      escritas en la misma transacción que la transición y despachadas
+      después por Celery.
+    """
+    op.add_column(
+        'packages',
+        sa.Column('version', sa.Integer(), nullable=False, server_default='1')
+    )
+
+    op.create_table(
+        'package_notification_outbox',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('package_id', sa.Integer(), sa.ForeignKey('packages.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('new_status', sa.String(20), nullable=False),
+        sa.Column('changed_by', sa.String(100), nullable=True),
+        sa.Column('status', sa.String(20), nullable=False, server_default='PENDING'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column('processed_at', sa.DateTime(timezone=True), nullable=True),
+    )
+    # El barrido periódico solo recorre las filas sin despachar
+    op.create_index(
+        'ix_package_notification_outbox_pending',
+        'package_notification_outbox',
+        ['created_at'],
+        postgresql_where=sa.text("status IN ('PENDING', 'PROCESSING')")
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_package_notification_outbox_pending', table_name='package_notification_outbox')
+    op.drop_table('package_notification_outbox')
+    op.drop_column('packages', 'version')
@@ -0,0 +1,45 @@
+# PAQUETES EL CLUB v1.0 - ALEMBIC SCRIPT TEMPLATE
+# Template para generar archivos de migración
+
+"""add_updated_at_indexes_for_validators
+
+Revision ID: b9d2e6f4a803
+Revises: a7c4e2f9b315
+Create Date: 2025-11-10 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'b9d2e6f4a803'
+down_revision = 'a7c4e2f9b315'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Índices para los validadores de las respuestas condicionales (ETag):
+    count + max(updated_at) del conjunto filtrado se resuelven con un
+    index-only scan en lugar de recorrer las tablas en cada sondeo.
+    """
+    op.create_index('ix_packages_updated_at', 'packages', ['updated_at'])
+    op.create_index('ix_packages_status_updated_at', 'packages', ['status', 'updated_at'])
+    op.create_index('ix_customers_updated_at', 'customers', ['updated_at'])
+    op.create_index('ix_file_uploads_package_id_updated_at', 'file_uploads', ['package_id', 'updated_at'])
+    # El listado solo muestra anuncios sin procesar
+    op.create_index(
+        'ix_package_announcements_new_pending_updated_at',
+        'package_announcements_new',
+        ['is_active', 'updated_at'],
+        postgresql_where=sa.text("is_processed = false")
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_package_announcements_new_pending_updated_at', table_name='package_announcements_new')
+    op.drop_index('ix_file_uploads_package_id_updated_at', table_name='file_uploads')
+    op.drop_index('ix_customers_updated_at', table_name='customers')
+    op.drop_index('ix_packages_status_updated_at', table_name='packages')
+    op.drop_index('ix_packages_updated_at', table_name='packages')
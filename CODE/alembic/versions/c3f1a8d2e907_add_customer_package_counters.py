@@ -0,0 +1,188 @@
+# PAQUETES EL CLUB v1.0 - ALEMBIC SCRIPT TEMPLATE
+# Template para generar archivos de migración
+
+"""add_customer_package_counters
+
+Revision ID: c3f1a8d2e907
+Revises: b9d2e6f4a803
+Create Date: 2025-11-10 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3f1a8d2e907'
+down_revision = 'b9d2e6f4a803'
+branch_labels = None
+depends_on = None
+
+
+COUNTER_COLUMNS = (
+    'total_packages',
+    'active_announced_packages',
+    'active_received_packages',
+    'total_packages_cancelled',
+)
+
+
+def upgrade() -> None:
+    """
+    Contadores de paquetes por cliente mantenidos por un trigger de packages.
+
+    - Nuevas columnas: total_packages y los conteos por estado actual
+      (ANUNCIADO y RECIBIDO activos, CANCELADO); ENTREGADO ya está en
+      total_packages_delivered.
+    - total_packages_received cuenta los paquetes que pasaron por recepción
+      (received_at) y total_spent suma total_amount de los entregados, en
+      centavos.
+    - El trigger aplica la diferencia de cada INSERT/UPDATE/DELETE de packages
+      al cliente en la misma transacción, sin importar el camino (transición,
+      anuncio, reasignación, borrado masivo). SET LOCAL
+      app.skip_customer_counters = 'on' lo omite en cargas que recalculan al
+      final (seed_synthetic_data).
+    - Los valores existentes se calculan aquí con un único UPDATE antes de
+      crear el trigger; la tarea backfill_customer_counters
+      (CustomerCounterService.backfill) queda para reconciliar.
+    """
+    for column in COUNTER_COLUMNS:
+        op.add_column('customers', sa.Column(column, sa.Integer(), nullable=False, server_default='0'))
+
+    # Carga inicial con las mismas reglas del trigger; los clientes sin
+    # paquetes también se corrigen (total_packages_delivered,
+    # total_packages_received y total_spent ya existían)
+    op.execute(sa.text("""
+        UPDATE customers AS c
+        SET total_packages = s.total,
+            active_announced_packages = s.announced,
+            active_received_packages = s.received_active,
+            total_packages_delivered = s.delivered,
+            total_packages_cancelled = s.cancelled,
+            total_packages_received = s.received,
+            total_spent = s.spent
+        FROM (
+            SELECT cu.id,
+                   count(p.id) AS total,
+                   count(p.id) FILTER (WHERE p.status = 'ANUNCIADO') AS announced,
+                   count(p.id) FILTER (WHERE p.status = 'RECIBIDO') AS received_active,
+                   count(p.id) FILTER (WHERE p.status = 'ENTREGADO') AS delivered,
+                   count(p.id) FILTER (WHERE p.status = 'CANCELADO') AS cancelled,
+                   count(p.id) FILTER (WHERE p.received_at IS NOT NULL) AS received,
+                   COALESCE(sum(round(p.total_amount * 100)) FILTER (WHERE p.status = 'ENTREGADO'), 0)::integer AS spent
+            FROM customers cu
+            LEFT JOIN packages p ON p.customer_id = cu.id
+            GROUP BY cu.id
+        ) AS s
+        WHERE c.id = s.id
+    """))
+
+    op.execute(sa.text("""
+        CREATE OR REPLACE FUNCTION packages_customer_counters() RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        DECLARE
+            old_customer uuid;
+            new_customer uuid;
+        BEGIN
+            IF current_setting('app.skip_customer_counters', true) = 'on' THEN
+                RETURN NULL;
+            END IF;
+
+            IF TG_OP <> 'INSERT' THEN
+                old_customer := OLD.customer_id;
+            END IF;
+            IF TG_OP <> 'DELETE' THEN
+                new_customer := NEW.customer_id;
+            END IF;
+
+            IF TG_OP = 'UPDATE' AND old_customer IS NOT DISTINCT FROM new_customer THEN
+                -- Sin cambio de estado ni de recepción, total_amount solo cuenta en
+                -- ENTREGADO: el recálculo de tarifas de paquetes abiertos no
+                -- escribe (ni bloquea) la fila del cliente
+                IF old_customer IS NULL
+                   OR (OLD.status IS NOT DISTINCT FROM NEW.status
+                       AND (OLD.received_at IS NULL) = (NEW.received_at IS NULL)
+                       AND (NEW.status IS DISTINCT FROM 'ENTREGADO'
+                            OR round(OLD.total_amount * 100) IS NOT DISTINCT FROM round(NEW.total_amount * 100))) THEN
+                    RETURN NULL;
+                END IF;
+                -- Mismo cliente: una sola actualización con la diferencia
+                UPDATE customers SET
+                    active_announced_packages = active_announced_packages
+                        + (NEW.status = 'ANUNCIADO')::int - (OLD.status = 'ANUNCIADO')::int,
+                    active_received_packages = active_received_packages
+                        + (NEW.status = 'RECIBIDO')::int - (OLD.status = 'RECIBIDO')::int,
+                    total_packages_delivered = total_packages_delivered
+                        + (NEW.status = 'ENTREGADO')::int - (OLD.status = 'ENTREGADO')::int,
+                    total_packages_cancelled = total_packages_cancelled
+                        + (NEW.status = 'CANCELADO')::int - (OLD.status = 'CANCELADO')::int,
+                    total_packages_received = total_packages_received
+                        + (NEW.received_at IS NOT NULL)::int - (OLD.received_at IS NOT NULL)::int,
+                    total_spent = total_spent
+                        + CASE WHEN NEW.status = 'ENTREGADO' THEN round(NEW.total_amount * 100)::int ELSE 0 END
+                        - CASE WHEN OLD.status = 'ENTREGADO' THEN round(OLD.total_amount * 100)::int ELSE 0 END
+                WHERE id = new_customer;
+                RETURN NULL;
+            END IF;
+
+            IF old_customer IS NOT NULL THEN
+                UPDATE customers SET
+                    total_packages = total_packages - 1,
+                    active_announced_packages = active_announced_packages - (OLD.status = 'ANUNCIADO')::int,
+                    active_received_packages = active_received_packages - (OLD.status = 'RECIBIDO')::int,
+                    total_packages_delivered = total_packages_delivered - (OLD.status = 'ENTREGADO')::int,
+                    total_packages_cancelled = total_packages_cancelled - (OLD.status = 'CANCELADO')::int,
+                    total_packages_received = total_packages_received - (OLD.received_at IS NOT NULL)::int,
+                    total_spent = total_spent
+                        - CASE WHEN OLD.status = 'ENTREGADO' THEN round(OLD.total_amount * 100)::int ELSE 0 END
+                WHERE id = old_customer;
+            END IF;
+
+            IF new_customer IS NOT NULL THEN
+                UPDATE customers SET
+                    total_packages = total_packages + 1,
+                    active_announced_packages = active_announced_packages + (NEW.status = 'ANUNCIADO')::int,
+                    active_received_packages = active_received_packages + (NEW.status = 'RECIBIDO')::int,
+                    total_packages_delivered = total_packages_delivered + (NEW.status = 'ENTREGADO')::int,
+                    total_packages_cancelled = total_packages_cancelled + (NEW.status = 'CANCELADO')::int,
+                    total_packages_received = total_packages_received + (NEW.received_at IS NOT NULL)::int,
+                    total_spent = total_spent
+                        + CASE WHEN NEW.status = 'ENTREGADO' THEN round(NEW.total_amount * 100)::int ELSE 0 END
+                WHERE id = new_customer;
+            END IF;
+
+            RETURN NULL;
+        END
+        $$;
+    """))
+    op.execute(sa.text("""
+        CREATE TRIGGER trg_packages_customer_counters
+        AFTER INSERT OR DELETE OR UPDATE OF customer_id, status, received_at, total_amount
+        ON packages
+        FOR EACH ROW EXECUTE FUNCTION packages_customer_counters()
+    """))
+
+    # Listado de clientes: ORDER BY total_packages DESC, id con LIMIT
+    op.execute(sa.text(
+        "CREATE INDEX ix_customers_total_packages ON customers (total_packages DESC, id)"
+    ))
+    # Top de clientes activos (estadísticas) y VIP por gasto
+    op.execute(sa.text(
+        "CREATE INDEX ix_customers_active_total_received ON customers (total_packages_received DESC) "
+        "WHERE is_active"
+    ))
+    op.execute(sa.text(
+        "CREATE INDEX ix_customers_vip_total_spent ON customers (total_spent DESC) "
+        "WHERE is_vip AND is_active"
+    ))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_customers_vip_total_spent', table_name='customers')
+    op.drop_index('ix_customers_active_total_received', table_name='customers')
+    op.drop_index('ix_customers_total_packages', table_name='customers')
+    op.execute(sa.text("DROP TRIGGER IF EXISTS trg_packages_customer_counters ON packages"))
+    op.execute(sa.text("DROP FUNCTION IF EXISTS packages_customer_counters()"))
+    for column in reversed(COUNTER_COLUMNS):
+        op.drop_column('customers', column)
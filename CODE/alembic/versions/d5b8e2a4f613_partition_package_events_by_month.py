@@ -0,0 +1,178 @@
+# PAQUETES EL CLUB v1.0 - ALEMBIC SCRIPT TEMPLATE
+# Template para generar archivos de migración
+
+"""partition_package_events_by_month
+
+Revision ID: d5b8e2a4f613
+Revises: c3f1a8d2e907
+Create Date: 2025-11-10 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5b8e2a4f613'
+down_revision = 'c3f1a8d2e907'
+branch_labels = None
+depends_on = None
+
+
+# Meses de particiones futuras que se crean al migrar (luego las mantiene la
+# tarea maintain_package_event_partitions con PACKAGE_EVENTS_PARTITIONS_AHEAD)
+MONTHS_AHEAD = 3
+
+# Índices btree de búsqueda puntual que se conservan (ver d8e9a7b1c3f2)
+LOOKUP_INDEXES = (
+    ('ix_package_events_package_id', 'package_id'),
+    ('ix_package_events_tracking_number', 'tracking_number'),
+    ('ix_package_events_guide_number', 'guide_number'),
+    ('ix_package_events_tracking_code', 'tracking_code'),
+    ('ix_package_events_customer_phone', 'customer_phone'),
+    ('ix_package_events_operator_id', 'operator_id'),
+)
+
+FOREIGN_KEYS = (
+    ('package_events_package_id_fkey', 'package_id', 'packages', 'CASCADE'),
+    ('package_events_announcement_id_fkey', 'announcement_id', 'package_announcements_new', 'SET NULL'),
+    ('package_events_customer_id_fkey', 'customer_id', 'customers', 'SET NULL'),
+    ('package_events_operator_id_fkey', 'operator_id', 'users', 'SET NULL'),
+)
+
+
+def _create_indexes_and_keys(primary_key: str) -> None:
+    op.execute(sa.text(f"ALTER TABLE package_events ADD PRIMARY KEY ({primary_key})"))
+    for name, column in LOOKUP_INDEXES:
+        op.create_index(name, 'package_events', [column])
+    for name, column, target, on_delete in FOREIGN_KEYS:
+        op.execute(sa.text(
+            f"ALTER TABLE package_events ADD CONSTRAINT {name} "
+            f"FOREIGN KEY ({column}) REFERENCES {target} (id) ON DELETE {on_delete}"
+        ))
+
+
+def upgrade() -> None:
+    """
+    package_events particionada por mes (RANGE sobre event_timestamp, meses
+    calendario de Colombia).
+
+    - Las consultas por rango de fechas solo recorren las particiones del rango
+      (partition pruning) y dentro de cada una usan un índice BRIN sobre
+      event_timestamp: la tabla es de solo inserción en orden de tiempo, así
+      que el BRIN ocupa unos pocos KB frente a un btree de cientos de MB.
+    - Se eliminan los btree de event_timestamp, event_type y
+      (event_type, event_timestamp); se conservan los de búsqueda puntual.
+    - La llave primaria pasa a (id, event_timestamp): en una tabla
+      particionada debe incluir la columna de partición.
+    - package_events_ensure_partitions(desde, hasta) crea las particiones
+      mensuales que falten; si la partición por defecto tiene filas de ese
+      mes las mueve a la nueva. La tarea maintain_package_event_partitions la
+      llama a diario y archiva las particiones más viejas que la retención
+      (PackageEventPartitionService).
+
+    La copia de los datos existentes bloquea package_events durante la
+    migración: ejecutarla en una ventana de mantenimiento.
+    """
+    op.execute(sa.text("ALTER TABLE package_events RENAME TO package_events_legacy"))
+    op.execute(sa.text("""
+        CREATE TABLE package_events (
+            LIKE package_events_legacy INCLUDING DEFAULTS INCLUDING CONSTRAINTS
+        ) PARTITION BY RANGE (event_timestamp)
+    """))
+    # Red de seguridad: eventos fuera de las particiones creadas
+    op.execute(sa.text("CREATE TABLE package_events_default PARTITION OF package_events DEFAULT"))
+
+    op.execute(sa.text("""
+        CREATE OR REPLACE FUNCTION package_events_ensure_partitions(from_ts timestamptz, to_ts timestamptz)
+        RETURNS integer
+        LANGUAGE plpgsql
+        AS $$
+        DECLARE
+            month_start date := date_trunc('month', from_ts AT TIME ZONE 'America/Bogota')::date;
+            last_month date := date_trunc('month', to_ts AT TIME ZONE 'America/Bogota')::date;
+            lower_bound timestamptz;
+            upper_bound timestamptz;
+            partition_name text;
+            created integer := 0;
+        BEGIN
+            WHILE month_start <= last_month LOOP
+                partition_name := 'package_events_' || to_char(month_start, '"y"YYYY"m"MM');
+                lower_bound := month_start::timestamp AT TIME ZONE 'America/Bogota';
+                upper_bound := (month_start + interval '1 month') AT TIME ZONE 'America/Bogota';
+
+                IF to_regclass(partition_name) IS NULL THEN
+                    IF EXISTS (
+                        SELECT 1 FROM package_events_default
+                        WHERE event_timestamp >= lower_bound AND event_timestamp < upper_bound
+                    ) THEN
+                        -- Mover las filas del mes que cayeron en la partición por defecto
+                        EXECUTE format(
+                            'CREATE TABLE %I (LIKE package_events INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+                            partition_name
+                        );
+                        EXECUTE format(
+                            'WITH moved AS (DELETE FROM package_events_default '
+                            'WHERE event_timestamp >= %L AND event_timestamp < %L RETURNING *) '
+                            'INSERT INTO %I SELECT * FROM moved',
+                            lower_bound, upper_bound, partition_name
+                        );
+                        EXECUTE format(
+                            'ALTER TABLE package_events ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                            partition_name, lower_bound, upper_bound
+                        );
+                    ELSE
+                        EXECUTE format(
+                            'CREATE TABLE %I PARTITION OF package_events FOR VALUES FROM (%L) TO (%L)',
+                            partition_name, lower_bound, upper_bound
+                        );
+                    END IF;
+                    created := created + 1;
+                END IF;
+
+                month_start := (month_start + interval '1 month')::date;
+            END LOOP;
+            RETURN created;
+        END
+        $$;
+    """))
+
+    # Particiones para la historia existente y los próximos meses; luego la copia
+    op.execute(sa.text(f"""
+        SELECT package_events_ensure_partitions(
+            COALESCE(min(event_timestamp), now()),
+            now() + interval '{MONTHS_AHEAD} months'
+        )
+        FROM package_events_legacy
+    """))
+    op.execute(sa.text("INSERT INTO package_events SELECT * FROM package_events_legacy ORDER BY event_timestamp"))
+    op.execute(sa.text("DROP TABLE package_events_legacy"))
+
+    # Índices después de la carga (se propagan a cada partición)
+    _create_indexes_and_keys("id, event_timestamp")
+    op.execute(sa.text(
+        "CREATE INDEX ix_package_events_event_timestamp_brin ON package_events "
+        "USING brin (event_timestamp) WITH (pages_per_range = 32)"
+    ))
+    op.execute(sa.text("ANALYZE package_events"))
+
+
+def downgrade() -> None:
+    op.execute(sa.text("ALTER TABLE package_events RENAME TO package_events_partitioned"))
+    op.execute(sa.text("""
+        CREATE TABLE package_events (
+            LIKE package_events_partitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS
+        )
+    """))
+    op.execute(sa.text("INSERT INTO package_events SELECT * FROM package_events_partitioned"))
+    op.execute(sa.text("DROP TABLE package_events_partitioned CASCADE"))
+    op.execute(sa.text("DROP FUNCTION IF EXISTS package_events_ensure_partitions(timestamptz, timestamptz)"))
+
+    _create_indexes_and_keys("id")
+    op.create_index('ix_package_events_event_type', 'package_events', ['event_type'])
+    op.create_index('ix_package_events_event_timestamp', 'package_events', ['event_timestamp'])
+    op.create_index(
+        'ix_package_events_event_type_timestamp',
+        'package_events',
+        ['event_type', 'event_timestamp']
+    )
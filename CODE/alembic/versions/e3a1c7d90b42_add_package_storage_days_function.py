@@ -0,0 +1,60 @@
+# PAQUETES EL CLUB v1.0 - ALEMBIC SCRIPT TEMPLATE
+# Template para generar archivos de migración
+
+"""add_package_storage_days_function
+
+Revision ID: e3a1c7d90b42
+Revises: 61567198240c
+Create Date: 2025-11-10 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3a1c7d90b42'
+down_revision = '61567198240c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Crear la función de lectura package_storage_days.
+
+    Días completos de almacenamiento (cada 24 horas = 1 día) desde la recepción
+    hasta la entrega o hasta as_of, nunca negativos. Es la misma regla que
+    PackageStateService._calculate_storage_days y la usan el listado de paquetes
+    y el recálculo masivo de tarifas (FeeService).
+
+    STABLE y no IMMUTABLE: as_of toma now() por defecto y los timestamps sin
+    zona se convierten con la TimeZone de la sesión.
+    """
+    op.execute(sa.text("""
+        CREATE OR REPLACE FUNCTION package_storage_days(
+            received_at timestamptz,
+            delivered_at timestamptz,
+            as_of timestamptz DEFAULT now()
+        ) RETURNS integer
+        LANGUAGE sql
+        STABLE
+        PARALLEL SAFE
+        AS $$
+            SELECT CASE
+                WHEN received_at IS NULL THEN 0
+                ELSE GREATEST(
+                    0,
+                    FLOOR(
+                        EXTRACT(EPOCH FROM (LEAST(COALESCE(delivered_at, as_of), as_of) - received_at)) / 86400
+                    )::integer
+                )
+            END
+        $$;
+    """))
+
+
+def downgrade() -> None:
+    op.execute(sa.text(
+        "DROP FUNCTION IF EXISTS package_storage_days(timestamptz, timestamptz, timestamptz)"
+    ))
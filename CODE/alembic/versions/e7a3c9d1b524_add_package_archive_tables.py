@@ -0,0 +1,111 @@
+# PAQUETES EL CLUB v1.0 - ALEMBIC SCRIPT TEMPLATE
+# Template para generar archivos de migración
+
+"""add_package_archive_tables
+
+Revision ID: e7a3c9d1b524
+Revises: d5b8e2a4f613
+Create Date: 2025-11-10 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a3c9d1b524'
+down_revision = 'd5b8e2a4f613'
+branch_labels = None
+depends_on = None
+
+
+# Tabla de trabajo -> índices de búsqueda de su tabla de archivo
+ARCHIVE_TABLES = {
+    'packages': ('tracking_number', 'guide_number', 'access_code', 'customer_id'),
+    'package_history': ('package_id',),
+    'messages': ('package_id',),
+    'notifications': ('package_id',),
+    'file_uploads': ('package_id',),
+}
+
+# Referencias a packages que deben sobrevivir al archivado del paquete
+DETACHED_REFERENCES = (
+    ('package_announcements_new', 'package_announcements_new_package_id_fkey', 'NO ACTION'),
+    ('package_events', 'package_events_package_id_fkey', 'CASCADE'),
+)
+
+
+def _drop_package_foreign_key(table: str) -> None:
+    # El nombre de la llave de package_announcements_new depende de la
+    # migración que la creó: se busca en el catálogo
+    op.execute(sa.text(f"""
+        DO $$
+        DECLARE
+            fk record;
+        BEGIN
+            FOR fk IN
+                SELECT conname FROM pg_constraint
+                WHERE contype = 'f'
+                  AND conrelid = '{table}'::regclass
+                  AND confrelid = 'packages'::regclass
+            LOOP
+                EXECUTE format('ALTER TABLE {table} DROP CONSTRAINT %I', fk.conname);
+            END LOOP;
+        END
+        $$;
+    """))
+
+
+def _columns(table: str) -> str:
+    rows = op.get_bind().execute(sa.text(
+        "SELECT column_name FROM information_schema.columns "
+        "WHERE table_schema = 'public' AND table_name = :table ORDER BY ordinal_position"
+    ), {"table": table})
+    return ", ".join(f'"{row.column_name}"' for row in rows)
+
+
+def upgrade() -> None:
+    """
+    Tablas de archivo para paquetes terminales (ENTREGADO / CANCELADO).
+
+    - <tabla>_archive con las mismas columnas que packages, package_history,
+      messages, notifications y file_uploads, más archived_at. Sin llaves
+      foráneas: el archivo solo recibe filas y conserva los ids originales.
+    - PackageArchiveService mueve por lotes los paquetes terminales más viejos
+      que PACKAGE_ARCHIVE_AFTER_DAYS con sus filas dependientes; la búsqueda
+      pública consulta el archivo cuando no hay coincidencia en packages.
+    - package_announcements_new.package_id y package_events.package_id dejan
+      de ser llaves foráneas: el anuncio y la auditoría siguen apuntando al id
+      del paquete archivado (los anuncios mantienen ocupados sus códigos).
+
+    Una columna nueva en una tabla de trabajo debe agregarse también a su
+    tabla de archivo; el servicio falla en vez de mover datos incompletos.
+    """
+    for table, indexed_columns in ARCHIVE_TABLES.items():
+        archive = f"{table}_archive"
+        op.execute(sa.text(f"CREATE TABLE {archive} (LIKE {table})"))
+        op.execute(sa.text(f"ALTER TABLE {archive} ADD COLUMN archived_at timestamptz NOT NULL DEFAULT now()"))
+        op.execute(sa.text(f"ALTER TABLE {archive} ADD PRIMARY KEY (id)"))
+        for column in indexed_columns:
+            op.create_index(f'ix_{archive}_{column}', archive, [column])
+
+    for table, _, _ in DETACHED_REFERENCES:
+        _drop_package_foreign_key(table)
+
+
+def downgrade() -> None:
+    # Devolver los paquetes archivados a las tablas de trabajo (sin tocar los
+    # contadores de clientes, que ya los incluyen) antes de restaurar las llaves
+    op.execute(sa.text("SET LOCAL app.skip_customer_counters = 'on'"))
+    for table in ARCHIVE_TABLES:
+        columns = _columns(table)
+        op.execute(sa.text(f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {table}_archive"))
+
+    for table, name, on_delete in DETACHED_REFERENCES:
+        op.execute(sa.text(
+            f"ALTER TABLE {table} ADD CONSTRAINT {name} "
+            f"FOREIGN KEY (package_id) REFERENCES packages (id) ON DELETE {on_delete}"
+        ))
+
+    for table in reversed(list(ARCHIVE_TABLES)):
+        op.execute(sa.text(f"DROP TABLE {table}_archive"))
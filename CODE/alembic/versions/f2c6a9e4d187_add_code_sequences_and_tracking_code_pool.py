@@ -0,0 +1,51 @@
+# PAQUETES EL CLUB v1.0 - ALEMBIC SCRIPT TEMPLATE
+# Template para generar archivos de migración
+
+"""add_code_sequences_and_tracking_code_pool
+
+Revision ID: f2c6a9e4d187
+Revises: e7a3c9d1b524
+Create Date: 2025-11-10 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2c6a9e4d187'
+down_revision = 'e7a3c9d1b524'
+branch_labels = None
+depends_on = None
+
+
+CODE_SEQUENCES = ('access_code_seq', 'tracking_number_seq', 'tracking_code_seq')
+
+
+def upgrade() -> None:
+    """
+    Secuencias de los generadores de códigos (CodeGenerator) y pool de
+    códigos de consulta públicos.
+
+    - Cada valor de una secuencia se convierte en un código con una
+      permutación con clave: códigos únicos sin consultar la tabla.
+    - tracking_code_pool guarda códigos de consulta de 4 caracteres ya
+      filtrados contra anuncios y paquetes existentes; se toman en orden de
+      position y se reponen con la tarea refill_tracking_code_pool (o al
+      encontrarlo vacío). Queda vacío aquí: la clave de la permutación es
+      configuración de la aplicación.
+    """
+    for sequence in CODE_SEQUENCES:
+        op.execute(sa.text(f"CREATE SEQUENCE {sequence} AS bigint START 0 MINVALUE 0"))
+
+    op.create_table(
+        'tracking_code_pool',
+        sa.Column('position', sa.BigInteger(), primary_key=True, autoincrement=False),
+        sa.Column('code', sa.String(length=10), nullable=False, unique=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('tracking_code_pool')
+    for sequence in reversed(CODE_SEQUENCES):
+        op.execute(sa.text(f"DROP SEQUENCE {sequence}"))
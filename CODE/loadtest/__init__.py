@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+"""
+PAQUETES EL CLUB v1.0 - Pruebas de Carga por Escenarios
+Versión: 1.0.0
+Fecha: 2025-11-10
+Autor: Equipo de Desarrollo
+
+Generador de carga con httpx + asyncio que reproduce los flujos reales de
+la aplicación (operador y cliente público) con llegadas de Poisson a una
+tasa configurable, y produce un reporte JSON (p50/p95/p99, throughput y
+errores por paso) que se puede comparar entre commits.
+
+Reemplaza a performance_monitor.py, que solo hacía peticiones GET sueltas
+y muestreaba CPU/memoria del contenedor.
+
+Uso (desde CODE/):
+    python -m loadtest fakes
+    python -m loadtest run --base-url http://localhost:8000 --rate 5 --duration 60 --output baseline.json
+    python -m loadtest diff baseline.json actual.json
+"""
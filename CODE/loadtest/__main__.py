@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+PAQUETES EL CLUB v1.0 - CLI de las Pruebas de Carga
+Versión: 1.0.0
+Fecha: 2025-11-10
+Autor: Equipo de Desarrollo
+
+Uso (desde CODE/):
+    python -m loadtest fakes [--host 127.0.0.1] [--liwa-port 9001] [--s3-port 9002] [--smtp-port 2525]
+    python -m loadtest run --rate 5 --duration 60 --mix operator=1,public=3 --output baseline.json
+    python -m loadtest diff baseline.json actual.json [--threshold 10]
+
+La contraseña del operador se toma de --password o de LOADTEST_OPERATOR_PASSWORD.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+
+from loadtest import fakes
+from loadtest.metrics import REPORT_VERSION, diff_reports
+from loadtest.runner import RunConfig, parse_mix, run
+
+
+def _print_summary(report: dict):
+    summary = report["summary"]
+    print(
+        f"Duración: {summary['elapsed_s']} s  peticiones: {summary['requests']}  "
+        f"throughput: {summary['throughput_rps']} req/s  errores: {summary['error_rate'] * 100:.2f}%"
+    )
+    print(f"{'endpoint':<32} {'n':>6} {'p50':>9} {'p95':>9} {'p99':>9} {'err%':>7}")
+    for name, stats in report["endpoints"].items():
+        latency = stats["latency_ms"]
+        print(
+            f"{name:<32} {stats['count']:>6} {latency['p50']:>9.2f} {latency['p95']:>9.2f} "
+            f"{latency['p99']:>9.2f} {stats['error_rate'] * 100:>7.2f}"
+        )
+    for name, stats in report["scenarios"].items():
+        print(
+            f"escenario {name}: {stats['completed']} completas, {stats['failed']} fallidas, "
+            f"{stats['dropped']} descartadas, p95 {stats['latency_ms']['p95']:.0f} ms"
+        )
+
+
+def cmd_run(args) -> int:
+    config = RunConfig(
+        base_url=args.base_url,
+        rate=args.rate,
+        duration=args.duration,
+        mix=parse_mix(args.mix),
+        max_concurrency=args.max_concurrency,
+        think_time=args.think_time,
+        polls=args.polls,
+        images=args.images,
+        image_kb=args.image_kb,
+        seed=args.seed,
+        operator_username=args.username,
+        operator_password=args.password or os.getenv("LOADTEST_OPERATOR_PASSWORD", "")
+    )
+    report = asyncio.run(run(config))
+    _print_summary(report)
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        print(f"Reporte guardado en {args.output}")
+    return 0
+
+
+def cmd_diff(args) -> int:
+    base = json.loads(Path(args.base).read_text(encoding="utf-8"))
+    new = json.loads(Path(args.new).read_text(encoding="utf-8"))
+    if base.get("version") != REPORT_VERSION or new.get("version") != REPORT_VERSION:
+        print(f"❌ Los reportes deben tener la versión de formato {REPORT_VERSION}")
+        return 2
+
+    print(f"base: {base['meta'].get('git_commit')}  actual: {new['meta'].get('git_commit')}")
+    if base["meta"].get("config") != new["meta"].get("config"):
+        print("⚠️ Las corridas usaron parámetros distintos; la comparación puede no ser válida")
+    lines, regressions = diff_reports(base, new, args.threshold)
+    print("\n".join(lines))
+    if regressions:
+        print(f"\n❌ Regresiones (umbral {args.threshold:.0f}%):")
+        for regression in regressions:
+            print(f"  - {regression}")
+        return 1
+    print("\n✅ Sin regresiones")
+    return 0
+
+
+def cmd_fakes(args) -> int:
+    for name, value in fakes.fake_environment(args.host, args.liwa_port, args.s3_port, args.smtp_port).items():
+        print(f"{name}={value}")
+    print("Servicios falsos activos (Ctrl+C para detener)")
+    try:
+        asyncio.run(fakes.serve(args.host, args.liwa_port, args.s3_port, args.smtp_port))
+    except KeyboardInterrupt:
+        pass
+    print("Peticiones atendidas: " + ", ".join(f"{key}={value}" for key, value in sorted(fakes.counters.items())))
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m loadtest", description="Pruebas de carga por escenarios")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Ejecutar una corrida y generar el reporte JSON")
+    run_parser.add_argument("--base-url", default="http://localhost:8000")
+    run_parser.add_argument("--rate", type=float, default=2.0, help="Sesiones nuevas por segundo (Poisson)")
+    run_parser.add_argument("--duration", type=float, default=60.0, help="Segundos generando llegadas")
+    run_parser.add_argument("--mix", default="operator=1,public=3", help="Pesos de los escenarios")
+    run_parser.add_argument("--max-concurrency", type=int, default=200, help="Sesiones simultáneas máximas")
+    run_parser.add_argument("--think-time", type=float, default=1.0, help="Espera media entre pasos (s)")
+    run_parser.add_argument("--polls", type=int, default=3, help="Consultas de guía por cliente público")
+    run_parser.add_argument("--images", type=int, default=1, choices=(0, 1, 2, 3), help="Fotos por recepción")
+    run_parser.add_argument("--image-kb", type=int, default=150, help="Tamaño de cada foto")
+    run_parser.add_argument("--seed", type=int, default=None, help="Semilla para llegadas reproducibles")
+    run_parser.add_argument("--username", default="admin", help="Usuario ADMIN u OPERADOR")
+    run_parser.add_argument("--password", default=None)
+    run_parser.add_argument("--output", help="Archivo JSON del reporte")
+    run_parser.set_defaults(handler=cmd_run)
+
+    diff_parser = subparsers.add_parser("diff", help="Comparar dos reportes")
+    diff_parser.add_argument("base")
+    diff_parser.add_argument("new")
+    diff_parser.add_argument("--threshold", type=float, default=10.0, help="Empeoramiento de p95/p99 tolerado (%%)")
+    diff_parser.set_defaults(handler=cmd_diff)
+
+    fakes_parser = subparsers.add_parser("fakes", help="Levantar LIWA, S3 y SMTP falsos")
+    fakes_parser.add_argument("--host", default="127.0.0.1")
+    fakes_parser.add_argument("--liwa-port", type=int, default=9001)
+    fakes_parser.add_argument("--s3-port", type=int, default=9002)
+    fakes_parser.add_argument("--smtp-port", type=int, default=2525)
+    fakes_parser.set_defaults(handler=cmd_fakes)
+
+    args = parser.parse_args()
+    try:
+        return args.handler(args)
+    except ValueError as e:
+        parser.error(str(e))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
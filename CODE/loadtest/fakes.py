@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+PAQUETES EL CLUB v1.0 - Servicios Externos Falsos para Pruebas de Carga
+Versión: 1.0.0
+Fecha: 2025-11-10
+Autor: Equipo de Desarrollo
+
+Sustitutos locales (solo biblioteca estándar) de LIWA, S3 y SMTP para que
+las pruebas de carga midan la aplicación y no a los proveedores, y no
+envíen SMS ni correos reales:
+
+- LIWA: POST .../auth/login devuelve un token, POST .../sms/single éxito
+- S3: PUT/GET/HEAD/DELETE con direccionamiento por ruta (/bucket/key),
+  objetos en memoria con un máximo (los más viejos se descartan)
+- SMTP: servidor en texto plano con AUTH PLAIN/LOGIN que acepta todo
+
+La aplicación se apunta a ellos con LIWA_AUTH_URL, LIWA_API_URL,
+AWS_S3_ENDPOINT_URL, SMTP_HOST/SMTP_PORT y SMTP_USE_TLS=false (ver
+fake_environment).
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+import uuid
+from collections import Counter, OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+
+# Objetos que guarda el S3 falso antes de descartar los más viejos
+S3_MAX_OBJECTS = 2000
+
+# Peticiones atendidas por cada servicio falso (se muestran al detenerlos)
+counters: Counter = Counter()
+_counters_lock = threading.Lock()
+
+
+def _count(key: str):
+    with _counters_lock:
+        counters[key] += 1
+
+
+class _FakeHandler(BaseHTTPRequestHandler):
+    """Base: HTTP/1.1 con keep-alive y sin log por petición"""
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _send(self, status: int, body: bytes = b"", content_type: str = "application/json", headers: Dict[str, str] = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if body and self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _json(self, status: int, data: dict):
+        self._send(status, json.dumps(data).encode("utf-8"))
+
+
+class FakeLiwaHandler(_FakeHandler):
+    """API de SMS de LIWA: autenticación y envío individual"""
+
+    def do_POST(self):
+        self._body()
+        if self.path.rstrip("/").endswith("/auth/login"):
+            _count("liwa.auth")
+            self._json(200, {"token": f"fake-{uuid.uuid4().hex}"})
+        elif self.path.rstrip("/").endswith("/sms/single"):
+            _count("liwa.sms")
+            self._json(200, {"success": True, "message": "SMS enviado", "id": uuid.uuid4().hex})
+        else:
+            self._json(404, {"success": False, "message": "Ruta no encontrada"})
+
+
+class FakeS3Handler(_FakeHandler):
+    """S3 con direccionamiento por ruta; cualquier bucket existe"""
+
+    objects: "OrderedDict[str, tuple]" = OrderedDict()
+    lock = threading.Lock()
+
+    def _not_found(self):
+        body = b'<?xml version="1.0" encoding="UTF-8"?><Error><Code>NoSuchKey</Code></Error>'
+        self._send(404, body, content_type="application/xml")
+
+    def do_PUT(self):
+        body = self._body()
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+        with self.lock:
+            self.objects[self.path] = (body, self.headers.get("Content-Type", "application/octet-stream"), etag)
+            self.objects.move_to_end(self.path)
+            while len(self.objects) > S3_MAX_OBJECTS:
+                self.objects.popitem(last=False)
+        _count("s3.put")
+        self._send(200, headers={"ETag": etag})
+
+    def do_GET(self):
+        _count("s3.get")
+        with self.lock:
+            stored = self.objects.get(self.path.split("?")[0])
+        if stored is None:
+            self._not_found()
+            return
+        body, content_type, etag = stored
+        self._send(200, body, content_type=content_type, headers={"ETag": etag})
+
+    def do_HEAD(self):
+        _count("s3.head")
+        path = self.path.split("?")[0]
+        if path.strip("/").count("/") == 0:
+            self._send(200, content_type="application/xml")  # head_bucket
+            return
+        self.do_GET()
+
+    def do_DELETE(self):
+        _count("s3.delete")
+        with self.lock:
+            self.objects.pop(self.path.split("?")[0], None)
+        self._send(204)
+
+
+async def _smtp_session(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    """Sesión SMTP mínima: acepta autenticación, remitentes y mensajes"""
+
+    async def reply(line: str):
+        writer.write(f"{line}\r\n".encode("ascii"))
+        await writer.drain()
+
+    await reply("220 fake-smtp ESMTP")
+    try:
+        while True:
+            raw = await reader.readline()
+            if not raw:
+                break
+            command = raw.decode("utf-8", "replace").strip()
+            verb = command.split(" ", 1)[0].upper()
+            if verb == "EHLO":
+                await reply("250-fake-smtp\r\n250-AUTH PLAIN LOGIN\r\n250 8BITMIME")
+            elif verb == "HELO":
+                await reply("250 fake-smtp")
+            elif verb == "AUTH":
+                if command.upper().startswith("AUTH LOGIN"):
+                    await reply("334 VXNlcm5hbWU6")
+                    await reader.readline()
+                    await reply("334 UGFzc3dvcmQ6")
+                    await reader.readline()
+                await reply("235 Authentication successful")
+            elif verb == "STARTTLS":
+                await reply("454 TLS not available")
+            elif verb == "DATA":
+                await reply("354 End data with <CR><LF>.<CR><LF>")
+                while (await reader.readline()) not in (b".\r\n", b".\n", b""):
+                    pass
+                _count("smtp.message")
+                await reply("250 OK queued")
+            elif verb == "QUIT":
+                await reply("221 Bye")
+                break
+            elif verb in ("MAIL", "RCPT", "RSET", "NOOP"):
+                await reply("250 OK")
+            else:
+                await reply("502 Command not implemented")
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+def fake_environment(host: str, liwa_port: int, s3_port: int, smtp_port: int) -> Dict[str, str]:
+    """Variables de entorno que apuntan la aplicación a los servicios falsos"""
+    return {
+        "LIWA_AUTH_URL": f"http://{host}:{liwa_port}/v2/auth/login",
+        "LIWA_API_URL": f"http://{host}:{liwa_port}/v2/sms/single",
+        "AWS_S3_ENDPOINT_URL": f"http://{host}:{s3_port}",
+        "SMTP_HOST": host,
+        "SMTP_PORT": str(smtp_port),
+        "SMTP_USE_TLS": "false"
+    }
+
+
+async def serve(host: str = "127.0.0.1", liwa_port: int = 9001, s3_port: int = 9002, smtp_port: int = 2525):
+    """Levantar los tres servicios hasta que se cancele la tarea"""
+    http_servers = [
+        ThreadingHTTPServer((host, liwa_port), FakeLiwaHandler),
+        ThreadingHTTPServer((host, s3_port), FakeS3Handler)
+    ]
+    for server in http_servers:
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    smtp_server = await asyncio.start_server(_smtp_session, host, smtp_port)
+
+    try:
+        async with smtp_server:
+            await smtp_server.serve_forever()
+    finally:
+        for server in http_servers:
+            server.shutdown()
+            server.server_close()
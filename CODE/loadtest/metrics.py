@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+PAQUETES EL CLUB v1.0 - Métricas de las Pruebas de Carga
+Versión: 1.0.0
+Fecha: 2025-11-10
+Autor: Equipo de Desarrollo
+
+Registro de latencias por paso (petición) y por escenario, reporte JSON y
+comparación de dos reportes.
+"""
+
+import math
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+# Versión del formato del reporte (comparar solo reportes de la misma versión)
+REPORT_VERSION = 1
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Percentil por rango más cercano sobre valores ya ordenados"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize_latencies(values: List[float]) -> Dict[str, float]:
+    """p50/p95/p99, media y máximo en milisegundos"""
+    ordered = sorted(values)
+    summary = {f"p{q}": round(percentile(ordered, q), 2) for q in PERCENTILES}
+    summary["mean"] = round(sum(ordered) / len(ordered), 2) if ordered else 0.0
+    summary["max"] = round(ordered[-1], 2) if ordered else 0.0
+    return summary
+
+
+@dataclass
+class StepStats:
+    """Resultados de un paso (endpoint) de los escenarios"""
+    latencies: List[float] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+    errors: Counter = field(default_factory=Counter)
+
+
+@dataclass
+class ScenarioStats:
+    """Sesiones de un escenario: iniciadas, completas, fallidas y descartadas"""
+    latencies: List[float] = field(default_factory=list)
+    started: int = 0
+    completed: int = 0
+    failed: int = 0
+    dropped: int = 0
+
+
+class Recorder:
+    """Acumula resultados durante la corrida (un solo event loop, sin locks)"""
+
+    def __init__(self):
+        self.steps: Dict[str, StepStats] = defaultdict(StepStats)
+        self.scenarios: Dict[str, ScenarioStats] = defaultdict(ScenarioStats)
+
+    def record_step(self, name: str, latency_ms: float, status: Optional[int] = None, error: Optional[str] = None):
+        """Registrar una petición; error es None si la respuesta fue la esperada"""
+        stats = self.steps[name]
+        stats.latencies.append(latency_ms)
+        if status is not None:
+            stats.statuses[str(status)] += 1
+        if error:
+            stats.errors[error] += 1
+
+    def scenario_started(self, name: str):
+        self.scenarios[name].started += 1
+
+    def scenario_finished(self, name: str, latency_ms: float, ok: bool):
+        stats = self.scenarios[name]
+        stats.latencies.append(latency_ms)
+        if ok:
+            stats.completed += 1
+        else:
+            stats.failed += 1
+
+    def scenario_dropped(self, name: str):
+        """Llegada descartada porque se alcanzó el máximo de sesiones concurrentes"""
+        self.scenarios[name].dropped += 1
+
+    def report(self, elapsed: float, meta: dict) -> dict:
+        """Reporte JSON serializable (ver REPORT_VERSION)"""
+        elapsed = max(elapsed, 1e-9)
+        endpoints = {}
+        total_requests = total_errors = 0
+        for name in sorted(self.steps):
+            stats = self.steps[name]
+            count = len(stats.latencies)
+            errors = sum(stats.errors.values())
+            total_requests += count
+            total_errors += errors
+            endpoints[name] = {
+                "count": count,
+                "errors": errors,
+                "error_rate": round(errors / count, 4) if count else 0.0,
+                "throughput_rps": round(count / elapsed, 3),
+                "latency_ms": summarize_latencies(stats.latencies),
+                "status": dict(sorted(stats.statuses.items())),
+                "error_kinds": dict(stats.errors.most_common())
+            }
+
+        scenarios = {}
+        for name in sorted(self.scenarios):
+            stats = self.scenarios[name]
+            scenarios[name] = {
+                "started": stats.started,
+                "completed": stats.completed,
+                "failed": stats.failed,
+                "dropped": stats.dropped,
+                "throughput_per_s": round(stats.completed / elapsed, 3),
+                "latency_ms": summarize_latencies(stats.latencies)
+            }
+
+        return {
+            "version": REPORT_VERSION,
+            "meta": meta,
+            "summary": {
+                "elapsed_s": round(elapsed, 3),
+                "requests": total_requests,
+                "errors": total_errors,
+                "error_rate": round(total_errors / total_requests, 4) if total_requests else 0.0,
+                "throughput_rps": round(total_requests / elapsed, 3)
+            },
+            "endpoints": endpoints,
+            "scenarios": scenarios
+        }
+
+
+def _change(base: float, new: float) -> Optional[float]:
+    """Cambio porcentual (None si la base es cero)"""
+    if not base:
+        return None
+    return (new - base) / base * 100
+
+
+def diff_reports(base: dict, new: dict, threshold_pct: float = 10.0) -> Tuple[List[str], List[str]]:
+    """
+    Comparar dos reportes por endpoint
+
+    Returns:
+        (líneas de la tabla, regresiones): una regresión es un p95/p99 que
+        empeora más de threshold_pct o una tasa de errores que aumenta
+    """
+    lines = [f"{'endpoint':<32} {'métrica':<11} {'base':>10} {'actual':>10} {'cambio':>9}"]
+    regressions = []
+    base_endpoints = base.get("endpoints", {})
+    new_endpoints = new.get("endpoints", {})
+
+    for name in sorted(set(base_endpoints) | set(new_endpoints)):
+        if name not in base_endpoints or name not in new_endpoints:
+            where = "actual" if name in new_endpoints else "base"
+            lines.append(f"{name:<32} (solo en el reporte {where})")
+            continue
+        old, cur = base_endpoints[name], new_endpoints[name]
+        rows = [(f"p{q}", old["latency_ms"][f"p{q}"], cur["latency_ms"][f"p{q}"]) for q in PERCENTILES]
+        rows.append(("rps", old["throughput_rps"], cur["throughput_rps"]))
+        rows.append(("errores %", old["error_rate"] * 100, cur["error_rate"] * 100))
+        for metric, old_value, new_value in rows:
+            change = _change(old_value, new_value)
+            change_text = "—" if change is None else f"{change:+.1f}%"
+            lines.append(f"{name:<32} {metric:<11} {old_value:>10.2f} {new_value:>10.2f} {change_text:>9}")
+            if metric in ("p95", "p99") and change is not None and change > threshold_pct:
+                regressions.append(f"{name} {metric}: {old_value:.2f} → {new_value:.2f} ms ({change:+.1f}%)")
+        if cur["error_rate"] > old["error_rate"]:
+            regressions.append(
+                f"{name} errores: {old['error_rate'] * 100:.2f}% → {cur['error_rate'] * 100:.2f}%"
+            )
+
+    return lines, regressions
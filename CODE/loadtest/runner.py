@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+PAQUETES EL CLUB v1.0 - Generador de Carga
+Versión: 1.0.0
+Fecha: 2025-11-10
+Autor: Equipo de Desarrollo
+
+Modelo abierto: las sesiones llegan como un proceso de Poisson a la tasa
+configurada, sin esperar a que terminen las anteriores (así se comportan
+los usuarios reales; un modelo cerrado oculta la latencia bajo carga).
+El escenario de cada llegada se elige por pesos. Si se alcanza el máximo
+de sesiones concurrentes la llegada se descarta y se cuenta como tal.
+"""
+
+import asyncio
+import random
+import subprocess
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Optional
+
+import httpx
+
+from loadtest.metrics import Recorder
+from loadtest.scenarios import SCENARIOS, LoadContext, ScenarioAborted, login_operator
+
+
+@dataclass
+class RunConfig:
+    """Parámetros de una corrida (se copian al reporte)"""
+    base_url: str = "http://localhost:8000"
+    rate: float = 2.0  # Sesiones nuevas por segundo
+    duration: float = 60.0  # Segundos generando llegadas
+    mix: Dict[str, float] = field(default_factory=lambda: {"operator": 1.0, "public": 3.0})
+    max_concurrency: int = 200
+    drain_timeout: float = 30.0  # Espera a las sesiones en curso al terminar
+    request_timeout: float = 30.0
+    think_time: float = 1.0
+    polls: int = 3
+    images: int = 1
+    image_kb: int = 150
+    seed: Optional[int] = None
+    operator_username: str = "admin"
+    operator_password: str = ""
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """'operator=1,public=3' → {'operator': 1.0, 'public': 3.0}"""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise ValueError(f"Escenario desconocido: {name} (disponibles: {', '.join(SCENARIOS)})")
+        mix[name] = float(weight or 1)
+    if not any(weight > 0 for weight in mix.values()):
+        raise ValueError("Al menos un escenario debe tener peso mayor que cero")
+    return mix
+
+
+def _git_commit() -> Optional[str]:
+    """Commit actual del repositorio (para identificar el reporte)"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).parent, capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+async def _session(ctx: LoadContext, name: str, semaphore: asyncio.Semaphore):
+    """Una sesión de usuario; el cupo de concurrencia ya fue tomado al llegar"""
+    ctx.recorder.scenario_started(name)
+    start = time.perf_counter()
+    ok = False
+    try:
+        await SCENARIOS[name](ctx)
+        ok = True
+    except ScenarioAborted:
+        pass
+    except (KeyError, TypeError, ValueError):
+        # Respuesta 2xx con un cuerpo que no tiene la forma esperada
+        ctx.recorder.record_step(f"{name}.unexpected_body", 0.0, error="respuesta inválida")
+    finally:
+        ctx.recorder.scenario_finished(name, (time.perf_counter() - start) * 1000, ok)
+        semaphore.release()
+
+
+async def run(config: RunConfig) -> dict:
+    """Ejecutar la corrida y devolver el reporte"""
+    rng = random.Random(config.seed)
+    recorder = Recorder()
+    names = [name for name, weight in config.mix.items() if weight > 0]
+    weights = [config.mix[name] for name in names]
+
+    limits = httpx.Limits(max_connections=config.max_concurrency, max_keepalive_connections=config.max_concurrency)
+    timeout = httpx.Timeout(config.request_timeout)
+    async with httpx.AsyncClient(base_url=config.base_url, limits=limits, timeout=timeout) as public, \
+            httpx.AsyncClient(base_url=config.base_url, limits=limits, timeout=timeout) as operator:
+        ctx = LoadContext(
+            public=public,
+            operator=operator,
+            recorder=recorder,
+            rng=rng,
+            think_time=config.think_time,
+            polls=config.polls,
+            images=config.images,
+            image_kb=config.image_kb
+        )
+        if "operator" in names:
+            await login_operator(ctx, config.operator_username, config.operator_password)
+
+        semaphore = asyncio.Semaphore(config.max_concurrency)
+        sessions = set()
+        start = time.perf_counter()
+        deadline = start + config.duration
+        next_arrival = start
+        while True:
+            next_arrival += rng.expovariate(config.rate)
+            if next_arrival >= deadline:
+                break
+            await asyncio.sleep(max(0.0, next_arrival - time.perf_counter()))
+            name = rng.choices(names, weights)[0]
+            if semaphore.locked():
+                recorder.scenario_dropped(name)
+                continue
+            await semaphore.acquire()  # No bloquea: hay cupo
+            task = asyncio.create_task(_session(ctx, name, semaphore))
+            sessions.add(task)
+            task.add_done_callback(sessions.discard)
+
+        if sessions:
+            _, pending = await asyncio.wait(set(sessions), timeout=config.drain_timeout)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        elapsed = time.perf_counter() - start
+
+    meta = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "config": {key: value for key, value in asdict(config).items() if key != "operator_password"}
+    }
+    return recorder.report(elapsed, meta)
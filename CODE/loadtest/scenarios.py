@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""
+PAQUETES EL CLUB v1.0 - Escenarios de las Pruebas de Carga
+Versión: 1.0.0
+Fecha: 2025-11-10
+Autor: Equipo de Desarrollo
+
+Cada escenario es una sesión de usuario: una secuencia de pasos con tiempos
+de espera entre ellos. Cada paso se registra con su propio nombre
+(escenario.paso) y un paso con respuesta inesperada termina la sesión.
+
+- operator: dashboard → contador del header → recibir con imágenes un
+  anuncio pendiente → detalle → entregar con pago en efectivo
+- public: anunciar un paquete → consultar el código de guía varias veces
+  (revalidando con If-None-Match como el navegador)
+
+Los anuncios del escenario público alimentan la cola de recepción del
+operador; si la cola está vacía, el operador crea su propio anuncio.
+"""
+
+import asyncio
+import itertools
+import os
+import random
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+import httpx
+
+from loadtest.metrics import Recorder
+
+# Anuncios pendientes de recibir (los más viejos se descartan si se llena)
+PENDING_QUEUE_SIZE = 1000
+
+
+class ScenarioAborted(Exception):
+    """Un paso no obtuvo la respuesta esperada: la sesión termina"""
+
+
+@dataclass
+class LoadContext:
+    """Estado compartido por todas las sesiones de una corrida"""
+    public: httpx.AsyncClient
+    operator: httpx.AsyncClient
+    recorder: Recorder
+    rng: random.Random
+    think_time: float = 1.0
+    polls: int = 3
+    images: int = 1
+    image_kb: int = 150
+    operator_id: Optional[int] = None
+    pending: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(PENDING_QUEUE_SIZE))
+    run_id: str = field(default_factory=lambda: uuid.uuid4().hex[:6].upper())
+    _sequence: itertools.count = field(default_factory=itertools.count)
+    _image: Optional[bytes] = None
+
+    def next_guide_number(self) -> str:
+        """Número de guía único por corrida (evita el 409 por guía duplicada)"""
+        return f"LT{self.run_id}{next(self._sequence):07d}"
+
+    def random_phone(self) -> str:
+        """Celular colombiano válido (3XXXXXXXXX)"""
+        return f"3{self.rng.randint(0, 999_999_999):09d}"
+
+    def image_payload(self) -> bytes:
+        """Imagen sintética: cabecera JPEG y relleno aleatorio (no se procesa en el servidor)"""
+        if self._image is None:
+            self._image = b"\xff\xd8\xff\xe0" + os.urandom(max(self.image_kb * 1024 - 6, 0)) + b"\xff\xd9"
+        return self._image
+
+    async def think(self):
+        """Espera entre pasos: exponencial con media think_time"""
+        if self.think_time > 0:
+            await asyncio.sleep(self.rng.expovariate(1 / self.think_time))
+
+    def remember_pending(self, tracking_code: str):
+        if self.pending.full():
+            self.pending.get_nowait()
+        self.pending.put_nowait(tracking_code)
+
+    def take_pending(self) -> Optional[str]:
+        try:
+            return self.pending.get_nowait()
+        except asyncio.QueueEmpty:
+            return None
+
+
+async def step(
+    ctx: LoadContext,
+    client: httpx.AsyncClient,
+    name: str,
+    method: str,
+    url: str,
+    expect=(200,),
+    **kwargs
+) -> httpx.Response:
+    """Ejecutar y cronometrar una petición; ScenarioAborted si el estado no es el esperado"""
+    start = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+    except httpx.HTTPError as e:
+        ctx.recorder.record_step(name, (time.perf_counter() - start) * 1000, error=type(e).__name__)
+        raise ScenarioAborted(name) from e
+    latency_ms = (time.perf_counter() - start) * 1000
+
+    error = None if response.status_code in expect else f"HTTP {response.status_code}"
+    ctx.recorder.record_step(name, latency_ms, status=response.status_code, error=error)
+    if error:
+        raise ScenarioAborted(name)
+    return response
+
+
+async def conditional_get(ctx: LoadContext, client: httpx.AsyncClient, name: str, url: str, etags: Dict[str, str], **kwargs):
+    """GET con If-None-Match como lo hace el navegador (200 o 304)"""
+    headers = {"If-None-Match": etags[url]} if url in etags else {}
+    response = await step(ctx, client, name, "GET", url, expect=(200, 304), headers=headers, **kwargs)
+    if response.headers.get("etag"):
+        etags[url] = response.headers["etag"]
+    return response
+
+
+async def announce(ctx: LoadContext, client: httpx.AsyncClient, name: str) -> str:
+    """Crear un anuncio desde el formulario público; devuelve el código de guía"""
+    response = await step(ctx, client, name, "POST", "/api/announcements/", json={
+        "customer_name": f"Cliente Carga {ctx.rng.randint(1, 9999)}",
+        "customer_phone": ctx.random_phone(),
+        "guide_number": ctx.next_guide_number()
+    })
+    return response.json()["announcement"]["tracking_code"]
+
+
+# ========================================
+# ESCENARIOS
+# ========================================
+
+async def public_customer(ctx: LoadContext):
+    """Cliente público: anuncia un paquete y consulta su estado varias veces"""
+    etags: Dict[str, str] = {}
+    tracking_code = await announce(ctx, ctx.public, "public.announce")
+    ctx.remember_pending(tracking_code)
+    for _ in range(ctx.polls):
+        await ctx.think()
+        await conditional_get(
+            ctx, ctx.public, "public.track", "/api/announcements/search/package",
+            etags, params={"query": tracking_code}
+        )
+
+
+async def operator(ctx: LoadContext):
+    """Operador: revisa el dashboard, recibe un anuncio con fotos y lo entrega"""
+    etags: Dict[str, str] = {}
+    await conditional_get(ctx, ctx.operator, "operator.list", "/api/packages/", etags, params={"skip": 0, "limit": 10})
+    await conditional_get(ctx, ctx.operator, "operator.announced_count", "/api/header/packages/announced/count", etags)
+    await ctx.think()
+
+    tracking_code = ctx.take_pending() or await announce(ctx, ctx.public, "operator.announce")
+    files = [
+        ("images", (f"foto_{i + 1}.jpg", ctx.image_payload(), "image/jpeg"))
+        for i in range(ctx.images)
+    ]
+    response = await step(ctx, ctx.operator, "operator.receive", "POST", "/api/packages/receive-with-images", data={
+        "announcement_id": f"announcement_{tracking_code}",
+        "package_type": ctx.rng.choice(("NORMAL", "NORMAL", "NORMAL", "EXTRA_DIMENSIONED")),
+        "package_condition": ctx.rng.choice(("OK", "OK", "REGULAR", "OPENED")),
+        "observations": "Prueba de carga"
+    }, files=files)
+    package_id = response.json()["package"]["id"]
+    await ctx.think()
+
+    detail = await conditional_get(ctx, ctx.operator, "operator.detail", f"/api/packages/{package_id}", etags)
+    total_amount = detail.json()["total_amount"]
+    await ctx.think()
+
+    await step(ctx, ctx.operator, "operator.deliver", "POST", f"/api/packages/{package_id}/deliver", json={
+        "payment_method": "efectivo",
+        "payment_amount": total_amount,
+        "operator_id": ctx.operator_id
+    })
+
+
+SCENARIOS = {
+    "operator": operator,
+    "public": public_customer
+}
+
+
+async def login_operator(ctx: LoadContext, username: str, password: str):
+    """
+    Iniciar sesión una vez para todas las sesiones de operador
+
+    La cookie se fija a mano en el cliente: fuera de development el servidor
+    la marca como secure y httpx no la enviaría por http.
+    """
+    response = await step(ctx, ctx.operator, "operator.login", "POST", "/api/auth/login", data={
+        "username": username,
+        "password": password
+    })
+    data = response.json()
+    ctx.operator.cookies.set("access_token", data["access_token"])
+    ctx.operator_id = int(data["user"]["id"])
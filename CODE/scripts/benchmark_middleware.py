@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: costo por petición de AuthRedirectMiddleware como
+BaseHTTPMiddleware (implementación anterior, reproducida aquí) frente al
+middleware ASGI puro actual, y tiempo hasta el primer byte de una descarga
+en streaming a través de cada uno
+
+Uso:
+    python scripts/benchmark_middleware.py [iteraciones]
+
+Llama a la aplicación ASGI directamente (sin servidor ni red) con una
+aplicación Starlette mínima: respuesta JSON pequeña en una ruta pública y en
+una protegida, y una respuesta en streaming de 20 fragmentos con 5 ms entre
+fragmentos.
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Agregar el directorio src al path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from app.middleware.auth_redirect import PUBLIC_PATHS, STATIC_PATHS, AuthRedirectMiddleware
+
+STREAM_CHUNKS = 20
+STREAM_DELAY = 0.005
+
+
+class LegacyAuthRedirectMiddleware(BaseHTTPMiddleware):
+    """Implementación anterior: BaseHTTPMiddleware con búsquedas lineales de rutas"""
+
+    def __init__(self, app, login_url: str = "/auth/login"):
+        super().__init__(app)
+        self.inner = AuthRedirectMiddleware(app, login_url)
+
+    async def dispatch(self, request, call_next):
+        path = request.url.path
+        if path in PUBLIC_PATHS or any(path.startswith(p + "/") or path.startswith(p + "?") for p in PUBLIC_PATHS):
+            return await call_next(request)
+        if any(path.startswith(p) for p in STATIC_PATHS):
+            return await call_next(request)
+        response = await call_next(request)
+        if response.status_code == 401:
+            return self.inner._handle_unauthorized(request.scope)
+        return response
+
+
+async def small_json(request):
+    return JSONResponse({"success": True, "items": [1, 2, 3]})
+
+
+async def stream(request):
+    async def chunks():
+        for _ in range(STREAM_CHUNKS):
+            await asyncio.sleep(STREAM_DELAY)
+            yield b"x" * 16384
+    return StreamingResponse(chunks(), media_type="image/jpeg")
+
+
+def build_app() -> Starlette:
+    return Starlette(routes=[
+        Route("/search", small_json),
+        Route("/api/packages/{package_id}", small_json),
+        Route("/api/images/{file_id}", stream),
+    ])
+
+
+async def call(app, path: str):
+    """Ejecutar una petición GET; devuelve (segundos hasta el primer byte del cuerpo, segundos totales)"""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+        "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 1), "server": ("bench", 80),
+    }
+    request_sent = False
+    disconnected = asyncio.Event()
+    first_byte = None
+    start = time.perf_counter()
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal first_byte
+        if message["type"] == "http.response.body" and first_byte is None and message.get("body"):
+            first_byte = time.perf_counter() - start
+
+    await app(scope, receive, send)
+    total = time.perf_counter() - start
+    disconnected.set()
+    return first_byte or total, total
+
+
+async def per_request_us(app, path: str, iterations: int) -> float:
+    for _ in range(min(iterations, 200)):
+        await call(app, path)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await call(app, path)
+    return (time.perf_counter() - start) * 1e6 / iterations
+
+
+async def streaming_ms(app, iterations: int):
+    samples = [await call(app, "/api/images/1") for _ in range(iterations)]
+    return (
+        statistics.median(ttfb for ttfb, _ in samples) * 1000,
+        statistics.median(total for _, total in samples) * 1000
+    )
+
+
+async def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    base = build_app()
+    stacks = [
+        ("sin middleware", base),
+        ("BaseHTTPMiddleware", LegacyAuthRedirectMiddleware(base)),
+        ("ASGI puro", AuthRedirectMiddleware(base)),
+    ]
+
+    print("=" * 78)
+    print(f"BENCHMARK AuthRedirectMiddleware ({iterations} peticiones por caso)")
+    print("=" * 78)
+
+    print(f"\n{'Pila':<22}{'pública (µs)':>16}{'protegida (µs)':>18}{'TTFB (ms)':>11}{'total (ms)':>11}")
+    results = {}
+    for name, app in stacks:
+        public = await per_request_us(app, "/search", iterations)
+        protected = await per_request_us(app, "/api/packages/1", iterations)
+        ttfb, total = await streaming_ms(app, max(10, iterations // 250))
+        results[name] = protected
+        print(f"{name:<22}{public:>16.1f}{protected:>18.1f}{ttfb:>11.2f}{total:>11.2f}")
+
+    baseline = results["sin middleware"]
+    print(
+        f"\nSobrecarga en ruta protegida: BaseHTTPMiddleware {results['BaseHTTPMiddleware'] - baseline:.1f} µs, "
+        f"ASGI puro {results['ASGI puro'] - baseline:.1f} µs"
+    )
+    print(f"TTFB ideal del streaming: {STREAM_DELAY * 1000:.0f} ms (un fragmento)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
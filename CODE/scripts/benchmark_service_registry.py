@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: costo de construir S3Service / SMSService / EmailService por
+petición frente a obtenerlos del registro de servicios del proceso
+
+Uso:
+    python scripts/benchmark_service_registry.py [iteraciones]
+
+No hace llamadas de red: construir el cliente boto3 solo carga modelos y
+crea el pool de conexiones. Si no hay credenciales AWS en el entorno se usan
+unas ficticias solo para poder construir el cliente.
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+# Agregar el directorio src al path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "AKIABENCHMARKONLY000")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "benchmark-only-secret")
+
+from app.services.s3_service import S3Service
+from app.services.sms_service import SMSService
+from app.services.email_service import EmailService
+from app.services.registry import service_registry, get_s3_service, get_sms_service, get_email_service
+
+
+def measure(factory, iterations: int) -> float:
+    """Tiempo medio por llamada en milisegundos"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        factory()
+    return (time.perf_counter() - start) * 1000 / iterations
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    cases = [
+        ("S3Service", S3Service, get_s3_service),
+        ("SMSService", SMSService, get_sms_service),
+        ("EmailService", EmailService, get_email_service),
+    ]
+
+    print("=" * 70)
+    print(f"BENCHMARK REGISTRO DE SERVICIOS ({iterations} iteraciones)")
+    print("=" * 70)
+
+    warm_up_start = time.perf_counter()
+    service_registry.warm_up()
+    print(f"\nwarm_up() inicial: {(time.perf_counter() - warm_up_start) * 1000:.2f} ms\n")
+
+    print(f"{'Servicio':<15}{'Por petición (ms)':>20}{'Registro (ms)':>18}{'Aceleración':>15}")
+    for name, constructor, getter in cases:
+        per_request = measure(constructor, iterations)
+        registry = measure(getter, iterations)
+        speedup = per_request / registry if registry else float("inf")
+        print(f"{name:<15}{per_request:>20.4f}{registry:>18.6f}{speedup:>14.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 from sqlalchemy.orm import Session
 from app.database import SessionLocal
 from app.services.sms_service import SMSService
+from app.services.liwa_token_lease import liwa_token_lease
 from app.utils.datetime_utils import get_colombia_now
 
 
@@ -43,25 +44,16 @@ async def main():
         print(f"\n📋 Estado del Cache del Token:")
         now = get_colombia_now()
         
-        if hasattr(sms_service, '_cached_token') and sms_service._cached_token:
-            print(f"   ✅ Token en cache: SÍ")
-            print(f"   🔑 Token: {sms_service._cached_token[:50]}...")
-            
-            if hasattr(sms_service, '_token_expires_at') and sms_service._token_expires_at:
-                expires_at = sms_service._token_expires_at
-                time_left = expires_at - now
-                
-                print(f"   ⏰ Expira en: {expires_at.strftime('%Y-%m-%d %H:%M:%S')}")
-                print(f"   ⏳ Tiempo restante: {time_left}")
-                
-                if time_left.total_seconds() > 0:
-                    print(f"   ✅ Estado: VÁLIDO")
-                else:
-                    print(f"   ❌ Estado: EXPIRADO")
-            else:
-                print(f"   ⚠️  Fecha de expiración: NO DEFINIDA")
+        lease = liwa_token_lease.current(config.account_id)
+        if lease:
+            token, expires_ts = lease
+            expires_at = datetime.fromtimestamp(expires_ts, tz=now.tzinfo)
+            print(f"   ✅ Token compartido en Redis: SÍ")
+            print(f"   🔑 Token: {token[:50]}...")
+            print(f"   ⏰ Expira en: {expires_at.strftime('%Y-%m-%d %H:%M:%S')}")
+            print(f"   ⏳ Tiempo restante: {expires_at - now}")
         else:
-            print(f"   ❌ Token en cache: NO")
+            print(f"   ❌ Token compartido en Redis: NO")
         
         # Probar obtención de token
         print(f"\n🔄 Probando obtención de token...")
@@ -71,11 +63,11 @@ async def main():
             print(f"   🔑 Token: {token[:50]}...")
             
             # Verificar nuevo estado del cache
-            if hasattr(sms_service, '_token_expires_at') and sms_service._token_expires_at:
-                expires_at = sms_service._token_expires_at
-                time_left = expires_at - get_colombia_now()
+            lease = liwa_token_lease.current(config.account_id)
+            if lease:
+                expires_at = datetime.fromtimestamp(lease[1], tz=get_colombia_now().tzinfo)
                 print(f"   ⏰ Nuevo token expira en: {expires_at.strftime('%Y-%m-%d %H:%M:%S')}")
-                print(f"   ⏳ Tiempo de vida: {time_left}")
+                print(f"   ⏳ Tiempo de vida: {expires_at - get_colombia_now()}")
             
         except Exception as e:
             print(f"   ❌ Error obteniendo token: {str(e)}")
@@ -28,15 +28,27 @@ celery_app.conf.update(
 
     # Configuración de tareas
     task_routes={
-        "app.tasks.generate_report": {"queue": "reports"},
+        "src.tasks.generate_report": {"queue": "reports"},
+        "src.tasks.generate_bulk_reports": {"queue": "reports"},
         "app.tasks.send_bulk_sms": {"queue": "sms"},
+        "src.tasks.send_announcement_notifications": {"queue": "sms"},
+        "src.tasks.dispatch_package_notification": {"queue": "sms"},
+        "src.tasks.dispatch_pending_package_notifications": {"queue": "sms"},
         "app.tasks.process_file_upload": {"queue": "files"},
         "app.tasks.cleanup_old_data": {"queue": "maintenance"},
+        "src.tasks.cleanup_invalid_customers": {"queue": "maintenance"},
+        "src.tasks.bulk_delete_packages": {"queue": "maintenance"},
+        "src.tasks.recalculate_package_fees": {"queue": "maintenance"},
+        "src.tasks.backfill_customer_counters": {"queue": "maintenance"},
+        "src.tasks.maintain_package_event_partitions": {"queue": "maintenance"},
+        "src.tasks.archive_terminal_packages": {"queue": "maintenance"},
+        "src.tasks.refill_tracking_code_pool": {"queue": "maintenance"},
     },
 
     # Configuración de colas
     task_default_queue="default",
     task_queues={
+        "default": {"exchange": "default", "routing_key": "default"},
         "reports": {"exchange": "reports", "routing_key": "reports"},
         "sms": {"exchange": "sms", "routing_key": "sms"},
         "files": {"exchange": "files", "routing_key": "files"},
@@ -70,6 +82,22 @@ celery_app.conf.update(
             "task": "app.tasks.update_dashboard_metrics",
             "schedule": 300.0,  # Cada 5 minutos
         },
+        "dispatch-pending-package-notifications": {
+            "task": "src.tasks.dispatch_pending_package_notifications",
+            "schedule": float(settings.package_outbox_sweep_interval),
+        },
+        "maintain-package-event-partitions": {
+            "task": "src.tasks.maintain_package_event_partitions",
+            "schedule": 86400.0,  # Cada 24 horas
+        },
+        "archive-terminal-packages": {
+            "task": "src.tasks.archive_terminal_packages",
+            "schedule": 86400.0,  # Cada 24 horas
+        },
+        "refill-tracking-code-pool": {
+            "task": "src.tasks.refill_tracking_code_pool",
+            "schedule": 300.0,  # Cada 5 minutos
+        },
     },
 )
 
@@ -104,5 +132,24 @@ def setup_periodic_tasks(sender, **kwargs):
 from celery.signals import celeryd_init
 celeryd_init.connect(setup_periodic_tasks)
 
+# Usar el mismo logging estructurado que la aplicación web en los workers
+from celery.signals import setup_logging as celery_setup_logging
+
+@celery_setup_logging.connect
+def configure_worker_logging(**kwargs):
+    """Reemplazar la configuración de logging de Celery por la de la aplicación"""
+    from .logging_config import setup_logging
+    setup_logging()
+
+# Servicios (S3, SMS, Email) construidos una vez por proceso hijo del worker
+from celery.signals import worker_process_init
+
+@worker_process_init.connect
+def warm_up_worker_services(**kwargs):
+    """Descartar instancias heredadas del padre y precalentar las del proceso hijo"""
+    from .services.registry import service_registry
+    service_registry.reset()
+    service_registry.warm_up()
+
 if __name__ == "__main__":
     celery_app.start()
\ No newline at end of file
@@ -16,6 +16,8 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 import os
 from .config import settings
+# Import absoluto: un solo contextvar de estadísticas aunque este módulo se cargue como src.app.database
+from app.utils.query_stats import install_query_hooks
 
 # URL de la base de datos desde configuración
 DATABASE_URL = settings.database_url
@@ -31,6 +33,9 @@ engine = create_engine(
     } if "postgresql" in DATABASE_URL else {}
 )
 
+# Conteo de consultas, filas y tiempo de BD por petición, y log de consultas lentas
+install_query_hooks(engine)
+
 # Crear sesión de base de datos
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+PAQUETES EL CLUB v1.0 - Configuración de Logging
+Versión: 1.0.0
+Fecha: 2025-11-10
+Autor: Equipo de Desarrollo
+
+Logging estructurado y no bloqueante:
+
+- Los registros se encolan con un QueueHandler y un QueueListener en un hilo
+  aparte los formatea (JSON por defecto) y los escribe; el worker que atiende
+  la petición nunca espera a stdout.
+- Cada registro lleva el request_id de la petición en curso (contextvar que
+  fija RequestIdMiddleware).
+- Niveles por módulo desde Settings.log_module_levels
+  (p. ej. "app.routes.public=WARNING,sqlalchemy.engine=WARNING").
+- log_sampled limita los mensajes repetitivos de rutas calientes a
+  Settings.log_sample_per_second por clave.
+"""
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from app.config import settings
+
+# ID de la petición en curso (lo fija RequestIdMiddleware)
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_exception_formatter = logging.Formatter()
+
+# Atributos estándar de LogRecord que no se copian como campos extra
+_RESERVED_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "request_id"}
+
+
+def get_request_id() -> Optional[str]:
+    """ID de la petición en curso, si existe"""
+    return request_id_var.get()
+
+
+class JsonFormatter(logging.Formatter):
+    """Una línea JSON por registro, con los campos extra pasados en extra={...}"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "timestamp": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            payload["request_id"] = request_id
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exception"] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class _ContextQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler que captura el request_id antes de cambiar de hilo"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Formatear el mensaje y la traza aquí (los args pueden no ser serializables
+        # entre hilos), pero conservar la traza aparte del mensaje
+        prepared = copy.copy(record)
+        prepared.request_id = request_id_var.get()
+        prepared.msg = record.getMessage()
+        prepared.args = None
+        if record.exc_info and not record.exc_text:
+            prepared.exc_text = _exception_formatter.formatException(record.exc_info)
+        prepared.exc_info = None
+        return prepared
+
+
+def parse_module_levels(spec: str) -> Dict[str, int]:
+    """Convertir "modulo=NIVEL,otro=NIVEL" en {modulo: nivel}"""
+    levels = {}
+    for item in (spec or "").split(","):
+        if "=" not in item:
+            continue
+        name, level = item.split("=", 1)
+        name, level = name.strip(), level.strip().upper()
+        if name and isinstance(logging.getLevelName(level), int):
+            levels[name] = logging.getLevelName(level)
+    return levels
+
+
+def setup_logging() -> None:
+    """Configurar el logging raíz (idempotente)"""
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if settings.log_json:
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter(settings.log_format))
+
+    log_queue: queue.Queue = queue.Queue(-1)
+    queue_handler = _ContextQueueHandler(log_queue)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(settings.log_level.upper())
+
+    for name, level in parse_module_levels(settings.log_module_levels).items():
+        logging.getLogger(name).setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Vaciar la cola y detener el hilo del listener"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+# ========================================
+# MUESTREO DE MENSAJES REPETITIVOS
+# ========================================
+
+_sample_lock = threading.Lock()
+_sample_windows: Dict[str, list] = {}
+
+
+def log_sampled(logger: logging.Logger, level: int, key: str, msg: str, *args, **kwargs) -> None:
+    """
+    Registrar como máximo settings.log_sample_per_second mensajes por clave y segundo
+
+    Si el nivel está deshabilitado no se formatea nada; los mensajes omitidos se
+    reportan en el siguiente registro emitido como campo "suppressed".
+    """
+    if not logger.isEnabledFor(level):
+        return
+
+    now = int(time.monotonic())
+    with _sample_lock:
+        window = _sample_windows.get(key)
+        if window is None or window[0] != now:
+            suppressed = window[2] if window else 0
+            window = _sample_windows[key] = [now, 0, 0]
+        else:
+            suppressed = 0
+        if window[1] >= settings.log_sample_per_second:
+            window[2] += 1
+            return
+        window[1] += 1
+
+    if suppressed:
+        extra = dict(kwargs.pop("extra", None) or {})
+        extra["suppressed"] = suppressed
+        kwargs["extra"] = extra
+    logger.log(level, msg, *args, **kwargs)
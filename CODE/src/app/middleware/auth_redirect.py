@@ -8,121 +8,95 @@
 # ========================================
 
 """
-Middleware para redirección automática al login cuando el usuario no está autenticado
+Middleware ASGI para redirección automática al login cuando el usuario no
+está autenticado. Las rutas públicas y estáticas pasan directo; en las demás
+solo se observa el inicio de la respuesta, así que las descargas en streaming
+(imágenes, CSV) no se almacenan en memoria
 """
 
-from fastapi import Request, Response, HTTPException
+from fastapi import HTTPException
 from fastapi.responses import RedirectResponse, JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 import logging
-from typing import List, Optional
 from urllib.parse import urlencode
 
+from app.utils.path_matcher import PathMatcher
+
 logger = logging.getLogger(__name__)
 
-class AuthRedirectMiddleware(BaseHTTPMiddleware):
+# Rutas que no requieren redirección (públicas)
+PUBLIC_PATHS = frozenset({
+    "/",
+    "/announce",
+    "/search",
+    "/help",
+    "/cookies",
+    "/policies",
+    "/auth/login",
+    "/auth/register",
+    "/auth/forgot-password",
+    "/auth/reset-password",
+    "/health",
+    "/metrics",
+    "/docs",
+    "/redoc",
+    "/openapi.json",
+    "/api/health",
+    "/api/auth/login"  # Agregar endpoint de login API
+})
+
+# Rutas estáticas que no requieren autenticación
+STATIC_PATHS = ("/static/", "/uploads/")
+
+
+class AuthRedirectMiddleware:
     """
     Middleware que intercepta respuestas 401 y redirige automáticamente al login
     """
-    
+
     def __init__(self, app: ASGIApp, login_url: str = "/auth/login"):
-        super().__init__(app)
+        self.app = app
         self.login_url = login_url
-        
-        # Rutas que no requieren redirección (públicas)
-        self.public_paths = {
-            "/",
-            "/announce",
-            "/search",
-            "/help",
-            "/cookies",
-            "/policies",
-            "/auth/login",
-            "/auth/register", 
-            "/auth/forgot-password",
-            "/auth/reset-password",
-            "/health",
-            "/metrics",
-            "/docs",
-            "/redoc",
-            "/openapi.json",
-            "/api/health",
-            "/api/auth/login"  # Agregar endpoint de login API
-        }
-        
-        # Rutas de API que requieren redirección JSON
-        self.api_paths = {
-            "/api/"
-        }
-        
-        # Rutas estáticas que no requieren autenticación
-        self.static_paths = {
-            "/static/",
-            "/uploads/"
-        }
+        # Exactas + subrutas de las públicas + prefijos estáticos, precompilados
+        self.exempt_paths = PathMatcher(PUBLIC_PATHS, (*PUBLIC_PATHS, *STATIC_PATHS))
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self.exempt_paths.matches(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        unauthorized = False
+
+        async def send_or_redirect(message: Message) -> None:
+            nonlocal unauthorized
+            if message["type"] == "http.response.start" and message["status"] == 401:
+                # Descartar la respuesta 401 original y enviar la del login
+                # cuando la aplicación termine su cuerpo
+                unauthorized = True
+                return
+            if not unauthorized:
+                await send(message)
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                await self._handle_unauthorized(scope)(scope, receive, send)
 
-    async def dispatch(self, request: Request, call_next):
-        """
-        Intercepta la request y maneja la redirección de autenticación
-        """
         try:
-            # Verificar si es una ruta pública
-            if self._is_public_path(request.url.path):
-                response = await call_next(request)
-                return response
-            
-            # Verificar si es una ruta estática
-            if self._is_static_path(request.url.path):
-                response = await call_next(request)
-                return response
-            
-            # Procesar la request normalmente
-            response = await call_next(request)
-            
-            # Si la respuesta es 401, manejar la redirección
-            if response.status_code == 401:
-                return await self._handle_unauthorized(request, response)
-            
-            return response
-            
+            await self.app(scope, receive, send_or_redirect)
         except HTTPException as e:
-            if e.status_code == 401:
-                return await self._handle_unauthorized(request, None)
-            raise e
-        except Exception as e:
-            logger.error(f"Error en AuthRedirectMiddleware: {e}")
-            return await call_next(request)
-
-    def _is_public_path(self, path: str) -> bool:
-        """Verificar si la ruta es pública"""
-        # Verificación exacta
-        if path in self.public_paths:
-            return True
-        
-        # Verificación de prefijos
-        for public_path in self.public_paths:
-            if path.startswith(public_path + "/") or path.startswith(public_path + "?"):
-                return True
-        
-        return False
-
-    def _is_static_path(self, path: str) -> bool:
-        """Verificar si la ruta es estática"""
-        for static_path in self.static_paths:
-            if path.startswith(static_path):
-                return True
-        return False
+            if e.status_code != 401 or unauthorized:
+                raise
+            await self._handle_unauthorized(scope)(scope, receive, send)
 
     def _is_api_path(self, path: str) -> bool:
         """Verificar si la ruta es de API"""
         # Solo las rutas que empiecen con /api/ son APIs
         return path.startswith("/api/")
 
-    async def _handle_unauthorized(self, request: Request, response: Optional[Response]):
+    def _handle_unauthorized(self, scope: Scope):
         """
-        Manejar respuesta 401 - redirigir al login
+        Respuesta para un 401 - redirigir al login
         """
+        request = Request(scope)
         path = request.url.path
         query_params = dict(request.query_params)
         
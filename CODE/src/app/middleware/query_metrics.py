@@ -0,0 +1,86 @@
+# ========================================
+# PAQUETES EL CLUB v1.0 - Middleware de Métricas SQL
+# ========================================
+# Archivo: CODE/LOCAL/src/app/middleware/query_metrics.py
+# Versión: 1.0.0
+# Fecha: 2025-11-10
+# Autor: Equipo de Desarrollo
+# ========================================
+
+"""
+Middleware ASGI que abre un QueryStats por petición, lo atribuye a la
+plantilla de la ruta (/api/packages/{package_id}, no la URL concreta),
+añade la cabecera Server-Timing y publica los histogramas de Prometheus
+"""
+
+import logging
+
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.utils.query_stats import (
+    DB_QUERIES_PER_REQUEST, DB_REPEATED_STATEMENTS, DB_ROWS_PER_REQUEST, DB_TIME_PER_REQUEST,
+    QueryStats, query_stats_var
+)
+
+logger = logging.getLogger("app.sql")
+
+SERVER_TIMING_HEADER = b"server-timing"
+UNMATCHED_ROUTE = "unmatched"
+
+
+def resolve_route_template(scope: Scope) -> str:
+    """Plantilla de la ruta que atenderá la petición (acotada para las etiquetas)"""
+    app = scope.get("app")
+    for route in getattr(app, "routes", []):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", UNMATCHED_ROUTE) or UNMATCHED_ROUTE
+    return UNMATCHED_ROUTE
+
+
+class QueryMetricsMiddleware:
+    """Consultas, filas y tiempo de base de datos por petición"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        stats = QueryStats(route=resolve_route_template(scope))
+
+        async def send_with_server_timing(message: Message) -> None:
+            if message["type"] == "http.response.start" and settings.sql_server_timing:
+                headers = list(message.get("headers", []))
+                headers.append((SERVER_TIMING_HEADER, stats.server_timing().encode("latin-1")))
+                message["headers"] = headers
+            await send(message)
+
+        token = query_stats_var.set(stats)
+        try:
+            await self.app(scope, receive, send_with_server_timing)
+        finally:
+            query_stats_var.reset(token)
+            self._observe(method, stats)
+
+    @staticmethod
+    def _observe(method: str, stats: QueryStats) -> None:
+        if stats.route == UNMATCHED_ROUTE:
+            return
+        labels = {"method": method, "route": stats.route}
+        DB_QUERIES_PER_REQUEST.labels(**labels).observe(stats.count)
+        DB_TIME_PER_REQUEST.labels(**labels).observe(stats.db_time)
+        DB_ROWS_PER_REQUEST.labels(**labels).observe(stats.rows)
+
+        if stats.max_repeats > settings.sql_repeat_threshold:
+            DB_REPEATED_STATEMENTS.labels(**labels).inc()
+            shape, times = stats.most_repeated(1)[0]
+            logger.warning(
+                "Posible N+1: consulta repetida %d veces en %s %s", times, method, stats.route,
+                extra={"route": stats.route, "method": method, "queries": stats.count, "repeat": times, "sql": shape}
+            )
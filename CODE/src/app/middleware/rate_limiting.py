@@ -4,26 +4,26 @@ PAQUETES EL CLUB v1.0 - Rate Limiting Middleware
 Versión: 1.0.0
 Fecha: 2025-09-21
 Autor: Equipo de Desarrollo
+
+Middleware ASGI que aplica a cada petición el límite de su ruta por IP del
+cliente (GCRA en Redis, ver app.utils.rate_limiter). Las reglas se compilan
+una sola vez al construir la pila de middlewares.
+
+Detrás de nginx el par de la conexión es el proxy: la IP del cliente se toma
+de X-Forwarded-For / X-Real-IP solo cuando el par es un proxy de confianza
+(RATE_LIMIT_TRUSTED_PROXIES); en otro caso esas cabeceras se ignoran.
 """
 
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.middleware import SlowAPIMiddleware
-from slowapi.errors import RateLimitExceeded
-from fastapi import Request, HTTPException
-from fastapi.responses import JSONResponse
-import redis
-from app.config import settings
+import ipaddress
+import math
+from functools import lru_cache
+from typing import Optional
 
-# Crear cliente Redis para rate limiting
-redis_client = redis.from_url(settings.redis_url)
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 
-# Configurar Limiter con Redis como backend
-limiter = Limiter(
-    key_func=get_remote_address,
-    storage_uri=settings.redis_url,
-    strategy="fixed-window",  # Ventana fija para consistencia
-)
+from app.config import settings
+from app.utils.rate_limiter import Decision, RateLimiter, RouteLimitTable
 
 # ========================================
 # CONFIGURACIÓN DE LIMITS POR ENDPOINT
@@ -36,7 +36,8 @@ GENERAL_LIMITS = {
     "api": "200/minute",      # Límite para endpoints de API
 }
 
-# Límites específicos por endpoint/ruta
+# Límites específicos por endpoint/ruta (cubren también sus subrutas; gana el
+# prefijo más largo)
 ENDPOINT_LIMITS = {
     # Autenticación - más restrictivo
     "/api/auth/login": "5/minute",
@@ -62,91 +63,128 @@ ENDPOINT_LIMITS = {
 
     # Endpoints públicos - permisivos
     "/api/announcements": "1000/minute",
+    "/api/announcements/bulk": "30/minute",
     "/api/packages": "500/minute",
+
+    # Resto de la API
+    "/api": GENERAL_LIMITS["api"],
+
+    # Sin límite: archivos estáticos, salud y métricas
+    "/static": None,
+    "/uploads": None,
+    "/health": None,
+    "/api/health": None,
+    "/metrics": None,
 }
 
-# ========================================
-# FUNCIONES DE RATE LIMITING
-# ========================================
+ROUTE_LIMITS = RouteLimitTable(exact={}, prefixes=ENDPOINT_LIMITS, default=GENERAL_LIMITS["default"])
 
-def get_rate_limit_for_path(path: str) -> str:
-    """
-    Obtener el límite de rate para una ruta específica
-    """
-    # Buscar coincidencias exactas primero
-    if path in ENDPOINT_LIMITS:
-        return ENDPOINT_LIMITS[path]
-
-    # Buscar coincidencias por prefijo
-    for endpoint, limit in ENDPOINT_LIMITS.items():
-        if path.startswith(endpoint):
-            return limit
-
-    # Categorizar por tipo de endpoint
-    if path.startswith("/api/admin"):
-        return GENERAL_LIMITS["strict"]
-    elif path.startswith("/api/"):
-        return GENERAL_LIMITS["api"]
-    else:
-        return GENERAL_LIMITS["default"]
+# Limitador compartido por el proceso (cliente Redis perezoso)
+rate_limiter = RateLimiter()
 
 # ========================================
-# HANDLERS DE ERRORES
+# MIDDLEWARE
 # ========================================
 
-async def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded):
+
+class ClientResolver:
+    """IP del cliente de una petición según los proxies de confianza"""
+
+    def __init__(self, trusted_proxies: str):
+        self._networks = tuple(
+            ipaddress.ip_network(item.strip(), strict=False)
+            for item in trusted_proxies.split(",") if item.strip()
+        )
+        self.is_trusted = lru_cache(maxsize=1024)(self._is_trusted)
+
+    def _is_trusted(self, address: str) -> bool:
+        try:
+            ip = ipaddress.ip_address(address)
+        except ValueError:
+            return False
+        return any(ip in network for network in self._networks)
+
+    def __call__(self, scope: Scope) -> str:
+        client = scope.get("client")
+        peer = client[0] if client else "unknown"
+        if not self._networks or not self.is_trusted(peer):
+            return peer
+
+        forwarded = []
+        real_ip = None
+        for name, value in scope.get("headers", ()):
+            if name == b"x-forwarded-for":
+                forwarded.extend(part.strip() for part in value.decode("latin-1").split(",") if part.strip())
+            elif name == b"x-real-ip":
+                real_ip = value.decode("latin-1").strip()
+
+        if forwarded:
+            # Cada proxy agrega a la derecha la IP de la que recibió la
+            # petición: el cliente es la primera, desde la derecha, que no
+            # sea un proxy de confianza (las de la izquierda las controla él)
+            for address in reversed(forwarded):
+                if not self.is_trusted(address):
+                    return address
+            return forwarded[0]
+        return real_ip or peer
+
+
+# IP del cliente compartida por el proceso
+client_resolver = ClientResolver(settings.rate_limit_trusted_proxies)
+
+
+def rate_limit_exceeded_response(decision: Decision) -> JSONResponse:
     """
-    Handler personalizado para errores de rate limiting
+    Respuesta 429 con los datos de la regla
     """
     return JSONResponse(
         status_code=429,
         content={
             "detail": "Demasiadas solicitudes. Por favor, espere antes de intentar nuevamente.",
             "error": "rate_limit_exceeded",
-            "retry_after": exc.retry_after,
-            "limit": exc.limit,
-            "remaining": exc.remaining,
+            "retry_after": int(decision.retry_after_header),
+            "limit": str(decision.limit),
+            "remaining": decision.remaining,
         },
         headers={
-            "Retry-After": str(exc.retry_after),
-            "X-RateLimit-Limit": str(exc.limit),
-            "X-RateLimit-Remaining": str(exc.remaining),
-            "X-RateLimit-Reset": str(exc.reset_time),
+            "Retry-After": decision.retry_after_header,
+            "X-RateLimit-Limit": str(decision.limit.limit),
+            "X-RateLimit-Remaining": str(decision.remaining),
+            "X-RateLimit-Reset": str(max(1, math.ceil(decision.reset_after))),
         }
     )
 
-# ========================================
-# MIDDLEWARE CONFIGURATION
-# ========================================
 
-def create_rate_limiter():
-    """
-    Crear y configurar el limiter con todas las reglas
-    """
-    # Configurar el handler de errores
-    limiter._rate_limit_exceeded_handler = rate_limit_exceeded_handler
-
-    return limiter
-
-# ========================================
-# DECORADORES PARA ENDPOINTS ESPECÍFICOS
-# ========================================
-
-def auth_rate_limit():
-    """Decorador para endpoints de autenticación"""
-    return limiter.limit(GENERAL_LIMITS["strict"])
-
-def admin_rate_limit():
-    """Decorador para endpoints de administración"""
-    return limiter.limit("20/minute")
-
-def api_rate_limit():
-    """Decorador para endpoints generales de API"""
-    return limiter.limit(GENERAL_LIMITS["api"])
-
-def public_rate_limit():
-    """Decorador para endpoints públicos"""
-    return limiter.limit("500/minute")
+class RateLimitMiddleware:
+    """Límite por IP y regla de ruta; 429 con Retry-After al excederlo"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limiter: Optional[RateLimiter] = None,
+        routes: Optional[RouteLimitTable] = None,
+        resolver: Optional[ClientResolver] = None
+    ):
+        self.app = app
+        self.limiter = limiter or rate_limiter
+        self.routes = routes or ROUTE_LIMITS
+        self.resolver = resolver or client_resolver
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.rate_limit_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        limit = self.routes.resolve(scope["path"])
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        decision = await self.limiter.hit(limit, self.resolver(scope))
+        if not decision.allowed:
+            await rate_limit_exceeded_response(decision)(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
 
 # ========================================
 # FUNCIONES DE MONITOREO
@@ -154,36 +192,10 @@ def public_rate_limit():
 
 def get_rate_limit_stats():
     """
-    Obtener estadísticas de rate limiting
-    """
-    try:
-        # Obtener keys de rate limiting desde Redis
-        keys = redis_client.keys("limiter:*")
-        stats = {}
-
-        for key in keys[:50]:  # Limitar a 50 keys para performance
-            key_str = key.decode('utf-8')
-            value = redis_client.get(key)
-            if value:
-                stats[key_str] = int(value)
-
-        return {
-            "total_keys": len(keys),
-            "sample_stats": stats,
-            "limits": GENERAL_LIMITS,
-            "endpoint_limits": ENDPOINT_LIMITS,
-        }
-    except Exception as e:
-        return {"error": f"Error obteniendo estadísticas: {str(e)}"}
-
-def clear_rate_limits():
-    """
-    Limpiar todos los límites de rate (solo para desarrollo/testing)
+    Reglas compiladas del limitador
     """
-    try:
-        keys = redis_client.keys("limiter:*")
-        if keys:
-            redis_client.delete(*keys)
-        return {"cleared_keys": len(keys)}
-    except Exception as e:
-        return {"error": f"Error limpiando límites: {str(e)}"}
\ No newline at end of file
+    return {
+        "enabled": settings.rate_limit_enabled,
+        "limits": GENERAL_LIMITS,
+        "endpoint_limits": ROUTE_LIMITS.rules(),
+    }
@@ -9,75 +9,85 @@ Middleware para validar y corregir inconsistencias de estado
 en las respuestas de la API.
 """
 
-from fastapi import Request, Response
-from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from app.services.package_status_service import PackageStatusService
-from sqlalchemy.orm import Session
 from app.database import get_db
+from app.utils.path_matcher import PathMatcher
 import json
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Endpoints que requieren validación de estado
+DEFAULT_VALIDATE_ENDPOINTS = (
+    "/api/announcements/search/package",
+    "/api/packages/",
+    "/api/dashboard/packages"
+)
 
-class StatusValidationMiddleware(BaseHTTPMiddleware):
+
+class StatusValidationMiddleware:
     """
-    Middleware que valida y corrige inconsistencias de estado
+    Middleware ASGI que valida y corrige inconsistencias de estado
     en las respuestas de la API.
+
+    Solo retiene el cuerpo de las respuestas 200 JSON de los endpoints
+    validados; el resto (incluidas las descargas en streaming) pasa sin
+    almacenarse.
     """
-    
-    def __init__(self, app, validate_endpoints: list = None):
-        super().__init__(app)
-        # Endpoints que requieren validación de estado
-        self.validate_endpoints = validate_endpoints or [
-            "/api/announcements/search/package",
-            "/api/packages/",
-            "/api/dashboard/packages"
-        ]
-    
-    async def dispatch(self, request: Request, call_next):
-        response = await call_next(request)
-        
+
+    def __init__(self, app: ASGIApp, validate_endpoints: list = None):
+        self.app = app
+        endpoints = validate_endpoints or DEFAULT_VALIDATE_ENDPOINTS
+        self.validate_endpoints = PathMatcher(endpoints, endpoints)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         # Solo validar endpoints específicos
-        if not any(endpoint in str(request.url.path) for endpoint in self.validate_endpoints):
-            return response
-        
-        # Solo validar respuestas JSON exitosas
-        if response.status_code != 200:
-            return response
-        
+        if scope["type"] != "http" or not self.validate_endpoints.matches(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        body = []
+
+        async def send_validated(message: Message) -> None:
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                content_type = MutableHeaders(scope=message).get("content-type", "")
+                # Solo validar respuestas JSON exitosas
+                if message["status"] == 200 and content_type.startswith("application/json"):
+                    start_message = message
+                    return
+            elif start_message is not None and message["type"] == "http.response.body":
+                body.append(message.get("body", b""))
+                if message.get("more_body", False):
+                    return
+                await self._send_validated(scope, start_message, b"".join(body), send)
+                return
+            await send(message)
+
+        await self.app(scope, receive, send_validated)
+
+    async def _send_validated(self, scope: Scope, start_message: Message, body: bytes, send: Send) -> None:
         try:
-            # Obtener el cuerpo de la respuesta
-            body = b""
-            async for chunk in response.body_iterator:
-                body += chunk
-            
-            # Parsear JSON
-            try:
-                data = json.loads(body.decode())
-            except json.JSONDecodeError:
-                return response
-            
-            # Validar y corregir si es necesario
-            corrected_data = await self._validate_and_correct_status(data, request)
-            
+            data = json.loads(body.decode())
+            # Validar y corregir si es necesario (sobre una copia: el original se compara después)
+            corrected_data = await self._validate_and_correct_status(json.loads(body.decode()), Request(scope))
             if corrected_data != data:
-                logger.warning(f"Status validation corrected data for {request.url.path}")
-                # Crear nueva respuesta con datos corregidos
-                corrected_body = json.dumps(corrected_data, ensure_ascii=False).encode()
-                return Response(
-                    content=corrected_body,
-                    status_code=response.status_code,
-                    headers=dict(response.headers),
-                    media_type="application/json"
-                )
-            
+                logger.warning(f"Status validation corrected data for {scope['path']}")
+                body = json.dumps(corrected_data, ensure_ascii=False).encode()
+                headers = MutableHeaders(scope=start_message)
+                headers["content-length"] = str(len(body))
+        except json.JSONDecodeError:
+            pass
         except Exception as e:
             logger.error(f"Error in status validation middleware: {e}")
-        
-        return response
-    
+
+        await send(start_message)
+        await send({"type": "http.response.body", "body": body, "more_body": False})
+
     async def _validate_and_correct_status(self, data: dict, request: Request) -> dict:
         """
         Validar y corregir inconsistencias de estado en los datos.
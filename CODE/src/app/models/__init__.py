@@ -17,6 +17,9 @@ from .report import Report, ReportTemplate, DashboardMetric, ReportSchedule, Rep
 from .rate import Rate, RateType
 from .announcement_new import PackageAnnouncementNew
 from .package_event import PackageEvent, EventType
+from .package_outbox import PackageNotificationOutbox, OutboxStatus
+from .package_archive import ArchivedPackage, ArchivedPackageHistory, ArchivedMessage, ArchivedNotification, ArchivedFileUpload
+from .tracking_code_pool import TrackingCodePool
 from .user_preferences import UserPreferences
 
 __all__ = [
@@ -45,5 +48,13 @@ __all__ = [
     "ReportFormat",
     "PackageAnnouncementNew",
     "PackageEvent",
-    "EventType"
+    "EventType",
+    "PackageNotificationOutbox",
+    "OutboxStatus",
+    "ArchivedPackage",
+    "ArchivedPackageHistory",
+    "ArchivedMessage",
+    "ArchivedNotification",
+    "ArchivedFileUpload",
+    "TrackingCodePool"
 ]
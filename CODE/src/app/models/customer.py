@@ -55,9 +55,17 @@ class Customer(Base):
     # Estado y control
     is_active = Column(Boolean, default=True, nullable=False, index=True)
     is_vip = Column(Boolean, default=False, nullable=False, index=True)
-    total_packages_received = Column(Integer, default=0, nullable=False)
+
+    # Contadores de paquetes: los mantiene el trigger trg_packages_customer_counters
+    # (migración c3f1a8d2e907) en la misma transacción que el cambio del paquete;
+    # no se escriben desde la aplicación (ver CustomerCounterService)
+    total_packages = Column(Integer, default=0, server_default="0", nullable=False)
+    total_packages_received = Column(Integer, default=0, nullable=False)  # Pasaron por recepción
     total_packages_delivered = Column(Integer, default=0, nullable=False)
-    total_spent = Column(Integer, default=0, nullable=False)  # En centavos
+    total_packages_cancelled = Column(Integer, default=0, server_default="0", nullable=False)
+    active_announced_packages = Column(Integer, default=0, server_default="0", nullable=False)
+    active_received_packages = Column(Integer, default=0, server_default="0", nullable=False)  # En bodega
+    total_spent = Column(Integer, default=0, nullable=False)  # En centavos, paquetes entregados
 
     # Metadata
     created_by_id = Column(Integer, ForeignKey("users.id"), nullable=True)
@@ -110,26 +118,23 @@ class Customer(Base):
             "full_address": self.full_address
         }
 
+    @property
+    def total_spent_pesos(self) -> float:
+        """Total gastado en pesos (total_spent está en centavos)"""
+        return (self.total_spent or 0) / 100
+
     @property
     def package_stats(self) -> dict:
         """Estadísticas de paquetes"""
         return {
+            "total_packages": self.total_packages,
             "total_received": self.total_packages_received,
             "total_delivered": self.total_packages_delivered,
-            "pending_delivery": self.total_packages_received - self.total_packages_delivered,
-            "total_spent_cop": self.total_spent / 100  # Convertir de centavos a pesos
+            "total_cancelled": self.total_packages_cancelled,
+            "announced": self.active_announced_packages,
+            "pending_delivery": self.active_received_packages,
+            "total_spent_cop": self.total_spent_pesos
         }
 
-    def update_package_counts(self):
-        """Actualizar contadores de paquetes"""
-        from .package import Package, PackageStatus
-
-        self.total_packages_received = len([p for p in self.packages if p.status in [PackageStatus.RECIBIDO, PackageStatus.ENTREGADO]])
-        self.total_packages_delivered = len([p for p in self.packages if p.status == PackageStatus.ENTREGADO])
-
-        # Calcular gasto total
-        delivered_packages = [p for p in self.packages if p.status == PackageStatus.ENTREGADO]
-        self.total_spent = sum(getattr(p, 'total_cost_cents', 0) for p in delivered_packages)
-
     def __repr__(self):
         return f"<Customer(id={self.id}, name='{self.display_name}', phone='{self.phone}', active={self.is_active})>"
@@ -60,6 +60,10 @@ class Package(Base):
     created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
     updated_by = Column(Integer, ForeignKey("users.id"), nullable=True)
 
+    # Control optimista de concurrencia: el ORM emite UPDATE ... WHERE id = :id
+    # AND version = :v y lanza StaleDataError si otro proceso ya lo modificó
+    version = Column(Integer, default=1, server_default="1", nullable=False)
+
     # Timestamps
     created_at = Column(DateTime, default=get_colombia_now, nullable=False)
     updated_at = Column(DateTime, default=get_colombia_now, onupdate=get_colombia_now, nullable=False)
@@ -73,6 +77,8 @@ class Package(Base):
     notifications = relationship("Notification", back_populates="package")
     announcements = relationship("PackageAnnouncementNew", back_populates="package", viewonly=True)  # Solo lectura para evitar problemas de cascada
 
+    __mapper_args__ = {"version_id_col": version}
+
     @property
     def total_cost_cents(self) -> int:
         """Costo total en centavos"""
@@ -80,14 +86,9 @@ class Package(Base):
 
     def calculate_correct_base_fee(self) -> Decimal:
         """Calcular la tarifa base correcta según el tipo de paquete"""
-        from app.config import settings
-        
-        if self.package_type == PackageType.NORMAL:
-            return Decimal(str(settings.base_delivery_rate_normal))
-        elif self.package_type == PackageType.EXTRA_DIMENSIONED:
-            return Decimal(str(settings.base_delivery_rate_extra_dimensioned))
-        else:
-            return Decimal(str(settings.base_delivery_rate_normal))
+        from app.services.rate_provider import get_rates
+
+        return get_rates().base_fee(self.package_type)
 
     def update_fees_if_needed(self):
         """Actualizar tarifas si no coinciden con el tipo de paquete"""
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+PAQUETES EL CLUB v1.0 - Archivo de Paquetes Terminales
+Versión: 1.0.0
+Fecha: 2025-11-10
+Autor: Equipo de Desarrollo
+
+Modelos de solo lectura de las tablas *_archive (migración e7a3c9d1b524):
+paquetes ENTREGADO/CANCELADO antiguos y sus filas dependientes, movidos fuera
+de las tablas de trabajo por PackageArchiveService. Cada tabla tiene las
+mismas columnas que su tabla de origen más archived_at.
+"""
+
+from sqlalchemy import Column, DateTime, Index, Table
+from sqlalchemy.orm import foreign, relationship
+
+from .base import Base
+from .customer import Customer
+from .file_upload import FileUpload
+from .message import Message
+from .notification import Notification
+from .package import Package
+from .package_history import PackageHistory
+
+
+def _archive_table(source: Table, name: str, *indexes: Index) -> Table:
+    """Mismas columnas que la tabla de origen (sin llaves foráneas) más archived_at"""
+    columns = [
+        Column(column.name, column.type, key=column.key, primary_key=column.primary_key, nullable=column.nullable)
+        for column in source.columns
+    ]
+    columns.append(Column("archived_at", DateTime(timezone=True), nullable=False))
+    return Table(name, Base.metadata, *columns, *indexes)
+
+
+class ArchivedPackage(Base):
+    """Paquete terminal archivado"""
+
+    __table__ = _archive_table(
+        Package.__table__, "packages_archive",
+        Index("ix_packages_archive_tracking_number", "tracking_number"),
+        Index("ix_packages_archive_guide_number", "guide_number"),
+        Index("ix_packages_archive_access_code", "access_code"),
+        Index("ix_packages_archive_customer_id", "customer_id"),
+    )
+
+    customer = relationship(
+        Customer,
+        primaryjoin=lambda: foreign(ArchivedPackage.customer_id) == Customer.id,
+        viewonly=True
+    )
+
+    def __repr__(self):
+        return f"<ArchivedPackage(id={self.id}, tracking='{self.tracking_number}', status='{self.status.value}')>"
+
+
+class ArchivedPackageHistory(Base):
+    """Historial de estados de un paquete archivado"""
+
+    __table__ = _archive_table(
+        PackageHistory.__table__, "package_history_archive",
+        Index("ix_package_history_archive_package_id", "package_id"),
+    )
+
+
+class ArchivedMessage(Base):
+    """Mensaje asociado a un paquete archivado"""
+
+    __table__ = _archive_table(
+        Message.__table__, "messages_archive",
+        Index("ix_messages_archive_package_id", "package_id"),
+    )
+
+
+class ArchivedNotification(Base):
+    """Notificación enviada por un paquete archivado"""
+
+    __table__ = _archive_table(
+        Notification.__table__, "notifications_archive",
+        Index("ix_notifications_archive_package_id", "package_id"),
+    )
+
+
+class ArchivedFileUpload(Base):
+    """Metadatos de archivo (imágenes de recepción) de un paquete archivado"""
+
+    __table__ = _archive_table(
+        FileUpload.__table__, "file_uploads_archive",
+        Index("ix_file_uploads_archive_package_id", "package_id"),
+    )
@@ -9,7 +9,7 @@ Tabla completa para historial detallado de todas las operaciones del ciclo de vi
 Registra datos completos en el momento de cada evento (anuncio, recepción, entrega, cancelación).
 """
 
-from sqlalchemy import Column, String, Integer, ForeignKey, Enum, DateTime, Numeric, Text, Boolean
+from sqlalchemy import Column, String, Integer, ForeignKey, Enum, DateTime, Numeric, Text, Boolean, Index
 from sqlalchemy.dialects.postgresql import UUID, JSON
 from sqlalchemy.orm import relationship
 from .base import Base
@@ -40,8 +40,19 @@ class PackageEvent(Base):
     - Reconstrucción del estado del paquete en cualquier momento
     - Reportes financieros y operativos detallados
     - Trazabilidad de operadores y acciones
+
+    Particionada por mes sobre event_timestamp (migración d5b8e2a4f613): los
+    filtros por rango de fecha solo recorren las particiones del rango. Ver
+    PackageEventPartitionService para la creación y el archivado.
     """
     __tablename__ = "package_events"
+    __table_args__ = (
+        Index(
+            "ix_package_events_event_timestamp_brin", "event_timestamp",
+            postgresql_using="brin", postgresql_with={"pages_per_range": 32}
+        ),
+        {"postgresql_partition_by": "RANGE (event_timestamp)"},
+    )
 
     # ========================================
     # IDENTIFICADORES
@@ -53,8 +64,9 @@ class PackageEvent(Base):
     # ========================================
     # TIPO DE EVENTO Y TIMESTAMP
     # ========================================
-    event_type = Column(Enum(EventType), nullable=False, index=True)
-    event_timestamp = Column(DateTime(timezone=True), default=get_colombia_now, nullable=False, index=True)
+    event_type = Column(Enum(EventType), nullable=False)
+    # Parte de la llave primaria: la llave de una tabla particionada incluye la columna de partición
+    event_timestamp = Column(DateTime(timezone=True), default=get_colombia_now, primary_key=True)
     
     # ========================================
     # DATOS DEL PAQUETE EN ESE MOMENTO
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""
+PAQUETES EL CLUB v1.0 - Outbox de Notificaciones de Paquetes
+Versión: 1.0.0
+Fecha: 2025-11-10
+Autor: Equipo de Desarrollo
+"""
+
+from sqlalchemy import Column, String, Integer, DateTime, Text, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+import enum
+import uuid
+
+from .base import Base
+from app.utils.datetime_utils import get_colombia_now
+
+
+class OutboxStatus(enum.Enum):
+    PENDING = "PENDING"
+    PROCESSING = "PROCESSING"
+    SENT = "SENT"
+    FAILED = "FAILED"
+
+
+class PackageNotificationOutbox(Base):
+    """
+    Notificación (SMS y email) pendiente por un cambio de estado
+
+    Se inserta en la misma transacción que la transición del paquete, de modo
+    que el cambio de estado y su notificación se confirman o descartan juntos.
+    """
+
+    __tablename__ = "package_notification_outbox"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    package_id = Column(Integer, ForeignKey("packages.id", ondelete="CASCADE"), nullable=False)
+    new_status = Column(String(20), nullable=False)
+    changed_by = Column(String(100), nullable=True)
+    status = Column(String(20), default=OutboxStatus.PENDING.value, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), default=get_colombia_now, nullable=False)
+    processed_at = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"<PackageNotificationOutbox(id={self.id}, package_id={self.package_id}, {self.new_status}, {self.status})>"
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+"""
+PAQUETES EL CLUB v1.0 - Pool de Códigos de Consulta
+Versión: 1.0.0
+Fecha: 2025-11-10
+Autor: Equipo de Desarrollo
+"""
+
+from sqlalchemy import Column, String, BigInteger
+
+from .base import Base
+
+
+class TrackingCodePool(Base):
+    """
+    Código de consulta público libre, generado por CodeGenerator
+
+    position es el valor de tracking_code_seq del que se derivó el código;
+    los códigos se toman en ese orden y se eliminan del pool al asignarse.
+    """
+
+    __tablename__ = "tracking_code_pool"
+
+    position = Column(BigInteger, primary_key=True, autoincrement=False)
+    code = Column(String(10), unique=True, nullable=False)
+
+    def __repr__(self):
+        return f"<TrackingCodePool(position={self.position}, code='{self.code}')>"
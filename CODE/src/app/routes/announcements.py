@@ -21,8 +21,7 @@ from app.schemas.announcements import (
     AnnouncementListResponse, AnnouncementSearchRequest, AnnouncementStatsResponse
 )
 from app.services.announcements_service import AnnouncementsService
-from app.services.sms_service import SMSService
-from app.services.email_service import EmailService
+from app.services.registry import get_sms_service, get_email_service
 from app.models.customer import Customer
 from app.dependencies import get_current_active_user, get_current_admin_user
 from app.config import settings
@@ -64,7 +63,7 @@ async def create_announcement(
             from app.schemas.notification import SMSByEventRequest
             from app.models.notification import NotificationPriority
             
-            sms_service = SMSService()
+            sms_service = get_sms_service()
             
             # Preparar variables para el SMS
             custom_variables = {
@@ -86,7 +85,8 @@ async def create_announcement(
                     custom_variables=custom_variables,
                     priority=NotificationPriority.ALTA,
                     is_test=False
-                )
+                ),
+                announcement=db_announcement
             )
             
             if sms_result.status == "sent":
@@ -115,7 +115,7 @@ async def create_announcement(
             if customer and customer.email:
                 logger.info(f"Cliente encontrado: {customer.full_name} (email: {customer.email})")
                 
-                email_service = EmailService()
+                email_service = get_email_service()
                 
                 # Preparar variables para la plantilla
                 first_name = customer.full_name.split(" ")[0] if customer.full_name else "Cliente"
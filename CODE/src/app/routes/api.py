@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Request, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Request, Response, Depends, HTTPException, status
 from fastapi.responses import JSONResponse, RedirectResponse
 from sqlalchemy.orm import Session, joinedload
 import uuid
@@ -10,12 +10,19 @@ from app.models.package_history import PackageHistory
 from app.utils.auth import get_password_hash
 from app.dependencies import get_current_active_user_from_cookies
 # from app.utils.auth_context import get_auth_context_from_request  # Módulo no existe
+from app.services.package_service import PackageService
 from app.services.package_state_service import PackageStateService
+from app.services.code_generator import CodeGenerator
+from app.services.announcement_ingestion_service import AnnouncementIngestionService, BulkAnnouncementError
+from app.utils.exceptions import PaqueteriaException
+from app.utils.conditional import make_etag, not_modified_response, set_etag
 from sqlalchemy import or_
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+ingestion_service = AnnouncementIngestionService()
+
 @router.get("/")
 async def api_root():
     """Endpoint raíz de la API"""
@@ -655,13 +662,6 @@ async def create_announcement_direct(request: Request, db: Session = Depends(get
                 content={"detail": "El número de guía es requerido"}
             )
         
-        # Generar código de tracking único
-        # Excluye el número 0 y la letra O para evitar confusión
-        import string
-        import random
-        allowed_chars = string.ascii_uppercase.replace('O', '') + string.digits.replace('0', '')
-        tracking_code = ''.join(random.choice(allowed_chars) for _ in range(4))
-        
         from ..utils.datetime_utils import get_colombia_now
         
         existing_announcement = db.query(PackageAnnouncementNew).filter(
@@ -690,7 +690,7 @@ async def create_announcement_direct(request: Request, db: Session = Depends(get
             if existing_customer:
                 # Cliente ya existe, usar su ID
                 customer_id = existing_customer.id
-                print(f"✅ Cliente existente encontrado: {existing_customer.id} - {existing_customer.full_name}")
+                logger.info(f"✅ Cliente existente encontrado: {existing_customer.id} - {existing_customer.full_name}")
             else:
                 # Cliente nuevo, crear con datos mínimos (nombre + teléfono)
                 # Separar nombre y apellido del customer_name con valores por defecto válidos
@@ -715,15 +715,16 @@ async def create_announcement_direct(request: Request, db: Session = Depends(get
                 
                 new_customer = customer_service.create_customer(db, customer_data)
                 customer_id = new_customer.id
-                print(f"✅ Cliente nuevo creado: {new_customer.id} - {new_customer.full_name}")
+                logger.info(f"✅ Cliente nuevo creado: {new_customer.id} - {new_customer.full_name}")
                 
         except Exception as customer_error:
             # Si falla la creación del cliente, continuar sin romper el anuncio
-            print(f"⚠️ Error gestionando cliente: {customer_error}")
-            import traceback
-            traceback.print_exc()
+            logger.warning(f"⚠️ Error gestionando cliente: {customer_error}", exc_info=True)
             # customer_id quedará None, pero el anuncio se creará igual
         
+        # Código de tracking único (pool de CodeGenerator)
+        tracking_code = CodeGenerator.claim_tracking_code(db)
+
         announcement = PackageAnnouncementNew(
             id=uuid.uuid4(),
             customer_name=customer_name,
@@ -746,11 +747,11 @@ async def create_announcement_direct(request: Request, db: Session = Depends(get
         # ENVIAR SMS DE CONFIRMACIÓN AUTOMÁTICAMENTE
         # ========================================
         try:
-            from app.services.sms_service import SMSService
+            from app.services.registry import get_sms_service
             from app.models.notification import NotificationEvent, NotificationPriority
             from app.schemas.notification import SMSByEventRequest
 
-            sms_service = SMSService()
+            sms_service = get_sms_service()
             event_request = SMSByEventRequest(
                 event_type=NotificationEvent.PACKAGE_ANNOUNCED,
                 announcement_id=announcement.id,
@@ -762,17 +763,15 @@ async def create_announcement_direct(request: Request, db: Session = Depends(get
                 priority=NotificationPriority.ALTA,
                 is_test=False
             )
-            sms_result = await sms_service.send_sms_by_event(db=db, event_request=event_request)
+            sms_result = await sms_service.send_sms_by_event(db=db, event_request=event_request, announcement=announcement)
             
             if sms_result.status == "sent":
-                print(f"✅ SMS de anuncio enviado exitosamente para anuncio {announcement.id} al {announcement.customer_phone}")
+                logger.info(f"✅ SMS de anuncio enviado exitosamente para anuncio {announcement.id} al {announcement.customer_phone}")
             else:
-                print(f"⚠️ SMS de anuncio falló para anuncio {announcement.id}: {sms_result.message}")
+                logger.warning(f"⚠️ SMS de anuncio falló para anuncio {announcement.id}: {sms_result.message}")
                 
         except Exception as sms_error:
-            print(f"❌ Error al enviar SMS para anuncio {announcement.id}: {sms_error}")
-            import traceback
-            traceback.print_exc()
+            logger.error(f"❌ Error al enviar SMS para anuncio {announcement.id}: {sms_error}", exc_info=True)
         
         return {
             "success": True,
@@ -790,10 +789,8 @@ async def create_announcement_direct(request: Request, db: Session = Depends(get
         
     except Exception as e:
         db.rollback()
-        import traceback
         error_detail = str(e)
-        print(f"Error al crear anuncio: {error_detail}")
-        traceback.print_exc()
+        logger.error(f"Error al crear anuncio: {error_detail}", exc_info=True)
         
         return JSONResponse(
             status_code=500,
@@ -804,6 +801,69 @@ async def create_announcement_direct(request: Request, db: Session = Depends(get
         )
 
 
+@router.post("/announcements/bulk")
+async def create_announcements_bulk(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_active_user_from_cookies),
+    db: Session = Depends(get_db)
+):
+    """
+    Crear anuncios por lote (transportadoras y administraciones de edificios)
+
+    Acepta un arreglo JSON (o {"announcements": [...]}) de objetos con
+    customer_name, customer_phone y guide_number, o un CSV con esas columnas
+    (text/csv o multipart con el campo "file"). Devuelve el resultado de cada
+    fila; una guía ya anunciada se informa como "existing" con su código, así
+    que reenviar el lote no duplica anuncios ni confirmaciones.
+    """
+    content_type = request.headers.get("content-type", "")
+    try:
+        if content_type.startswith("multipart/form-data"):
+            upload = (await request.form()).get("file")
+            if upload is None or not hasattr(upload, "read"):
+                return JSONResponse(status_code=400, content={"detail": "Adjunte el CSV en el campo 'file'"})
+            items = ingestion_service.parse_csv(await upload.read())
+        elif content_type.startswith("text/csv"):
+            items = ingestion_service.parse_csv(await request.body())
+        else:
+            try:
+                body = await request.json()
+            except ValueError:
+                return JSONResponse(status_code=400, content={"detail": "El cuerpo debe ser JSON o CSV"})
+            items = body.get("announcements") if isinstance(body, dict) else body
+            if not isinstance(items, list):
+                return JSONResponse(
+                    status_code=400,
+                    content={"detail": "Envíe un arreglo de anuncios o un objeto con la clave 'announcements'"}
+                )
+
+        report = ingestion_service.ingest(db, items)
+    except BulkAnnouncementError as e:
+        return JSONResponse(status_code=400, content={"detail": str(e)})
+    except PaqueteriaException as e:
+        return JSONResponse(status_code=e.status_code, content={"detail": e.message})
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error en ingesta masiva de anuncios: {e}", exc_info=True)
+        return JSONResponse(
+            status_code=500,
+            content={"detail": "Error del sistema. Por favor, comuníquese con el administrador."}
+        )
+
+    queued = ingestion_service.enqueue_notifications(report["created_ids"], background_tasks)
+    logger.info(
+        f"Ingesta masiva de anuncios por {current_user.username}: "
+        f"{report['summary']['created']}/{report['summary']['total']} creados"
+    )
+    return {
+        "success": True,
+        "summary": report["summary"],
+        "notifications_queued": queued,
+        "results": report["results"]
+    }
+
+
 @router.get("/search")
 async def search_packages_and_announcements(
     q: str = None,
@@ -816,6 +876,8 @@ async def search_packages_and_announcements(
 
 @router.get("/announcements/search/package")
 async def search_package_endpoint(
+    request: Request,
+    response: Response,
     query: str = None,
     db: Session = Depends(get_db)
 ):
@@ -836,6 +898,18 @@ async def search_package_endpoint(
         # Determinar el tipo de búsqueda
         query_type = determine_query_type(clean_query)
 
+        # Guías y códigos (lo que consulta periódicamente la página de seguimiento):
+        # 304 si nada de lo que se muestra cambió desde la última consulta
+        if query_type.get("type") in ["guide_number", "tracking_code"]:
+            etag = make_etag(
+                "tracking_search", clean_query,
+                *PackageService().tracking_search_validator(db, clean_query)
+            )
+            not_modified = not_modified_response(request, etag)
+            if not_modified:
+                return not_modified
+            set_etag(response, etag)
+
         # Para guías y códigos de tracking: búsqueda exacta
         # Para nombres y teléfonos: búsqueda parcial
         # Para queries inválidos: no buscar nada
@@ -1004,31 +1078,31 @@ def determine_query_type(query: str) -> dict:
     """
     import re
 
-    print(f"DEBUG: determine_query_type called with query='{query}'")
+    logger.debug("DEBUG: determine_query_type called with query='%s'", query)
 
     # Si es exactamente 4 caracteres alfanuméricos, es un tracking code
     if re.match(r'^[A-Z0-9]{4}$', query.upper()):
-        print(f"DEBUG: '{query}' classified as tracking_code")
+        logger.debug("DEBUG: '%s' classified as tracking_code", query)
         return {"type": "tracking_code"}
 
     # Si parece un número de guía (5+ caracteres alfanuméricos)
     if re.match(r'^[A-Z0-9]{5,}$', query.upper()):
-        print(f"DEBUG: '{query}' classified as guide_number")
+        logger.debug("DEBUG: '%s' classified as guide_number", query)
         return {"type": "guide_number"}
 
     # Si parece un teléfono válido (mínimo 7 dígitos, con posibles espacios/guiones)
     if re.match(r'^[\d\s\-\+\(\)]{7,}$', query):
-        print(f"DEBUG: '{query}' classified as phone")
+        logger.debug("DEBUG: '%s' classified as phone", query)
         return {"type": "phone"}
 
     # Si parece un nombre válido (mínimo 3 caracteres alfabéticos)
     if re.match(r'^[A-Za-z\s]{3,}$', query):
-        print(f"DEBUG: '{query}' classified as name")
+        logger.debug("DEBUG: '%s' classified as name", query)
         return {"type": "name"}
 
     # Para cualquier otra cosa (letras sueltas, números cortos, caracteres especiales, etc.)
     # no permitir búsqueda - devolver tipo inválido
-    print(f"DEBUG: '{query}' classified as invalid")
+    logger.debug("DEBUG: '%s' classified as invalid", query)
     return {"type": "invalid"}
 
 @router.get("/packages/{tracking_number}/history")
@@ -22,6 +22,9 @@ from app.dependencies import get_current_active_user
 from app.models.user import User
 from app.schemas.user import UserCreate, UserResponse
 from app.services.user_service import UserService
+import logging
+
+logger = logging.getLogger(__name__)
 
 # Crear router
 router = APIRouter()
@@ -39,17 +42,17 @@ async def test_endpoint():
 async def test_login_endpoint(request: Request):
     """Endpoint de prueba para simular el login del frontend"""
     try:
-        print(f"DEBUG: Petición de prueba recibida en /api/auth/test-login")
-        print(f"DEBUG: Headers: {dict(request.headers)}")
+        logger.debug("DEBUG: Petición de prueba recibida en /api/auth/test-login")
+        logger.debug("DEBUG: Headers: %s", dict(request.headers))
         
         # Obtener datos del formulario
         form_data = await request.form()
-        print(f"DEBUG: Form data keys: {list(form_data.keys())}")
+        logger.debug("DEBUG: Form data keys: %s", list(form_data.keys()))
         
         username = form_data.get("username", "").strip()
         password = form_data.get("password", "").strip()
         
-        print(f"DEBUG: Datos recibidos - username: {username}, password: {'*' * len(password)}")
+        logger.debug("DEBUG: Datos recibidos - username: %s, password: %s", username, '*' * len(password))
         
         return {
             "success": True,
@@ -61,9 +64,7 @@ async def test_login_endpoint(request: Request):
         }
         
     except Exception as e:
-        print(f"Error en test-login: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.error(f"Error en test-login: {str(e)}", exc_info=True)
         return {
             "success": False,
             "message": f"❌ Error en prueba: {str(e)}"
@@ -76,18 +77,18 @@ async def login_frontend(request: Request, db: Session = Depends(get_db)):
     Endpoint de login específico para el frontend
     """
     try:
-        print(f"DEBUG: Petición recibida en /api/auth/login")
-        print(f"DEBUG: Headers: {dict(request.headers)}")
+        logger.debug("DEBUG: Petición recibida en /api/auth/login")
+        logger.debug("DEBUG: Headers: %s", dict(request.headers))
         
         # Obtener datos del formulario
         form_data = await request.form()
-        print(f"DEBUG: Form data keys: {list(form_data.keys())}")
+        logger.debug("DEBUG: Form data keys: %s", list(form_data.keys()))
         
         username_or_email = form_data.get("username", "").strip()
         password = form_data.get("password", "").strip()
         
         # Debug: imprimir datos recibidos
-        print(f"DEBUG: Datos recibidos - username: {username_or_email}, password: {'*' * len(password)}")
+        logger.debug("DEBUG: Datos recibidos - username: %s, password: %s", username_or_email, '*' * len(password))
         
         if not username_or_email or not password:
             return JSONResponse({
@@ -149,7 +150,7 @@ async def login_frontend(request: Request, db: Session = Depends(get_db)):
         })
         
         # Debug: imprimir respuesta
-        print(f"DEBUG: Respuesta exitosa para usuario {user.username}")
+        logger.debug("DEBUG: Respuesta exitosa para usuario %s", user.username)
         
         # Establecer cookies (24h) con flags de seguridad
         from app.config import settings
@@ -261,11 +262,9 @@ async def login_frontend(request: Request, db: Session = Depends(get_db)):
 
                 return response
             except Exception as fallback_error:
-                print(f"Error en fallback de desarrollo: {fallback_error}")
+                logger.error(f"Error en fallback de desarrollo: {fallback_error}")
 
-        print(f"Error en login: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.error(f"Error en login: {str(e)}", exc_info=True)
         return JSONResponse({
             "success": False,
             "message": "❌ No pudimos procesar tu solicitud. Intenta nuevamente."
@@ -17,10 +17,7 @@ import csv
 
 from app.database import get_db
 from app.models.customer import Customer
-from app.models.package import Package, PackageStatus
-from app.models.message import Message
-from app.models.notification import Notification
-from app.models.announcement_new import PackageAnnouncementNew
+from app.models.package import Package
 from app.schemas.customer import (
     CustomerCreate, CustomerUpdate, CustomerResponse,
     CustomerListResponse, CustomerStatsResponse,
@@ -30,6 +27,7 @@ from app.schemas.customer import (
 )
 from app.services.customer_service import CustomerService
 from app.services.package_service import PackageService
+from app.services.bulk_deletion_service import BulkDeletionService
 from app.dependencies import get_current_active_user, get_current_admin_user, get_current_active_user_from_cookies
 from app.utils.phone_utils import normalize_phone, validate_phone, format_phone_link
 from fastapi import Request
@@ -197,78 +195,13 @@ async def delete_customer(
         if not customer:
             raise HTTPException(status_code=404, detail="Cliente no encontrado")
 
-        # Contar paquetes asociados al cliente
-        from app.models.package import Package
-        packages_count = db.query(Package).filter(
-            Package.customer_id == customer_id
-        ).count()
-        
-        if packages_count > 0:
-            logger.info(f"Cliente {customer_id} tiene {packages_count} paquete(s) asociado(s). Desvinculando paquetes...")
-            
-            # Desvincular todos los paquetes del cliente estableciendo customer_id a NULL
-            # Esto es más seguro que eliminar los paquetes, ya que los paquetes pueden tener
-            # su propio ciclo de vida independiente del cliente
-            try:
-                packages_updated = db.query(Package).filter(
-                    Package.customer_id == customer_id
-                ).update(
-                    {Package.customer_id: None},
-                    synchronize_session=False
-                )
-                db.commit()
-                logger.info(f"Desvinculados {packages_updated} paquete(s) del cliente {customer_id} (customer_id establecido a NULL)")
-            except Exception as e:
-                db.rollback()
-                logger.error(f"Error al desvincular paquetes del cliente {customer_id}: {str(e)}", exc_info=True)
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"Error al desvincular {packages_count} paquete(s) del cliente: {str(e)}"
-                )
-        
-        # Ahora eliminar el cliente
-        # Las relaciones como messages, notifications, announcements se eliminarán
-        # automáticamente por cascade="all, delete-orphan" en SQLAlchemy
-        try:
-            db.delete(customer)
-            db.commit()
-            logger.info(f"Cliente {customer_id} ({customer.first_name} {customer.last_name}) eliminado exitosamente. Paquetes desvinculados: {packages_count}")
-        except Exception as e:
-            db.rollback()
-            logger.error(f"Error al eliminar cliente {customer_id}: {str(e)}", exc_info=True)
-            
-            # Si el error es por restricción de clave foránea, intentar una estrategia alternativa
-            if "foreign key constraint" in str(e).lower() or "constraint" in str(e).lower() or "violates foreign key" in str(e).lower():
-                # Intentar eliminar primero las relaciones que no se eliminan automáticamente
-                try:
-                    # Eliminar mensajes del cliente
-                    messages_deleted = db.query(Message).filter(Message.customer_id == customer_id).delete(synchronize_session=False)
-                    logger.info(f"Eliminados {messages_deleted} mensaje(s) del cliente {customer_id}")
-                    
-                    # Eliminar notificaciones del cliente
-                    notifications_deleted = db.query(Notification).filter(Notification.customer_id == customer_id).delete(synchronize_session=False)
-                    logger.info(f"Eliminadas {notifications_deleted} notificación(es) del cliente {customer_id}")
-                    
-                    # Eliminar anuncios del cliente
-                    announcements_deleted = db.query(PackageAnnouncementNew).filter(PackageAnnouncementNew.customer_id == customer_id).delete(synchronize_session=False)
-                    logger.info(f"Eliminados {announcements_deleted} anuncio(s) del cliente {customer_id}")
-                    
-                    # Intentar eliminar el cliente nuevamente
-                    db.delete(customer)
-                    db.commit()
-                    logger.info(f"Cliente {customer_id} eliminado exitosamente después de limpiar relaciones manualmente")
-                except Exception as e2:
-                    db.rollback()
-                    logger.error(f"Error al eliminar cliente después de limpiar relaciones: {str(e2)}", exc_info=True)
-                    raise HTTPException(
-                        status_code=500,
-                        detail=f"Error al eliminar el cliente: {str(e2)}"
-                    )
-            else:
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"Error al eliminar el cliente: {str(e)}"
-                )
+        # Desvincular paquetes (customer_id = NULL) y eliminar mensajes, notificaciones
+        # y anuncios del cliente con sentencias de conjunto en una sola transacción
+        result = BulkDeletionService().delete_customers(db, [customer_id])
+        logger.info(
+            f"Cliente {customer_id} eliminado exitosamente. "
+            f"Paquetes desvinculados: {result['packages_detached']}"
+        )
         
         return None
     except HTTPException:
@@ -293,81 +226,36 @@ async def get_customer_packages(
     """Obtener los últimos 10 paquetes de un cliente (Anunciado, Recibido, Entregado, Cancelado)"""
     try:
         # Verificar que el cliente existe
-        customer = db.query(Customer).filter(Customer.id == customer_id).first()
-        if not customer:
+        if not db.query(Customer.id).filter(Customer.id == customer_id).first():
             raise HTTPException(status_code=404, detail="Cliente no encontrado")
         
-        # Obtener paquetes del cliente
-        from app.models.package import Package, PackageStatus
-        from app.models.announcement_new import PackageAnnouncementNew
-        from sqlalchemy import desc, or_
+        # Columnas de paquetes y anuncios no procesados del cliente, sin entidades del ORM
+        from app.services.package_read_model import PackageReadModel
         
-        # Estados permitidos usando el enum correcto
-        ALLOWED_STATUSES = [
-            PackageStatus.ANUNCIADO,
-            PackageStatus.RECIBIDO,
-            PackageStatus.ENTREGADO,
-            PackageStatus.CANCELADO
-        ]
-        
-        # Obtener paquetes con estados permitidos
-        packages_query = db.query(Package).filter(
-            Package.customer_id == customer_id,
-            Package.status.in_(ALLOWED_STATUSES)
-        ).order_by(desc(Package.created_at)).limit(limit * 2)  # Obtener más para compensar filtros
-        
-        packages = packages_query.all()
-        
-        # Obtener también los anuncios no procesados del cliente (activos y cancelados)
-        announcements = db.query(PackageAnnouncementNew).filter(
-            PackageAnnouncementNew.customer_id == customer_id,
-            PackageAnnouncementNew.is_processed == False
-        ).order_by(desc(PackageAnnouncementNew.announced_at)).limit(limit).all()
-        
-        # Función para normalizar estado
-        def normalize_status(status):
-            if not status:
-                return None
-            status_str = status.value if hasattr(status, 'value') else str(status)
-            status_map = {
-                'announced': 'ANUNCIADO',
-                'received': 'RECIBIDO',
-                'delivered': 'ENTREGADO',
-                'cancelled': 'CANCELADO',
-                'canceled': 'CANCELADO'
-            }
-            return status_map.get(status_str.lower(), status_str.upper())
+        packages, announcements = PackageReadModel.customer_recent_items(db, customer_id, limit)
         
-        # Serializar paquetes
+        # Serializar paquetes (la consulta ya filtra los estados permitidos)
         result = []
         
         for pkg in packages:
-            normalized_status = normalize_status(pkg.status)
-            # Solo agregar si el estado está en los permitidos
-            if normalized_status in ['ANUNCIADO', 'RECIBIDO', 'ENTREGADO', 'CANCELADO']:
-                result.append({
-                    'id': str(pkg.id),
-                    'tracking_number': pkg.tracking_number,
-                    'guide_number': pkg.guide_number,
-                    'status': normalized_status,
-                    'announced_at': pkg.announced_at.isoformat() if pkg.announced_at else None,
-                    'received_at': pkg.received_at.isoformat() if pkg.received_at else None,
-                    'delivered_at': pkg.delivered_at.isoformat() if pkg.delivered_at else None,
-                    'type': 'package'
-                })
+            result.append({
+                'id': str(pkg.id),
+                'tracking_number': pkg.tracking_number,
+                'guide_number': pkg.guide_number,
+                'status': pkg.status.value,
+                'announced_at': pkg.announced_at.isoformat() if pkg.announced_at else None,
+                'received_at': pkg.received_at.isoformat() if pkg.received_at else None,
+                'delivered_at': pkg.delivered_at.isoformat() if pkg.delivered_at else None,
+                'type': 'package'
+            })
         
         # Agregar anuncios (solo activos o cancelados)
         for ann in announcements:
-            if ann.is_active:
-                status = 'ANUNCIADO'
-            else:
-                status = 'CANCELADO'
-            
             result.append({
                 'id': f'announcement_{ann.id}',
                 'tracking_number': ann.tracking_code,
                 'guide_number': ann.guide_number,
-                'status': status,
+                'status': 'ANUNCIADO' if ann.is_active else 'CANCELADO',
                 'announced_at': ann.announced_at.isoformat() if ann.announced_at else None,
                 'received_at': None,
                 'delivered_at': None,
@@ -407,33 +295,23 @@ async def get_package_counts_batch(
         # Limitar a 50 clientes por petición para evitar sobrecarga
         ids_list = ids_list[:50]
         
-        # Query optimizada: contar paquetes por cliente y estado en una sola consulta
-        from sqlalchemy import case
-        
+        # Contadores por estado mantenidos en customers (trigger de packages)
         package_counts = db.query(
-            Package.customer_id,
-            func.sum(case((Package.status == PackageStatus.ANUNCIADO, 1), else_=0)).label('announced'),
-            func.sum(case((Package.status == PackageStatus.RECIBIDO, 1), else_=0)).label('received'),
-            func.sum(case((Package.status == PackageStatus.ENTREGADO, 1), else_=0)).label('delivered'),
-            func.sum(case((Package.status == PackageStatus.CANCELADO, 1), else_=0)).label('cancelled')
-        ).filter(
-            Package.customer_id.in_(ids_list),
-            Package.status.in_([
-                PackageStatus.ANUNCIADO,
-                PackageStatus.RECIBIDO,
-                PackageStatus.ENTREGADO,
-                PackageStatus.CANCELADO
-            ])
-        ).group_by(Package.customer_id).all()
+            Customer.id,
+            Customer.active_announced_packages,
+            Customer.active_received_packages,
+            Customer.total_packages_delivered,
+            Customer.total_packages_cancelled
+        ).filter(Customer.id.in_(ids_list)).all()
         
         # Formatear resultados
         result = {}
         for customer_id, announced, received, delivered, cancelled in package_counts:
             result[str(customer_id)] = {
-                'announced': announced or 0,
-                'received': received or 0,
-                'delivered': delivered or 0,
-                'cancelled': cancelled or 0
+                'announced': announced,
+                'received': received,
+                'delivered': delivered,
+                'cancelled': cancelled
             }
         
         # Agregar clientes sin paquetes con contadores en 0
@@ -551,6 +429,26 @@ async def check_duplicate_customer(
             detail=f"Error al verificar duplicados: {str(e)}"
         )
 
+def _invalid_customer_reasons(customer: dict) -> List[str]:
+    customer_name = f"{customer['first_name']} {customer['last_name'] or ''}".strip()
+    phone = customer["phone"] or ""
+    reasons = []
+    if _is_placeholder_customer(customer_name) or "sin cliente" in _normalize_spanish_string(customer_name):
+        reasons.append("Nombre: 'Sin cliente'")
+    if not phone.strip() or "sin telefono" in _normalize_spanish_string(phone):
+        reasons.append("Sin teléfono válido")
+    return reasons
+
+
+def _require_admin(request: Request, db: Session, detail: str):
+    current_user = get_user_from_request(request, db)
+    if not current_user:
+        raise HTTPException(status_code=401, detail="No autenticado")
+    if current_user.role.value != "ADMIN":
+        raise HTTPException(status_code=403, detail=detail)
+    return current_user
+
+
 @router.get("/cleanup/invalid/list", status_code=status.HTTP_200_OK)
 async def list_invalid_customers(
     request: Request,
@@ -566,127 +464,43 @@ async def list_invalid_customers(
     son paquetes sin cliente asociado (customer_id = NULL), no clientes reales.
     """
     try:
-        current_user = get_user_from_request(request, db)
-        if not current_user:
-            raise HTTPException(status_code=401, detail="No autenticado")
-        
-        # Verificar que sea administrador
-        if current_user.role.value != "ADMIN":
-            raise HTTPException(status_code=403, detail="Solo administradores pueden ver clientes inválidos")
-        
-        # Buscar clientes inválidos usando SQL directo para mayor flexibilidad
-        from sqlalchemy import text
-        invalid_customers_query = text("""
-            SELECT * FROM customers
-            WHERE 
-                -- Clientes con "Sin cliente" en cualquier campo de nombre
-                (
-                    LOWER(TRIM(first_name)) LIKE '%sin cliente%' OR
-                    LOWER(TRIM(last_name)) LIKE '%sin cliente%' OR
-                    LOWER(TRIM(COALESCE(full_name, ''))) LIKE '%sin cliente%' OR
-                    LOWER(TRIM(CONCAT(first_name, ' ', last_name))) LIKE '%sin cliente%' OR
-                    LOWER(REPLACE(first_name, ' ', '')) LIKE '%sincliente%' OR
-                    LOWER(REPLACE(last_name, ' ', '')) LIKE '%sincliente%' OR
-                    LOWER(REPLACE(COALESCE(full_name, ''), ' ', '')) LIKE '%sincliente%'
-                )
-                OR
-                -- Clientes sin teléfono válido
-                (
-                    phone IS NULL OR
-                    TRIM(phone) = '' OR
-                    LOWER(TRIM(phone)) LIKE '%sin teléfono%' OR
-                    LOWER(TRIM(phone)) LIKE '%sin telefono%' OR
-                    LOWER(TRIM(phone)) LIKE '%sintelefono%' OR
-                    LOWER(REPLACE(phone, ' ', '')) LIKE '%sintelefono%' OR
-                    LOWER(REPLACE(phone, 'é', 'e')) LIKE '%sin telefono%' OR
-                    LOWER(REPLACE(REPLACE(phone, ' ', ''), 'é', 'e')) LIKE '%sintelefono%'
-                )
-        """)
-        
-        result = db.execute(invalid_customers_query)
-        invalid_customers_rows = result.fetchall()
-        
-        # Convertir resultados a objetos Customer usando los IDs
-        invalid_customers = []
-        for row in invalid_customers_rows:
-            customer_id = row[0]  # El primer campo es el ID
-            customer = db.query(Customer).filter(Customer.id == customer_id).first()
-            if customer:
-                invalid_customers.append(customer)
-        
-        # Si no hay clientes inválidos, verificar si hay paquetes sin cliente
-        # y mostrar información sobre ellos
-        packages_without_customer = 0
-        if not invalid_customers:
-            packages_without_customer = db.query(Package).filter(Package.customer_id.is_(None)).count()
-        else:
-            # Incluir clientes que en paquetes se muestran como "Sin cliente" o "Sin teléfono"
-            suspect_customer_ids = set()
-            for customer in invalid_customers:
-                suspect_customer_ids.add(customer.id)
-            else:
-                packages_without_customer = db.query(Package).filter(Package.customer_id.is_(None)).count()
-
-        # Buscar clientes asociados a paquetes con campos "Sin cliente" o "Sin teléfono"
-        suspect_packages = db.query(Package.customer_id, Package.customer_name, Package.customer_phone).distinct().all()
-        for customer_id, package_name, package_phone in suspect_packages:
-            if not customer_id:
-                continue
-            if _is_placeholder_customer(package_name) or _is_placeholder_phone(package_phone):
-                suspect_customer_ids.add(customer_id)
-
-        # Unir clientes sospechosos adicionales y completar info
-        if suspect_customer_ids:
-            extra_customers = db.query(Customer).filter(Customer.id.in_(suspect_customer_ids)).all()
-            for extra in extra_customers:
-                if extra not in invalid_customers:
-                    invalid_customers.append(extra)
-        
-        customers_info = []
-        for customer in invalid_customers:
-            customer_id = customer.id
-            customer_name = f"{customer.first_name} {customer.last_name or ''}".strip()
-            phone = customer.phone or "Sin teléfono"
-            
-            # Contar relaciones
-            packages_count = db.query(Package).filter(Package.customer_id == customer_id).count()
-            messages_count = db.query(Message).filter(Message.customer_id == customer_id).count()
-            notifications_count = db.query(Notification).filter(Notification.customer_id == customer_id).count()
-            announcements_count = db.query(PackageAnnouncementNew).filter(PackageAnnouncementNew.customer_id == customer_id).count()
-            
-            # Determinar razón
-            reasons = []
-            if "Sin cliente" in customer_name:
-                reasons.append("Nombre: 'Sin cliente'")
-            if not customer.phone or customer.phone == '' or "Sin teléfono" in phone or "sin telefono" in phone.lower():
-                reasons.append("Sin teléfono válido")
-            
-            customers_info.append({
-                "id": str(customer_id),
-                "name": customer_name,
-                "phone": phone,
-                "email": customer.email or None,
-                "address": customer.address_street or None,
-                "packages_count": packages_count,
-                "messages_count": messages_count,
-                "notifications_count": notifications_count,
-                "announcements_count": announcements_count,
-                "reasons": reasons
-            })
-        
+        _require_admin(request, db, "Solo administradores pueden ver clientes inválidos")
+
+        service = BulkDeletionService()
+        invalid_ids = service.find_invalid_customer_ids(db)
+        # Conteos de relaciones de todos los clientes en una sola consulta
+        rows = service.get_customers_relation_counts(db, invalid_ids)
+
+        customers_info = [
+            {
+                "id": str(row["id"]),
+                "name": f"{row['first_name']} {row['last_name'] or ''}".strip(),
+                "phone": row["phone"] or "Sin teléfono",
+                "email": row["email"] or None,
+                "address": row["address_street"] or None,
+                "packages_count": row["packages_count"],
+                "messages_count": row["messages_count"],
+                "notifications_count": row["notifications_count"],
+                "announcements_count": row["announcements_count"],
+                "reasons": _invalid_customer_reasons(row)
+            }
+            for row in rows
+        ]
+
         response = {
             "success": True,
             "count": len(customers_info),
             "customers": customers_info
         }
-        
-        # Si hay paquetes sin cliente, agregar información adicional
-        if packages_without_customer > 0:
-            response["packages_without_customer"] = packages_without_customer
-            response["message"] = f"No hay clientes inválidos, pero hay {packages_without_customer} paquete(s) sin cliente asociado. Al ejecutar la limpieza, se crearán clientes 'Sin cliente' para estos paquetes y luego se eliminarán."
-        
+
+        if not customers_info:
+            packages_without_customer = db.query(func.count(Package.id)).filter(Package.customer_id.is_(None)).scalar()
+            if packages_without_customer > 0:
+                response["packages_without_customer"] = packages_without_customer
+                response["message"] = f"No hay clientes inválidos, pero hay {packages_without_customer} paquete(s) sin cliente asociado."
+
         return response
-        
+
     except HTTPException:
         raise
     except Exception as e:
@@ -699,6 +513,7 @@ async def list_invalid_customers(
 @router.delete("/cleanup/invalid", status_code=status.HTTP_200_OK)
 async def cleanup_invalid_customers(
     request: Request,
+    background: bool = Query(False, description="Ejecutar la limpieza como tarea en segundo plano"),
     db: Session = Depends(get_db)
 ):
     """Eliminar clientes inválidos (solo administradores)
@@ -706,121 +521,25 @@ async def cleanup_invalid_customers(
     Elimina clientes que:
     - Se llamen "Sin cliente"
     - No tengan número de teléfono (NULL, vacío, o "Sin teléfono")
+
+    La eliminación usa sentencias de conjunto por lotes; con background=true
+    se encola en Celery y se consulta con /cleanup/jobs/{task_id}.
     """
     try:
-        current_user = get_user_from_request(request, db)
-        if not current_user:
-            raise HTTPException(status_code=401, detail="No autenticado")
-        
-        # Verificar que sea administrador
-        if current_user.role.value != "ADMIN":
-            raise HTTPException(status_code=403, detail="Solo administradores pueden eliminar clientes")
-        
-        # Buscar clientes inválidos usando SQL directo para mayor flexibilidad
-        from sqlalchemy import text
-        invalid_customers_query = text("""
-            SELECT id FROM customers
-            WHERE 
-                -- Clientes con "Sin cliente" en cualquier campo de nombre
-                (
-                    LOWER(TRIM(first_name)) LIKE '%sin cliente%' OR
-                    LOWER(TRIM(last_name)) LIKE '%sin cliente%' OR
-                    LOWER(TRIM(COALESCE(full_name, ''))) LIKE '%sin cliente%' OR
-                    LOWER(TRIM(CONCAT(first_name, ' ', last_name))) LIKE '%sin cliente%' OR
-                    LOWER(REPLACE(first_name, ' ', '')) LIKE '%sincliente%' OR
-                    LOWER(REPLACE(last_name, ' ', '')) LIKE '%sincliente%' OR
-                    LOWER(REPLACE(COALESCE(full_name, ''), ' ', '')) LIKE '%sincliente%'
-                )
-                OR
-                -- Clientes sin teléfono válido
-                (
-                    phone IS NULL OR
-                    TRIM(phone) = '' OR
-                    LOWER(TRIM(phone)) LIKE '%sin teléfono%' OR
-                    LOWER(TRIM(phone)) LIKE '%sin telefono%' OR
-                    LOWER(TRIM(phone)) LIKE '%sintelefono%' OR
-                    LOWER(REPLACE(phone, ' ', '')) LIKE '%sintelefono%' OR
-                    LOWER(REPLACE(phone, 'é', 'e')) LIKE '%sin telefono%' OR
-                    LOWER(REPLACE(REPLACE(phone, ' ', ''), 'é', 'e')) LIKE '%sintelefono%'
-                )
-        """)
-        
-        result = db.execute(invalid_customers_query)
-        invalid_customers_ids = [row[0] for row in result.fetchall()]
-        
-        # Obtener objetos Customer
-        invalid_customers = db.query(Customer).filter(Customer.id.in_(invalid_customers_ids)).all() if invalid_customers_ids else []
-        
-        # Si no hay clientes inválidos, verificar si hay paquetes sin cliente
-        # y crear clientes "Sin cliente" para ellos (luego los eliminaremos)
-        if not invalid_customers:
-            packages_without_customer = db.query(Package).filter(Package.customer_id.is_(None)).count()
-            if packages_without_customer > 0:
-                logger.info(f"Se encontraron {packages_without_customer} paquete(s) sin cliente. Creando clientes 'Sin cliente' para limpiarlos...")
-                
-                # Verificar si ya existe un cliente "Sin cliente" con teléfono "Sin teléfono"
-                # Si existe, usarlo; si no, crearlo
-                from uuid import uuid4
-                from datetime import datetime
-                
-                # Buscar cliente "Sin cliente" existente usando LIKE para ser más flexible
-                existing_sin_cliente = db.query(Customer).filter(
-                    func.lower(func.trim(Customer.first_name)).like('%sin cliente%'),
-                    or_(
-                        func.lower(func.trim(Customer.phone)).like('%sin teléfono%'),
-                        func.lower(func.trim(Customer.phone)).like('%sin telefono%')
-                    )
-                ).first()
-                
-                if existing_sin_cliente:
-                    logger.info(f"Ya existe un cliente 'Sin cliente' (ID: {existing_sin_cliente.id}). Usándolo para asociar paquetes...")
-                    sin_cliente_id = existing_sin_cliente.id
-                    sin_cliente = existing_sin_cliente
-                else:
-                    # Crear un cliente "Sin cliente" único para todos los paquetes huérfanos
-                    # Usar un teléfono único para evitar conflictos con la restricción unique
-                    # El campo phone tiene límite de 20 caracteres, así que usamos solo los primeros 4 caracteres del UUID
-                    sin_cliente_id = uuid4()
-                    unique_phone = f"SinTel-{sin_cliente_id.hex[:4]}"  # Máximo 13 caracteres
-                    
-                    sin_cliente = Customer(
-                        id=sin_cliente_id,
-                        first_name="Sin cliente",
-                        last_name="",
-                        full_name="Sin cliente",
-                        phone=unique_phone,  # Teléfono único para evitar conflictos (máx 20 chars)
-                        email=None,
-                        address_street="",
-                        is_active=False
-                    )
-                    db.add(sin_cliente)
-                    db.flush()  # Para obtener el ID sin hacer commit
-                    logger.info(f"Creado nuevo cliente 'Sin cliente' (ID: {sin_cliente_id}) con teléfono único: {unique_phone}")
-                
-                # Asociar todos los paquetes huérfanos a este cliente
-                updated_packages = db.query(Package).filter(Package.customer_id.is_(None)).update(
-                    {Package.customer_id: sin_cliente_id},
-                    synchronize_session=False
-                )
-                db.commit()
-                
-                logger.info(f"Asociados {updated_packages} paquete(s) al cliente 'Sin cliente' (ID: {sin_cliente_id})")
-                
-                # Refrescar el objeto desde la base de datos para asegurar que esté en la sesión correcta
-                sin_cliente = db.query(Customer).filter(Customer.id == sin_cliente_id).first()
-                
-                if sin_cliente:
-                    # Agregar este cliente a la lista de inválidos para eliminarlo
-                    invalid_customers = [sin_cliente]
-                    logger.info(f"Cliente 'Sin cliente' (ID: {sin_cliente_id}) agregado a la lista de eliminación")
-                else:
-                    logger.error(f"No se pudo recuperar el cliente 'Sin cliente' después de crearlo/asociarlo (ID: {sin_cliente_id})")
-                    raise HTTPException(
-                        status_code=500,
-                        detail="Error al crear/recuperar cliente temporal para limpieza"
-                    )
-        
-        if not invalid_customers:
+        _require_admin(request, db, "Solo administradores pueden eliminar clientes")
+
+        if background:
+            from app.tasks import cleanup_invalid_customers as cleanup_task
+            task = cleanup_task.delay()
+            return {
+                "success": True,
+                "message": "Limpieza de clientes inválidos encolada",
+                "task_id": task.id
+            }
+
+        result = BulkDeletionService().cleanup_invalid_customers(db)
+
+        if result["customers_deleted"] == 0:
             return {
                 "success": True,
                 "message": "No se encontraron clientes inválidos para eliminar",
@@ -829,90 +548,29 @@ async def cleanup_invalid_customers(
                 "deleted_customers": [],
                 "error_customers": []
             }
-        
-        logger.info(f"Encontrados {len(invalid_customers)} cliente(s) inválido(s) para eliminar")
-        
-        deleted_customers = []
-        error_customers = []
-        
-        for customer in invalid_customers:
-            customer_id = customer.id
-            customer_name = f"{customer.first_name} {customer.last_name or ''}".strip()
-            
-            try:
-                logger.info(f"Iniciando eliminación de cliente {customer_name} (ID: {customer_id})")
-                
-                # Contar relaciones
-                packages_count = db.query(Package).filter(Package.customer_id == customer_id).count()
-                messages_count = db.query(Message).filter(Message.customer_id == customer_id).count()
-                notifications_count = db.query(Notification).filter(Notification.customer_id == customer_id).count()
-                announcements_count = db.query(PackageAnnouncementNew).filter(PackageAnnouncementNew.customer_id == customer_id).count()
-                
-                logger.info(f"Cliente {customer_name}: {packages_count} paquete(s), {messages_count} mensaje(s), {notifications_count} notificación(es), {announcements_count} anuncio(s)")
-                
-                # Desvincular paquetes
-                if packages_count > 0:
-                    updated = db.query(Package).filter(Package.customer_id == customer_id).update(
-                        {Package.customer_id: None},
-                        synchronize_session=False
-                    )
-                    logger.info(f"Desvinculados {updated} paquete(s) del cliente {customer_name}")
-                
-                # Eliminar relaciones
-                if messages_count > 0:
-                    deleted_messages = db.query(Message).filter(Message.customer_id == customer_id).delete(synchronize_session=False)
-                    logger.info(f"Eliminados {deleted_messages} mensaje(s) del cliente {customer_name}")
-                
-                if notifications_count > 0:
-                    deleted_notifications = db.query(Notification).filter(Notification.customer_id == customer_id).delete(synchronize_session=False)
-                    logger.info(f"Eliminadas {deleted_notifications} notificación(es) del cliente {customer_name}")
-                
-                if announcements_count > 0:
-                    deleted_announcements = db.query(PackageAnnouncementNew).filter(PackageAnnouncementNew.customer_id == customer_id).delete(synchronize_session=False)
-                    logger.info(f"Eliminados {deleted_announcements} anuncio(s) del cliente {customer_name}")
-                
-                # Eliminar el cliente
-                db.delete(customer)
-                db.commit()
-                
-                # Verificar que el cliente fue eliminado
-                customer_exists = db.query(Customer).filter(Customer.id == customer_id).first()
-                if customer_exists:
-                    logger.error(f"⚠️ El cliente {customer_name} (ID: {customer_id}) NO fue eliminado correctamente")
-                    raise Exception("El cliente no fue eliminado correctamente de la base de datos")
-                
-                deleted_customers.append({
-                    "id": str(customer_id),
-                    "name": customer_name,
-                    "phone": customer.phone or "Sin teléfono",
-                    "packages_detached": packages_count,
-                    "messages_deleted": messages_count,
-                    "notifications_deleted": notifications_count,
-                    "announcements_deleted": announcements_count
-                })
-                
-                logger.info(f"✅ Cliente {customer_name} (ID: {customer_id}) eliminado exitosamente")
-                
-            except Exception as e:
-                db.rollback()
-                error_message = str(e)
-                logger.error(f"❌ Error al eliminar cliente {customer_name} (ID: {customer_id}): {error_message}", exc_info=True)
-                error_customers.append({
-                    "id": str(customer_id),
-                    "name": customer_name,
-                    "phone": customer.phone or "Sin teléfono",
-                    "error": error_message
-                })
-        
+
+        deleted_customers = [
+            {
+                "id": str(row["id"]),
+                "name": f"{row['first_name']} {row['last_name'] or ''}".strip(),
+                "phone": row["phone"] or "Sin teléfono",
+                "packages_detached": row["packages_count"],
+                "messages_deleted": row["messages_count"],
+                "notifications_deleted": row["notifications_count"],
+                "announcements_deleted": row["announcements_count"]
+            }
+            for row in result["customers"]
+        ]
+
         return {
             "success": True,
-            "message": f"Limpieza completada: {len(deleted_customers)} cliente(s) eliminado(s), {len(error_customers)} error(es)",
-            "deleted_count": len(deleted_customers),
-            "error_count": len(error_customers),
+            "message": f"Limpieza completada: {result['customers_deleted']} cliente(s) eliminado(s), 0 error(es)",
+            "deleted_count": result["customers_deleted"],
+            "error_count": 0,
             "deleted_customers": deleted_customers,
-            "error_customers": error_customers
+            "error_customers": []
         }
-        
+
     except HTTPException:
         raise
     except Exception as e:
@@ -923,6 +581,25 @@ async def cleanup_invalid_customers(
             detail=f"Error al limpiar clientes inválidos: {str(e)}"
         )
 
+@router.get("/cleanup/jobs/{task_id}", status_code=status.HTTP_200_OK)
+async def get_cleanup_job_status(
+    task_id: str,
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """Consultar el estado de una limpieza en segundo plano (solo administradores)"""
+    _require_admin(request, db, "Solo administradores pueden consultar limpiezas")
+
+    from app.celery_app import celery_app
+    task = celery_app.AsyncResult(task_id)
+    response = {"task_id": task_id, "status": task.status}
+    if task.successful():
+        result = task.result or {}
+        response["result"] = {k: v for k, v in result.items() if k != "customers"}
+    elif task.failed():
+        response["error"] = str(task.result)
+    return response
+
 # ========================================
 # ENDPOINTS DE LISTADO Y BÚSQUEDA
 # ========================================
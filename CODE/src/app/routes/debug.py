@@ -138,8 +138,8 @@ async def get_services_status(db: Session) -> Dict[str, Any]:
     
     # Verificar S3
     try:
-        from app.services.s3_service import S3Service
-        s3_service = S3Service()
+        from app.services.registry import get_s3_service
+        s3_service = get_s3_service()
         # Intentar listar objetos (operación básica)
         services["s3"] = {"status": "ok", "details": "S3 Service Available"}
     except Exception as e:
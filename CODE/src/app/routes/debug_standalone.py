@@ -704,8 +704,8 @@ async def get_services_status_standalone(db: Session = Depends(get_db)):
     
     # S3
     try:
-        from app.services.s3_service import S3Service
-        s3_service = S3Service()
+        from app.services.registry import get_s3_service
+        s3_service = get_s3_service()
         services["s3"] = {"status": "ok", "details": "S3 Service Available"}
     except Exception as e:
         services["s3"] = {"status": "error", "details": str(e)}
@@ -898,8 +898,8 @@ async def run_tests_standalone(db: Session = Depends(get_db)):
     
     # Test 2: S3
     try:
-        from app.services.s3_service import S3Service
-        s3_service = S3Service()
+        from app.services.registry import get_s3_service
+        s3_service = get_s3_service()
         tests.append({
             "name": "Servicio S3",
             "status": "pass",
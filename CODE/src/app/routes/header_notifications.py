@@ -6,7 +6,7 @@ Fecha: 2025-01-24
 Autor: Equipo de Desarrollo
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 from datetime import datetime
 
@@ -19,6 +19,10 @@ from app.services.header_notification_service import HeaderNotificationService
 from app.services.message_service import MessageService
 from app.models.package import Package, PackageStatus
 from app.dependencies import get_current_active_user_from_cookies
+from app.utils.conditional import make_etag, not_modified_response, set_etag
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(
     tags=["Notificaciones del Header"],
@@ -29,6 +33,21 @@ header_notification_service = HeaderNotificationService()
 message_service = MessageService()
 
 
+def _conditional_count(request: Request, response: Response, data: dict, *scope):
+    """
+    Contadores del header con ETag
+
+    El contador ya es el validador (una consulta COUNT): el ETag se deriva
+    del propio payload y el sondeo periódico recibe 304 mientras no cambie.
+    """
+    etag = make_etag(*scope, *sorted(data.items()))
+    not_modified = not_modified_response(request, etag)
+    if not_modified:
+        return not_modified
+    set_etag(response, etag)
+    return data
+
+
 @router.get("/notifications/header", response_model=HeaderNotificationResponse)
 async def get_header_notifications(
     current_user: User = Depends(get_current_active_user_from_cookies),
@@ -60,21 +79,17 @@ async def get_header_notifications(
 
 @router.get("/notifications/count")
 async def get_notifications_count(
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_active_user_from_cookies),
     db: Session = Depends(get_db)
 ):
     """Obtener solo el contador de notificaciones (para HTMX)"""
     try:
-        badge_data = header_notification_service.get_notification_badge_data(
+        data = header_notification_service.get_notification_count(
             db, current_user.id, current_user.role.value
         )
-        
-        return {
-            "count": badge_data["total_notifications"],
-            "show_badge": badge_data["show_badge"],
-            "badge_text": badge_data["badge_text"],
-            "badge_class": badge_data["badge_class"]
-        }
+        return _conditional_count(request, response, data, "notifications", current_user.id)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -119,7 +134,7 @@ async def mark_messages_as_read(
                     message_service.mark_as_read(db, message_id, current_user.id)
                     updated_count += 1
                 except Exception as e:
-                    print(f"Error marcando mensaje {message_id} como leído: {e}")
+                    logger.error(f"Error marcando mensaje {message_id} como leído: {e}")
                     continue
             
             return MarkAsReadResponse(
@@ -136,13 +151,15 @@ async def mark_messages_as_read(
 
 @router.get("/packages/received/count")
 async def get_received_packages_count(
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_active_user_from_cookies),
     db: Session = Depends(get_db)
 ):
     """Obtener el contador de paquetes en estado RECIBIDO para mostrar en el header."""
     try:
         count = db.query(Package).filter(Package.status == PackageStatus.RECIBIDO).count()
-        return {"count": count}
+        return _conditional_count(request, response, {"count": count}, "packages_received")
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -152,26 +169,16 @@ async def get_received_packages_count(
 
 @router.get("/packages/announced/count")
 async def get_announced_packages_count(
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_active_user_from_cookies),
     db: Session = Depends(get_db)
 ):
     """Obtener el contador de paquetes en estado ANUNCIADO y anuncios no procesados para mostrar en el header."""
     try:
-        from app.models.announcement_new import PackageAnnouncementNew
-        
-        # Contar paquetes en estado ANUNCIADO
-        packages_announced = db.query(Package).filter(Package.status == PackageStatus.ANUNCIADO).count()
-        
-        # Contar anuncios no procesados y activos
-        announcements_not_processed = db.query(PackageAnnouncementNew).filter(
-            PackageAnnouncementNew.is_processed == False,
-            PackageAnnouncementNew.is_active == True
-        ).count()
-        
-        # Total: paquetes anunciados + anuncios no procesados
-        total_count = packages_announced + announcements_not_processed
+        total_count = header_notification_service.get_announced_packages_count(db)
         
-        return {"count": total_count}
+        return _conditional_count(request, response, {"count": total_count}, "packages_announced")
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
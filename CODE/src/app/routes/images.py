@@ -11,10 +11,14 @@ from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models.file_upload import FileUpload, FileType
-from app.services.s3_service import S3Service
+from app.models.package_archive import ArchivedFileUpload
+from app.services.registry import get_s3_service
 import boto3
 from botocore.exceptions import ClientError
 import io
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/images", tags=["images"])
 
@@ -24,7 +28,7 @@ async def test_s3_connection():
     OPCIÓN 1: Endpoint de diagnóstico mejorado para verificar conectividad con S3
     """
     try:
-        s3_service = S3Service()
+        s3_service = get_s3_service()
         
         # Test básico de conexión
         connection_test = s3_service.test_connection()
@@ -134,7 +138,7 @@ async def list_bucket_images(limit: int = 20):
     Listar imágenes disponibles en el bucket S3
     """
     try:
-        s3_service = S3Service()
+        s3_service = get_s3_service()
         
         # Listar archivos de imagen en el bucket
         response = s3_service.s3_client.list_objects_v2(
@@ -196,7 +200,7 @@ async def show_bucket_image(path: str):
     Mostrar una imagen específica del bucket usando su path completo
     """
     try:
-        s3_service = S3Service()
+        s3_service = get_s3_service()
         
         # Generar URL presignada para la imagen
         presigned_url = s3_service.generate_presigned_url(
@@ -228,9 +232,6 @@ async def get_image_improved(
     Mantiene arquitectura de seguridad actual pero más robusta
     """
     import time
-    import logging
-    
-    logger = logging.getLogger(__name__)
     
     try:
         logger.info(f"🖼️ Solicitando imagen ID: {file_id}")
@@ -245,6 +246,12 @@ async def get_image_improved(
             FileUpload.id == file_id,
             FileUpload.file_type == FileType.IMAGEN
         ).first()
+        if not file_upload:
+            # Imagen de un paquete archivado (conserva su id)
+            file_upload = db.query(ArchivedFileUpload).filter(
+                ArchivedFileUpload.id == file_id,
+                ArchivedFileUpload.file_type == FileType.IMAGEN
+            ).first()
         
         if not file_upload:
             logger.warning(f"❌ Imagen no encontrada en BD: {file_id}")
@@ -258,7 +265,7 @@ async def get_image_improved(
         logger.info(f"🔑 S3 Key: {file_upload.s3_key}")
         
         # Configurar S3
-        s3_service = S3Service()
+        s3_service = get_s3_service()
         
         # Normalizar S3 key para compatibilidad
         normalized_key = s3_service._normalize_s3_key(file_upload.s3_key)
@@ -473,7 +480,7 @@ async def test_presigned_url(
                 "success": False
             }
         
-        s3_service = S3Service()
+        s3_service = get_s3_service()
         
         # Test completo de la imagen
         test_results = {
@@ -591,16 +598,16 @@ async def get_image_fallback(
     import time
     
     try:
-        print(f"🔄 Fallback solicitado para: {filename}")
-        print(f"🔑 S3 Key: {s3_key}")
+        logger.debug("🔄 Fallback solicitado para: %s", filename)
+        logger.debug("🔑 S3 Key: %s", s3_key)
         
         # Configurar S3
-        s3_service = S3Service()
+        s3_service = get_s3_service()
         
         # RETRY LOGIC - Intentar 3 veces
         for attempt in range(3):
             try:
-                print(f"🔄 Fallback intento {attempt + 1}/3")
+                logger.debug("🔄 Fallback intento %s/3", attempt + 1)
                 
                 # Obtener el objeto desde S3
                 response = s3_service.s3_client.get_object(
@@ -612,7 +619,7 @@ async def get_image_fallback(
                 content = response['Body'].read()
                 content_type = response.get('ContentType', 'image/jpeg')
                 
-                print(f"✅ Fallback exitoso - Tamaño: {len(content)} bytes")
+                logger.info(f"✅ Fallback exitoso - Tamaño: {len(content)} bytes")
                 
                 # Crear respuesta de streaming
                 return StreamingResponse(
@@ -627,7 +634,7 @@ async def get_image_fallback(
                 
             except ClientError as e:
                 error_code = e.response['Error']['Code']
-                print(f"❌ Error fallback intento {attempt + 1}: {error_code}")
+                logger.error(f"❌ Error fallback intento {attempt + 1}: {error_code}")
                 
                 if error_code == 'NoSuchKey':
                     break  # No reintentar para archivos que no existen
@@ -635,16 +642,16 @@ async def get_image_fallback(
                     time.sleep(1)
                     
             except Exception as fallback_error:
-                print(f"❌ Error inesperado fallback intento {attempt + 1}: {fallback_error}")
+                logger.error(f"❌ Error inesperado fallback intento {attempt + 1}: {fallback_error}")
                 if attempt < 2:
                     time.sleep(1)
         
         # Si llegamos aquí, el fallback falló
-        print(f"❌ Fallback falló para: {filename}")
+        logger.error(f"❌ Fallback falló para: {filename}")
         return await placeholder_image_response()
                 
     except Exception as e:
-        print(f"❌ Error general en fallback: {e}")
+        logger.error(f"❌ Error general en fallback: {e}")
         return await placeholder_image_response()
 
 @router.get("/debug/health-check")
@@ -665,7 +672,7 @@ async def images_health_check(db: Session = Depends(get_db)):
         # Check 1: Conexión S3
         start_time = time.time()
         try:
-            s3_service = S3Service()
+            s3_service = get_s3_service()
             s3_connection = s3_service.test_connection()
             health_report["checks"]["s3_connection"] = {
                 "status": "✅ HEALTHY" if s3_connection else "❌ UNHEALTHY",
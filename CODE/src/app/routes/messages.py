@@ -21,6 +21,9 @@ from app.schemas.message import (
 )
 from app.services.message_service import MessageService
 from app.dependencies import get_current_active_user_from_cookies
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(
     tags=["Mensajes"],
@@ -258,9 +261,7 @@ async def answer_message(
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        import traceback
-        print(f"Error detallado al responder mensaje: {str(e)}")
-        print(traceback.format_exc())
+        logger.error(f"Error detallado al responder mensaje: {str(e)}", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error al responder mensaje: {str(e)}"
@@ -24,8 +24,12 @@ from app.schemas.notification import (
     SMSSendResponse, SMSBulkSendResponse, SMSTestRequest, SMSTestResponse,
     SMSReportRequest, SMSReportResponse
 )
-from app.services.sms_service import SMSService
+from app.services.registry import get_sms_service
+from app.services.sms_templates import sms_template_cache
 from app.dependencies import get_current_active_user, get_current_admin_user
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(
     prefix="/notifications",
@@ -48,7 +52,7 @@ async def list_notifications(
     db: Session = Depends(get_db)
 ):
     """Listar notificaciones con filtros"""
-    service = SMSService()
+    service = get_sms_service()
 
     # Construir filtros
     filters = {}
@@ -81,7 +85,7 @@ async def get_notification(
     db: Session = Depends(get_db)
 ):
     """Obtener notificación específica"""
-    service = SMSService()
+    service = get_sms_service()
     notification = service.get_by_id(db, notification_id)
     if not notification:
         raise HTTPException(status_code=404, detail="Notificación no encontrada")
@@ -95,7 +99,7 @@ async def retry_notification(
     db: Session = Depends(get_db)
 ):
     """Reintentar envío de notificación fallida"""
-    service = SMSService()
+    service = get_sms_service()
     notification = service.get_by_id(db, notification_id)
 
     if not notification:
@@ -119,7 +123,7 @@ async def list_sms_templates(
     db: Session = Depends(get_db)
 ):
     """Listar plantillas SMS"""
-    service = SMSService()
+    service = get_sms_service()
     templates = db.query(SMSMessageTemplate).filter(SMSMessageTemplate.is_active == True).all()
 
     return SMSMessageTemplateListResponse(
@@ -150,6 +154,7 @@ async def create_sms_template(
     db.add(new_template)
     db.commit()
     db.refresh(new_template)
+    sms_template_cache.invalidate()
 
     return SMSMessageTemplateResponse.model_validate(new_template)
 
@@ -176,6 +181,7 @@ async def update_sms_template(
 
     db.commit()
     db.refresh(template)
+    sms_template_cache.invalidate()
 
     return SMSMessageTemplateResponse.model_validate(template)
 
@@ -199,6 +205,7 @@ async def delete_sms_template(
 
     db.delete(template)
     db.commit()
+    sms_template_cache.invalidate()
 
 # ========================================
 # ENDPOINTS PARA CONFIGURACIÓN SMS
@@ -210,7 +217,7 @@ async def get_sms_config(
     db: Session = Depends(get_db)
 ):
     """Obtener configuración SMS (solo administradores)"""
-    service = SMSService()
+    service = get_sms_service()
     config = service.get_sms_config(db)
     return SMSConfigurationResponse.model_validate(config)
 
@@ -221,7 +228,7 @@ async def update_sms_config(
     db: Session = Depends(get_db)
 ):
     """Actualizar configuración SMS (solo administradores)"""
-    service = SMSService()
+    service = get_sms_service()
     config = service.get_sms_config(db)
 
     update_data = config_update.dict(exclude_unset=True)
@@ -242,7 +249,7 @@ async def test_sms_config(
     db: Session = Depends(get_db)
 ):
     """Probar configuración SMS (solo administradores)"""
-    service = SMSService()
+    service = get_sms_service()
     return await service.test_sms_configuration(db, test_request)
 
 # ========================================
@@ -256,7 +263,7 @@ async def send_sms(
     db: Session = Depends(get_db)
 ):
     """Enviar SMS individual"""
-    service = SMSService()
+    service = get_sms_service()
     return await service.send_sms(
         db=db,
         recipient=sms_request.recipient,
@@ -272,7 +279,7 @@ async def send_bulk_sms(
     db: Session = Depends(get_db)
 ):
     """Enviar SMS masivo"""
-    service = SMSService()
+    service = get_sms_service()
     return await service.send_bulk_sms(
         db=db,
         recipients=bulk_request.recipients,
@@ -288,7 +295,7 @@ async def send_sms_by_event(
     db: Session = Depends(get_db)
 ):
     """Enviar SMS basado en evento usando plantilla"""
-    service = SMSService()
+    service = get_sms_service()
     return await service.send_sms_by_event(db, event_request)
 
 # ========================================
@@ -302,7 +309,7 @@ async def get_notification_stats(
     db: Session = Depends(get_db)
 ):
     """Obtener estadísticas de notificaciones"""
-    service = SMSService()
+    service = get_sms_service()
     stats = service.get_sms_stats(db, days)
 
     # Obtener notificaciones recientes para fallos
@@ -343,7 +350,7 @@ async def generate_sms_report(
     """Generar reporte detallado de SMS"""
     # TODO: Implementar reporte detallado
     # Por ahora devolver estadísticas básicas
-    service = SMSService()
+    service = get_sms_service()
     stats = service.get_sms_stats(db, 30)  # Últimos 30 días
 
     return SMSReportResponse(
@@ -370,7 +377,7 @@ async def export_notifications_csv(
     db: Session = Depends(get_db)
 ):
     """Exportar notificaciones a CSV"""
-    service = SMSService()
+    service = get_sms_service()
 
     # Calcular fecha de inicio
     from app.utils.datetime_utils import get_colombia_now
@@ -464,7 +471,7 @@ async def liwa_webhook(
 
     except Exception as e:
         # Log error but don't fail the webhook
-        print(f"Error procesando webhook Liwa: {str(e)}")
+        logger.error(f"Error procesando webhook Liwa: {str(e)}")
         return {"received": False, "error": str(e)}
 
 # ========================================
@@ -477,7 +484,7 @@ async def setup_default_templates(
     db: Session = Depends(get_db)
 ):
     """Crear plantillas por defecto (solo administradores)"""
-    service = SMSService()
+    service = get_sms_service()
     templates = service.create_default_templates(db)
 
     return {
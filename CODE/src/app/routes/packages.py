@@ -11,8 +11,9 @@
 Router de paquetes para PAQUETES EL CLUB
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Form
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Form, Body, Request, Response
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.orm import Session
 from typing import Optional, List
 from app.database import get_db
 from app.dependencies import get_current_active_user, get_current_active_user_from_cookies
@@ -20,7 +21,7 @@ from app.models.user import User
 from app.models.file_upload import FileUpload, FileType
 from app.config import settings
 from app.models.package import Package, PackageStatus, PackageType, PackageCondition
-from app.services.s3_service import S3Service
+from app.services.registry import get_s3_service
 from app.schemas.package import (
     PackageCreate, PackageUpdate, PackageResponse,
     PackageStatusUpdate, PackageSearch, PackageStats,
@@ -31,10 +32,16 @@ from app.schemas.package import (
 )
 from app.services.package_state_service import PackageStateService
 from app.services.package_service import PackageService
-from app.services.email_service import EmailService
+from app.services.rate_provider import get_rates
+from app.services.registry import get_email_service
 from app.models.notification import NotificationEvent, NotificationPriority
+from app.utils.conditional import make_etag, not_modified_response, set_etag
 from app.utils.datetime_utils import get_colombia_now
-from app.utils.normalization import normalize_package_item, normalize_status, normalize_type, normalize_condition
+from app.utils.exceptions import PackageConflictException
+from app.utils.normalization import normalize_type, normalize_condition
+import logging
+
+logger = logging.getLogger(__name__)
 
 # Crear router
 router = APIRouter(
@@ -69,6 +76,8 @@ async def create_package(
 @router.get("/{package_id}")
 async def get_package(
     package_id: str,  # Changed to str to handle announcement IDs
+    request: Request,
+    response: Response,
     # Temporarily disabled for testing: current_user: dict = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -81,7 +90,7 @@ async def get_package(
         
         # Get announcement data
         announcement_query = text("""
-            SELECT customer_name, customer_phone, guide_number, tracking_code, announced_at
+            SELECT customer_name, customer_phone, guide_number, tracking_code, announced_at, updated_at
             FROM package_announcements_new
             WHERE tracking_code = :tracking_code AND is_processed = false
         """)
@@ -90,6 +99,13 @@ async def get_package(
         
         if not announcement:
             raise HTTPException(status_code=404, detail="Anuncio no encontrado o ya procesado")
+
+        # La fila ya es el validador: updated_at del anuncio y versión de tarifas
+        etag = make_etag("announcement", package_id, announcement[5], get_rates().version)
+        not_modified = not_modified_response(request, etag)
+        if not_modified:
+            return not_modified
+        set_etag(response, etag)
         
         # Return announcement data in package format
         return {
@@ -108,9 +124,9 @@ async def get_package(
             'received_at': None,
             'delivered_at': None,
             'cancelled_at': None,
-            'base_fee': float(settings.base_delivery_rate_normal),
+            'base_fee': float(get_rates().base_fee(PackageType.NORMAL)),
             'storage_fee': 0.00,
-            'total_amount': float(settings.base_delivery_rate_normal),
+            'total_amount': float(get_rates().base_fee(PackageType.NORMAL)),
             'customer_id': None,
             'created_at': announcement[4].isoformat() if announcement[4] else None,
             'updated_at': announcement[4].isoformat() if announcement[4] else None,
@@ -124,9 +140,17 @@ async def get_package(
             raise HTTPException(status_code=400, detail="ID de paquete inválido")
             
         package_service = PackageService()
+        validator = package_service.package_validator(db, package_id_int)
+        if validator is not None:
+            not_modified = not_modified_response(request, make_etag("package", package_id_int, *validator))
+            if not_modified:
+                return not_modified
+
         package = package_service.get_package_with_correct_fees(db, package_id_int)
         if not package:
             raise HTTPException(status_code=404, detail="Paquete no encontrado")
+        # Tras la posible corrección de tarifas el paquete puede haber cambiado
+        set_etag(response, make_etag("package", package.id, *package_service.package_etag_parts(package)))
 
         # Create custom response with customer data
         package_dict = {
@@ -198,6 +222,7 @@ async def delete_package(
 
 @router.get("/")
 async def list_packages(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
     status_filter: Optional[str] = Query(None, description="Filtrar por estado"),
@@ -206,256 +231,28 @@ async def list_packages(
     db: Session = Depends(get_db)
 ):
     """Listar paquetes con filtros opcionales y paginación (10 por página) - OPTIMIZADO"""
-    from sqlalchemy import text
-    import logging
-    from app.cache_manager import cache_manager
-    
-    logger = logging.getLogger(__name__)
-    
-    # OPTIMIZACIÓN: Verificar caché primero
-    cache_filters = {
-        "skip": skip,
-        "limit": limit,
-        "status_filter": status_filter,
-        "customer_id": customer_id
-    }
-    
-    cached_result = cache_manager.get_cached_packages_list(cache_filters)
-    if cached_result:
-        logger.info("📦 Datos obtenidos del caché")
-        return cached_result
-
-    # Get packages with file uploads
-    # Get packages with file uploads using ORM
-    from datetime import datetime, timezone
-    
     try:
-        # Construir query base
-        query = db.query(Package).options(
-            joinedload(Package.customer),
-            joinedload(Package.file_uploads)
+        package_service = PackageService()
+        # Validador barato (una consulta de agregados): 304 si la página no cambió
+        etag = make_etag(
+            "packages_page", skip, limit, status_filter, customer_id,
+            *package_service.dashboard_page_validator(db, status_filter=status_filter, customer_id=customer_id)
         )
-        
-        # Aplicar filtro de estado si se proporciona
-        if status_filter:
-            logger.info(f"🔍 Aplicando filtro de estado: {status_filter}")
-            # Normalizar el estado para comparación
-            from app.utils.normalization import normalize_status
-            normalized_status = normalize_status(status_filter)
-            if normalized_status:
-                query = query.filter(Package.status == normalized_status)
-                logger.info(f"✅ Filtro aplicado: {normalized_status}")
-        
-        # Aplicar filtro de cliente si se proporciona
-        if customer_id:
-            query = query.filter(Package.customer_id == customer_id)
-        
-        # Obtener paquetes ordenados
-        packages_query = query.order_by(Package.created_at.desc()).all()
-        
-        # Contar total para paginación
-        total_packages = len(packages_query)
-        logger.info(f"📊 Paquetes encontrados: {total_packages}")
+        not_modified = not_modified_response(request, etag)
+        if not_modified:
+            return not_modified
+
+        page = package_service.list_dashboard_page(
+            db, skip=skip, limit=limit, status_filter=status_filter, customer_id=customer_id, validator=etag
+        )
+        # Las filas son dataclasses con fechas nativas: orjson las serializa en
+        # una sola pasada, sin jsonable_encoder
+        page_response = ORJSONResponse(page)
+        set_etag(page_response, etag)
+        return page_response
     except Exception as e:
         logger.error(f"Error querying packages: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error al consultar paquetes: {str(e)}")
-    
-    packages_data = []
-    # OPTIMIZACIÓN: Calcular storage_days una sola vez
-    now_utc = datetime.now(timezone.utc)
-    
-    for package in packages_query:
-        try:
-            # Calculate storage days (optimizado)
-            storage_days = 0
-            storage_fee = 0.0
-            if package.received_at:
-                received_at = package.received_at
-                if received_at.tzinfo is None:
-                    received_at = received_at.replace(tzinfo=timezone.utc)
-                delta = now_utc - received_at
-                storage_days = max(0, delta.days)
-                storage_fee = float(storage_days * settings.base_storage_rate)
-            
-            total_amount = float(package.base_fee or 0) + storage_fee
-            
-            # Get file uploads
-            file_uploads_data = []
-            for file_upload in package.file_uploads:
-                try:
-                    file_uploads_data.append({
-                        'id': file_upload.id,
-                        'filename': file_upload.filename,
-                        's3_key': file_upload.s3_key,
-                        's3_url': file_upload.s3_url,
-                        'file_type': file_upload.file_type.value if file_upload.file_type else None,
-                        'file_size': file_upload.file_size,
-                        'content_type': file_upload.content_type,
-                        'created_at': file_upload.created_at.isoformat() if file_upload.created_at else None
-                    })
-                except Exception as e:
-                    logger.warning(f"Error processing file upload {file_upload.id}: {str(e)}")
-                    continue
-            
-            packages_data.append({
-                'id': package.id,
-                'tracking_number': package.tracking_number,
-                'guide_number': package.guide_number,
-                'customer_name': package.customer.full_name if package.customer else 'Sin cliente',
-                'customer_phone': package.customer.phone if package.customer else 'Sin teléfono',
-                'customer_email': package.customer.email if package.customer else None,
-                'package_type': package.package_type.value if package.package_type else 'normal',
-                'status': package.status.value if package.status else 'ANUNCIADO',
-                'package_condition': package.package_condition.value if package.package_condition else 'BUENO',
-                'access_code': package.access_code or '',
-                'baroti': package.posicion,
-                'observations': None,
-                'announced_at': package.announced_at.isoformat() if package.announced_at else None,
-                'received_at': package.received_at.isoformat() if package.received_at else None,
-                'delivered_at': package.delivered_at.isoformat() if package.delivered_at else None,
-                'cancelled_at': package.cancelled_at.isoformat() if package.cancelled_at else None,
-                'base_fee': float(package.base_fee or 0),
-                'storage_fee': storage_fee,
-                'storage_days': storage_days,
-                'total_amount': total_amount,
-                'customer_id': package.customer_id,
-                'created_at': package.created_at.isoformat() if package.created_at else None,
-                'updated_at': package.updated_at.isoformat() if package.updated_at else None,
-                'is_announcement': False,
-                'file_uploads': file_uploads_data
-            })
-        except Exception as e:
-            logger.error(f"Error processing package {package.id}: {str(e)}")
-            continue
-
-    # Obtener anuncios no procesados (aplicar filtro de estado si existe)
-    # Construir WHERE clause dinámicamente
-    where_clauses = ["a.is_processed = false"]
-    
-    # Aplicar filtro de estado a anuncios si se proporciona
-    if status_filter:
-        normalized_status = normalize_status(status_filter)
-        if normalized_status == "ANUNCIADO":
-            where_clauses.append("a.is_active = true")
-        elif normalized_status == "CANCELADO":
-            where_clauses.append("a.is_active = false")
-        else:
-            # Si el filtro es RECIBIDO o ENTREGADO, no mostrar anuncios
-            where_clauses.append("1=0")  # Condición que siempre es falsa
-    
-    where_clause = " AND ".join(where_clauses)
-    
-    announcements_query = f"""
-        SELECT
-            CONCAT('announcement_', a.tracking_code) as id,
-            a.tracking_code as tracking_number,
-            'normal' as package_type,
-            CASE 
-                WHEN a.is_active = false THEN 'cancelado'
-                ELSE 'announced'
-            END as status,
-            'ok' as package_condition,
-            '' as access_code,
-            NULL as posicion,
-            NULL as observations,
-            a.announced_at,
-            NULL as received_at,
-            NULL as delivered_at,
-            CASE 
-                WHEN a.is_active = false THEN a.updated_at
-                ELSE NULL
-            END as cancelled_at,
-            {settings.base_delivery_rate_normal} as base_fee,
-            0.00 as storage_fee,
-            {settings.base_delivery_rate_normal} as total_amount,
-            a.customer_id,
-            a.announced_at as created_at,
-            a.announced_at as updated_at,
-            COALESCE(c.full_name, a.customer_name, 'Sin cliente') as customer_name,
-            COALESCE(c.phone, a.customer_phone, 'Sin teléfono') as customer_phone,
-            c.email as customer_email,
-            a.guide_number
-        FROM package_announcements_new a
-        LEFT JOIN customers c ON a.customer_id = c.id
-        WHERE {where_clause}
-        ORDER BY a.announced_at DESC
-    """
-
-    announcements_result = db.execute(text(announcements_query))
-    announcements_data = announcements_result.fetchall()
-    logger.info(f"📢 Anuncios encontrados: {len(announcements_data)}")
-
-    # Combine packages and announcements
-    all_items = []
-
-    # Add packages (now they are already dictionaries with file_uploads)
-    for package_dict in packages_data:
-        all_items.append(normalize_package_item(package_dict))
-
-    # Add announcements
-    for row in announcements_data:
-        item_dict = {
-            'id': row[0],  # This will be 'announcement_uuid'
-            'tracking_number': row[1],
-            'package_type': row[2],  # normalized later
-            'status': row[3],        # normalized later
-            'package_condition': row[4],
-            'access_code': row[5],
-            'baroti': row[6],
-            'observations': row[7],
-            'announced_at': row[8].isoformat() if row[8] else None,
-            'received_at': row[9],
-            'delivered_at': row[10],
-            'cancelled_at': row[11],
-            'base_fee': float(row[12]),
-            'storage_fee': float(row[13]),
-            'storage_days': 0,  # Los anuncios no tienen días de almacenamiento
-            'total_amount': float(row[14]),
-            'customer_id': row[15],
-            'created_at': row[16].isoformat() if row[16] else None,
-            'updated_at': row[17].isoformat() if row[17] else None,
-            'customer_name': row[18],  # ✅ Ahora viene de customers.full_name si existe
-            'customer_phone': row[19],  # ✅ Ahora viene de customers.phone si existe
-            'customer_email': row[20],  # ✅ Email del cliente (puede ser None)
-            'guide_number': row[21],  # Guide number from announcement
-            'is_announcement': True,  # Flag to identify if it's an announcement
-            'file_uploads': []  # Los anuncios no tienen archivos adjuntos
-        }
-        all_items.append(normalize_package_item(item_dict))
-
-    # Sort by creation date (most recent first)
-    all_items.sort(key=lambda x: x['created_at'] or '', reverse=True)
-
-    # Calcular información de paginación
-    total_items = total_packages + len(announcements_data)
-    total_pages = (total_items + limit - 1) // limit if total_items > 0 else 1
-    current_page = (skip // limit) + 1
-    has_prev = skip > 0
-    has_next = skip + limit < total_items
-
-    # Aplicar paginación después de combinar y ordenar
-    start_idx = skip
-    end_idx = skip + limit
-    paginated_items = all_items[start_idx:end_idx]
-
-    # Preparar respuesta
-    result = {
-        "packages": paginated_items,
-        "pagination": {
-            "page": current_page,
-            "limit": limit,
-            "total": total_items,
-            "total_pages": total_pages,
-            "has_prev": has_prev,
-            "has_next": has_next
-        }
-    }
-    
-    # OPTIMIZACIÓN: Guardar en caché por 15 segundos (reducido para mejor refresco)
-    cache_manager.cache_packages_list(result, cache_filters, ttl=15)
-    logger.info(f"📦 Datos guardados en caché - {len(paginated_items)} items")
-    
-    return result
 
 
 @router.post("/search", response_model=List[PackageResponse])
@@ -493,10 +290,7 @@ async def update_package_status(
     db: Session = Depends(get_db)
 ):
     """Actualizar el estado de un paquete o procesar un anuncio"""
-    print(f"🚀🚀🚀 ENDPOINT CALLED: update_package_status with package_id={package_id}")
-    print(f"🚀🚀🚀 ENDPOINT CALLED: status_update={status_update}")
-    print(f"🚀🚀🚀 ENDPOINT CALLED: status_update.status={status_update.status}")
-    print(f"🚀🚀🚀 ENDPOINT CALLED: status_update.dict()={status_update.dict()}")
+    logger.debug("update_package_status package_id=%s status=%s", package_id, status_update.status)
     package_service = PackageService()
 
     try:
@@ -567,36 +361,21 @@ async def update_package_status(
         else:
             # Handle regular package status updates
             package_id_int = int(package_id)
-            print(f"🔄 DEBUG: Updating package {package_id_int} status to {status_update.status}")
             
-            # Get current package status for debugging
-            current_package = db.query(Package).filter(Package.id == package_id_int).first()
-            if current_package:
-                print(f"🔄 DEBUG: Current package status: {current_package.status}")
-                print(f"🔄 DEBUG: Current package status value: {current_package.status.value}")
-                print(f"🔄 DEBUG: Current package status type: {type(current_package.status)}")
-                print(f"🔄 DEBUG: New status: {status_update.status}")
-                print(f"🔄 DEBUG: New status value: {status_update.status.value}")
-                print(f"🔄 DEBUG: New status type: {type(status_update.status)}")
-                print(f"🔄 DEBUG: Transition: {current_package.status.value} -> {status_update.status.value}")
-                
-                # Check if transition is allowed
+            # Diagnóstico de la transición (consulta extra solo con DEBUG habilitado)
+            if logger.isEnabledFor(logging.DEBUG):
                 from app.services.package_state_service import PackageStateService
-                print(f"🔄 DEBUG: Current status enum: {current_package.status}")
-                print(f"🔄 DEBUG: Current status enum type: {type(current_package.status)}")
-                print(f"🔄 DEBUG: Current status enum value: {current_package.status.value}")
-                print(f"🔄 DEBUG: New status enum: {status_update.status}")
-                print(f"🔄 DEBUG: New status enum type: {type(status_update.status)}")
-                print(f"🔄 DEBUG: New status enum value: {status_update.status.value}")
-                
-                # Check allowed transitions for current status
-                allowed_transitions = PackageStateService.ALLOWED_TRANSITIONS.get(current_package.status, [])
-                print(f"🔄 DEBUG: Allowed transitions for {current_package.status.value}: {[t.value for t in allowed_transitions]}")
-                
-                is_allowed = PackageStateService.is_transition_allowed(current_package.status, status_update.status)
-                print(f"🔄 DEBUG: Is transition allowed? {is_allowed}")
-            else:
-                print(f"🔄 DEBUG: Package {package_id_int} not found!")
+                current_package = db.query(Package).filter(Package.id == package_id_int).first()
+                if current_package:
+                    allowed_transitions = PackageStateService.ALLOWED_TRANSITIONS.get(current_package.status, [])
+                    logger.debug(
+                        "Transición de paquete %s: %s -> %s (permitidas: %s, permitida: %s)",
+                        package_id_int, current_package.status.value, status_update.status.value,
+                        [t.value for t in allowed_transitions],
+                        PackageStateService.is_transition_allowed(current_package.status, status_update.status)
+                    )
+                else:
+                    logger.debug("Paquete %s no encontrado", package_id_int)
             
             db_package = package_service.update_package_status(
                 db=db,
@@ -645,6 +424,8 @@ async def update_package_status(
                 'is_announcement': False
             }
 
+    except PackageConflictException as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=e.message)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -738,6 +519,10 @@ async def receive_package_from_announcement(
 
         return result
 
+    except HTTPException:
+        raise
+    except PackageConflictException as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=e.message)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
@@ -769,25 +554,12 @@ async def deliver_package_with_payment(
             request=request
         )
 
-        # INVALIDAR CACHÉ después de entregar paquete
-        try:
-            from app.cache_manager import cache_manager
-            # Obtener customer_id del paquete para invalidar su caché también
-            package = db.query(Package).filter(Package.id == package_id).first()
-            cache_manager.invalidate_package_cache(
-                package_id=str(package_id),
-                customer_id=str(package.customer_id) if package and package.customer_id else None
-            )
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.info(f"✅ Caché invalidado para paquete {package_id} después de entrega")
-        except Exception as cache_error:
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.warning(f"⚠️ Error invalidando caché: {str(cache_error)}")
-
         return result
 
+    except HTTPException:
+        raise
+    except PackageConflictException as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=e.message)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
@@ -819,7 +591,6 @@ async def cancel_package_with_reason(
             
             # Cancel the announcement instead of a package
             from sqlalchemy import text
-            from app.utils.datetime_utils import get_colombia_now
             from app.models.announcement_new import PackageAnnouncementNew
             
             # Find the announcement (must not be processed, but can be cancelled)
@@ -851,12 +622,8 @@ async def cancel_package_with_reason(
             try:
                 from app.cache_manager import cache_manager
                 cache_manager.invalidate_package_cache()
-                import logging
-                logger = logging.getLogger(__name__)
                 logger.info(f"✅ Caché invalidado después de cancelar anuncio {announcement.tracking_code}")
             except Exception as cache_error:
-                import logging
-                logger = logging.getLogger(__name__)
                 logger.warning(f"⚠️ Error invalidando caché: {str(cache_error)}")
             
             # Return a response compatible with PackageCancelResponse
@@ -885,25 +652,12 @@ async def cancel_package_with_reason(
             request=request
         )
 
-        # INVALIDAR CACHÉ después de cancelar paquete
-        try:
-            from app.cache_manager import cache_manager
-            # Obtener customer_id del paquete para invalidar su caché también
-            package = db.query(Package).filter(Package.id == package_id_int).first()
-            cache_manager.invalidate_package_cache(
-                package_id=str(package_id_int),
-                customer_id=str(package.customer_id) if package and package.customer_id else None
-            )
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.info(f"✅ Caché invalidado para paquete {package_id_int} después de cancelación")
-        except Exception as cache_error:
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.warning(f"⚠️ Error invalidando caché: {str(cache_error)}")
-
         return result
 
+    except HTTPException:
+        raise
+    except PackageConflictException as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=e.message)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
@@ -1037,7 +791,7 @@ async def receive_package_with_images(
         # Procesar imágenes si existen (método tradicional)
         uploaded_images = []
         if images and len(images) > 0:
-            s3_service = S3Service()
+            s3_service = get_s3_service()
 
             for i, image_file in enumerate(images[:3]):  # Máximo 3 imágenes
                 if not image_file.filename:
@@ -1081,10 +835,10 @@ async def receive_package_with_images(
                 try:
                     s3_url = s3_service.upload_file(image_content, s3_key, content_type)
                     s3_key_final = s3_key  # Solo asignar si upload fue exitoso
-                    print(f"✅ Imagen {i+1} subida exitosamente a S3: {s3_url}")
-                    print(f"   📊 Formato: {content_type} | Extensión: {file_extension}")
+                    logger.info(f"✅ Imagen {i+1} subida exitosamente a S3: {s3_url}")
+                    logger.debug("   📊 Formato: %s | Extensión: %s", content_type, file_extension)
                 except Exception as s3_error:
-                    print(f"❌ Error subiendo imagen {i+1} a S3: {str(s3_error)}")
+                    logger.error(f"❌ Error subiendo imagen {i+1} a S3: {str(s3_error)}")
                     # No guardar en base de datos si S3 falla
                     continue
 
@@ -1107,21 +861,21 @@ async def receive_package_with_images(
                             "s3_key": s3_key_final,
                             "s3_url": s3_url
                         })
-                        print(f"✅ Archivo {image_file.filename} guardado en base de datos")
+                        logger.info(f"✅ Archivo {image_file.filename} guardado en base de datos")
                     except Exception as db_error:
-                        print(f"❌ Error guardando archivo en base de datos: {str(db_error)}")
+                        logger.error(f"❌ Error guardando archivo en base de datos: {str(db_error)}")
                         # Continuar con el siguiente archivo
                         continue
 
             # Hacer commit de las imágenes después de agregarlas a la sesión
             if uploaded_images:
                 db.commit()
-                print(f"✅ {len(uploaded_images)} imágenes guardadas en BD")
+                logger.info(f"✅ {len(uploaded_images)} imágenes guardadas en BD")
 
         # NUEVO: Registrar imágenes que ya están en S3 (flujo frontend actual)
         if not uploaded_images:  # Solo si no se procesaron imágenes por el método tradicional
             try:
-                s3_service = S3Service()
+                s3_service = get_s3_service()
                 from datetime import datetime
                 
                 # Generar la ruta base donde deberían estar las imágenes
@@ -1131,7 +885,7 @@ async def receive_package_with_images(
                 day = now.day
                 s3_base_path = f"{year}/{month:02d}/{day:02d}/packages/announcement_{tracking_code}/receive/"
                 
-                print(f"🔍 Buscando imágenes en S3: {s3_base_path}")
+                logger.debug("🔍 Buscando imágenes en S3: %s", s3_base_path)
                 
                 # Listar objetos en S3 que coincidan con el patrón
                 response = s3_service.s3_client.list_objects_v2(
@@ -1151,7 +905,7 @@ async def receive_package_with_images(
                                 'last_modified': obj['LastModified']
                             })
                     
-                    print(f"📷 Encontradas {len(s3_images)} imágenes en S3")
+                    logger.debug("📷 Encontradas %s imágenes en S3", len(s3_images))
                     
                     # Registrar cada imagen en la base de datos
                     for s3_img in s3_images:
@@ -1188,21 +942,21 @@ async def receive_package_with_images(
                                 "s3_url": s3_url
                             })
                             
-                            print(f"✅ Imagen registrada en BD: {filename}")
+                            logger.info(f"✅ Imagen registrada en BD: {filename}")
                             
                         except Exception as img_error:
-                            print(f"❌ Error registrando imagen {s3_img['key']}: {str(img_error)}")
+                            logger.error(f"❌ Error registrando imagen {s3_img['key']}: {str(img_error)}")
                             continue
                     
                     # Commit de las imágenes registradas
                     if uploaded_images:
                         db.commit()
-                        print(f"✅ {len(uploaded_images)} imágenes de S3 registradas en BD")
+                        logger.info(f"✅ {len(uploaded_images)} imágenes de S3 registradas en BD")
                 else:
-                    print("📷 No se encontraron imágenes en S3")
+                    logger.debug("📷 No se encontraron imágenes en S3")
                     
             except Exception as s3_error:
-                print(f"⚠️  Error buscando imágenes en S3: {str(s3_error)}")
+                logger.warning(f"⚠️  Error buscando imágenes en S3: {str(s3_error)}")
                 # No fallar el proceso por esto
 
         # El anuncio ya fue marcado como procesado por PackageStateService
@@ -1215,9 +969,9 @@ async def receive_package_with_images(
                 package_id=str(db_package.id),
                 customer_id=str(db_package.customer_id) if db_package.customer_id else None
             )
-            print(f"✅ Caché invalidado para paquete {db_package.id} después de recepción")
+            logger.debug("✅ Caché invalidado para paquete %s después de recepción", db_package.id)
         except Exception as cache_error:
-            print(f"⚠️ Error invalidando caché: {str(cache_error)}")
+            logger.warning(f"⚠️ Error invalidando caché: {str(cache_error)}")
 
         return {
             "success": True,
@@ -1240,11 +994,11 @@ async def receive_package_with_images(
 
     except HTTPException:
         raise
+    except PackageConflictException as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=e.message)
     except Exception as e:
         db.rollback()
-        print(f"Error en recepción de paquete: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.error(f"Error en recepción de paquete: {str(e)}", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error al recibir paquete: {str(e)}"
@@ -1322,19 +1076,29 @@ async def recalculate_package_fees(
 
 @router.post("/fix-all-fees")
 async def fix_all_packages_fees(
+    background: bool = Query(False, description="Encolar el recálculo en Celery"),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """Corregir tarifas de todos los paquetes que tengan valores incorrectos"""
+    # Verificar permisos (solo admin)
+    if current_user.role.value != "ADMIN":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Solo los administradores pueden corregir tarifas"
+        )
+
     try:
-        # Verificar permisos (solo admin)
-        if current_user.role.value != "ADMIN":
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Solo los administradores pueden corregir tarifas"
-            )
+        if background:
+            from app.tasks import recalculate_package_fees as recalculate_task
+            task = recalculate_task.delay()
+            return {
+                "message": "Recálculo de tarifas encolado",
+                "task_id": task.id,
+                "status": "queued"
+            }
 
-        # Corregir todas las tarifas
+        # Corregir todas las tarifas (UPDATE por lotes en la base de datos)
         package_service = PackageService()
         fixed_count = package_service.fix_all_packages_fees(db=db)
 
@@ -1351,42 +1115,49 @@ async def fix_all_packages_fees(
         )
 
 
-@router.get("/rates/dynamic")
-async def get_dynamic_rates():
-    """Obtener tarifas dinámicas desde .env"""
-    try:
-        from app.config import settings
-        
-        rates = {
-            "normal": int(settings.base_delivery_rate_normal),
-            "extra_dimensioned": int(settings.base_delivery_rate_extra_dimensioned),
-            "storage_per_day": int(settings.base_storage_rate),
-            "currency": settings.currency
-        }
-        
-        return {
-            "success": True,
-            "rates": rates,
-            "message": "Tarifas obtenidas dinámicamente desde .env"
-        }
-
-    except Exception as e:
+@router.get("/fix-all-fees/jobs/{task_id}")
+async def get_fix_all_fees_job_status(
+    task_id: str,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Consultar el progreso de un recálculo de tarifas en segundo plano"""
+    if current_user.role.value != "ADMIN":
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error al obtener tarifas dinámicas: {str(e)}"
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Solo los administradores pueden consultar el recálculo de tarifas"
         )
 
+    from app.celery_app import celery_app
+    task = celery_app.AsyncResult(task_id)
+    response = {"task_id": task_id, "status": task.status}
+    if task.status == "PROGRESS":
+        response["progress"] = task.info
+    elif task.successful():
+        response["result"] = task.result
+    elif task.failed():
+        response["error"] = str(task.result)
+    return response
+
+
+@router.get("/rates/dynamic")
+async def get_dynamic_rates():
+    """Obtener tarifas vigentes (instantánea en memoria del proveedor de tarifas)"""
+    snapshot = get_rates()
+    return {
+        "success": True,
+        "rates": snapshot.as_public_dict(),
+        "source": snapshot.source,
+        "version": snapshot.version,
+        "message": "Tarifas obtenidas del proveedor de tarifas"
+    }
+
 
 @router.post("/calculate-dynamic-fee")
-async def calculate_dynamic_fee(
-    request: dict,
-    db: Session = Depends(get_db)
-):
-    """Calcular tarifa dinámicamente desde CODE/LOCAL/.env"""
+async def calculate_dynamic_fee(request: dict):
+    """Calcular tarifa con las tarifas vigentes en memoria"""
     try:
         from app.utils.dynamic_fee_calculator import DynamicFeeCalculator
         from app.models.package import PackageType
-        from app.utils.normalization import normalize_type
         
         # Extraer parámetros del request
         raw_package_type = request.get('package_type', 'NORMAL')
@@ -1414,9 +1185,11 @@ async def calculate_dynamic_fee(
         return {
             "success": True,
             "calculation": fee_calculation,
-            "message": "Tarifa calculada dinámicamente desde CODE/LOCAL/.env"
+            "message": "Tarifa calculada con las tarifas vigentes"
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1494,6 +1267,28 @@ async def delete_package_by_id(
         )
 
 
+@router.post("/bulk-delete")
+async def bulk_delete_packages(
+    package_ids: List[int] = Body(..., embed=True, min_length=1),
+    current_user: User = Depends(get_current_active_user_from_cookies)
+):
+    """Encolar la eliminación masiva de paquetes y sus referencias (solo ADMIN)"""
+    if current_user.role.value != "ADMIN":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Solo los administradores pueden eliminar paquetes"
+        )
+
+    from app.tasks import bulk_delete_packages as bulk_delete_task
+    task = bulk_delete_task.delay(package_ids)
+
+    return {
+        "success": True,
+        "message": f"Eliminación de {len(package_ids)} paquete(s) encolada",
+        "task_id": task.id
+    }
+
+
 @router.get("/with-email")
 async def list_packages_with_email(
     db: Session = Depends(get_db),
@@ -1682,7 +1477,7 @@ async def send_package_email_notification(
         }
         
         # Enviar email usando EmailService
-        email_service = EmailService()
+        email_service = get_email_service()
         
         result = await email_service.send_email_by_event(
             db=db,
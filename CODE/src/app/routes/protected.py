@@ -4,7 +4,7 @@
 
 from fastapi import APIRouter, Request, HTTPException, Depends, status
 from fastapi.responses import RedirectResponse, JSONResponse
-from fastapi.templating import Jinja2Templates
+from app.utils.template_loader import get_templates
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, desc, or_, cast, String
 from datetime import datetime
@@ -22,12 +22,17 @@ from app.dependencies import get_current_active_user, get_current_active_user_fr
 from app.utils.auth import get_password_hash, verify_password
 from app.utils.datetime_utils import get_colombia_now
 from app.services.package_state_service import PackageStateService
+from app.services.code_generator import CodeGenerator
+from app.utils.exceptions import PackageConflictException
 from app.models.customer import Customer
 from app.services.customer_service import CustomerService
 from app.schemas.customer import CustomerCreate, CustomerUpdate
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
-templates = Jinja2Templates(directory="/app/src/templates", auto_reload=True)
+templates = get_templates()
 
 # ========================================
 # RUTAS PROTEGIDAS - REQUIEREN AUTENTICACIÓN
@@ -118,8 +123,6 @@ async def save_settings(
         raise
     except Exception as e:
         db.rollback()
-        import logging
-        logger = logging.getLogger(__name__)
         logger.error(f"Error al guardar configuración: {e}", exc_info=True)
         
         context = get_auth_context_from_request(request)
@@ -223,8 +226,6 @@ async def package_detail_page(package_id: str, request: Request, db: Session = D
     except HTTPException:
         raise
     except Exception as e:
-        import logging
-        logger = logging.getLogger(__name__)
         logger.error(f"Error al cargar paquete {package_id}: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -255,8 +256,6 @@ async def announcement_detail_page(announcement_id: str, request: Request, db: S
     except HTTPException:
         raise
     except Exception as e:
-        import logging
-        logger = logging.getLogger(__name__)
         logger.error(f"Error al cargar anuncio {announcement_id}: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -314,9 +313,7 @@ async def announcement_detail_by_guide_page(guide_number: str, request: Request,
             # Anuncio no encontrado - crear anuncio en la base de datos
             try:
                 # Generar código de tracking único
-                import secrets
-                import string
-                tracking_code = ''.join(secrets.choice(string.ascii_uppercase + string.digits) for _ in range(4))
+                tracking_code = CodeGenerator.claim_tracking_code(db)
 
                 # Crear anuncio en la base de datos
                 new_announcement = PackageStateService.create_announcement(
@@ -343,7 +340,7 @@ async def announcement_detail_by_guide_page(guide_number: str, request: Request,
                 }
             except Exception as create_error:
                 # Si falla la creación, usar datos por defecto sin guardar en BD
-                print(f"Error creando anuncio: {create_error}")
+                logger.error(f"Error creando anuncio: {create_error}")
                 announcement_data = {
                     "id": f"test-{guide_number}",
                     "customer_name": "CLIENTE PRUEBA",
@@ -912,8 +909,6 @@ async def delete_user(
         )
     except Exception as e:
         db.rollback()
-        import logging
-        logger = logging.getLogger(__name__)
         logger.error(f"Error al eliminar usuario: {e}", exc_info=True)
         
         return JSONResponse(
@@ -1323,8 +1318,6 @@ async def change_current_user_password(
         raise
     except Exception as e:
         db.rollback()
-        import logging
-        logger = logging.getLogger(__name__)
         logger.error(f"Error al cambiar contraseña: {e}", exc_info=True)
         
         return JSONResponse(
@@ -1349,8 +1342,8 @@ async def create_package_from_announcement_simple(announcement_id: str, request:
         package_condition = body.get("package_condition", "ok")
         observations = body.get("observations", "")
 
-        print(f"🔧 DEBUG: Endpoint called with announcement_id={announcement_id}")
-        print(f"🔧 DEBUG: Request body: {body}")
+        logger.debug("🔧 DEBUG: Endpoint called with announcement_id=%s", announcement_id)
+        logger.debug("🔧 DEBUG: Request body: %s", body)
 
         from app.models.package import PackageType, PackageCondition
 
@@ -1361,18 +1354,18 @@ async def create_package_from_announcement_simple(announcement_id: str, request:
             announcement = db.query(Package).filter(Package.id == announcement_uuid).first()
             if announcement:
                 guide_number = announcement.guide_number
-                print(f"🔧 DEBUG: Found announcement by UUID: {guide_number}")
+                logger.debug("🔧 DEBUG: Found announcement by UUID: %s", guide_number)
             else:
                 raise ValueError(f"No se encontró anuncio con ID: {announcement_id}")
         except (ValueError, TypeError):
             # Si no es un UUID válido, tratarlo como guide_number
             guide_number = announcement_id
-            print(f"🔧 DEBUG: Treating as guide_number: {guide_number}")
+            logger.debug("🔧 DEBUG: Treating as guide_number: %s", guide_number)
 
         try:
             package_type_enum = PackageType(package_type)
             package_condition_enum = PackageCondition(package_condition)
-            print(f"🔧 DEBUG: Enums converted successfully: {package_type_enum}, {package_condition_enum}")
+            logger.debug("🔧 DEBUG: Enums converted successfully: %s, %s", package_type_enum, package_condition_enum)
         except Exception as enum_error:
             raise ValueError(f"Valor inválido para enum: {enum_error}")
 
@@ -1382,7 +1375,7 @@ async def create_package_from_announcement_simple(announcement_id: str, request:
             operator_name = current_user.username or current_user.first_name or f"Usuario {current_user.id}"
 
         # Usar el servicio de estados para procesar el cambio
-        print(f"🔧 DEBUG: Calling PackageStateService.process_announcement_to_received")
+        logger.debug("🔧 DEBUG: Calling PackageStateService.process_announcement_to_received")
         result = PackageStateService.process_announcement_to_received(
             db=db,
             guide_number=guide_number,
@@ -1392,23 +1385,30 @@ async def create_package_from_announcement_simple(announcement_id: str, request:
             changed_by=operator_name  # Usar nombre real del usuario
         )
 
-        print(f"🔧 DEBUG: Service returned: {result}")
+        logger.debug("🔧 DEBUG: Service returned: %s", result)
         return result
 
     except ValueError as e:
         # Error de validación (paquete no encontrado, transición no permitida, etc.)
-        print(f"❌ DEBUG: ValueError: {str(e)}")
+        logger.warning(f"❌ ValueError: {str(e)}")
         return {
             "success": False,
             "message": str(e),
             "package_id": None,
             "status": "ERROR_VALIDACION"
         }
+    except PackageConflictException as e:
+        # Otro operador recibió la misma guía al mismo tiempo
+        logger.warning(f"❌ Conflicto: {e.message}")
+        return {
+            "success": False,
+            "message": e.message,
+            "package_id": None,
+            "status": "CONFLICTO"
+        }
     except Exception as e:
         db.rollback()
-        print(f"❌ DEBUG: Exception: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.error(f"❌ Exception: {str(e)}", exc_info=True)
         return {
             "success": False,
             "message": f"Error al procesar el anuncio: {str(e)}",
@@ -1452,14 +1452,14 @@ async def get_package_history(tracking_number: str, db: Session = Depends(get_db
 async def update_package_status_disabled(package_id: str, request: Request, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user_from_cookies)):
     """Actualizar el estado de un paquete"""
     try:
-        print(f"🔄 DEBUG: update_package_status called with package_id={package_id}")
+        logger.debug("🔄 DEBUG: update_package_status called with package_id=%s", package_id)
 
         # Obtener datos del request
         body = await request.json()
         new_status = body.get("status")
 
-        print(f"🔄 DEBUG: Request body: {body}")
-        print(f"🔄 DEBUG: New status: {new_status}")
+        logger.debug("🔄 DEBUG: Request body: %s", body)
+        logger.debug("🔄 DEBUG: New status: %s", new_status)
 
         if not new_status:
             raise HTTPException(
@@ -1494,12 +1494,12 @@ async def update_package_status_disabled(package_id: str, request: Request, db:
                 detail=f"Estado inválido: {new_status}. Estados válidos: {[s.value for s in PackageStatus]}"
             )
 
-        print(f"🔄 DEBUG: Current package status: {package.status}")
-        print(f"🔄 DEBUG: New status enum: {status_enum}")
-        print(f"🔄 DEBUG: Transition: {package.status.value} -> {status_enum.value}")
+        logger.debug("🔄 DEBUG: Current package status: %s", package.status)
+        logger.debug("🔄 DEBUG: New status enum: %s", status_enum)
+        logger.debug("🔄 DEBUG: Transition: %s -> %s", package.status.value, status_enum.value)
 
         # Actualizar el estado usando el servicio
-        history_entry = PackageStateService.update_package_status(
+        history_entry = PackageStateService.apply_status_change(
             db=db,
             package=package,
             new_status=status_enum,
@@ -1527,9 +1527,10 @@ async def update_package_status_disabled(package_id: str, request: Request, db:
 async def get_packages(db: Session = Depends(get_db)):
     """Obtener todos los paquetes de la base de datos"""
     try:
-        from sqlalchemy.orm import joinedload
-        
-        packages = db.query(Package).options(joinedload(Package.customer)).all()
+        from app.services.package_read_model import PackageReadModel
+
+        # Solo las columnas del resumen, sin entidades del ORM
+        packages = PackageReadModel.package_summaries(db)
         return {
             "success": True,
             "count": len(packages),
@@ -1537,8 +1538,8 @@ async def get_packages(db: Session = Depends(get_db)):
                 {
                     "id": str(pkg.id),
                     "tracking_number": pkg.tracking_number,
-                    "customer_name": pkg.customer.full_name if pkg.customer else "Sin cliente",
-                    "customer_phone": pkg.customer.phone if pkg.customer else "Sin teléfono",
+                    "customer_name": pkg.customer_name or "Sin cliente",
+                    "customer_phone": pkg.customer_phone or "Sin teléfono",
                     "status": pkg.status.value if pkg.status else None,
                     "package_type": pkg.package_type.value if pkg.package_type else None,
                     "package_condition": pkg.package_condition.value if pkg.package_condition else None,
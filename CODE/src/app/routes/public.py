@@ -19,13 +19,17 @@ from app.models.package import Package, PackageStatus
 from app.models.customer import Customer
 from app.models.package_history import PackageHistory
 from app.models.message import Message, MessageType, MessageStatus, MessagePriority
+from app.models.package_archive import ArchivedFileUpload, ArchivedPackage, ArchivedPackageHistory
 from app.services.package_state_service import PackageStateService
+from app.services.package_archive_service import PackageArchiveService
+from app.services.code_generator import CodeGenerator
 from app.utils.normalization import normalize_history_event, normalize_package_item, normalize_status
-from app.services.s3_service import S3Service
+from app.services.registry import get_s3_service
 from app.utils.datetime_utils import get_colombia_now
 from app.schemas.message import CustomerInquiryCreate
 from sqlalchemy.orm import joinedload
 from app.config import settings
+from app.logging_config import log_sampled
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -202,7 +206,7 @@ async def messages_page(
 
     except Exception as e:
         # En caso de error, mostrar datos vacíos
-        print(f"Error al cargar mensajes: {str(e)}")
+        logger.error(f"Error al cargar mensajes: {str(e)}")
         context["messages"] = []
         context["total_messages"] = 0
         context["message_stats"] = {
@@ -430,13 +434,6 @@ async def create_announcement_direct(request: Request, db: Session = Depends(get
                 content={"detail": "El número de guía es requerido"}
             )
 
-        # Generar código de tracking único
-        # Excluye el número 0 y la letra O para evitar confusión
-        import string
-        import random
-        allowed_chars = string.ascii_uppercase.replace('O', '') + string.digits.replace('0', '')
-        tracking_code = ''.join(random.choice(allowed_chars) for _ in range(4))
-
         # Verificar si ya existe un anuncio con este número de guía
         existing_announcement = db.query(PackageAnnouncementNew).filter(
             PackageAnnouncementNew.guide_number == guide_number
@@ -464,7 +461,7 @@ async def create_announcement_direct(request: Request, db: Session = Depends(get
             if existing_customer:
                 # Cliente ya existe, usar su ID
                 customer_id = existing_customer.id
-                print(f"✅ Cliente existente encontrado: {existing_customer.id} - {existing_customer.full_name}")
+                logger.info(f"✅ Cliente existente encontrado: {existing_customer.id} - {existing_customer.full_name}")
             else:
                 # Cliente nuevo, crear con datos mínimos (nombre + teléfono)
                 # Separar nombre y apellido del customer_name con valores por defecto válidos
@@ -489,15 +486,16 @@ async def create_announcement_direct(request: Request, db: Session = Depends(get
                 
                 new_customer = customer_service.create_customer(db, customer_data)
                 customer_id = new_customer.id
-                print(f"✅ Cliente nuevo creado: {new_customer.id} - {new_customer.full_name}")
+                logger.info(f"✅ Cliente nuevo creado: {new_customer.id} - {new_customer.full_name}")
                 
         except Exception as customer_error:
             # Si falla la creación del cliente, continuar sin romper el anuncio
-            print(f"⚠️ Error gestionando cliente: {customer_error}")
-            import traceback
-            traceback.print_exc()
+            logger.warning(f"⚠️ Error gestionando cliente: {customer_error}", exc_info=True)
             # customer_id quedará None, pero el anuncio se creará igual
 
+        # Código de tracking único (pool de CodeGenerator)
+        tracking_code = CodeGenerator.claim_tracking_code(db)
+
         announcement = PackageAnnouncementNew(
             id=uuid.uuid4(),
             customer_name=customer_name,
@@ -518,11 +516,11 @@ async def create_announcement_direct(request: Request, db: Session = Depends(get
 
         # Enviar SMS de confirmación automáticamente
         try:
-            from app.services.sms_service import SMSService
+            from app.services.registry import get_sms_service
             from app.models.notification import NotificationEvent, NotificationPriority
             from app.schemas.notification import SMSByEventRequest
 
-            sms_service = SMSService()
+            sms_service = get_sms_service()
             event_request = SMSByEventRequest(
                 event_type=NotificationEvent.PACKAGE_ANNOUNCED,
                 announcement_id=announcement.id,
@@ -534,10 +532,10 @@ async def create_announcement_direct(request: Request, db: Session = Depends(get
                 priority=NotificationPriority.ALTA,
                 is_test=False
             )
-            await sms_service.send_sms_by_event(db=db, event_request=event_request)
+            await sms_service.send_sms_by_event(db=db, event_request=event_request, announcement=announcement)
         except Exception as sms_error:
             # Log error but don't fail the announcement creation
-            print(f"Error sending SMS confirmation for announcement {announcement.id}: {str(sms_error)}")
+            logger.error(f"Error sending SMS confirmation for announcement {announcement.id}: {str(sms_error)}")
             # Continue with success response
 
         # Enviar EMAIL de confirmación automáticamente
@@ -549,10 +547,10 @@ async def create_announcement_direct(request: Request, db: Session = Depends(get
                 customer = None
 
             if customer and getattr(customer, "email", None):
-                from app.services.email_service import EmailService
+                from app.services.registry import get_email_service
                 from app.models.notification import NotificationEvent
 
-                email_service = EmailService()
+                email_service = get_email_service()
 
                 full_name = customer.full_name or announcement.customer_name
                 first_name = full_name.split(" ")[0]
@@ -579,7 +577,7 @@ async def create_announcement_direct(request: Request, db: Session = Depends(get
                 )
         except Exception as email_error:
             # Log error but don't bloquear el flujo de anuncio
-            print(f"Error sending EMAIL confirmation for announcement {announcement.id}: {str(email_error)}")
+            logger.error(f"Error sending EMAIL confirmation for announcement {announcement.id}: {str(email_error)}")
 
         return {
             "success": True,
@@ -597,10 +595,8 @@ async def create_announcement_direct(request: Request, db: Session = Depends(get
 
     except Exception as e:
         db.rollback()
-        import traceback
         error_detail = str(e)
-        print(f"Error al crear anuncio: {error_detail}")
-        traceback.print_exc()
+        logger.error(f"Error al crear anuncio: {error_detail}", exc_info=True)
 
         return JSONResponse(
             status_code=500,
@@ -735,6 +731,9 @@ async def search_package_endpoint(
                 Package.access_code == query.strip()  # Agregar búsqueda por access_code
             )
         ).all()
+        if not packages:
+            # Paquetes entregados/cancelados antiguos ya movidos al archivo
+            packages = PackageArchiveService.find_archived_packages(db, query.strip())
 
         for package in packages:
             try:
@@ -747,7 +746,7 @@ async def search_package_endpoint(
                 # Si no, mostrar el tracking_number
                 tracking_code_display = package.access_code if package.access_code == query.strip() else package.tracking_number
 
-                print(f"✅ Paquete encontrado: ID={package.id}, access_code={package.access_code}, tracking_number={package.tracking_number}, guide_number={package.guide_number}")
+                logger.debug("✅ Paquete encontrado: ID=%s, tracking_number=%s, guide_number=%s", package.id, package.tracking_number, package.guide_number)
 
                 results.append({
                     "type": "package",
@@ -761,9 +760,7 @@ async def search_package_endpoint(
                     "is_processed": True
                 })
             except Exception as pkg_error:
-                print(f"❌ Error procesando paquete {package.id}: {str(pkg_error)}")
-                import traceback
-                traceback.print_exc()
+                logger.error(f"❌ Error procesando paquete {package.id}: {str(pkg_error)}", exc_info=True)
                 continue  # Saltar este paquete y continuar con el siguiente
 
         if len(results) == 0:
@@ -784,8 +781,8 @@ async def search_package_endpoint(
         except Exception:
             pass
         
-        print(f"🔍 Resultado encontrado: {first_result['type']} - {first_result.get('guide_number', 'N/A')}")
-        print(f"📦 ID del resultado: {first_result.get('id', 'N/A')}")
+        logger.debug("🔍 Resultado encontrado: %s - %s", first_result['type'], first_result.get('guide_number', 'N/A'))
+        logger.debug("📦 ID del resultado: %s", first_result.get('id', 'N/A'))
 
         # Determinar si mostrar formulario de consulta (valores por defecto seguros)
         should_show_inquiry_form = query_type.get("type") == "tracking_code"
@@ -843,12 +840,20 @@ async def search_package_endpoint(
                 if not package:
                     package = db.query(Package).filter(Package.tracking_number == announcement.tracking_code).first()
 
+                # 4) Paquete archivado (mismo id o número de tracking)
+                if not package:
+                    package = PackageArchiveService.find_archived_package(
+                        db, announcement.package_id, (announcement.guide_number, announcement.tracking_code)
+                    )
+
                 if package:
+                    archived = isinstance(package, ArchivedPackage)
+                    history_model = ArchivedPackageHistory if archived else PackageHistory
                     # Obtener el historial del paquete
                     # Obtener historial del paquete usando Integer directamente
-                    package_history = db.query(PackageHistory).filter(
-                        PackageHistory.package_id == package.id
-                    ).order_by(PackageHistory.changed_at.asc()).all()
+                    package_history = db.query(history_model).filter(
+                        history_model.package_id == package.id
+                    ).order_by(history_model.changed_at.asc()).all()
 
                     # Convertir el historial del paquete al formato esperado por el frontend
                     for hist_entry in package_history:
@@ -885,56 +890,55 @@ async def search_package_endpoint(
                             # Agregar información de imágenes si existen
                             if package:
                                 from app.models.file_upload import FileUpload
-                                from app.services.s3_service import S3Service
+                                from app.services.registry import get_s3_service
                                 from app.models.file_upload import FileType
                                 from sqlalchemy import or_
                                 
+                                upload_model = ArchivedFileUpload if archived else FileUpload
+
                                 # Buscar imágenes de recepción específicamente
                                 # Buscar por múltiples criterios para mayor compatibilidad
-                                images = db.query(FileUpload).filter(
+                                images = db.query(upload_model).filter(
                                     or_(
                                         # Búsqueda principal: por package_id
-                                        FileUpload.package_id == package.id,
+                                        upload_model.package_id == package.id,
                                         # Búsqueda alternativa: por tracking_code en s3_key (para imágenes existentes)
-                                        FileUpload.s3_key.like(f"%{announcement.tracking_code}%"),
+                                        upload_model.s3_key.like(f"%{announcement.tracking_code}%"),
                                         # Búsqueda adicional: por guide_number en s3_key
-                                        FileUpload.s3_key.like(f"%{announcement.guide_number}%")
+                                        upload_model.s3_key.like(f"%{announcement.guide_number}%")
                                     ),
-                                    FileUpload.file_type == FileType.IMAGEN,  # Usar IMAGEN en lugar de RECEPTION_IMAGE
+                                    upload_model.file_type == FileType.IMAGEN,  # Usar IMAGEN en lugar de RECEPTION_IMAGE
                                     # Filtrar solo archivos de imagen (no metadata.json)
                                     or_(
-                                        FileUpload.filename.like('%.jpg'),
-                                        FileUpload.filename.like('%.jpeg'),
-                                        FileUpload.filename.like('%.png'),
-                                        FileUpload.filename.like('%.webp')
+                                        upload_model.filename.like('%.jpg'),
+                                        upload_model.filename.like('%.jpeg'),
+                                        upload_model.filename.like('%.png'),
+                                        upload_model.filename.like('%.webp')
                                     )
                                 ).all()
 
-                                print(f"🔍 Buscando imágenes para paquete {package.id}: {len(images)} encontradas")
-                                print(f"🔍 Criterios de búsqueda:")
-                                print(f"   - package_id: {package.id}")
-                                print(f"   - tracking_code: {announcement.tracking_code}")
-                                print(f"   - guide_number: {announcement.guide_number}")
-                                
-                                # Debug: mostrar todas las imágenes encontradas
-                                for img in images:
-                                    print(f"   📷 Imagen encontrada: {img.filename} | s3_key: {img.s3_key}")
+                                log_sampled(
+                                    logger, logging.DEBUG, "public.search.images",
+                                    "🔍 Imágenes para paquete %s: %s encontradas (tracking_code=%s, guide_number=%s)",
+                                    package.id, len(images), announcement.tracking_code, announcement.guide_number
+                                )
 
                                 if images:
                                     details["has_images"] = True
                                     details["images_count"] = len(images)
                                     details["images"] = []
                                     try:
-                                        s3_service = S3Service()
+                                        s3_service = get_s3_service()
                                         for img in images:
                                             if img.s3_key:
                                                 try:
-                                                    print(f"🖼️ Procesando imagen: {img.filename}")
-                                                    print(f"🔑 S3 Key: {img.s3_key}")
+                                                    log_sampled(
+                                                        logger, logging.DEBUG, "public.search.image",
+                                                        "🖼️ Procesando imagen %s: %s (s3_key=%s)", img.id, img.filename, img.s3_key
+                                                    )
                                                     
                                                     # OPCIÓN 1 SIMPLIFICADA: Usar endpoint de fallback directo
                                                     filename = img.filename
-                                                    print(f"🔍 Procesando imagen: {filename}")
                                                     
                                                     # Construir s3_key basado en el filename
                                                     if filename and '_' in filename:
@@ -955,8 +959,6 @@ async def search_package_endpoint(
                                                     
                                                     # OPCIÓN 1: Usar endpoint de imágenes mejorado con retry logic
                                                     secure_url = f"/api/images/{img.id}"
-                                                    print(f"✅ URL segura generada (Opción 1): {secure_url}")
-                                                    print(f"🔍 Imagen ID: {img.id}, Filename: {img.filename}")
                                                     
                                                     details["images"].append({
                                                         "id": str(img.id),
@@ -967,7 +969,7 @@ async def search_package_endpoint(
                                                     })
                                                     
                                                 except Exception as url_error:
-                                                    print(f"❌ Error generando URL presignada para {img.filename}: {str(url_error)}")
+                                                    logger.error(f"❌ Error generando URL presignada para {img.filename}: {str(url_error)}")
                                                     # Incluir imagen sin URL para debugging
                                                     details["images"].append({
                                                         "id": str(img.id),
@@ -978,7 +980,7 @@ async def search_package_endpoint(
                                                         "uploaded_at": img.created_at.isoformat() if img.created_at else None
                                                     })
                                             else:
-                                                print(f"⚠️ Imagen sin s3_key: {img.filename}")
+                                                logger.warning(f"⚠️ Imagen sin s3_key: {img.filename}")
                                                 details["images"].append({
                                                     "id": str(img.id),
                                                     "filename": img.filename,
@@ -988,7 +990,7 @@ async def search_package_endpoint(
                                                     "uploaded_at": img.created_at.isoformat() if img.created_at else None
                                                 })
                                     except Exception as s3_error:
-                                        print(f"❌ Error general procesando imágenes: {str(s3_error)}")
+                                        logger.error(f"❌ Error general procesando imágenes: {str(s3_error)}")
                                         # Fallback: include images without URLs
                                         details["images"] = [
                                             {
@@ -1001,7 +1003,7 @@ async def search_package_endpoint(
                                             for img in images
                                         ]
                                 else:
-                                    print(f"ℹ️ No se encontraron imágenes para el paquete {package.id}")
+                                    logger.debug("ℹ️ No se encontraron imágenes para el paquete %s", package.id)
                                     details["has_images"] = False
                                     details["images_count"] = 0
                         elif hist_entry.new_status == "ENTREGADO":
@@ -1041,9 +1043,7 @@ async def search_package_endpoint(
 
         except Exception as processing_error:
             # Loguear y continuar con respuesta mínima para no romper UX
-            print(f"❌ Error procesando detalles/historial en búsqueda pública: {str(processing_error)}")
-            import traceback
-            traceback.print_exc()
+            logger.error(f"❌ Error procesando detalles/historial en búsqueda pública: {str(processing_error)}", exc_info=True)
             # Mantener defaults: history=[], has_pending_messages=False, should_show_inquiry_form según tipo
 
             # Fallback: si tenemos un anuncio procesado, intentar enriquecer el historial
@@ -1064,7 +1064,7 @@ async def search_package_endpoint(
                         # Asegurar al menos los eventos que faltan según el estado actual
                         history[:] = add_missing_history_events(pkg_fallback, history)
             except Exception as fb_err:
-                print(f"ℹ️ Fallback de historial no aplicado: {str(fb_err)}")
+                logger.debug("ℹ️ Fallback de historial no aplicado: %s", str(fb_err))
 
         if first_result["type"] == "package":
             # Handle package history directly
@@ -1073,8 +1073,14 @@ async def search_package_endpoint(
                 package = db.query(Package).filter(Package.id == int(first_result["id"])).first()
             except Exception:
                 package = db.query(Package).filter(Package.tracking_number == first_result.get("tracking_number") ).first()
+            if not package:
+                package = PackageArchiveService.find_archived_package(
+                    db, int(first_result["id"]), (first_result.get("tracking_code"),)
+                )
 
             if package:
+                archived = isinstance(package, ArchivedPackage)
+                history_model = ArchivedPackageHistory if archived else PackageHistory
                 # Mostrar el evento de anuncio primero
                 history.append(normalize_history_event({
                     "status": "ANUNCIADO",
@@ -1089,9 +1095,9 @@ async def search_package_endpoint(
                 }))
 
                 # Obtener el historial del paquete
-                package_history = db.query(PackageHistory).filter(
-                    PackageHistory.package_id == package.id
-                ).order_by(PackageHistory.changed_at.asc()).all()
+                package_history = db.query(history_model).filter(
+                    history_model.package_id == package.id
+                ).order_by(history_model.changed_at.asc()).all()
 
                 # Convertir el historial del paquete al formato esperado por el frontend
                 for hist_entry in package_history:
@@ -1123,25 +1129,26 @@ async def search_package_endpoint(
 
                         # Agregar información de imágenes si existen
                         from app.models.file_upload import FileUpload
-                        from app.services.s3_service import S3Service
+                        from app.services.registry import get_s3_service
                         from sqlalchemy import or_
                         from app.models.file_upload import FileType
+                        upload_model = ArchivedFileUpload if archived else FileUpload
                         
                         # Buscar imágenes por múltiples criterios para mayor compatibilidad
-                        images = db.query(FileUpload).filter(
+                        images = db.query(upload_model).filter(
                             or_(
                                 # Búsqueda principal: por package_id
-                                FileUpload.package_id == package.id,
+                                upload_model.package_id == package.id,
                                 # Búsqueda alternativa: por tracking_number en s3_key
-                                FileUpload.s3_key.like(f"%{package.tracking_number}%")
+                                upload_model.s3_key.like(f"%{package.tracking_number}%")
                             ),
-                            FileUpload.file_type == FileType.IMAGEN,  # Usar IMAGEN en lugar de RECEPTION_IMAGE
+                            upload_model.file_type == FileType.IMAGEN,  # Usar IMAGEN en lugar de RECEPTION_IMAGE
                             # Filtrar solo archivos de imagen (no metadata.json)
                             or_(
-                                FileUpload.filename.like('%.jpg'),
-                                FileUpload.filename.like('%.jpeg'),
-                                FileUpload.filename.like('%.png'),
-                                FileUpload.filename.like('%.webp')
+                                upload_model.filename.like('%.jpg'),
+                                upload_model.filename.like('%.jpeg'),
+                                upload_model.filename.like('%.png'),
+                                upload_model.filename.like('%.webp')
                             )
                         ).all()
 
@@ -1150,12 +1157,14 @@ async def search_package_endpoint(
                             details["images_count"] = len(images)
                             details["images"] = []
                             try:
-                                s3_service = S3Service()
+                                s3_service = get_s3_service()
                                 for img in images:
                                     # OPCIÓN 1: Usar endpoint interno en lugar de URL directa de S3
                                     secure_url = f"/api/images/{img.id}"
-                                    print(f"✅ URL segura generada (Opción 1): {secure_url}")
-                                    print(f"🔍 Imagen ID: {img.id}, Filename: {img.filename}")
+                                    log_sampled(
+                                        logger, logging.DEBUG, "public.search.image",
+                                        "✅ URL segura generada para imagen %s: %s", img.id, secure_url
+                                    )
 
                                     details["images"].append({
                                         "id": str(img.id),
@@ -1267,13 +1276,7 @@ async def search_package_endpoint(
         }
 
     except Exception as e:
-        import traceback
-        error_trace = traceback.format_exc()
-        print(f"❌ ERROR EN BÚSQUEDA DE PAQUETE:")
-        print(f"   Query: {query}")
-        print(f"   Error: {str(e)}")
-        print(f"   Traceback completo:")
-        print(error_trace)
+        logger.error(f"❌ Error en búsqueda de paquete (query={query}): {str(e)}", exc_info=True)
         
         return {
             "success": False,
@@ -1406,7 +1409,7 @@ async def create_customer_inquiry(
                             customer.email = inquiry.customer_email
                             customer.updated_at = get_colombia_now()
                             db.commit()
-                            print(f"✅ Email actualizado para cliente {customer.id} desde anuncio: {inquiry.customer_email}")
+                            logger.info(f"✅ Email actualizado para cliente {customer.id} desde anuncio: {inquiry.customer_email}")
                 
                 # Si existe paquete y tiene cliente asociado
                 elif package and package.customer_id:
@@ -1418,13 +1421,11 @@ async def create_customer_inquiry(
                         customer.email = inquiry.customer_email
                         customer.updated_at = get_colombia_now()
                         db.commit()
-                        print(f"✅ Email actualizado para cliente {customer.id} desde paquete: {inquiry.customer_email}")
+                        logger.info(f"✅ Email actualizado para cliente {customer.id} desde paquete: {inquiry.customer_email}")
                         
             except Exception as email_error:
                 # No fallar la consulta por esto, solo registrar el error
-                print(f"⚠️ Error actualizando email del cliente: {email_error}")
-                import traceback
-                traceback.print_exc()
+                logger.warning(f"⚠️ Error actualizando email del cliente: {email_error}", exc_info=True)
                 # Continuar normalmente
 
         return {
@@ -1583,7 +1584,7 @@ async def check_tracking_inquiries(
 async def test_s3_endpoint():
     """Test S3 service endpoint"""
     try:
-        s3_service = S3Service()
+        s3_service = get_s3_service()
         test_key = "paquetes-recibidos-imagenes/packages/27/reception_images/27_reception_image_1.jpg"
         presigned_url = s3_service.generate_presigned_url(test_key)
         return {
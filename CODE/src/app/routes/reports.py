@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+PAQUETES EL CLUB v1.0 - Rutas de Reportes
+Versión: 1.0.0
+Fecha: 2025-10-19
+Autor: Equipo de Desarrollo
+
+Los reportes se generan en segundo plano (Celery, cola "reports"): el endpoint
+de generación solo crea la fila en estado PENDING y devuelve su ID; el cliente
+consulta el estado y descarga el artefacto cuando está COMPLETED.
+"""
+
+import logging
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks, status
+from fastapi.responses import FileResponse, RedirectResponse
+from sqlalchemy.orm import Session
+
+from app.database import get_db, SessionLocal
+from app.dependencies import get_current_active_user_from_cookies
+from app.models.report import Report, ReportStatus, ReportType
+from app.models.user import User
+from app.schemas.report import (
+    ReportGenerationRequest, ReportGenerationResponse, ReportListResponse, ReportResponse
+)
+from app.services.report_service import ReportService
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    tags=["Reportes"],
+    responses={404: {"description": "Reporte no encontrado"}}
+)
+
+
+def _run_report_job_in_background(report_id: str):
+    """Fallback cuando el broker de Celery no está disponible"""
+    db = SessionLocal()
+    try:
+        ReportService(db).run_report_job(report_id)
+    finally:
+        db.close()
+
+
+def _get_report_or_404(db: Session, report_id: UUID) -> Report:
+    report = ReportService(db).get_report(report_id)
+    if not report:
+        raise HTTPException(status_code=404, detail="Reporte no encontrado")
+    return report
+
+
+@router.post("/generate", response_model=ReportGenerationResponse, status_code=status.HTTP_202_ACCEPTED)
+async def generate_report(
+    request: ReportGenerationRequest,
+    background_tasks: BackgroundTasks,
+    title: Optional[str] = Query(None, max_length=200),
+    current_user: User = Depends(get_current_active_user_from_cookies),
+    db: Session = Depends(get_db)
+):
+    """Encolar la generación de un reporte (no bloquea el worker web)"""
+    if request.report_type == ReportType.CUSTOM_REPORT:
+        raise HTTPException(status_code=400, detail="Tipo de reporte no soportado")
+
+    service = ReportService(db)
+    report = service.create_report(
+        title=title or request.report_type.value,
+        report_type=request.report_type,
+        # reports.created_by_id es UUID y users.id es entero: se registra el usuario en los parámetros
+        parameters={**(request.parameters or {}), "requested_by": current_user.username},
+        report_format=request.format
+    )
+
+    try:
+        from app.tasks import generate_report as generate_report_task
+        generate_report_task.delay(str(report.id))
+    except Exception as e:
+        logger.warning(f"Celery no disponible, generando reporte {report.id} tras la respuesta: {e}")
+        background_tasks.add_task(_run_report_job_in_background, str(report.id))
+
+    return ReportGenerationResponse(
+        report_id=report.id,
+        status=report.status,
+        message="Reporte encolado. Consulte el estado en /api/reports/{report_id}"
+    )
+
+
+@router.get("/", response_model=ReportListResponse)
+async def list_reports(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=100),
+    report_type: Optional[ReportType] = None,
+    report_status: Optional[ReportStatus] = Query(None, alias="status"),
+    current_user: User = Depends(get_current_active_user_from_cookies),
+    db: Session = Depends(get_db)
+):
+    """Listar reportes con filtros y paginación"""
+    filters = {"report_type": report_type, "status": report_status}
+    reports, total = ReportService(db).get_reports_list(skip=skip, limit=limit, filters=filters)
+    return ReportListResponse(
+        reports=[ReportResponse.model_validate(report) for report in reports],
+        total=total,
+        skip=skip,
+        limit=limit
+    )
+
+
+@router.get("/{report_id}", response_model=ReportResponse)
+async def get_report_status(
+    report_id: UUID,
+    current_user: User = Depends(get_current_active_user_from_cookies),
+    db: Session = Depends(get_db)
+):
+    """Consultar el estado de un reporte (polling)"""
+    return ReportResponse.model_validate(_get_report_or_404(db, report_id))
+
+
+@router.get("/{report_id}/download")
+async def download_report(
+    report_id: UUID,
+    current_user: User = Depends(get_current_active_user_from_cookies),
+    db: Session = Depends(get_db)
+):
+    """Descargar el artefacto de un reporte completado"""
+    report = _get_report_or_404(db, report_id)
+    if report.status in (ReportStatus.PENDING, ReportStatus.PROCESSING):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"El reporte aún se está generando (estado: {report.status.value})"
+        )
+    if report.status == ReportStatus.FAILED:
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="La generación del reporte falló")
+
+    try:
+        artifact = ReportService(db).get_report_artifact(report)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    if "url" in artifact:
+        return RedirectResponse(url=artifact["url"], status_code=status.HTTP_307_TEMPORARY_REDIRECT)
+
+    return FileResponse(
+        path=artifact["path"],
+        filename=artifact["file_name"],
+        media_type=artifact["content_type"]
+    )
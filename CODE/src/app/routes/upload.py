@@ -1,12 +1,15 @@
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends, Request
 from fastapi.responses import JSONResponse
-import boto3
 import json
 from datetime import datetime
 import os
 from pathlib import Path
 from app.dependencies import get_current_active_user_from_cookies
 from app.models.user import UserRole
+from app.services.registry import get_s3_service
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/upload", tags=["upload"])
 
@@ -19,26 +22,23 @@ BUCKET_NAME = os.getenv('AWS_S3_BUCKET', 'paquetes-el-club')
 # Verificar si las credenciales de AWS están configuradas
 USE_S3 = AWS_ACCESS_KEY_ID and AWS_SECRET_ACCESS_KEY and not AWS_ACCESS_KEY_ID.startswith('your-')
 
-# Inicializar S3 client solo si las credenciales están configuradas
-s3_client = None
-if USE_S3:
+
+def _get_s3_client():
+    """Cliente S3 compartido del proceso (registro de servicios) o None si no está disponible"""
+    if not USE_S3:
+        return None
     try:
-        s3_client = boto3.client(
-            's3',
-            aws_access_key_id=AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-            region_name=AWS_REGION
-        )
-        print(f"✅ Cliente S3 inicializado correctamente para bucket: {BUCKET_NAME}")
+        return get_s3_service().s3_client
     except Exception as e:
-        print(f"⚠️ Error inicializando cliente S3: {str(e)}")
-        USE_S3 = False
+        logger.warning(f"⚠️ Error inicializando cliente S3: {str(e)}")
+        return None
+
 
 # Configuración de almacenamiento local (fallback)
 LOCAL_STORAGE_PATH = Path("/app/uploads")
 LOCAL_STORAGE_PATH.mkdir(parents=True, exist_ok=True)
 
-print(f"📦 Modo de almacenamiento: {'AWS S3' if USE_S3 else 'Local (Fallback)'}")
+logger.debug("📦 Modo de almacenamiento: %s", 'AWS S3' if USE_S3 else 'Local (Fallback)')
 
 @router.post("/s3")
 async def upload_image_to_s3(
@@ -62,7 +62,8 @@ async def upload_image_to_s3(
         # Leer contenido del archivo
         file_content = await file.read()
         
-        if USE_S3 and s3_client:
+        s3_client = _get_s3_client()
+        if s3_client:
             # ========================================
             # MODO AWS S3 (Producción)
             # ========================================
@@ -82,8 +83,8 @@ async def upload_image_to_s3(
             # Generar URL pública de S3
             file_url = f"https://{BUCKET_NAME}.s3.amazonaws.com/{s3_key}"
             
-            print(f"✅ Archivo subido a S3: {s3_key}")
-            print(f"🔗 URL S3: {file_url}")
+            logger.info(f"✅ Archivo subido a S3: {s3_key}")
+            logger.debug("🔗 URL S3: %s", file_url)
             
         else:
             # ========================================
@@ -100,22 +101,19 @@ async def upload_image_to_s3(
             # Generar URL local (accesible via nginx)
             file_url = f"/uploads/{s3_key}"
             
-            print(f"✅ Archivo guardado localmente: {local_file_path}")
-            print(f"🔗 URL Local: {file_url}")
+            logger.info(f"✅ Archivo guardado localmente: {local_file_path}")
+            logger.debug("🔗 URL Local: %s", file_url)
         
         return {
             "success": True,
             "url": file_url,
             "s3_key": s3_key,
             "size": len(file_content),
-            "storage_mode": "s3" if USE_S3 else "local"
+            "storage_mode": "s3" if s3_client else "local"
         }
         
     except Exception as e:
-        import traceback
-        error_details = traceback.format_exc()
-        print(f"❌ Error en upload_image_to_s3: {str(e)}")
-        print(f"📋 Traceback: {error_details}")
+        logger.error(f"❌ Error en upload_image_to_s3: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error subiendo imagen: {str(e)}")
 
 @router.post("/s3-metadata")
@@ -140,7 +138,8 @@ async def upload_metadata_to_s3(
         # Convertir metadatos a JSON
         metadata_json = json.dumps(metadata, indent=2, ensure_ascii=False)
         
-        if USE_S3 and s3_client:
+        s3_client = _get_s3_client()
+        if s3_client:
             # ========================================
             # MODO AWS S3 (Producción)
             # ========================================
@@ -157,7 +156,7 @@ async def upload_metadata_to_s3(
                 }
             )
             
-            print(f"✅ Metadatos subidos a S3: {s3_key}")
+            logger.info(f"✅ Metadatos subidos a S3: {s3_key}")
             
         else:
             # ========================================
@@ -171,18 +170,15 @@ async def upload_metadata_to_s3(
             with open(local_file_path, 'w', encoding='utf-8') as f:
                 f.write(metadata_json)
             
-            print(f"✅ Metadatos guardados localmente: {local_file_path}")
+            logger.info(f"✅ Metadatos guardados localmente: {local_file_path}")
         
         return {
             "success": True,
             "s3_key": s3_key,
             "metadata_uploaded": True,
-            "storage_mode": "s3" if USE_S3 else "local"
+            "storage_mode": "s3" if s3_client else "local"
         }
         
     except Exception as e:
-        import traceback
-        error_details = traceback.format_exc()
-        print(f"❌ Error subiendo metadatos: {str(e)}")
-        print(f"📋 Traceback: {error_details}")
+        logger.error(f"❌ Error subiendo metadatos: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error subiendo metadatos: {str(e)}")
@@ -7,6 +7,9 @@ from app.models import User, Package, Message
 from app.dependencies import get_current_active_user_from_cookies
 from app.utils.auth_context import get_auth_context_from_request, get_auth_context_required
 from datetime import datetime
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 from app.utils.template_loader import get_templates
@@ -270,27 +273,46 @@ async def admin_page(request: Request, current_user: User = Depends(get_current_
 
 
 @router.get("/packages")
-async def packages_page(request: Request, current_user: User = Depends(get_current_active_user_from_cookies)):
+async def packages_page(
+    request: Request,
+    current_user: User = Depends(get_current_active_user_from_cookies),
+    db: Session = Depends(get_db)
+):
     context = get_auth_context_from_request(request)
     context["user"] = current_user
 
     if not context["is_authenticated"]:
         return RedirectResponse(url="/auth/login?redirect=/packages", status_code=302)
 
-    # Agregar configuración de tarifas desde .env
+    # Agregar tarifas vigentes (proveedor de tarifas en memoria)
     from app.config import settings
+    from app.services.rate_provider import get_rates
     # Usar production_url como URL principal para enlaces públicos
     base_url = settings.production_url if settings.environment == "production" else settings.development_url
     context["app_config"] = {
-        "rates": {
-            "normal": settings.base_delivery_rate_normal,
-            "extra_dimensioned": settings.base_delivery_rate_extra_dimensioned,
-            "storage_per_day": settings.base_storage_rate
-        },
+        "rates": get_rates().as_public_dict(),
         "development_url": base_url,  # Usar la URL correcta según el entorno
         "production_url": settings.production_url
     }
 
+    # Primera página y contadores del header incrustados como JSON: el cliente
+    # pinta la tabla sin esperar /api/packages/ y solo pide las páginas siguientes
+    from fastapi.encoders import jsonable_encoder
+    from app.services.package_service import PackageService
+    from app.services.header_notification_service import HeaderNotificationService
+    try:
+        context["initial_packages"] = jsonable_encoder(PackageService().list_dashboard_page(db))
+    except Exception as e:
+        logger.warning(f"No se pudo incrustar la primera página de paquetes: {e}")
+        context["initial_packages"] = None
+    try:
+        context["initial_header_counts"] = HeaderNotificationService().get_header_counts(
+            db, current_user.id, current_user.role.value
+        )
+    except Exception as e:
+        logger.warning(f"No se pudieron incrustar los contadores del header: {e}")
+        context["initial_header_counts"] = None
+
     return templates.TemplateResponse("packages/packages.html", context)
 
 @router.get("/receive")
@@ -313,7 +335,7 @@ async def receive_package_page(request: Request):
         return templates.TemplateResponse("receive/receive.html", context)
 
     except Exception as e:
-        print(f"Error en autenticación de /receive: {e}")
+        logger.error(f"Error en autenticación de /receive: {e}")
         return RedirectResponse(url="/auth/login?redirect=/receive", status_code=302)
 
 @router.get("/packages/{package_id}")
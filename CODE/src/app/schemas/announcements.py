@@ -9,6 +9,7 @@ Autor: Equipo de Desarrollo
 from pydantic import BaseModel, validator
 from typing import Optional
 from datetime import datetime
+from uuid import UUID
 from .base import TimestampSchema, IDSchema
 
 class AnnouncementBase(BaseModel):
@@ -96,6 +97,7 @@ class AnnouncementUpdate(BaseModel):
 
 class AnnouncementResponse(IDSchema, AnnouncementBase, TimestampSchema):
     """Esquema de respuesta para anuncios"""
+    id: UUID  # package_announcements_new usa UUID como clave primaria
     processed_at: Optional[datetime] = None
     status: str
 
@@ -7,7 +7,7 @@ Autor: Equipo de Desarrollo
 """
 
 from typing import Optional, List, Dict, Any
-from pydantic import BaseModel, EmailStr, Field, validator
+from pydantic import AliasChoices, BaseModel, EmailStr, Field, validator
 from datetime import datetime
 from uuid import UUID
 
@@ -87,9 +87,14 @@ class CustomerResponse(TimestampSchema, CustomerBase):
     id: UUID
     full_name: str
     is_active: bool
+    total_packages: int
     total_packages_received: int
     total_packages_delivered: int
-    total_spent: float  # En pesos (no centavos)
+    total_packages_cancelled: int
+    active_announced_packages: int
+    active_received_packages: int
+    # En pesos: se lee de Customer.total_spent_pesos (la columna guarda centavos)
+    total_spent: float = Field(validation_alias=AliasChoices('total_spent_pesos', 'total_spent'))
 
     # Información calculada
     display_name: str
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+PAQUETES EL CLUB v1.0 - Filas del Listado de Paquetes
+Versión: 1.0.0
+Fecha: 2025-11-10
+Autor: Equipo de Desarrollo
+
+Proyecciones ligeras (dataclasses con __slots__, no modelos Pydantic) para
+el listado del dashboard. Se construyen directamente desde las filas de
+PackageReadModel.dashboard_page con los valores ya normalizados y se
+serializan con orjson en una sola pasada: fechas, UUID y dataclasses son
+tipos nativos para orjson, así que no hace falta jsonable_encoder ni
+convertir cada fecha con isoformat().
+"""
+
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Union
+
+from app.models.package import PackageCondition, PackageStatus, PackageType
+
+# Valores normalizados fijos de los anuncios (antes pasaban por normalize_package_item)
+ANNOUNCEMENT_TYPE = PackageType.NORMAL.value
+ANNOUNCEMENT_CONDITION = PackageCondition.BUENO.value
+
+
+@dataclass(slots=True)
+class PackageListRow:
+    """Paquete o anuncio sin procesar tal como lo recibe la tabla del dashboard"""
+    id: Union[int, str]
+    tracking_number: Optional[str]
+    guide_number: Optional[str]
+    customer_name: str
+    customer_phone: str
+    customer_email: Optional[str]
+    package_type: str
+    status: str
+    package_condition: str
+    access_code: str
+    baroti: Optional[str]
+    observations: Optional[str]
+    announced_at: Optional[datetime]
+    received_at: Optional[datetime]
+    delivered_at: Optional[datetime]
+    cancelled_at: Optional[datetime]
+    base_fee: float
+    storage_fee: float
+    storage_days: int
+    total_amount: float
+    customer_id: Optional[Union[int, uuid.UUID]]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+    is_announcement: bool
+    # Archivos adjuntos tal como los agrega json_agg (dicts ya serializables)
+    file_uploads: List[Dict[str, Any]] = field(default_factory=list)
+
+    @classmethod
+    def from_page_row(cls, row, announcement_base_fee: float) -> "PackageListRow":
+        """Fila de PackageReadModel.dashboard_page (paquete o anuncio sin procesar)"""
+        if row.is_announcement:
+            return cls(
+                id=f"announcement_{row.tracking_number}",
+                tracking_number=row.tracking_number,
+                guide_number=row.guide_number,
+                customer_name=row.customer_name or 'Sin cliente',
+                customer_phone=row.customer_phone or 'Sin teléfono',
+                customer_email=row.customer_email,
+                package_type=ANNOUNCEMENT_TYPE,
+                status=PackageStatus.ANUNCIADO.value if row.announcement_is_active else PackageStatus.CANCELADO.value,
+                package_condition=ANNOUNCEMENT_CONDITION,
+                access_code='',
+                baroti=None,
+                observations=None,
+                announced_at=row.created_at,
+                received_at=None,
+                delivered_at=None,
+                cancelled_at=None if row.announcement_is_active else row.announcement_updated_at,
+                base_fee=announcement_base_fee,
+                storage_fee=0.0,
+                storage_days=0,  # Los anuncios no tienen días de almacenamiento
+                total_amount=announcement_base_fee,
+                customer_id=row.customer_id,
+                created_at=row.created_at,
+                updated_at=row.created_at,
+                is_announcement=True,
+                file_uploads=[]  # Los anuncios no tienen archivos adjuntos
+            )
+        return cls(
+            id=row.package_id,
+            tracking_number=row.tracking_number,
+            guide_number=row.guide_number,
+            customer_name=row.customer_name or 'Sin cliente',
+            customer_phone=row.customer_phone or 'Sin teléfono',
+            customer_email=row.customer_email,
+            package_type=row.package_type.value if row.package_type else PackageType.NORMAL.value,
+            status=row.status.value if row.status else PackageStatus.ANUNCIADO.value,
+            package_condition=row.package_condition.value if row.package_condition else PackageCondition.BUENO.value,
+            access_code=row.access_code or '',
+            baroti=row.posicion,
+            observations=None,
+            announced_at=row.announced_at,
+            received_at=row.received_at,
+            delivered_at=row.delivered_at,
+            cancelled_at=row.cancelled_at,
+            base_fee=float(row.base_fee or 0),
+            storage_fee=float(row.storage_fee or 0),
+            storage_days=row.storage_days or 0,
+            total_amount=float(row.total_amount or 0),
+            customer_id=row.customer_id,
+            created_at=row.created_at,
+            updated_at=row.updated_at,
+            is_announcement=False,
+            file_uploads=row.file_uploads or []
+        )
@@ -19,6 +19,7 @@ from app.models.customer import Customer
 from app.models.message import Message
 from app.models.notification import Notification
 from app.models.report import Report, ReportStatus
+from app.services.package_archive_service import with_archive
 from app.utils.datetime_utils import get_colombia_now
 
 logger = logging.getLogger(__name__)
@@ -55,10 +56,10 @@ class AdminService:
         return {
             "total_users": self.db.query(func.count(User.id)).scalar(),
             "active_users": self.db.query(func.count(User.id)).filter(User.is_active == True).scalar(),
-            "total_packages": self.db.query(func.count(Package.id)).scalar(),
+            "total_packages": self.db.query(func.count(with_archive(Package, "id").c.id)).scalar(),
             "total_customers": self.db.query(func.count(Customer.id)).scalar(),
-            "total_messages": self.db.query(func.count(Message.id)).scalar(),
-            "total_notifications": self.db.query(func.count(Notification.id)).scalar(),
+            "total_messages": self.db.query(func.count(with_archive(Message, "id").c.id)).scalar(),
+            "total_notifications": self.db.query(func.count(with_archive(Notification, "id").c.id)).scalar(),
             "total_reports": self.db.query(func.count(Report.id)).scalar()
         }
 
@@ -94,16 +95,20 @@ class AdminService:
         }
 
     def _get_business_metrics(self, period_start: datetime, period_end: datetime) -> Dict[str, Any]:
-        """Métricas de negocio para el período"""
+        """Métricas de negocio para el período (incluye paquetes, mensajes y SMS archivados)"""
+        packages = with_archive(Package, "id", "status", "created_at")
+        messages = with_archive(Message, "id", "status", "created_at")
+        notifications = with_archive(Notification, "id", "cost_cents", "created_at")
+
         # Paquetes por estado
         package_status = self.db.query(
-            Package.status, func.count(Package.id)
+            packages.c.status, func.count(packages.c.id)
         ).filter(
             and_(
-                Package.created_at >= period_start,
-                Package.created_at <= period_end
+                packages.c.created_at >= period_start,
+                packages.c.created_at <= period_end
             )
-        ).group_by(Package.status).all()
+        ).group_by(packages.c.status).all()
 
         packages_by_status = {status.value: count for status, count in package_status}
 
@@ -117,24 +122,24 @@ class AdminService:
 
         # Mensajes por estado
         message_status = self.db.query(
-            Message.status, func.count(Message.id)
+            messages.c.status, func.count(messages.c.id)
         ).filter(
             and_(
-                Message.created_at >= period_start,
-                Message.created_at <= period_end
+                messages.c.created_at >= period_start,
+                messages.c.created_at <= period_end
             )
-        ).group_by(Message.status).all()
+        ).group_by(messages.c.status).all()
 
         messages_by_status = {status.value: count for status, count in message_status}
 
         # SMS enviados y costos
         sms_stats = self.db.query(
-            func.count(Notification.id),
-            func.sum(Notification.cost_cents)
+            func.count(notifications.c.id),
+            func.sum(notifications.c.cost_cents)
         ).filter(
             and_(
-                Notification.created_at >= period_start,
-                Notification.created_at <= period_end
+                notifications.c.created_at >= period_start,
+                notifications.c.created_at <= period_end
             )
         ).first()
 
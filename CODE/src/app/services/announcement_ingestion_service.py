@@ -0,0 +1,402 @@
+# -*- coding: utf-8 -*-
+"""
+PAQUETES EL CLUB v1.0 - Ingesta Masiva de Anuncios
+Versión: 1.0.0
+Fecha: 2025-11-10
+Autor: Equipo de Desarrollo
+
+Anuncios por lote para transportadoras y administraciones de edificios
+(POST /api/announcements/bulk, JSON o CSV). Un lote cuesta un número fijo de
+consultas, no una cadena por guía:
+
+1. Validación de todas las filas en una pasada (mismas reglas que
+   /api/announcements/direct) y guías repetidas dentro del lote.
+2. Una consulta de las guías ya anunciadas: la ingesta es idempotente por
+   guide_number y reenviar el lote devuelve los mismos códigos.
+3. Clientes por teléfono: una consulta y un INSERT de varias filas para los
+   que faltan.
+4. Códigos de consulta tomados del pool en una sola consulta (CodeGenerator).
+5. Un INSERT de varias filas con ON CONFLICT DO NOTHING y un commit.
+
+Los SMS y emails de confirmación se encolan (tarea
+send_announcement_notifications) en lugar de enviarse dentro de la petición.
+"""
+
+import csv
+import io
+import logging
+import uuid
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session, joinedload
+
+from app.config import settings
+from app.models.announcement_new import PackageAnnouncementNew
+from app.models.customer import Customer
+from app.models.package import PackageStatus
+from app.services.code_generator import CodeGenerator
+from app.utils.datetime_utils import get_colombia_now
+from app.utils.phone_utils import normalize_phone, validate_phone
+
+logger = logging.getLogger(__name__)
+
+# Anuncios por tarea de notificación
+NOTIFICATION_CHUNK_SIZE = 100
+
+# Encabezados aceptados en el CSV para cada campo
+CSV_COLUMNS = {
+    "customer_name": ("customer_name", "nombre", "cliente", "destinatario"),
+    "customer_phone": ("customer_phone", "telefono", "teléfono", "celular"),
+    "guide_number": ("guide_number", "guia", "guía", "numero_guia", "número_guia"),
+}
+
+# Estados de fila en el reporte
+CREATED = "created"
+EXISTING = "existing"
+DUPLICATE = "duplicate"
+INVALID = "invalid"
+FAILED = "failed"
+
+
+class BulkAnnouncementError(ValueError):
+    """Lote ilegible o fuera de los límites (la petición completa se rechaza)"""
+
+
+def _split_name(customer_name: str) -> Dict[str, str]:
+    """Nombre y apellido del cliente nuevo, con el mismo criterio que el anuncio directo"""
+    name_parts = [part.strip() for part in customer_name.split() if part.strip()]
+    first_name = name_parts[0] if name_parts else (customer_name.strip() or "CLIENTE")
+    last_name = name_parts[1] if len(name_parts) > 1 else (name_parts[0] if name_parts else "PENDIENTE")
+    first_name = first_name[:50]
+    last_name = last_name[:50] or "PENDIENTE"
+    return {"first_name": first_name, "last_name": last_name, "full_name": f"{first_name} {last_name}"[:100]}
+
+
+class AnnouncementIngestionService:
+    """Validación, creación e informe por fila de lotes de anuncios"""
+
+    # ========================================
+    # ENTRADA
+    # ========================================
+
+    @staticmethod
+    def parse_csv(content: bytes) -> List[Dict[str, str]]:
+        """Filas de un CSV con encabezado (coma o punto y coma, UTF-8)"""
+        try:
+            text_content = content.decode("utf-8-sig")
+        except UnicodeDecodeError:
+            raise BulkAnnouncementError("El archivo CSV debe estar codificado en UTF-8")
+
+        try:
+            dialect = csv.Sniffer().sniff(text_content[:2048], delimiters=",;")
+        except csv.Error:
+            dialect = csv.excel
+        reader = csv.DictReader(io.StringIO(text_content), dialect=dialect)
+
+        headers = {(header or "").strip().lower(): header for header in reader.fieldnames or []}
+        columns = {}
+        for field, aliases in CSV_COLUMNS.items():
+            column = next((headers[alias] for alias in aliases if alias in headers), None)
+            if column is None:
+                raise BulkAnnouncementError(f"Falta la columna '{field}' en el CSV")
+            columns[field] = column
+
+        return [
+            {field: (row.get(column) or "") for field, column in columns.items()}
+            for row in reader
+            if any((value or "").strip() for value in row.values() if isinstance(value, str))
+        ]
+
+    # ========================================
+    # INGESTA
+    # ========================================
+
+    def ingest(self, db: Session, items: Sequence[Any]) -> Dict[str, Any]:
+        """
+        Crear los anuncios del lote y devolver el resultado de cada fila, en el
+        orden recibido. Las filas inválidas no impiden crear las demás.
+        """
+        if not items:
+            raise BulkAnnouncementError("El lote no contiene anuncios")
+        if len(items) > settings.announcement_bulk_max_rows:
+            raise BulkAnnouncementError(
+                f"El lote supera el máximo de {settings.announcement_bulk_max_rows} anuncios"
+            )
+
+        results, pending = self._validate(items)
+
+        # Guías ya anunciadas (idempotencia)
+        if pending:
+            existing = db.query(
+                PackageAnnouncementNew.id, PackageAnnouncementNew.guide_number, PackageAnnouncementNew.tracking_code
+            ).filter(PackageAnnouncementNew.guide_number.in_(list(pending))).all()
+            for announcement in existing:
+                self._resolve(pending.pop(announcement.guide_number), EXISTING, announcement)
+
+        created_ids: List[uuid.UUID] = []
+        if pending:
+            created_ids = self._create(db, pending)
+
+        summary = {status: 0 for status in (CREATED, EXISTING, DUPLICATE, INVALID, FAILED)}
+        for result in results:
+            if result["status"] == DUPLICATE:
+                first = results[result["duplicate_of"] - 1]
+                result["tracking_code"] = first.get("tracking_code")
+                result["announcement_id"] = first.get("announcement_id")
+            summary[result["status"]] += 1
+        summary["total"] = len(results)
+
+        return {"summary": summary, "results": results, "created_ids": created_ids}
+
+    @staticmethod
+    def _validate(items: Sequence[Any]) -> Tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+        """Reporte inicial por fila y filas válidas por guía (la primera de cada guía)"""
+        results: List[Dict[str, Any]] = []
+        pending: Dict[str, Dict[str, Any]] = {}
+        first_row: Dict[str, int] = {}
+
+        for index, item in enumerate(items, start=1):
+            result: Dict[str, Any] = {"row": index, "status": INVALID, "guide_number": None, "tracking_code": None}
+            results.append(result)
+            if not isinstance(item, dict):
+                result["errors"] = ["La fila debe ser un objeto con customer_name, customer_phone y guide_number"]
+                continue
+
+            customer_name = str(item.get("customer_name") or "").strip().upper()
+            raw_phone = str(item.get("customer_phone") or "").strip()
+            guide_number = str(item.get("guide_number") or "").strip().upper()
+            result["guide_number"] = guide_number or None
+
+            errors = []
+            if not customer_name:
+                errors.append("El nombre del cliente es requerido")
+            elif len(customer_name) > 100:
+                errors.append("El nombre del cliente supera 100 caracteres")
+            customer_phone = normalize_phone(raw_phone) if raw_phone else None
+            if not raw_phone:
+                errors.append("El teléfono del cliente es requerido")
+            elif not validate_phone(customer_phone):
+                errors.append("Número de teléfono inválido. Use formato: +573001234567 o 3001234567")
+            if not guide_number:
+                errors.append("El número de guía es requerido")
+            elif len(guide_number) > 50:
+                errors.append("El número de guía supera 50 caracteres")
+            if errors:
+                result["errors"] = errors
+                continue
+
+            if guide_number in first_row:
+                result["status"] = DUPLICATE
+                result["duplicate_of"] = first_row[guide_number]
+                continue
+
+            first_row[guide_number] = index
+            pending[guide_number] = {
+                "result": result,
+                "customer_name": customer_name,
+                "customer_phone": customer_phone,
+                "guide_number": guide_number,
+            }
+        return results, pending
+
+    @staticmethod
+    def _resolve(row: Dict[str, Any], status: str, announcement) -> None:
+        row["result"].update({
+            "status": status,
+            "tracking_code": announcement.tracking_code,
+            "announcement_id": str(announcement.id),
+        })
+
+    def _create(self, db: Session, pending: Dict[str, Dict[str, Any]]) -> List[uuid.UUID]:
+        """Clientes, códigos e INSERT de los anuncios nuevos en una transacción"""
+        try:
+            customers = self._resolve_customers(db, pending.values())
+            tracking_codes = CodeGenerator.claim_tracking_codes(db, len(pending))
+
+            now = get_colombia_now()
+            values = [
+                {
+                    "id": uuid.uuid4(),
+                    "customer_name": row["customer_name"],
+                    "customer_phone": row["customer_phone"],
+                    "guide_number": row["guide_number"],
+                    "tracking_code": tracking_code,
+                    "customer_id": customers.get(row["customer_phone"]),
+                    "is_active": True,
+                    "is_processed": False,
+                    "announced_at": now,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for row, tracking_code in zip(pending.values(), tracking_codes)
+            ]
+            inserted = db.execute(
+                insert(PackageAnnouncementNew).values(values).on_conflict_do_nothing().returning(
+                    PackageAnnouncementNew.id, PackageAnnouncementNew.guide_number, PackageAnnouncementNew.tracking_code
+                )
+            ).all()
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        created_ids = []
+        for announcement in inserted:
+            self._resolve(pending.pop(announcement.guide_number), CREATED, announcement)
+            created_ids.append(announcement.id)
+
+        # Guías que otra petición anunció entre la consulta y el INSERT
+        if pending:
+            concurrent = db.query(
+                PackageAnnouncementNew.id, PackageAnnouncementNew.guide_number, PackageAnnouncementNew.tracking_code
+            ).filter(PackageAnnouncementNew.guide_number.in_(list(pending))).all()
+            for announcement in concurrent:
+                self._resolve(pending.pop(announcement.guide_number), EXISTING, announcement)
+            for row in pending.values():
+                row["result"].update({"status": FAILED, "errors": ["No se pudo crear el anuncio, intente de nuevo"]})
+
+        return created_ids
+
+    @staticmethod
+    def _resolve_customers(db: Session, rows: Iterable[Dict[str, Any]]) -> Dict[str, uuid.UUID]:
+        """id de cliente por teléfono, creando en un solo INSERT los que no existen"""
+        names: Dict[str, str] = {}
+        for row in rows:
+            names.setdefault(row["customer_phone"], row["customer_name"])
+
+        customers = dict(db.query(Customer.phone, Customer.id).filter(Customer.phone.in_(list(names))).all())
+        missing = [phone for phone in names if phone not in customers]
+        if not missing:
+            return customers
+
+        now = get_colombia_now()
+        created = db.execute(
+            insert(Customer).values([
+                {
+                    "id": uuid.uuid4(),
+                    "phone": phone,
+                    **_split_name(names[phone]),
+                    "address_country": "Colombia",
+                    "preferred_language": "es",
+                    "is_active": True,
+                    "is_vip": False,
+                    "total_packages_received": 0,
+                    "total_packages_delivered": 0,
+                    "total_spent": 0,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for phone in missing
+            ]).on_conflict_do_nothing(index_elements=["phone"]).returning(Customer.phone, Customer.id)
+        ).all()
+        customers.update(dict(created))
+
+        # Teléfonos que otra transacción registró entre la consulta y el INSERT
+        if len(created) < len(missing):
+            remaining = [phone for phone in missing if phone not in customers]
+            customers.update(dict(db.query(Customer.phone, Customer.id).filter(Customer.phone.in_(remaining)).all()))
+        return customers
+
+    # ========================================
+    # NOTIFICACIONES
+    # ========================================
+
+    @staticmethod
+    def enqueue_notifications(announcement_ids: Sequence[uuid.UUID], background_tasks=None) -> int:
+        """
+        Encolar las confirmaciones por bloques de NOTIFICATION_CHUNK_SIZE; sin
+        Celery se envían después de la respuesta en el mismo proceso
+        """
+        ids = [str(announcement_id) for announcement_id in announcement_ids]
+        if not ids:
+            return 0
+        chunks = [ids[start:start + NOTIFICATION_CHUNK_SIZE] for start in range(0, len(ids), NOTIFICATION_CHUNK_SIZE)]
+        try:
+            from app.tasks import send_announcement_notifications
+            for chunk in chunks:
+                send_announcement_notifications.delay(chunk)
+        except Exception as e:
+            if background_tasks is None:
+                logger.error(f"Confirmaciones de {len(ids)} anuncios sin encolar: {e}")
+                return 0
+            logger.warning(f"Celery no disponible, confirmaciones de anuncios en segundo plano local: {e}")
+            for chunk in chunks:
+                background_tasks.add_task(_send_notifications_in_process, chunk)
+        return len(ids)
+
+    async def send_notifications(self, db: Session, announcement_ids: Sequence[str]) -> Dict[str, int]:
+        """SMS (y email si el cliente lo tiene) de confirmación de cada anuncio"""
+        from app.models.notification import NotificationEvent, NotificationPriority
+        from app.services.registry import get_email_service, get_sms_service
+
+        announcements = db.query(PackageAnnouncementNew).options(
+            joinedload(PackageAnnouncementNew.customer)
+        ).filter(PackageAnnouncementNew.id.in_([uuid.UUID(str(value)) for value in announcement_ids])).all()
+
+        sms_service = get_sms_service()
+        email_service = get_email_service()
+        tracking_base = settings.tracking_base_url.rstrip("/")
+        sent = {"sms": 0, "email": 0, "failed": 0}
+
+        # SMS: una plantilla y N renderizados sobre los anuncios ya cargados
+        try:
+            response = await sms_service.send_sms_by_event_batch(
+                db=db,
+                event_type=NotificationEvent.PACKAGE_ANNOUNCED,
+                announcements=announcements,
+                priority=NotificationPriority.ALTA,
+                is_test=False
+            )
+            sent["sms"] += response.sent_count
+            sent["failed"] += response.failed_count
+            for result in response.results:
+                if result["status"] == "failed":
+                    logger.error(
+                        f"Error sending SMS confirmation for announcement {result['announcement_id']}: {result['error']}"
+                    )
+        except Exception as e:
+            sent["failed"] += len(announcements)
+            logger.error(f"Error sending SMS confirmations for {len(announcements)} announcements: {str(e)}")
+
+        for announcement in announcements:
+            customer = announcement.customer
+            if not (customer and getattr(customer, "email", None)):
+                continue
+            try:
+                full_name = customer.full_name or announcement.customer_name
+                await email_service.send_email_by_event(
+                    db=db,
+                    event_type=NotificationEvent.PACKAGE_ANNOUNCED,
+                    recipient=customer.email,
+                    variables={
+                        "first_name": full_name.split(" ")[0],
+                        "current_status": PackageStatus.ANUNCIADO.value,
+                        "guide_number": announcement.guide_number,
+                        "consult_code": announcement.tracking_code,
+                        "tracking_url": f"{tracking_base}?auto_search={announcement.tracking_code}",
+                    },
+                    package_id=None,
+                    customer_id=str(customer.id),
+                    announcement_id=str(announcement.id),
+                    is_test=False,
+                )
+                sent["email"] += 1
+            except Exception as e:
+                sent["failed"] += 1
+                logger.error(f"Error sending EMAIL confirmation for announcement {announcement.id}: {str(e)}")
+
+        return sent
+
+
+async def _send_notifications_in_process(announcement_ids: List[str]) -> None:
+    """Respaldo sin Celery: sesión propia, después de enviar la respuesta"""
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        await AnnouncementIngestionService().send_notifications(db, announcement_ids)
+    except Exception as e:
+        logger.error(f"Error enviando confirmaciones de anuncios: {e}")
+    finally:
+        db.close()
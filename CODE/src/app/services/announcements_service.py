@@ -7,7 +7,7 @@ Autor: Equipo de Desarrollo
 """
 
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_, func
+from sqlalchemy import and_, func
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
 import uuid
@@ -20,6 +20,16 @@ from app.schemas.announcements import (
     AnnouncementListResponse, AnnouncementSearchRequest, AnnouncementStatsResponse
 )
 from .base import BaseService
+from .code_generator import CodeGenerator
+
+def _announcement_status(is_active: bool, is_processed: bool) -> str:
+    """Mismo criterio que PackageAnnouncementNew.status"""
+    if not is_active:
+        return "inactivo"
+    if is_processed:
+        return "recibido"
+    return "pendiente"
+
 
 class AnnouncementsService(BaseService[Package, AnnouncementCreate, AnnouncementUpdate]):
     """Servicio para gestión de anuncios de paquetes"""
@@ -61,51 +71,36 @@ class AnnouncementsService(BaseService[Package, AnnouncementCreate, Announcement
 
     def search_announcements(self, db: Session, search_request: AnnouncementSearchRequest,
                            skip: int = 0, limit: int = 50) -> AnnouncementListResponse:
-        """Buscar anuncios con filtros"""
-        query = db.query(Package)
-
-        # Aplicar filtros
-        if search_request.query:
-            search_term = f"%{search_request.query}%"
-            query = query.filter(
-                or_(
-                    Package.guide_number.ilike(search_term),
-                    Package.tracking_number.ilike(search_term),
-                    Package.customer_name.ilike(search_term),
-                    Package.customer_phone.ilike(search_term)
-                )
-            )
+        """Buscar anuncios con filtros (columnas de package_announcements_new, sin entidades del ORM)"""
+        from app.services.package_read_model import PackageReadModel
+
+        rows, total = PackageReadModel.search_announcements(
+            db,
+            query=search_request.query,
+            status=search_request.status,
+            date_from=search_request.date_from,
+            date_to=search_request.date_to,
+            skip=skip,
+            limit=limit
+        )
 
-        if search_request.status:
-            if search_request.status == "pending":
-                query = query.filter(
-                    and_(
-                        Package.is_active == True,
-                        Package.is_processed == False
-                    )
-                )
-            elif search_request.status == "processed":
-                query = query.filter(Package.is_processed == True)
-            elif search_request.status == "cancelled":
-                query = query.filter(Package.is_active == False)
-
-        if search_request.date_from:
-            query = query.filter(Package.created_at >= search_request.date_from)
-
-        if search_request.date_to:
-            query = query.filter(Package.created_at <= search_request.date_to)
-
-        # Ordenar por fecha de creación descendente
-        query = query.order_by(Package.created_at.desc())
-
-        # Paginación
-        total = query.count()
-        announcements = query.offset(skip).limit(limit).all()
-
-        # Convertir a respuestas
-        announcement_responses = []
-        for announcement in announcements:
-            announcement_responses.append(AnnouncementResponse.model_validate(announcement))
+        # Las filas ya traen los valores guardados: se construyen sin revalidar
+        announcement_responses = [
+            AnnouncementResponse.model_construct(
+                id=row.id,
+                customer_name=row.customer_name,
+                customer_phone=row.customer_phone,
+                guide_number=row.guide_number,
+                tracking_code=row.tracking_code,
+                is_active=row.is_active,
+                is_processed=row.is_processed,
+                processed_at=row.processed_at,
+                created_at=row.created_at,
+                updated_at=row.updated_at,
+                status=_announcement_status(row.is_active, row.is_processed)
+            )
+            for row in rows
+        ]
 
         return AnnouncementListResponse(
             announcements=announcement_responses,
@@ -181,19 +176,4 @@ class AnnouncementsService(BaseService[Package, AnnouncementCreate, Announcement
 
     def _generate_tracking_code(self, db: Session) -> str:
         """Generar código de tracking único"""
-        import random
-        import string
-
-        while True:
-            # Generar código de 4 caracteres alfanuméricos
-            # Excluye el número 0 y la letra O para evitar confusión
-            allowed_chars = string.ascii_uppercase.replace('O', '') + string.digits.replace('0', '')
-            tracking_code = ''.join(random.choices(allowed_chars, k=4))
-
-            # Verificar que no exista
-            existing = db.query(Package).filter(
-                Package.tracking_number == tracking_code
-            ).first()
-
-            if not existing:
-                return tracking_code
\ No newline at end of file
+        return CodeGenerator.claim_tracking_code(db)
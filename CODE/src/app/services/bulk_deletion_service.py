@@ -0,0 +1,323 @@
+# -*- coding: utf-8 -*-
+"""
+PAQUETES EL CLUB v1.0 - Servicio de Eliminación Masiva
+Versión: 1.0.0
+Fecha: 2025-10-19
+Autor: Equipo de Desarrollo
+
+Eliminación en cascada basada en conjuntos: cada tabla relacionada se limpia
+con una única sentencia DELETE/UPDATE ... WHERE x = ANY(:ids) por lote, en
+lugar de cargar y borrar fila por fila. Los objetos de S3 de los archivos
+eliminados se borran después del commit con delete_objects (hasta 1000 keys
+por llamada).
+"""
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.utils.datetime_utils import get_colombia_now
+
+logger = logging.getLogger(__name__)
+
+# Tamaño de lote para mantener las transacciones acotadas
+DELETE_BATCH_SIZE = 5000
+# Límite de la API de S3 para delete_objects
+S3_DELETE_BATCH_SIZE = 1000
+
+# Condición SQL que identifica clientes inválidos ("Sin cliente" / sin teléfono válido)
+INVALID_CUSTOMERS_CONDITION = """
+    (
+        LOWER(TRIM(first_name)) LIKE '%sin cliente%' OR
+        LOWER(TRIM(last_name)) LIKE '%sin cliente%' OR
+        LOWER(TRIM(COALESCE(full_name, ''))) LIKE '%sin cliente%' OR
+        LOWER(TRIM(CONCAT(first_name, ' ', last_name))) LIKE '%sin cliente%' OR
+        LOWER(REPLACE(first_name, ' ', '')) LIKE '%sincliente%' OR
+        LOWER(REPLACE(last_name, ' ', '')) LIKE '%sincliente%' OR
+        LOWER(REPLACE(COALESCE(full_name, ''), ' ', '')) LIKE '%sincliente%'
+    )
+    OR
+    (
+        phone IS NULL OR
+        TRIM(phone) = '' OR
+        LOWER(TRIM(phone)) LIKE '%sin teléfono%' OR
+        LOWER(TRIM(phone)) LIKE '%sin telefono%' OR
+        LOWER(TRIM(phone)) LIKE '%sintelefono%' OR
+        LOWER(REPLACE(phone, ' ', '')) LIKE '%sintelefono%' OR
+        LOWER(REPLACE(phone, 'é', 'e')) LIKE '%sin telefono%' OR
+        LOWER(REPLACE(REPLACE(phone, ' ', ''), 'é', 'e')) LIKE '%sintelefono%'
+    )
+"""
+
+
+# Referencias a clientes (y a sus anuncios) en el archivo de paquetes; se
+# ejecutan antes de borrar los anuncios
+ARCHIVE_DETACH_STATEMENTS = (
+    "UPDATE packages_archive SET customer_id = NULL WHERE customer_id = ANY(CAST(:ids AS uuid[]))",
+    "UPDATE messages_archive SET customer_id = NULL WHERE customer_id = ANY(CAST(:ids AS uuid[]))",
+    """
+    UPDATE notifications_archive
+    SET customer_id = CASE WHEN customer_id = ANY(CAST(:ids AS uuid[])) THEN NULL ELSE customer_id END,
+        announcement_id = CASE WHEN announcement_id IN (
+            SELECT id FROM package_announcements_new WHERE customer_id = ANY(CAST(:ids AS uuid[]))
+        ) THEN NULL ELSE announcement_id END
+    WHERE customer_id = ANY(CAST(:ids AS uuid[]))
+       OR announcement_id IN (
+           SELECT id FROM package_announcements_new WHERE customer_id = ANY(CAST(:ids AS uuid[]))
+       )
+    """,
+)
+
+
+def _chunks(items: Sequence[Any], size: int) -> Iterable[List[Any]]:
+    for i in range(0, len(items), size):
+        yield list(items[i:i + size])
+
+
+class BulkDeletionService:
+    """
+    Servicio para eliminación masiva de paquetes y clientes con sentencias de conjunto
+    """
+
+    # ========================================
+    # PAQUETES
+    # ========================================
+
+    def delete_packages(self, db: Session, package_ids: Sequence[int], delete_s3_objects: bool = True) -> Dict[str, Any]:
+        """
+        Eliminar paquetes y todas sus referencias (historial, mensajes,
+        notificaciones, archivos) por lotes
+
+        Los eventos de auditoría (package_events) se conservan desvinculados y
+        los anuncios asociados vuelven a quedar sin procesar.
+
+        Returns:
+            Dict con los conteos por tabla
+        """
+        totals = {
+            "packages_deleted": 0,
+            "history_deleted": 0,
+            "messages_deleted": 0,
+            "notifications_deleted": 0,
+            "files_deleted": 0,
+            "events_unlinked": 0,
+            "announcements_updated": 0,
+            "s3_objects_deleted": 0,
+        }
+        ids = sorted({int(package_id) for package_id in package_ids})
+
+        for batch in _chunks(ids, DELETE_BATCH_SIZE):
+            try:
+                counts, s3_keys = self._delete_packages_batch(db, batch)
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+
+            for key, value in counts.items():
+                totals[key] += value
+            if delete_s3_objects and s3_keys:
+                totals["s3_objects_deleted"] += self.delete_s3_objects(s3_keys)
+
+        return totals
+
+    def _delete_packages_batch(self, db: Session, ids: List[int]):
+        params = {"ids": ids}
+
+        history_deleted = db.execute(text(
+            "DELETE FROM package_history WHERE package_id = ANY(:ids)"
+        ), params).rowcount
+        messages_deleted = db.execute(text(
+            "DELETE FROM messages WHERE package_id = ANY(:ids)"
+        ), params).rowcount
+        notifications_deleted = db.execute(text(
+            "DELETE FROM notifications WHERE package_id = ANY(:ids)"
+        ), params).rowcount
+        s3_keys = [row[0] for row in db.execute(text(
+            "DELETE FROM file_uploads WHERE package_id = ANY(:ids) RETURNING s3_key"
+        ), params) if row[0]]
+        events_unlinked = db.execute(text(
+            "UPDATE package_events SET package_id = NULL WHERE package_id = ANY(:ids)"
+        ), params).rowcount
+        announcements_updated = db.execute(text("""
+            UPDATE package_announcements_new
+            SET package_id = NULL, is_processed = false, processed_at = NULL, updated_at = :updated_at
+            WHERE package_id = ANY(:ids)
+        """), {**params, "updated_at": get_colombia_now()}).rowcount
+        packages_deleted = db.execute(text(
+            "DELETE FROM packages WHERE id = ANY(:ids)"
+        ), params).rowcount
+
+        counts = {
+            "packages_deleted": packages_deleted,
+            "history_deleted": history_deleted,
+            "messages_deleted": messages_deleted,
+            "notifications_deleted": notifications_deleted,
+            "files_deleted": len(s3_keys),
+            "events_unlinked": events_unlinked,
+            "announcements_updated": announcements_updated,
+        }
+        return counts, s3_keys
+
+    def delete_s3_objects(self, s3_keys: Sequence[str]) -> int:
+        """Eliminar objetos de S3 en lotes de hasta 1000 keys por llamada"""
+        if not s3_keys:
+            return 0
+
+        try:
+            from app.services.registry import get_s3_service
+            s3_service = get_s3_service()
+        except Exception as e:
+            logger.warning(f"S3 no disponible, {len(s3_keys)} objeto(s) no eliminados: {e}")
+            return 0
+
+        deleted = 0
+        for batch in _chunks(list(dict.fromkeys(s3_keys)), S3_DELETE_BATCH_SIZE):
+            try:
+                response = s3_service.s3_client.delete_objects(
+                    Bucket=s3_service.bucket_name,
+                    Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True}
+                )
+                errors = response.get("Errors", [])
+                for error in errors:
+                    logger.error(f"Error eliminando {error.get('Key')} de S3: {error.get('Message')}")
+                deleted += len(batch) - len(errors)
+            except Exception as e:
+                logger.error(f"Error en delete_objects de S3 ({len(batch)} keys): {e}")
+
+        return deleted
+
+    # ========================================
+    # CLIENTES
+    # ========================================
+
+    def find_invalid_customer_ids(self, db: Session) -> List[Any]:
+        """IDs de clientes "Sin cliente" o sin teléfono válido"""
+        result = db.execute(text(f"SELECT id FROM customers WHERE {INVALID_CUSTOMERS_CONDITION}"))
+        return [row[0] for row in result]
+
+    def get_customers_relation_counts(self, db: Session, customer_ids: Sequence[Any]) -> List[Dict[str, Any]]:
+        """
+        Datos y conteos de relaciones de varios clientes en una sola consulta
+        (en lugar de cuatro COUNT por cliente)
+        """
+        if not customer_ids:
+            return []
+
+        rows = []
+        for batch in _chunks([str(cid) for cid in customer_ids], DELETE_BATCH_SIZE):
+            result = db.execute(text("""
+                WITH ids AS (SELECT unnest(CAST(:ids AS uuid[])) AS id)
+                SELECT c.id, c.first_name, c.last_name, c.phone, c.email, c.address_street,
+                       COALESCE(p.cnt, 0) AS packages_count,
+                       COALESCE(m.cnt, 0) AS messages_count,
+                       COALESCE(n.cnt, 0) AS notifications_count,
+                       COALESCE(a.cnt, 0) AS announcements_count
+                FROM customers c
+                JOIN ids ON ids.id = c.id
+                LEFT JOIN (SELECT customer_id, COUNT(*) AS cnt FROM packages
+                           WHERE customer_id = ANY(CAST(:ids AS uuid[])) GROUP BY customer_id) p ON p.customer_id = c.id
+                LEFT JOIN (SELECT customer_id, COUNT(*) AS cnt FROM messages
+                           WHERE customer_id = ANY(CAST(:ids AS uuid[])) GROUP BY customer_id) m ON m.customer_id = c.id
+                LEFT JOIN (SELECT customer_id, COUNT(*) AS cnt FROM notifications
+                           WHERE customer_id = ANY(CAST(:ids AS uuid[])) GROUP BY customer_id) n ON n.customer_id = c.id
+                LEFT JOIN (SELECT customer_id, COUNT(*) AS cnt FROM package_announcements_new
+                           WHERE customer_id = ANY(CAST(:ids AS uuid[])) GROUP BY customer_id) a ON a.customer_id = c.id
+            """), {"ids": batch})
+            rows.extend(dict(row._mapping) for row in result)
+
+        return rows
+
+    def delete_customers(self, db: Session, customer_ids: Sequence[Any]) -> Dict[str, Any]:
+        """
+        Eliminar clientes por lotes: desvincula paquetes y eventos, elimina
+        mensajes, notificaciones y anuncios, y por último los clientes
+
+        En las tablas *_archive (sin llaves foráneas) las referencias al
+        cliente y a sus anuncios quedan en NULL.
+
+        Returns:
+            Dict con los conteos por tabla
+        """
+        totals = {
+            "customers_deleted": 0,
+            "packages_detached": 0,
+            "messages_deleted": 0,
+            "notifications_deleted": 0,
+            "announcements_deleted": 0,
+            "events_unlinked": 0,
+            "archived_rows_detached": 0,
+        }
+        ids = [str(cid) for cid in dict.fromkeys(customer_ids)]
+
+        for batch in _chunks(ids, DELETE_BATCH_SIZE):
+            params = {"ids": batch}
+            try:
+                packages_detached = db.execute(text(
+                    "UPDATE packages SET customer_id = NULL WHERE customer_id = ANY(CAST(:ids AS uuid[]))"
+                ), params).rowcount
+                archived_rows_detached = sum(
+                    db.execute(text(statement), params).rowcount for statement in ARCHIVE_DETACH_STATEMENTS
+                )
+                events_unlinked = db.execute(text(
+                    "UPDATE package_events SET customer_id = NULL WHERE customer_id = ANY(CAST(:ids AS uuid[]))"
+                ), params).rowcount
+                messages_deleted = db.execute(text(
+                    "DELETE FROM messages WHERE customer_id = ANY(CAST(:ids AS uuid[]))"
+                ), params).rowcount
+                # Las notificaciones que apuntan a anuncios del cliente también deben irse
+                notifications_deleted = db.execute(text("""
+                    DELETE FROM notifications
+                    WHERE customer_id = ANY(CAST(:ids AS uuid[]))
+                       OR announcement_id IN (
+                           SELECT id FROM package_announcements_new
+                           WHERE customer_id = ANY(CAST(:ids AS uuid[]))
+                       )
+                """), params).rowcount
+                db.execute(text("""
+                    UPDATE package_events e SET announcement_id = NULL
+                    FROM package_announcements_new a
+                    WHERE e.announcement_id = a.id
+                      AND a.customer_id = ANY(CAST(:ids AS uuid[]))
+                """), params)
+                announcements_deleted = db.execute(text(
+                    "DELETE FROM package_announcements_new WHERE customer_id = ANY(CAST(:ids AS uuid[]))"
+                ), params).rowcount
+                customers_deleted = db.execute(text(
+                    "DELETE FROM customers WHERE id = ANY(CAST(:ids AS uuid[]))"
+                ), params).rowcount
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+
+            totals["customers_deleted"] += customers_deleted
+            totals["packages_detached"] += packages_detached
+            totals["messages_deleted"] += messages_deleted
+            totals["notifications_deleted"] += notifications_deleted
+            totals["announcements_deleted"] += announcements_deleted
+            totals["events_unlinked"] += events_unlinked
+            totals["archived_rows_detached"] += archived_rows_detached
+
+        return totals
+
+    def cleanup_invalid_customers(self, db: Session, customer_ids: Optional[Sequence[Any]] = None) -> Dict[str, Any]:
+        """
+        Limpieza completa de clientes inválidos
+
+        Si no se indican IDs se eliminan todos los clientes que cumplen la
+        condición de inválidos.
+        """
+        if customer_ids is None:
+            customer_ids = self.find_invalid_customer_ids(db)
+
+        summary = self.get_customers_relation_counts(db, customer_ids)
+        totals = self.delete_customers(db, customer_ids)
+
+        logger.info(
+            f"Limpieza de clientes inválidos: {totals['customers_deleted']} eliminados, "
+            f"{totals['packages_detached']} paquetes desvinculados"
+        )
+        return {**totals, "customers": summary}
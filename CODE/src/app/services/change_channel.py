@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+PAQUETES EL CLUB v1.0 - Avisos de Cambio entre Procesos
+Versión: 1.0.0
+Fecha: 2025-11-10
+Autor: Equipo de Desarrollo
+
+Canal pub/sub de Redis para invalidar cachés en memoria de todos los procesos
+(tarifas, plantillas SMS):
+
+- publish() envía la versión nueva con un único cliente Redis por proceso.
+- Cada proceso escucha en un hilo de fondo que se inicia en el primer uso
+  (ensure_listening). El hilo y el cliente se asocian al PID: tras un fork
+  (prefork de Celery, workers de gunicorn) el hijo arranca los suyos en lugar
+  de heredar los del padre, que no existen en el hijo.
+- Al (re)suscribirse se llama on_change(None) para recargar lo que haya
+  cambiado mientras no se escuchaba; los avisos sin versión se ignoran.
+  Si Redis no está disponible, listening es False y el llamador recarga por
+  antigüedad.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ChangeChannel:
+    """Publicación y escucha de avisos de cambio en un canal de Redis"""
+
+    def __init__(
+        self,
+        channel: str,
+        on_change: Callable[[Optional[str]], None],
+        retry_interval: Callable[[], float]
+    ):
+        self.channel = channel
+        self._on_change = on_change
+        self._retry_interval = retry_interval
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+        self._client = None
+        self._listener: Optional[threading.Thread] = None
+        self._listening = False
+
+    # ========================================
+    # ESTADO POR PROCESO
+    # ========================================
+
+    def _ensure_process(self) -> None:
+        """Descartar el hilo y el cliente heredados de otro proceso (fork)"""
+        pid = os.getpid()
+        if self._pid != pid:
+            self._lock = threading.Lock()
+            self._pid = pid
+            self._client = None
+            self._listener = None
+            self._listening = False
+
+    def _redis(self):
+        self._ensure_process()
+        if self._client is None:
+            import redis
+            self._client = redis.from_url(settings.redis_url, decode_responses=True)
+        return self._client
+
+    @property
+    def listening(self) -> bool:
+        """True si este proceso está suscrito al canal"""
+        return self._pid == os.getpid() and self._listening
+
+    # ========================================
+    # PUBLICACIÓN Y ESCUCHA
+    # ========================================
+
+    def publish(self, version: str) -> None:
+        """Avisar a todos los procesos que hay una versión nueva"""
+        try:
+            self._redis().publish(self.channel, json.dumps({"version": version}))
+        except Exception as e:
+            logger.warning(f"No se pudo publicar el cambio en Redis ({self.channel}): {e}")
+
+    def ensure_listening(self) -> None:
+        """Iniciar el hilo de escucha de este proceso si aún no existe"""
+        self._ensure_process()
+        if self._listener is not None:
+            return
+        with self._lock:
+            if self._listener is not None:
+                return
+            self._listener = threading.Thread(
+                target=self._listen, name=f"change-listener:{self.channel}", daemon=True
+            )
+            self._listener.start()
+
+    def _listen(self) -> None:
+        """Escuchar avisos de cambio; reintenta la conexión si Redis se cae"""
+        while True:
+            try:
+                pubsub = self._redis().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                self._listening = True
+                # Recargar por si hubo cambios mientras no se escuchaba
+                self._on_change(None)
+                for message in pubsub.listen():
+                    try:
+                        version = json.loads(message["data"]).get("version")
+                    except (TypeError, ValueError, AttributeError):
+                        version = None
+                    # Un aviso sin versión se trata como "sin cambios"
+                    if version is not None:
+                        self._on_change(version)
+            except Exception as e:
+                logger.warning(f"Escucha de cambios interrumpida ({self.channel}): {e}")
+            self._listening = False
+            time.sleep(self._retry_interval())
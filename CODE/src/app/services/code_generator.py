@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""
+PAQUETES EL CLUB v1.0 - Generación de Códigos sin Colisiones
+Versión: 1.0.0
+Fecha: 2025-11-10
+Autor: Equipo de Desarrollo
+
+Códigos de acceso, números de tracking (PAP...) y códigos de consulta
+públicos derivados de secuencias de PostgreSQL (migración f2c6a9e4d187) con
+una permutación con clave: una red de Feistel sobre los dígitos del alfabeto
+del código. La permutación es biyectiva, así que valores distintos de la
+secuencia dan códigos distintos sin consultar la tabla, y sin la clave
+(CODE_GENERATOR_KEY) el código siguiente no se deduce de los anteriores.
+
+- Código de acceso y número de tracking: un nextval por código.
+- Código de consulta (4 caracteres): el espacio es pequeño y ya contiene
+  códigos aleatorios anteriores a este servicio, así que los códigos se
+  toman de tracking_code_pool con un único DELETE ... RETURNING (SKIP
+  LOCKED). La reposición (tarea refill_tracking_code_pool) genera códigos
+  de la secuencia y descarta, en una sola consulta, los que ya estén en uso.
+"""
+
+import hashlib
+import hmac
+import logging
+from datetime import datetime
+from functools import lru_cache
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.utils.exceptions import PackageException
+
+logger = logging.getLogger(__name__)
+
+# Sin 0 ni O para evitar confusión al dictar el código
+TRACKING_CODE_ALPHABET = "ABCDEFGHIJKLMNPQRSTUVWXYZ123456789"
+ACCESS_CODE_ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+
+ACCESS_CODE_LENGTH = 8
+TRACKING_NUMBER_SUFFIX_LENGTH = 4
+
+FEISTEL_ROUNDS = 8
+
+# Códigos extra al reponer el pool desde una petición que lo encontró vacío
+INLINE_REFILL_MARGIN = 100
+MAX_REFILL_ROUNDS = 10
+
+NEXT_ACCESS_CODE_SQL = text("SELECT nextval('access_code_seq')")
+NEXT_TRACKING_NUMBER_SQL = text("SELECT nextval('tracking_number_seq')")
+
+NEXTVAL_BATCH_SQL = text("""
+    SELECT nextval('tracking_code_seq') AS position
+    FROM generate_series(1, :count)
+""")
+
+CLAIM_TRACKING_CODES_SQL = text("""
+    DELETE FROM tracking_code_pool
+    WHERE position IN (
+        SELECT position
+        FROM tracking_code_pool
+        ORDER BY position
+        LIMIT :count
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING code
+""")
+
+# Descarta los códigos que ya usa un anuncio o un paquete (activo o archivado)
+INSERT_POOL_SQL = text("""
+    INSERT INTO tracking_code_pool (position, code)
+    SELECT c.position, c.code
+    FROM unnest(CAST(:positions AS bigint[]), CAST(:codes AS varchar[])) AS c(position, code)
+    WHERE NOT EXISTS (SELECT 1 FROM package_announcements_new a WHERE a.tracking_code = c.code)
+      AND NOT EXISTS (SELECT 1 FROM packages p WHERE p.tracking_number = c.code)
+      AND NOT EXISTS (SELECT 1 FROM packages_archive p WHERE p.tracking_number = c.code)
+    ON CONFLICT DO NOTHING
+""")
+
+POOL_SIZE_SQL = text("SELECT count(*) FROM tracking_code_pool")
+
+
+class FeistelCodec:
+    """
+    Biyección con clave entre [0, base^width) y los códigos de `width`
+    caracteres del alfabeto
+
+    El número se divide en dos mitades de base^(width // 2) y
+    base^(width - width // 2) valores; cada ronda suma a una mitad, módulo su
+    tamaño, un HMAC-SHA256 de la otra. Cada ronda es invertible, así que la
+    composición es una permutación del espacio completo para cualquier
+    ancho, sin ciclos de rechazo.
+    """
+
+    __slots__ = ("alphabet", "width", "size", "_left_size", "_right_size", "_mac")
+
+    def __init__(self, alphabet: str, width: int, key: bytes):
+        base = len(alphabet)
+        self.alphabet = alphabet
+        self.width = width
+        self._left_size = base ** (width // 2)
+        self._right_size = base ** (width - width // 2)
+        self.size = self._left_size * self._right_size
+        self._mac = hmac.new(key, digestmod=hashlib.sha256)
+
+    def _round(self, index: int, value: int, modulus: int) -> int:
+        mac = self._mac.copy()
+        mac.update(index.to_bytes(1, "big") + value.to_bytes(8, "big"))
+        return int.from_bytes(mac.digest()[:8], "big") % modulus
+
+    def permute(self, number: int) -> int:
+        if not 0 <= number < self.size:
+            raise ValueError(f"{number} fuera del espacio de {self.size} códigos")
+        left, right = divmod(number, self._right_size)
+        for index in range(FEISTEL_ROUNDS):
+            if index % 2 == 0:
+                left = (left + self._round(index, right, self._left_size)) % self._left_size
+            else:
+                right = (right + self._round(index, left, self._right_size)) % self._right_size
+        return left * self._right_size + right
+
+    def encode(self, number: int) -> str:
+        value = self.permute(number)
+        base = len(self.alphabet)
+        chars = []
+        for _ in range(self.width):
+            value, digit = divmod(value, base)
+            chars.append(self.alphabet[digit])
+        return "".join(reversed(chars))
+
+
+@lru_cache(maxsize=None)
+def get_codec(kind: str, alphabet: str, width: int) -> FeistelCodec:
+    """Codec por tipo de código y ancho, con una clave derivada para cada uno"""
+    secret = (settings.code_generator_key or settings.secret_key).encode()
+    key = hmac.new(secret, f"{kind}:{width}".encode(), hashlib.sha256).digest()
+    return FeistelCodec(alphabet, width, key)
+
+
+class CodeGenerator:
+    """Códigos únicos e impredecibles para paquetes y anuncios"""
+
+    @staticmethod
+    def next_access_code(db: Session) -> str:
+        """Código de acceso de 8 caracteres (un nextval)"""
+        number = db.execute(NEXT_ACCESS_CODE_SQL).scalar()
+        return get_codec("access_code", ACCESS_CODE_ALPHABET, ACCESS_CODE_LENGTH).encode(number)
+
+    @staticmethod
+    def next_tracking_number(db: Session, now: Optional[datetime] = None) -> str:
+        """
+        PAP + YYYYMMDD + 4 caracteres (un nextval). El sufijo recorre sus
+        36^4 valores antes de repetir, así que la fecha solo se repite con más
+        de 1,6 millones de números emitidos en el mismo día.
+        """
+        codec = get_codec("tracking_number", ACCESS_CODE_ALPHABET, TRACKING_NUMBER_SUFFIX_LENGTH)
+        number = db.execute(NEXT_TRACKING_NUMBER_SQL).scalar()
+        today = (now or datetime.utcnow()).strftime('%Y%m%d')
+        return f"PAP{today}{codec.encode(number % codec.size)}"
+
+    @classmethod
+    def claim_tracking_code(cls, db: Session) -> str:
+        """Código de consulta público tomado del pool"""
+        return cls.claim_tracking_codes(db, 1)[0]
+
+    @classmethod
+    def claim_tracking_codes(cls, db: Session, count: int) -> List[str]:
+        """
+        `count` códigos de consulta en una consulta. Quedan reservados con la
+        transacción del llamador: si esta se revierte, vuelven al pool.
+        """
+        codes = [row.code for row in db.execute(CLAIM_TRACKING_CODES_SQL, {"count": count})]
+        rounds = 0
+        while len(codes) < count:
+            # Pool vacío (o tomado por transacciones concurrentes): reponer en
+            # la transacción actual y tomar los que falten
+            rounds += 1
+            if rounds > MAX_REFILL_ROUNDS or cls._generate_pool_codes(db, count - len(codes) + INLINE_REFILL_MARGIN) is None:
+                raise PackageException(
+                    "No hay códigos de consulta disponibles; aumente TRACKING_CODE_LENGTH",
+                    status_code=503
+                )
+            codes.extend(row.code for row in db.execute(CLAIM_TRACKING_CODES_SQL, {"count": count - len(codes)}))
+        return codes
+
+    @classmethod
+    def refill_tracking_code_pool(cls, db: Session, target: Optional[int] = None) -> int:
+        """Completar el pool hasta `target` códigos; devuelve los agregados"""
+        target = target or settings.tracking_code_pool_size
+        added = 0
+        for _ in range(MAX_REFILL_ROUNDS):
+            missing = target - db.execute(POOL_SIZE_SQL).scalar()
+            if missing <= 0:
+                break
+            inserted = cls._generate_pool_codes(db, missing)
+            db.commit()
+            if inserted is None:
+                break
+            added += inserted
+        return added
+
+    @staticmethod
+    def _generate_pool_codes(db: Session, count: int) -> Optional[int]:
+        """
+        Insertar en el pool los códigos de `count` valores de la secuencia que
+        no estén en uso; None si la secuencia ya recorrió todo el espacio
+        """
+        codec = get_codec("tracking_code", TRACKING_CODE_ALPHABET, settings.tracking_code_length)
+        positions = [
+            row.position for row in db.execute(NEXTVAL_BATCH_SQL, {"count": count})
+            if row.position < codec.size
+        ]
+        if not positions:
+            logger.error(
+                f"Secuencia de códigos de consulta agotada para {codec.width} caracteres ({codec.size} códigos)"
+            )
+            return None
+        result = db.execute(INSERT_POOL_SQL, {
+            "positions": positions,
+            "codes": [codec.encode(position) for position in positions]
+        })
+        return result.rowcount or 0
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+PAQUETES EL CLUB v1.0 - Contadores de Paquetes por Cliente
+Versión: 1.0.0
+Fecha: 2025-11-10
+Autor: Equipo de Desarrollo
+
+Los contadores de customers (total_packages, total_packages_received,
+total_packages_delivered, total_packages_cancelled, active_announced_packages,
+active_received_packages y total_spent) los mantiene el trigger
+trg_packages_customer_counters (migración c3f1a8d2e907) en la misma
+transacción que cada cambio de packages.
+
+Este servicio los recalcula desde packages y packages_archive (los paquetes
+archivados siguen contando) por lotes de clientes (orden por id): carga
+inicial después de la migración y reconciliación. Cada lote
+bloquea primero sus clientes (FOR UPDATE) y después calcula: una transición
+concurrente o ya está incluida en el cálculo o aplica su diferencia después
+del commit del lote, así que no se pierden ni duplican cambios.
+"""
+
+import logging
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# callback(clientes_procesados, filas_actualizadas)
+ProgressCallback = Callable[[int, int], None]
+
+LOCK_CUSTOMER_BATCH_SQL = text("""
+    SELECT id
+    FROM customers
+    WHERE id > :after_id
+    ORDER BY id
+    LIMIT :batch_size
+    FOR UPDATE
+""")
+
+# Misma regla que el trigger: received = pasó por recepción, spent = entregados en centavos
+RECOMPUTE_COUNTERS_SQL = text("""
+    UPDATE customers AS c
+    SET total_packages = s.total,
+        active_announced_packages = s.announced,
+        active_received_packages = s.received_active,
+        total_packages_delivered = s.delivered,
+        total_packages_cancelled = s.cancelled,
+        total_packages_received = s.received,
+        total_spent = s.spent
+    FROM (
+        SELECT ids.id,
+               count(p.id) AS total,
+               count(p.id) FILTER (WHERE p.status = 'ANUNCIADO') AS announced,
+               count(p.id) FILTER (WHERE p.status = 'RECIBIDO') AS received_active,
+               count(p.id) FILTER (WHERE p.status = 'ENTREGADO') AS delivered,
+               count(p.id) FILTER (WHERE p.status = 'CANCELADO') AS cancelled,
+               count(p.id) FILTER (WHERE p.received_at IS NOT NULL) AS received,
+               COALESCE(sum(round(p.total_amount * 100)) FILTER (WHERE p.status = 'ENTREGADO'), 0)::integer AS spent
+        FROM unnest(CAST(:ids AS uuid[])) AS ids(id)
+        LEFT JOIN (
+            SELECT id, customer_id, status, received_at, total_amount FROM packages
+            UNION ALL
+            SELECT id, customer_id, status, received_at, total_amount FROM packages_archive
+        ) p ON p.customer_id = ids.id
+        GROUP BY ids.id
+    ) AS s
+    WHERE c.id = s.id
+      AND (c.total_packages, c.active_announced_packages, c.active_received_packages,
+           c.total_packages_delivered, c.total_packages_cancelled, c.total_packages_received, c.total_spent)
+          IS DISTINCT FROM (s.total, s.announced, s.received_active, s.delivered, s.cancelled, s.received, s.spent)
+""")
+
+
+class CustomerCounterService:
+    """Carga y reconciliación de los contadores de paquetes por cliente"""
+
+    def backfill(
+        self,
+        db: Session,
+        batch_size: Optional[int] = None,
+        progress_callback: Optional[ProgressCallback] = None
+    ) -> Dict[str, Any]:
+        """Recalcular los contadores de todos los clientes, un commit por lote"""
+        batch_size = batch_size or settings.customer_counters_batch_size
+
+        after_id = "00000000-0000-0000-0000-000000000000"
+        processed = 0
+        updated_count = 0
+        while True:
+            ids = [str(row.id) for row in db.execute(
+                LOCK_CUSTOMER_BATCH_SQL, {"after_id": after_id, "batch_size": batch_size}
+            )]
+            if not ids:
+                db.rollback()
+                break
+            result = db.execute(RECOMPUTE_COUNTERS_SQL, {"ids": ids})
+            db.commit()
+
+            processed += len(ids)
+            updated_count += result.rowcount or 0
+            after_id = ids[-1]
+            if progress_callback:
+                progress_callback(processed, updated_count)
+
+        logger.info(f"Contadores de clientes recalculados: {updated_count} de {processed} clientes corregidos")
+        return {"customers_processed": processed, "updated_count": updated_count}
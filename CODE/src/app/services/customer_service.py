@@ -174,19 +174,19 @@ class CustomerService(BaseService[Customer, CustomerCreate, CustomerUpdate]):
             if search_filters:
                 base_query = base_query.filter(or_(*search_filters))
 
-        # Obtener total
-        total = base_query.count()
-
-        # Ordenar por cantidad total de paquetes (suma de todos los estados)
-        # Importar Package para hacer el join
-        from app.models.package import Package
-        
-        # Hacer un left join con packages y contar por cliente
-        customers_with_counts = base_query.outerjoin(Package).group_by(Customer.id).order_by(
-            desc(func.count(Package.id))
+        # Ordenar por cantidad total de paquetes (contador mantenido por trigger,
+        # índice ix_customers_total_packages) con el id como desempate estable
+        customers = base_query.order_by(
+            desc(Customer.total_packages), Customer.id
         ).offset(skip).limit(limit).all()
 
-        return customers_with_counts, total
+        # El total solo requiere un COUNT si la página no alcanza para deducirlo
+        if len(customers) < limit and (customers or skip == 0):
+            total = skip + len(customers)
+        else:
+            total = base_query.with_entities(func.count(Customer.id)).scalar()
+
+        return customers, total
 
     def get_customer_stats(self, db: Session) -> CustomerStatsResponse:
         """Obtener estadísticas generales de clientes"""
@@ -264,8 +264,7 @@ class CustomerService(BaseService[Customer, CustomerCreate, CustomerUpdate]):
         for announcement in duplicate.announcements:
             announcement.customer_id = primary.id
 
-        # Actualizar contadores
-        primary.update_package_counts()
+        # Los contadores de ambos clientes los ajusta el trigger de packages
 
         # Eliminar cliente duplicado
         db.delete(duplicate)
@@ -378,8 +377,9 @@ class CustomerService(BaseService[Customer, CustomerCreate, CustomerUpdate]):
 
     def get_customers_with_packages(self, db: Session, skip: int = 0, limit: int = 50) -> List[Customer]:
         """Obtener clientes que tienen paquetes"""
-        from app.models.package import Package
-        return db.query(Customer).join(Package).distinct().offset(skip).limit(limit).all()
+        return db.query(Customer).filter(Customer.total_packages > 0).order_by(
+            desc(Customer.total_packages), Customer.id
+        ).offset(skip).limit(limit).all()
 
     def get_vip_customers(self, db: Session, skip: int = 0, limit: int = 50) -> List[Customer]:
         """Obtener clientes VIP"""
@@ -103,7 +103,8 @@ class EmailService(BaseService[Notification, Any, Any]):
 
         try:
             server = smtplib.SMTP(settings.smtp_host, settings.smtp_port, timeout=10)
-            server.starttls()
+            if settings.smtp_use_tls:
+                server.starttls()
             server.login(settings.smtp_user, settings.smtp_password)
             server.quit()
             
@@ -520,7 +521,8 @@ class EmailService(BaseService[Notification, Any, Any]):
 
             # Enviar email
             server = smtplib.SMTP(settings.smtp_host, settings.smtp_port, timeout=30)
-            server.starttls()
+            if settings.smtp_use_tls:
+                server.starttls()
             server.login(settings.smtp_user, settings.smtp_password)
             server.sendmail(settings.smtp_from_email, recipient, msg.as_string())
             server.quit()
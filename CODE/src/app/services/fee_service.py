@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+PAQUETES EL CLUB v1.0 - Motor de Tarifas en SQL
+Versión: 1.0.0
+Fecha: 2025-11-10
+Autor: Equipo de Desarrollo
+
+Las tarifas (base por tipo, almacenamiento por días completos y total) se
+calculan en la base de datos:
+
+- Lectura: expresiones SQLAlchemy sobre la función package_storage_days
+  (migración e3a1c7d90b42) para que listados y reportes obtengan los días
+  y montos ya calculados en la consulta.
+- Escritura: un único UPDATE ... FROM por rango de IDs que solo toca las
+  filas cuyos montos cambian, con commit y progreso por lote. Los paquetes
+  ENTREGADO y CANCELADO conservan los montos con que se cerraron.
+"""
+
+import logging
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import case, cast, func, literal, text, Integer, Numeric
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.package import Package, PackageType
+from app.services.rate_provider import get_rates
+from app.utils.datetime_utils import get_colombia_now
+
+logger = logging.getLogger(__name__)
+
+# callback(procesados_hasta_id, ultimo_id, filas_actualizadas)
+ProgressCallback = Callable[[int, int, int], None]
+
+RECALCULATE_FEES_SQL = text("""
+    UPDATE packages AS p
+    SET base_fee = f.base_fee,
+        storage_fee = f.storage_fee,
+        total_amount = f.base_fee + f.storage_fee,
+        updated_at = :now
+    FROM (
+        SELECT
+            id,
+            CASE WHEN package_type::text = 'EXTRA_DIMENSIONADO'
+                THEN CAST(:rate_extra AS numeric(10, 2))
+                ELSE CAST(:rate_normal AS numeric(10, 2))
+            END AS base_fee,
+            CASE WHEN status::text = 'RECIBIDO'
+                THEN package_storage_days(received_at, delivered_at, :as_of) * CAST(:storage_rate AS numeric(10, 2))
+                ELSE storage_fee
+            END AS storage_fee
+        FROM packages
+        WHERE id BETWEEN :first_id AND :last_id
+          AND status::text IN ('ANUNCIADO', 'RECIBIDO')
+    ) AS f
+    WHERE p.id = f.id
+      AND (p.base_fee, p.storage_fee, p.total_amount)
+          IS DISTINCT FROM (f.base_fee, f.storage_fee, f.base_fee + f.storage_fee)
+""")
+
+
+class FeeService:
+    """Cálculo de tarifas de paquetes expresado en SQL"""
+
+    # ========================================
+    # EXPRESIONES DE LECTURA
+    # ========================================
+
+    @staticmethod
+    def storage_days_expr(as_of=None):
+        """Días de almacenamiento (package_storage_days) como expresión de columna"""
+        return func.package_storage_days(
+            Package.received_at,
+            Package.delivered_at,
+            as_of if as_of is not None else func.now(),
+            type_=Integer
+        )
+
+    @staticmethod
+    def base_fee_expr():
+        """Tarifa base según el tipo de paquete, tomada del proveedor de tarifas"""
+        rates = get_rates()
+        return case(
+            (Package.package_type == PackageType.EXTRA_DIMENSIONADO,
+             literal(rates.base_fee(PackageType.EXTRA_DIMENSIONADO), Numeric(10, 2))),
+            else_=literal(rates.base_fee(PackageType.NORMAL), Numeric(10, 2))
+        )
+
+    @classmethod
+    def storage_fee_expr(cls, as_of=None):
+        """Tarifa de almacenamiento: días completos por la tarifa diaria"""
+        return cast(cls.storage_days_expr(as_of), Numeric(10, 2)) * literal(
+            get_rates().storage_per_day, Numeric(10, 2)
+        )
+
+    @classmethod
+    def fee_columns(cls, as_of=None):
+        """
+        Columnas etiquetadas (storage_days, storage_fee, total_amount) para
+        agregar a una consulta de Package con add_columns
+        """
+        storage_fee = cls.storage_fee_expr(as_of)
+        return (
+            cls.storage_days_expr(as_of).label("storage_days"),
+            storage_fee.label("storage_fee"),
+            (func.coalesce(Package.base_fee, 0) + storage_fee).label("total_amount"),
+        )
+
+    # ========================================
+    # RECÁLCULO MASIVO
+    # ========================================
+
+    def recalculate_fees(
+        self,
+        db: Session,
+        chunk_size: Optional[int] = None,
+        progress_callback: Optional[ProgressCallback] = None,
+        as_of=None
+    ) -> Dict[str, Any]:
+        """
+        Recalcular base_fee, storage_fee y total_amount de los paquetes abiertos
+
+        Solo se tocan los ANUNCIADO y RECIBIDO, y el almacenamiento solo se
+        recalcula para los RECIBIDO; en ENTREGADO/CANCELADO quedan los montos
+        congelados al cerrar el paquete.
+        """
+        chunk_size = chunk_size or settings.fee_recalculation_chunk_size
+        as_of = as_of or get_colombia_now()
+
+        first_id, last_id = db.query(func.min(Package.id), func.max(Package.id)).one()
+        if first_id is None:
+            return {"updated_count": 0, "chunks": 0, "last_id": None}
+
+        rates = get_rates()
+        params = {
+            "rate_normal": rates.base_fee(PackageType.NORMAL),
+            "rate_extra": rates.base_fee(PackageType.EXTRA_DIMENSIONADO),
+            "storage_rate": rates.storage_per_day,
+            "as_of": as_of,
+            "now": as_of,
+        }
+
+        updated_count = 0
+        chunks = 0
+        for start in range(first_id, last_id + 1, chunk_size):
+            end = min(start + chunk_size - 1, last_id)
+            result = db.execute(RECALCULATE_FEES_SQL, {**params, "first_id": start, "last_id": end})
+            db.commit()
+
+            updated_count += result.rowcount or 0
+            chunks += 1
+            if progress_callback:
+                progress_callback(end, last_id, updated_count)
+
+        logger.info(f"Recálculo de tarifas completado: {updated_count} paquetes actualizados en {chunks} lotes")
+        return {"updated_count": updated_count, "chunks": chunks, "last_id": last_id}
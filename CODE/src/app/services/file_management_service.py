@@ -22,6 +22,9 @@ from app.models.file_upload import FileUpload, FileType
 from app.models.user import User
 from app.schemas.file_upload import FileUploadCreate, FileUploadResponse
 from app.utils.datetime_utils import get_colombia_now
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 class FileFolder:
@@ -198,7 +201,7 @@ class FileManagementService(BaseService[FileUpload, FileUploadCreate, dict]):
                 return str(thumbnail_path.relative_to(self.upload_dir))
 
         except Exception as e:
-            print(f"Error creando thumbnail: {e}")
+            logger.error(f"Error creando thumbnail: {e}")
             return None
 
     def _extract_metadata(self, file_content: bytes, filename: str, file_type: FileType) -> Dict[str, Any]:
@@ -238,7 +241,7 @@ class FileManagementService(BaseService[FileUpload, FileUploadCreate, dict]):
                 shutil.copy2(source_path, backup_path)
 
         except Exception as e:
-            print(f"Error creando backup de versión: {e}")
+            logger.error(f"Error creando backup de versión: {e}")
 
     # === GESTIÓN DE CARPETAS ===
 
@@ -14,7 +14,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func
 
 from .base import BaseService
-from .s3_service import S3Service
+from .registry import get_s3_service
 from app.models.file_upload import FileUpload, FileType
 from app.schemas.file_upload import FileUploadCreate, FileUploadResponse
 
@@ -28,7 +28,7 @@ class FileUploadService(BaseService[FileUpload, FileUploadCreate, dict]):
         super().__init__(FileUpload)
         self.upload_dir = Path(upload_dir)
         self.upload_dir.mkdir(exist_ok=True)
-        self.s3_service = S3Service()
+        self.s3_service = get_s3_service()
 
     def create_file_upload(self, db: Session, file_upload_in: FileUploadCreate, uploaded_by: int) -> FileUpload:
         """Crear registro de file upload"""
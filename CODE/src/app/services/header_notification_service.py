@@ -14,6 +14,9 @@ from datetime import datetime, timedelta
 from app.models.message import Message, MessageStatus
 from app.models.user import User
 from app.utils.datetime_utils import get_colombia_now
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 class HeaderNotificationService:
@@ -49,7 +52,7 @@ class HeaderNotificationService:
             
             return count
         except Exception as e:
-            print(f"Error obteniendo contador de mensajes no leídos: {e}")
+            logger.error(f"Error obteniendo contador de mensajes no leídos: {e}")
             return 0
 
     def get_pending_messages_count(self, db: Session, user_role: Optional[str] = None) -> int:
@@ -84,7 +87,7 @@ class HeaderNotificationService:
             count = query.count()
             return count
         except Exception as e:
-            print(f"Error obteniendo contador de mensajes pendientes: {e}")
+            logger.error(f"Error obteniendo contador de mensajes pendientes: {e}")
             return 0
 
     def get_notification_badge_data(self, db: Session, user_id: int, user_role: Optional[str] = None) -> Dict[str, Any]:
@@ -121,7 +124,7 @@ class HeaderNotificationService:
                 "badge_class": self._get_badge_class(total_notifications)
             }
         except Exception as e:
-            print(f"Error obteniendo datos del badge de notificaciones: {e}")
+            logger.error(f"Error obteniendo datos del badge de notificaciones: {e}")
             return {
                 "unread_messages": 0,
                 "pending_messages": 0,
@@ -132,6 +135,45 @@ class HeaderNotificationService:
                 "badge_class": ""
             }
 
+    def get_notification_count(self, db: Session, user_id: int, user_role: Optional[str] = None) -> Dict[str, Any]:
+        """Contador del badge de mensajes (respuesta de /api/header/notifications/count)"""
+        badge_data = self.get_notification_badge_data(db, user_id, user_role)
+        return {
+            "count": badge_data["total_notifications"],
+            "show_badge": badge_data["show_badge"],
+            "badge_text": badge_data["badge_text"],
+            "badge_class": badge_data["badge_class"]
+        }
+
+    def get_announced_packages_count(self, db: Session) -> int:
+        """Paquetes en estado ANUNCIADO más anuncios activos aún no procesados"""
+        from app.models.announcement_new import PackageAnnouncementNew
+        from app.models.package import Package, PackageStatus
+
+        # Contar paquetes en estado ANUNCIADO
+        packages_announced = db.query(Package).filter(Package.status == PackageStatus.ANUNCIADO).count()
+
+        # Contar anuncios no procesados y activos
+        announcements_not_processed = db.query(PackageAnnouncementNew).filter(
+            PackageAnnouncementNew.is_processed == False,
+            PackageAnnouncementNew.is_active == True
+        ).count()
+
+        return packages_announced + announcements_not_processed
+
+    def get_header_counts(self, db: Session, user_id: int, user_role: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Contadores iniciales del header para incrustar en el HTML
+
+        Mismo formato que las respuestas de /api/header/notifications/count y
+        /api/header/packages/announced/count, de modo que base.html los pinta
+        sin hacer la primera consulta.
+        """
+        return {
+            "notifications": self.get_notification_count(db, user_id, user_role),
+            "packages_announced": {"count": self.get_announced_packages_count(db)}
+        }
+
     def _get_badge_class(self, count: int) -> str:
         """
         Obtener clase CSS para el badge según el número de notificaciones
@@ -180,7 +222,7 @@ class HeaderNotificationService:
                 for msg in messages
             ]
         except Exception as e:
-            print(f"Error obteniendo vista previa de mensajes: {e}")
+            logger.error(f"Error obteniendo vista previa de mensajes: {e}")
             return []
 
     def mark_all_as_read(self, db: Session, user_id: int) -> bool:
@@ -209,6 +251,6 @@ class HeaderNotificationService:
             db.commit()
             return updated > 0
         except Exception as e:
-            print(f"Error marcando mensajes como leídos: {e}")
+            logger.error(f"Error marcando mensajes como leídos: {e}")
             db.rollback()
             return False
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+PAQUETES EL CLUB v1.0 - Token de Liwa Compartido en Redis
+Versión: 1.0.0
+Fecha: 2025-11-10
+Autor: Equipo de Desarrollo
+
+Un único token de autenticación de Liwa.co para todos los workers (uvicorn y
+Celery):
+
+- El token vive en Redis con su vencimiento; cada proceso guarda además una
+  copia local para no consultar Redis en cada SMS.
+- Renovación single-flight: solo el proceso que obtiene el lock
+  (SET NX con vencimiento) hace el login; los demás esperan a que el token
+  nuevo aparezca en Redis.
+- Renovación proactiva: dentro del margen previo al vencimiento, quien obtenga
+  el lock renueva y los demás siguen usando el token vigente.
+- invalidate() descarta el token tras un 401, solo si nadie lo reemplazó ya.
+- Sin Redis se degrada a la caché local del proceso.
+"""
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from typing import Awaitable, Callable, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+TOKEN_KEY_PREFIX = "paqueteria:liwa:token"
+
+# Borrar la clave solo si aún contiene el valor esperado
+_COMPARE_AND_DELETE = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class LiwaTokenLease:
+    """Token de Liwa compartido entre procesos con renovación coordinada"""
+
+    def __init__(self):
+        self._client = None
+        self._local: dict = {}  # account -> (token, expires_at)
+
+    # ========================================
+    # REDIS
+    # ========================================
+
+    def _redis(self):
+        if self._client is None:
+            import redis
+            self._client = redis.from_url(settings.redis_url, decode_responses=True)
+        return self._client
+
+    @staticmethod
+    def _token_key(account: str) -> str:
+        return f"{TOKEN_KEY_PREFIX}:{account}"
+
+    def _read_shared(self, account: str) -> Optional[Tuple[str, float]]:
+        raw = self._redis().get(self._token_key(account))
+        if not raw:
+            return None
+        try:
+            data = json.loads(raw)
+            return data["token"], float(data["expires_at"])
+        except (TypeError, ValueError, KeyError):
+            return None
+
+    def _write_shared(self, account: str, token: str, expires_at: float) -> None:
+        ttl = max(1, int(expires_at - time.time()))
+        self._redis().set(
+            self._token_key(account),
+            json.dumps({"token": token, "expires_at": expires_at}),
+            ex=ttl
+        )
+
+    def _acquire_lock(self, account: str) -> Optional[str]:
+        owner = uuid.uuid4().hex
+        acquired = self._redis().set(
+            f"{self._token_key(account)}:lock", owner,
+            nx=True, ex=settings.liwa_token_lock_timeout
+        )
+        return owner if acquired else None
+
+    def _release_lock(self, account: str, owner: str) -> None:
+        try:
+            self._redis().eval(_COMPARE_AND_DELETE, 1, f"{self._token_key(account)}:lock", owner)
+        except Exception as e:
+            logger.warning(f"No se pudo liberar el lock del token Liwa: {e}")
+
+    # ========================================
+    # API
+    # ========================================
+
+    @staticmethod
+    def _is_fresh(entry: Optional[Tuple[str, float]], now: float) -> bool:
+        return bool(entry) and now < entry[1] - settings.liwa_token_refresh_margin
+
+    @staticmethod
+    def _is_valid(entry: Optional[Tuple[str, float]], now: float) -> bool:
+        return bool(entry) and now < entry[1]
+
+    async def get_token(self, account: str, authenticate: Callable[[], Awaitable[str]]) -> str:
+        """
+        Obtener un token válido para la cuenta, autenticando solo si hace falta
+
+        authenticate: corrutina que hace el login contra Liwa y devuelve el token
+        """
+        now = time.time()
+        local = self._local.get(account)
+        if self._is_fresh(local, now):
+            return local[0]
+
+        try:
+            shared = self._read_shared(account)
+        except Exception as e:
+            logger.warning(f"Redis no disponible para el token Liwa, usando caché local: {e}")
+            if self._is_valid(local, now):
+                return local[0]
+            return await self._authenticate(account, authenticate, share=False)
+
+        if self._is_fresh(shared, now):
+            self._local[account] = shared
+            return shared[0]
+
+        owner = self._acquire_lock(account)
+        if owner:
+            try:
+                # Otro proceso pudo renovar entre la lectura y el lock
+                shared = self._read_shared(account)
+                if self._is_fresh(shared, time.time()):
+                    self._local[account] = shared
+                    return shared[0]
+                return await self._authenticate(account, authenticate)
+            finally:
+                self._release_lock(account, owner)
+
+        # Otro proceso está renovando: el token vigente sigue sirviendo
+        if self._is_valid(shared, now):
+            self._local[account] = shared
+            return shared[0]
+        return await self._wait_for_refresh(account, authenticate)
+
+    async def _wait_for_refresh(self, account: str, authenticate: Callable[[], Awaitable[str]]) -> str:
+        """Esperar el token que está obteniendo otro proceso"""
+        deadline = time.monotonic() + settings.liwa_token_lock_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+            try:
+                shared = self._read_shared(account)
+            except Exception as e:
+                logger.warning(f"Redis no disponible esperando el token Liwa: {e}")
+                break
+            if self._is_valid(shared, time.time()):
+                self._local[account] = shared
+                return shared[0]
+        else:
+            logger.warning("Tiempo de espera agotado esperando el token Liwa de otro proceso")
+        return await self._authenticate(account, authenticate)
+
+    async def _authenticate(self, account: str, authenticate: Callable[[], Awaitable[str]], share: bool = True) -> str:
+        token = await authenticate()
+        expires_at = time.time() + settings.liwa_token_ttl
+        self._local[account] = (token, expires_at)
+        if share:
+            try:
+                self._write_shared(account, token, expires_at)
+            except Exception as e:
+                logger.warning(f"No se pudo guardar el token Liwa en Redis: {e}")
+        logger.info("Token Liwa renovado", extra={"account": account})
+        return token
+
+    def current(self, account: str) -> Optional[Tuple[str, float]]:
+        """Token compartido vigente y su vencimiento (epoch), para diagnóstico"""
+        shared = self._read_shared(account)
+        return shared if self._is_valid(shared, time.time()) else None
+
+    def invalidate(self, account: str, token: Optional[str] = None) -> None:
+        """
+        Descartar el token (p. ej. tras un 401)
+
+        Si se indica token, la copia compartida solo se borra si sigue siendo ese
+        token, para no descartar uno que otro proceso acaba de renovar.
+        """
+        local = self._local.get(account)
+        if token is None or (local and local[0] == token):
+            self._local.pop(account, None)
+        try:
+            key = self._token_key(account)
+            if token is None:
+                self._redis().delete(key)
+                return
+            raw = self._redis().get(key)
+            if raw and json.loads(raw).get("token") == token:
+                self._redis().eval(_COMPARE_AND_DELETE, 1, key, raw)
+        except Exception as e:
+            logger.warning(f"No se pudo invalidar el token Liwa en Redis: {e}")
+
+
+# Instancia global compartida por todos los SMSService del proceso
+liwa_token_lease = LiwaTokenLease()
@@ -104,9 +104,9 @@ class NotificationService(BaseService[Notification, NotificationCreate, dict]):
             bool: True si se envió exitosamente
         """
         try:
-            from app.services.email_service import EmailService
+            from app.services.registry import get_email_service
             
-            email_service = EmailService()
+            email_service = get_email_service()
             
             # Determinar URL base según ambiente (NUNCA hardcodear URLs)
             base_url = (
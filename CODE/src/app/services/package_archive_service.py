@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""
+PAQUETES EL CLUB v1.0 - Archivo de Paquetes Terminales
+Versión: 1.0.0
+Fecha: 2025-11-10
+Autor: Equipo de Desarrollo
+
+Separación caliente/frío de packages: los paquetes ENTREGADO y CANCELADO más
+viejos que PACKAGE_ARCHIVE_AFTER_DAYS se mueven, con su historial, mensajes,
+notificaciones y metadatos de archivos, a las tablas *_archive (migración
+e7a3c9d1b524). Las consultas operativas (listados, ocupación de posiciones,
+conteos del encabezado) trabajan así sobre un conjunto pequeño que cabe en
+shared_buffers.
+
+Cada lote es una transacción: toma los paquetes con FOR UPDATE SKIP LOCKED y
+por cada tabla ejecuta un único DELETE ... RETURNING encadenado a su INSERT
+en el archivo. Si la ejecución se interrumpe, los lotes confirmados quedan
+archivados y la siguiente ejecución continúa con los restantes.
+
+Los contadores de clientes no cambian (SET LOCAL app.skip_customer_counters):
+son históricos e incluyen los paquetes archivados.
+
+Reportes y métricas históricas leen la tabla de trabajo junto con su archivo
+con with_archive(); sin eso, un período anterior a PACKAGE_ARCHIVE_AFTER_DAYS
+perdería casi todos los paquetes entregados y cancelados.
+"""
+
+import logging
+from datetime import timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import or_, select, text, union_all
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.message import Message
+from app.models.notification import Notification
+from app.models.package import Package
+from app.models.package_archive import ArchivedMessage, ArchivedNotification, ArchivedPackage
+from app.utils.datetime_utils import get_colombia_now
+
+logger = logging.getLogger(__name__)
+
+# callback(paquetes_archivados, lotes)
+ProgressCallback = Callable[[int, int], None]
+
+# Tabla de trabajo -> columna que la vincula al paquete; las dependientes van
+# antes que packages por sus llaves foráneas (el outbox se borra en cascada)
+ARCHIVED_TABLES = (
+    ("package_history", "package_id"),
+    ("messages", "package_id"),
+    ("notifications", "package_id"),
+    ("file_uploads", "package_id"),
+    ("packages", "id"),
+)
+
+SELECT_TERMINAL_BATCH_SQL = text("""
+    SELECT id
+    FROM packages
+    WHERE id > :after_id
+      AND status IN ('ENTREGADO', 'CANCELADO')
+      AND COALESCE(delivered_at, cancelled_at, updated_at) < :cutoff
+    ORDER BY id
+    LIMIT :batch_size
+    FOR UPDATE SKIP LOCKED
+""")
+
+# Modelo de trabajo -> modelo de su archivo, para lecturas históricas
+ARCHIVE_MODELS = {
+    Package: ArchivedPackage,
+    Message: ArchivedMessage,
+    Notification: ArchivedNotification,
+}
+
+COLUMNS_SQL = text("""
+    SELECT column_name
+    FROM information_schema.columns
+    WHERE table_schema = 'public' AND table_name = :table
+    ORDER BY ordinal_position
+""")
+
+
+def with_archive(model, *columns: str):
+    """
+    Subconsulta `tabla UNION ALL tabla_archive` con las columnas indicadas
+
+    Para reportes y métricas que cubren períodos ya archivados; PostgreSQL
+    aplica los filtros sobre la subconsulta a cada rama. Las columnas se usan
+    como `subconsulta.c.<columna>`.
+    """
+    archive = ARCHIVE_MODELS[model]
+    working = select(*(model.__table__.c[name] for name in columns))
+    archived = select(*(archive.__table__.c[name] for name in columns))
+    return union_all(working, archived).subquery(f"{model.__tablename__}_all")
+
+
+class PackageArchiveService:
+    """Archivado de paquetes terminales y búsqueda en el archivo"""
+
+    # ========================================
+    # ARCHIVADO
+    # ========================================
+
+    def archive_terminal_packages(
+        self,
+        db: Session,
+        older_than_days: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        progress_callback: Optional[ProgressCallback] = None
+    ) -> Dict[str, Any]:
+        """Mover los paquetes terminales antiguos al archivo, un commit por lote"""
+        older_than_days = settings.package_archive_after_days if older_than_days is None else older_than_days
+        batch_size = batch_size or settings.package_archive_batch_size
+        cutoff = get_colombia_now() - timedelta(days=older_than_days)
+        statements = self._move_statements(db)
+
+        totals = {table: 0 for table, _ in ARCHIVED_TABLES}
+        after_id = 0
+        batches = 0
+        while True:
+            db.execute(text("SET LOCAL app.skip_customer_counters = 'on'"))
+            ids = [row.id for row in db.execute(
+                SELECT_TERMINAL_BATCH_SQL, {"after_id": after_id, "cutoff": cutoff, "batch_size": batch_size}
+            )]
+            if not ids:
+                db.rollback()
+                break
+            try:
+                archived_at = get_colombia_now()
+                for table, statement in statements.items():
+                    totals[table] += db.execute(statement, {"ids": ids, "archived_at": archived_at}).rowcount or 0
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+
+            batches += 1
+            after_id = ids[-1]
+            if progress_callback:
+                progress_callback(totals["packages"], batches)
+
+        if totals["packages"]:
+            logger.info(f"Paquetes archivados: {totals['packages']} en {batches} lotes (anteriores a {cutoff.date()})")
+        return {"cutoff": cutoff.isoformat(), "batches": batches, "archived": totals}
+
+    @staticmethod
+    def _move_statements(db: Session) -> Dict[str, Any]:
+        """DELETE ... RETURNING + INSERT por tabla, con las columnas reales de la tabla de trabajo"""
+        statements = {}
+        for table, key in ARCHIVED_TABLES:
+            columns = ", ".join(f'"{row.column_name}"' for row in db.execute(COLUMNS_SQL, {"table": table}))
+            statements[table] = text(f"""
+                WITH moved AS (
+                    DELETE FROM {table} WHERE {key} = ANY(:ids) RETURNING {columns}
+                )
+                INSERT INTO {table}_archive ({columns}, archived_at)
+                SELECT {columns}, :archived_at FROM moved
+            """)
+        db.rollback()
+        return statements
+
+    # ========================================
+    # BÚSQUEDA
+    # ========================================
+
+    @staticmethod
+    def find_archived_packages(db: Session, query: str) -> List[ArchivedPackage]:
+        """Paquetes archivados por número de tracking, guía o código de acceso"""
+        return db.query(ArchivedPackage).filter(
+            or_(
+                ArchivedPackage.tracking_number == query,
+                ArchivedPackage.guide_number == query,
+                ArchivedPackage.access_code == query
+            )
+        ).all()
+
+    @staticmethod
+    def find_archived_package(
+        db: Session,
+        package_id: Optional[int] = None,
+        tracking_numbers: Iterable[str] = ()
+    ) -> Optional[ArchivedPackage]:
+        """Paquete archivado por id o, si no lo hay, por número de tracking"""
+        if package_id:
+            package = db.query(ArchivedPackage).filter(ArchivedPackage.id == package_id).first()
+            if package:
+                return package
+        tracking_numbers = [value for value in tracking_numbers if value]
+        if not tracking_numbers:
+            return None
+        return db.query(ArchivedPackage).filter(ArchivedPackage.tracking_number.in_(tracking_numbers)).first()
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""
+PAQUETES EL CLUB v1.0 - Particiones de Eventos de Paquete
+Versión: 1.0.0
+Fecha: 2025-11-10
+Autor: Equipo de Desarrollo
+
+package_events está particionada por mes (migración d5b8e2a4f613). Este
+servicio:
+
+- Crea por adelantado las particiones de los próximos meses
+  (función package_events_ensure_partitions).
+- Archiva las particiones más viejas que PACKAGE_EVENTS_RETENTION_MONTHS:
+  DETACH de la tabla (commit), exportación a CSV gzip con COPY, relectura
+  del archivo para verificar el número de filas, copia a S3 si corresponde
+  y DROP de la tabla.
+
+Una partición desvinculada que no se pudo exportar queda como tabla suelta
+con el mismo nombre y se reintenta en la siguiente ejecución; nunca se
+elimina sin un archivo verificado.
+"""
+
+import csv
+import gzip
+import logging
+import os
+import re
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.utils.datetime_utils import get_colombia_now
+
+logger = logging.getLogger(__name__)
+
+PARTITION_NAME = re.compile(r"^package_events_y(\d{4})m(\d{2})$")
+
+ENSURE_PARTITIONS_SQL = text("""
+    SELECT package_events_ensure_partitions(now(), now() + make_interval(months => :months_ahead))
+""")
+
+# Particiones mensuales vinculadas a package_events y tablas sueltas con el
+# mismo patrón de nombre (desvinculadas pero aún sin archivar)
+PARTITIONS_SQL = text("""
+    SELECT c.relname AS name,
+           i.inhparent IS NOT NULL AS attached,
+           pg_total_relation_size(c.oid) AS size_bytes
+    FROM pg_class c
+    LEFT JOIN pg_inherits i
+           ON i.inhrelid = c.oid AND i.inhparent = 'package_events'::regclass
+    WHERE c.relkind = 'r'
+      AND c.relnamespace = 'public'::regnamespace
+      AND c.relname ~ '^package_events_y[0-9]{4}m[0-9]{2}$'
+    ORDER BY c.relname
+""")
+
+
+@dataclass(frozen=True)
+class EventPartition:
+    """Partición mensual de package_events"""
+    name: str
+    month: date
+    attached: bool
+    size_bytes: int
+
+
+class PackageEventPartitionService:
+    """Creación y archivado de las particiones mensuales de package_events"""
+
+    # ========================================
+    # CONSULTA Y CREACIÓN
+    # ========================================
+
+    @staticmethod
+    def list_partitions(db: Session) -> List[EventPartition]:
+        partitions = []
+        for row in db.execute(PARTITIONS_SQL):
+            year, month = PARTITION_NAME.match(row.name).groups()
+            partitions.append(EventPartition(
+                name=row.name,
+                month=date(int(year), int(month), 1),
+                attached=row.attached,
+                size_bytes=row.size_bytes
+            ))
+        return partitions
+
+    @staticmethod
+    def ensure_partitions(db: Session, months_ahead: Optional[int] = None) -> int:
+        """Crear las particiones del mes actual y de los próximos meses; devuelve cuántas creó"""
+        months_ahead = settings.package_events_partitions_ahead if months_ahead is None else months_ahead
+        created = db.execute(ENSURE_PARTITIONS_SQL, {"months_ahead": months_ahead}).scalar() or 0
+        db.commit()
+        if created:
+            logger.info(f"Particiones de package_events creadas: {created}")
+        return created
+
+    # ========================================
+    # ARCHIVADO
+    # ========================================
+
+    @staticmethod
+    def retention_cutoff(retention_months: Optional[int] = None) -> date:
+        """Primer mes que se conserva: las particiones anteriores se archivan"""
+        retention_months = settings.package_events_retention_months if retention_months is None else retention_months
+        today = get_colombia_now().date()
+        months = today.year * 12 + (today.month - 1) - retention_months
+        return date(months // 12, months % 12 + 1, 1)
+
+    def archive_old_partitions(self, db: Session, retention_months: Optional[int] = None) -> Dict[str, Any]:
+        """Desvincular, exportar y eliminar las particiones fuera de la retención"""
+        cutoff = self.retention_cutoff(retention_months)
+        archived = []
+        failed = []
+
+        for partition in self.list_partitions(db):
+            if partition.month >= cutoff:
+                continue
+            try:
+                if partition.attached:
+                    self._detach(db, partition.name)
+                archived.append({"partition": partition.name, **self._export_and_drop(db, partition.name)})
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Error archivando la partición {partition.name}: {str(e)}", exc_info=True)
+                failed.append(partition.name)
+
+        if archived:
+            logger.info(f"Particiones de package_events archivadas: {[a['partition'] for a in archived]}")
+        return {"cutoff": cutoff.isoformat(), "archived": archived, "failed": failed}
+
+    @staticmethod
+    def _detach(db: Session, name: str) -> None:
+        # DETACH toma un bloqueo exclusivo breve sobre package_events: no
+        # esperar detrás de consultas largas (se reintenta en la próxima ejecución)
+        db.execute(text("SET LOCAL lock_timeout = '5s'"))
+        db.execute(text(f'ALTER TABLE package_events DETACH PARTITION "{name}"'))
+        db.commit()
+
+    def _export_and_drop(self, db: Session, name: str) -> Dict[str, Any]:
+        archive_dir = Path(settings.package_events_archive_dir)
+        archive_dir.mkdir(parents=True, exist_ok=True)
+        final_path = archive_dir / f"{name}.csv.gz"
+        temp_path = archive_dir / f"{name}.csv.gz.tmp"
+
+        expected = db.execute(text(f'SELECT count(*) FROM "{name}"')).scalar()
+        cursor = db.connection().connection.cursor()
+        try:
+            with gzip.open(temp_path, "wt", encoding="utf-8", newline="") as archive:
+                cursor.copy_expert(
+                    f'COPY (SELECT * FROM "{name}" ORDER BY event_timestamp) TO STDOUT WITH (FORMAT csv, HEADER)',
+                    archive
+                )
+        finally:
+            cursor.close()
+        # Releer el archivo: confirma que el gzip es legible y que están todas las filas
+        with gzip.open(temp_path, "rt", encoding="utf-8", newline="") as archive:
+            exported = sum(1 for _ in csv.reader(archive)) - 1
+        if exported != expected:
+            temp_path.unlink(missing_ok=True)
+            raise RuntimeError(f"Exportación incompleta de {name}: {exported} de {expected} filas")
+
+        with open(temp_path, "rb") as archive:
+            os.fsync(archive.fileno())
+        os.replace(temp_path, final_path)
+        location = self._store_archive(final_path)
+
+        db.execute(text(f'DROP TABLE "{name}"'))
+        db.commit()
+        return {"rows": expected, "location": location}
+
+    @staticmethod
+    def _store_archive(local_path: Path) -> str:
+        """Sube el archivo a S3 si está configurado; devuelve la ubicación final"""
+        if settings.package_events_archive_storage != "s3":
+            return str(local_path)
+
+        from app.services.registry import get_s3_service
+        s3_service = get_s3_service()
+        s3_key = f"{settings.package_events_archive_s3_prefix.strip('/')}/{local_path.name}"
+        s3_service.s3_client.upload_file(str(local_path), s3_service.bucket_name, s3_key)
+        local_path.unlink(missing_ok=True)
+        return f"s3://{s3_service.bucket_name}/{s3_key}"
@@ -235,19 +235,11 @@ class PackageEventService:
         if not date_to:
             date_to = get_colombia_now()
         
-        # Total de eventos en el rango
-        total_query = db.query(func.count(PackageEvent.id)).filter(
-            and_(
-                PackageEvent.event_timestamp >= date_from,
-                PackageEvent.event_timestamp <= date_to
-            )
-        )
-        total_events = total_query.scalar() or 0
-        
-        # Eventos por tipo
+        # Eventos por tipo en el rango (el total es su suma); solo recorre las
+        # particiones mensuales del rango
         events_by_type_query = db.query(
             PackageEvent.event_type,
-            func.count(PackageEvent.id)
+            func.count()
         ).filter(
             and_(
                 PackageEvent.event_timestamp >= date_from,
@@ -256,50 +248,41 @@ class PackageEventService:
         ).group_by(PackageEvent.event_type).all()
         
         events_by_type = {event_type.value: count for event_type, count in events_by_type_query}
+        total_events = sum(events_by_type.values())
+        
+        # Hoy, esta semana y este mes en una sola pasada desde el inicio más antiguo
+        now = get_colombia_now()
+        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        week_start = today_start - timedelta(days=now.weekday())
+        month_start = today_start.replace(day=1)
+        
+        # Ingresos: solo eventos de ENTREGA con pago recibido
+        is_paid_delivery = and_(
+            PackageEvent.event_type == EventType.ENTREGA,
+            PackageEvent.payment_received == True
+        )
         
-        # Eventos hoy
-        today_start = get_colombia_now().replace(hour=0, minute=0, second=0, microsecond=0)
-        events_today = db.query(func.count(PackageEvent.id)).filter(
-            PackageEvent.event_timestamp >= today_start
-        ).scalar() or 0
-        
-        # Eventos esta semana
-        week_start = get_colombia_now() - timedelta(days=get_colombia_now().weekday())
-        week_start = week_start.replace(hour=0, minute=0, second=0, microsecond=0)
-        events_this_week = db.query(func.count(PackageEvent.id)).filter(
-            PackageEvent.event_timestamp >= week_start
-        ).scalar() or 0
-        
-        # Eventos este mes
-        month_start = get_colombia_now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        events_this_month = db.query(func.count(PackageEvent.id)).filter(
-            PackageEvent.event_timestamp >= month_start
-        ).scalar() or 0
-        
-        # Ingresos (solo eventos de ENTREGA con pago recibido)
-        revenue_today = db.query(func.sum(PackageEvent.payment_amount)).filter(
-            and_(
-                PackageEvent.event_type == EventType.ENTREGA,
-                PackageEvent.payment_received == True,
-                PackageEvent.event_timestamp >= today_start
-            )
-        ).scalar() or Decimal('0.00')
-        
-        revenue_this_week = db.query(func.sum(PackageEvent.payment_amount)).filter(
-            and_(
-                PackageEvent.event_type == EventType.ENTREGA,
-                PackageEvent.payment_received == True,
-                PackageEvent.event_timestamp >= week_start
+        def revenue_since(start):
+            return func.sum(PackageEvent.payment_amount).filter(
+                and_(is_paid_delivery, PackageEvent.event_timestamp >= start)
             )
-        ).scalar() or Decimal('0.00')
         
-        revenue_this_month = db.query(func.sum(PackageEvent.payment_amount)).filter(
-            and_(
-                PackageEvent.event_type == EventType.ENTREGA,
-                PackageEvent.payment_received == True,
-                PackageEvent.event_timestamp >= month_start
-            )
-        ).scalar() or Decimal('0.00')
+        period_totals = db.query(
+            func.count().filter(PackageEvent.event_timestamp >= today_start),
+            func.count().filter(PackageEvent.event_timestamp >= week_start),
+            func.count().filter(PackageEvent.event_timestamp >= month_start),
+            revenue_since(today_start),
+            revenue_since(week_start),
+            revenue_since(month_start)
+        ).filter(
+            PackageEvent.event_timestamp >= min(week_start, month_start)
+        ).one()
+        
+        (events_today, events_this_week, events_this_month,
+         revenue_today, revenue_this_week, revenue_this_month) = period_totals
+        revenue_today = revenue_today or Decimal('0.00')
+        revenue_this_week = revenue_this_week or Decimal('0.00')
+        revenue_this_month = revenue_this_month or Decimal('0.00')
         
         return PackageEventStats(
             total_events=total_events,
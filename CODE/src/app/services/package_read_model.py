@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+"""
+PAQUETES EL CLUB v1.0 - Consultas de Lectura de Paquetes y Anuncios
+Versión: 1.0.0
+Fecha: 2025-11-10
+Autor: Equipo de Desarrollo
+
+Consultas de solo lectura para los endpoints de listado. Seleccionan
+únicamente las columnas que se devuelven y entregan filas (Row) en lugar de
+entidades del ORM: sin identity map, sin relaciones cargadas y sin objetos
+que el Session tenga que rastrear.
+
+El listado del dashboard pagina en PostgreSQL la unión de paquetes y anuncios
+sin procesar, de modo que solo se materializan las filas de la página; los
+archivos adjuntos llegan en la misma consulta agregados con json_agg.
+"""
+
+from typing import List, Optional, Tuple
+
+from sqlalchemy import Boolean, Integer, String, cast, false, func, literal, literal_column, null, or_, select, union_all
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.orm import Session, aliased
+
+from app.models.announcement_new import PackageAnnouncementNew
+from app.models.customer import Customer
+from app.models.file_upload import FileUpload
+from app.models.package import Package, PackageStatus
+from app.services.fee_service import FeeService
+from app.utils.normalization import normalize_status
+
+# Estados que muestra el historial de paquetes de un cliente
+CUSTOMER_HISTORY_STATUSES = (
+    PackageStatus.ANUNCIADO,
+    PackageStatus.RECIBIDO,
+    PackageStatus.ENTREGADO,
+    PackageStatus.CANCELADO
+)
+
+
+class PackageReadModel:
+    """Proyecciones de columnas para listados de paquetes y anuncios"""
+
+    # ========================================
+    # LISTADO DEL DASHBOARD
+    # ========================================
+
+    @staticmethod
+    def _file_uploads_json():
+        """Archivos del paquete de la fila como arreglo JSON (correlacionado con Package)"""
+        upload = func.json_build_object(
+            "id", FileUpload.id,
+            "filename", FileUpload.filename,
+            "s3_key", FileUpload.s3_key,
+            "s3_url", FileUpload.s3_url,
+            "file_type", FileUpload.file_type,
+            "file_size", FileUpload.file_size,
+            "content_type", FileUpload.content_type,
+            "created_at", FileUpload.created_at
+        )
+        return select(
+            func.coalesce(func.json_agg(aggregate_order_by(upload, FileUpload.id)), literal_column("'[]'::json"))
+        ).where(FileUpload.package_id == Package.id).scalar_subquery()
+
+    @staticmethod
+    def _dashboard_keys(status_filter: Optional[str], customer_id=None):
+        """Claves (tipo, id, fecha de creación) de paquetes y anuncios sin procesar del filtro"""
+        package_keys = select(
+            literal(False, Boolean).label("is_announcement"),
+            Package.id.label("package_id"),
+            cast(null(), String).label("tracking_code"),
+            Package.created_at.label("created_at")
+        )
+        announcement_keys = select(
+            literal(True, Boolean).label("is_announcement"),
+            cast(null(), Integer).label("package_id"),
+            PackageAnnouncementNew.tracking_code.label("tracking_code"),
+            PackageAnnouncementNew.announced_at.label("created_at")
+        ).where(PackageAnnouncementNew.is_processed == False)
+
+        if status_filter:
+            normalized_status = normalize_status(status_filter)
+            if normalized_status:
+                package_keys = package_keys.where(Package.status == normalized_status)
+            if normalized_status == "ANUNCIADO":
+                announcement_keys = announcement_keys.where(PackageAnnouncementNew.is_active == True)
+            elif normalized_status == "CANCELADO":
+                announcement_keys = announcement_keys.where(PackageAnnouncementNew.is_active == False)
+            else:
+                # Si el filtro es RECIBIDO o ENTREGADO, no mostrar anuncios
+                announcement_keys = announcement_keys.where(false())
+        if customer_id:
+            package_keys = package_keys.where(Package.customer_id == customer_id)
+
+        return union_all(package_keys, announcement_keys).subquery("dashboard_keys")
+
+    @classmethod
+    def dashboard_page(
+        cls,
+        db: Session,
+        skip: int = 0,
+        limit: int = 10,
+        status_filter: Optional[str] = None,
+        customer_id=None
+    ) -> Tuple[list, int]:
+        """
+        Filas de una página del dashboard (más recientes primero) y total de elementos
+
+        Una sola consulta: la unión de claves se ordena y pagina en SQL (con el
+        total como count(*) OVER ()), y solo las filas de la página se unen con
+        paquetes, clientes, anuncios, tarifas y archivos.
+        """
+        keys = cls._dashboard_keys(status_filter, customer_id)
+        ordering = (keys.c.created_at.desc(), keys.c.is_announcement, keys.c.package_id.desc())
+        page = select(
+            keys,
+            func.count().over().label("total")
+        ).order_by(*ordering).offset(skip).limit(limit).subquery("page")
+
+        package_customer = aliased(Customer)
+        announcement = aliased(PackageAnnouncementNew)
+        announcement_customer = aliased(Customer)
+
+        rows = db.execute(
+            select(
+                page.c.is_announcement,
+                page.c.total,
+                page.c.created_at,
+                Package.id.label("package_id"),
+                func.coalesce(Package.tracking_number, announcement.tracking_code).label("tracking_number"),
+                func.coalesce(Package.guide_number, announcement.guide_number).label("guide_number"),
+                Package.package_type,
+                Package.status,
+                Package.package_condition,
+                Package.access_code,
+                Package.posicion,
+                Package.announced_at,
+                Package.received_at,
+                Package.delivered_at,
+                Package.cancelled_at,
+                Package.base_fee,
+                Package.updated_at,
+                func.coalesce(Package.customer_id, announcement.customer_id).label("customer_id"),
+                func.coalesce(
+                    package_customer.full_name, announcement_customer.full_name, announcement.customer_name
+                ).label("customer_name"),
+                func.coalesce(
+                    package_customer.phone, announcement_customer.phone, announcement.customer_phone
+                ).label("customer_phone"),
+                func.coalesce(package_customer.email, announcement_customer.email).label("customer_email"),
+                announcement.is_active.label("announcement_is_active"),
+                announcement.updated_at.label("announcement_updated_at"),
+                *FeeService.fee_columns(),
+                cls._file_uploads_json().label("file_uploads")
+            )
+            .select_from(page)
+            .outerjoin(Package, Package.id == page.c.package_id)
+            .outerjoin(package_customer, package_customer.id == Package.customer_id)
+            .outerjoin(announcement, announcement.tracking_code == page.c.tracking_code)
+            .outerjoin(announcement_customer, announcement_customer.id == announcement.customer_id)
+            .order_by(page.c.created_at.desc(), page.c.is_announcement, page.c.package_id.desc())
+        ).all()
+
+        if rows:
+            return rows, rows[0].total
+        if skip == 0:
+            return rows, 0
+        # Página fuera de rango: el total sale de un conteo aparte
+        return rows, db.execute(select(func.count()).select_from(keys)).scalar() or 0
+
+    # ========================================
+    # OTROS LISTADOS
+    # ========================================
+
+    @staticmethod
+    def package_summaries(db: Session) -> List:
+        """Resumen de todos los paquetes con nombre y teléfono del cliente"""
+        return db.execute(
+            select(
+                Package.id,
+                Package.tracking_number,
+                Package.guide_number,
+                Package.status,
+                Package.package_type,
+                Package.package_condition,
+                Package.posicion,
+                Package.access_code,
+                Package.announced_at,
+                Package.received_at,
+                Package.delivered_at,
+                Package.cancelled_at,
+                Package.created_at,
+                Customer.full_name.label("customer_name"),
+                Customer.phone.label("customer_phone")
+            )
+            .outerjoin(Customer, Customer.id == Package.customer_id)
+            .order_by(Package.created_at.desc())
+        ).all()
+
+    @staticmethod
+    def customer_recent_items(db: Session, customer_id, limit: int = 10) -> Tuple[List, List]:
+        """Últimos paquetes (estados del historial) y anuncios sin procesar de un cliente"""
+        packages = db.execute(
+            select(
+                Package.id,
+                Package.tracking_number,
+                Package.guide_number,
+                Package.status,
+                Package.announced_at,
+                Package.received_at,
+                Package.delivered_at
+            )
+            .where(Package.customer_id == customer_id, Package.status.in_(CUSTOMER_HISTORY_STATUSES))
+            .order_by(Package.created_at.desc())
+            .limit(limit * 2)  # El listado final se ordena por fecha de anuncio
+        ).all()
+        announcements = db.execute(
+            select(
+                PackageAnnouncementNew.id,
+                PackageAnnouncementNew.tracking_code,
+                PackageAnnouncementNew.guide_number,
+                PackageAnnouncementNew.is_active,
+                PackageAnnouncementNew.announced_at
+            )
+            .where(PackageAnnouncementNew.customer_id == customer_id, PackageAnnouncementNew.is_processed == False)
+            .order_by(PackageAnnouncementNew.announced_at.desc())
+            .limit(limit)
+        ).all()
+        return packages, announcements
+
+    @staticmethod
+    def search_announcements(
+        db: Session,
+        query: Optional[str] = None,
+        status: Optional[str] = None,
+        date_from=None,
+        date_to=None,
+        skip: int = 0,
+        limit: int = 50
+    ) -> Tuple[List, int]:
+        """Anuncios filtrados (página y total) con las columnas de AnnouncementResponse"""
+        criteria = []
+        if query:
+            search_term = f"%{query}%"
+            criteria.append(or_(
+                PackageAnnouncementNew.guide_number.ilike(search_term),
+                PackageAnnouncementNew.tracking_code.ilike(search_term),
+                PackageAnnouncementNew.customer_name.ilike(search_term),
+                PackageAnnouncementNew.customer_phone.ilike(search_term)
+            ))
+        if status == "pending":
+            criteria.extend([PackageAnnouncementNew.is_active == True, PackageAnnouncementNew.is_processed == False])
+        elif status == "processed":
+            criteria.append(PackageAnnouncementNew.is_processed == True)
+        elif status == "cancelled":
+            criteria.append(PackageAnnouncementNew.is_active == False)
+        if date_from:
+            criteria.append(PackageAnnouncementNew.created_at >= date_from)
+        if date_to:
+            criteria.append(PackageAnnouncementNew.created_at <= date_to)
+
+        rows = db.execute(
+            select(
+                PackageAnnouncementNew.id,
+                PackageAnnouncementNew.customer_name,
+                PackageAnnouncementNew.customer_phone,
+                PackageAnnouncementNew.guide_number,
+                PackageAnnouncementNew.tracking_code,
+                PackageAnnouncementNew.is_active,
+                PackageAnnouncementNew.is_processed,
+                PackageAnnouncementNew.processed_at,
+                PackageAnnouncementNew.created_at,
+                PackageAnnouncementNew.updated_at,
+                func.count().over().label("total")
+            )
+            .where(*criteria)
+            .order_by(PackageAnnouncementNew.created_at.desc())
+            .offset(skip)
+            .limit(limit)
+        ).all()
+
+        if rows:
+            return rows, rows[0].total
+        if skip == 0:
+            return rows, 0
+        total = db.execute(select(func.count(PackageAnnouncementNew.id)).where(*criteria)).scalar() or 0
+        return rows, total
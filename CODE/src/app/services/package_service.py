@@ -6,20 +6,16 @@ Fecha: 2025-01-24
 Autor: Equipo de Desarrollo
 """
 
-import secrets
-import string
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
+from sqlalchemy import and_, or_, func, select, false
 from datetime import datetime, timedelta
 from decimal import Decimal
 
 from .base import BaseService
 from app.models.package import Package, PackageStatus, PackageType, PackageCondition
 from app.models.customer import Customer
-from app.models.package_history import PackageHistory
 from app.models.message import Message
-from app.models.notification import Notification
 from app.models.file_upload import FileUpload
 # from app.models.announcement_new import PackageAnnouncementNew  # Archivo eliminado
 from app.schemas.package import (
@@ -28,7 +24,15 @@ from app.schemas.package import (
 )
 from app.schemas.customer import CustomerCreate
 from .customer_service import CustomerService
+from .code_generator import CodeGenerator
+from .bulk_deletion_service import BulkDeletionService
+from .rate_provider import get_rates
+from app.schemas.package_list import PackageListRow
+from app.utils.normalization import normalize_status
 import uuid
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 class PackageService(BaseService[Package, PackageCreate, PackageUpdate]):
@@ -49,7 +53,7 @@ class PackageService(BaseService[Package, PackageCreate, PackageUpdate]):
         tracking_number = self._generate_tracking_number(db)
 
         # Generar código de acceso único
-        access_code = self._generate_access_code()
+        access_code = self._generate_access_code(db)
 
         # Calcular tarifas
         base_fee, storage_fee, total_amount = self._calculate_fees(package_in.package_type)
@@ -90,7 +94,7 @@ class PackageService(BaseService[Package, PackageCreate, PackageUpdate]):
             tracking_number = self._generate_tracking_number(db)
 
         # Generar código de acceso único
-        access_code = self._generate_access_code()
+        access_code = self._generate_access_code(db)
 
         # Calcular tarifas (tarifa normal por defecto)
         base_fee, storage_fee, total_amount = self._calculate_fees(PackageType.NORMAL)
@@ -140,13 +144,13 @@ class PackageService(BaseService[Package, PackageCreate, PackageUpdate]):
             existing = db.query(Package).filter(Package.tracking_number == tracking_number).first()
             if existing:
                 # En lugar de lanzar error, retornar el paquete existente
-                print(f"⚠️ Tracking {tracking_number} ya existe, retornando paquete existente")
+                logger.warning(f"⚠️ Tracking {tracking_number} ya existe, retornando paquete existente")
                 return existing
         else:
             tracking_number = self._generate_tracking_number(db)
 
         # Generar código de acceso único
-        access_code = self._generate_access_code()
+        access_code = self._generate_access_code(db)
 
         # Calcular tarifas (tarifa normal por defecto)
         base_fee, storage_fee, total_amount = self._calculate_fees(PackageType.NORMAL)
@@ -243,7 +247,7 @@ class PackageService(BaseService[Package, PackageCreate, PackageUpdate]):
             additional_data['package_condition'] = status_update.package_condition.value
 
         # Usar PackageStateService para cambiar el estado y crear historial
-        history_entry = PackageStateService.update_package_status(
+        PackageStateService.apply_status_change(
             db=db,
             package=package,
             new_status=new_status,
@@ -308,6 +312,196 @@ class PackageService(BaseService[Package, PackageCreate, PackageUpdate]):
             'type_breakdown': {pkg_type.value: count for pkg_type, count in type_counts}
         }
 
+    def list_dashboard_page(
+        self,
+        db: Session,
+        skip: int = 0,
+        limit: int = 10,
+        status_filter: Optional[str] = None,
+        customer_id: Optional[int] = None,
+        validator: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Página del listado de paquetes y anuncios no procesados (más recientes primero)
+
+        La comparten GET /api/packages/ y la vista /packages, que incrusta la
+        primera página en el HTML para no esperar la llamada a la API.
+        validator: ETag calculado con dashboard_page_validator; forma parte de
+        la clave de caché para que el cuerpo cacheado corresponda siempre al
+        ETag publicado.
+        """
+        from app.cache_manager import cache_manager
+
+        # OPTIMIZACIÓN: Verificar caché primero
+        cache_filters = {
+            "skip": skip,
+            "limit": limit,
+            "status_filter": status_filter,
+            "customer_id": customer_id,
+            "validator": validator
+        }
+
+        cached_result = cache_manager.get_cached_packages_list(cache_filters)
+        if cached_result:
+            logger.debug("📦 Datos obtenidos del caché")
+            return cached_result
+
+        # Solo las filas de la página, con archivos agregados en la misma consulta
+        from app.services.package_read_model import PackageReadModel
+
+        rows, total_items = PackageReadModel.dashboard_page(
+            db, skip=skip, limit=limit, status_filter=status_filter, customer_id=customer_id
+        )
+        announcement_base_fee = float(get_rates().base_fee(PackageType.NORMAL))
+        paginated_items = [PackageListRow.from_page_row(row, announcement_base_fee) for row in rows]
+        logger.debug("📊 Elementos en total: %s", total_items)
+
+        # Calcular información de paginación
+        total_pages = (total_items + limit - 1) // limit if total_items > 0 else 1
+        current_page = (skip // limit) + 1
+        has_prev = skip > 0
+        has_next = skip + limit < total_items
+
+        # Preparar respuesta
+        result = {
+            "packages": paginated_items,
+            "pagination": {
+                "page": current_page,
+                "limit": limit,
+                "total": total_items,
+                "total_pages": total_pages,
+                "has_prev": has_prev,
+                "has_next": has_next
+            }
+        }
+
+        # OPTIMIZACIÓN: Guardar en caché por 15 segundos (reducido para mejor refresco)
+        cache_manager.cache_packages_list(result, cache_filters, ttl=15)
+        logger.debug("📦 Datos guardados en caché - %s items", len(paginated_items))
+
+        return result
+
+    # ========================================
+    # VALIDADORES PARA RESPUESTAS CONDICIONALES (ETag)
+    # ========================================
+
+    @staticmethod
+    def _count_and_max(model, *criteria):
+        """Subconsulta escalar 'count:max(updated_at)' sobre las filas filtradas"""
+        return select(
+            func.concat(func.count(model.id), ":", func.max(model.updated_at))
+        ).where(*criteria).scalar_subquery()
+
+    def dashboard_page_validator(
+        self,
+        db: Session,
+        status_filter: Optional[str] = None,
+        customer_id: Optional[int] = None
+    ) -> Tuple:
+        """
+        Partes del validador de list_dashboard_page con una sola consulta de agregados
+
+        Cubre todo lo que aparece en la página: paquetes y anuncios del filtro
+        (conteo y último cambio), clientes y archivos adjuntos. La fecha y la
+        versión de tarifas entran porque la tarifa de almacenamiento cambia
+        con los días y con la configuración, no con updated_at.
+        """
+        from app.models.announcement_new import PackageAnnouncementNew
+        from app.utils.datetime_utils import get_colombia_now
+
+        # Mismos filtros que list_dashboard_page
+        package_criteria = []
+        announcement_criteria = [PackageAnnouncementNew.is_processed == False]
+        normalized_status = normalize_status(status_filter) if status_filter else None
+        if normalized_status:
+            package_criteria.append(Package.status == normalized_status)
+        if customer_id:
+            package_criteria.append(Package.customer_id == customer_id)
+        if status_filter:
+            if normalized_status == "ANUNCIADO":
+                announcement_criteria.append(PackageAnnouncementNew.is_active == True)
+            elif normalized_status == "CANCELADO":
+                announcement_criteria.append(PackageAnnouncementNew.is_active == False)
+            else:
+                announcement_criteria.append(false())
+
+        row = db.execute(select(
+            self._count_and_max(Package, *package_criteria),
+            self._count_and_max(PackageAnnouncementNew, *announcement_criteria),
+            select(func.max(Customer.updated_at)).scalar_subquery(),
+            self._count_and_max(FileUpload)
+        )).one()
+        return (*row, get_colombia_now().date(), get_rates().version)
+
+    def package_validator(self, db: Session, package_id: int) -> Optional[Tuple]:
+        """
+        Partes del validador de un paquete (None si no existe)
+
+        Se consulta solo la fila por clave primaria: updated_at y version del
+        paquete y updated_at del cliente. package_etag_parts() produce las
+        mismas partes a partir del paquete ya cargado.
+        """
+        from app.utils.datetime_utils import get_colombia_now
+
+        row = db.query(Package.updated_at, Package.version, Customer.updated_at).outerjoin(
+            Customer, Customer.id == Package.customer_id
+        ).filter(Package.id == package_id).first()
+        if not row:
+            return None
+        return (*row, get_colombia_now().date(), get_rates().version)
+
+    @staticmethod
+    def package_etag_parts(package: Package) -> Tuple:
+        """Partes del validador a partir de un paquete cargado (ver package_validator)"""
+        from app.utils.datetime_utils import get_colombia_now
+
+        return (
+            package.updated_at,
+            package.version,
+            package.customer.updated_at if package.customer else None,
+            get_colombia_now().date(),
+            get_rates().version
+        )
+
+    def tracking_search_validator(self, db: Session, query: str) -> Tuple:
+        """
+        Partes del validador de la búsqueda exacta por guía o código
+
+        Anuncios que coinciden, paquetes vinculados (por guía, por código o por
+        anuncio), sus clientes y archivos, y los mensajes abiertos del código.
+        El historial se escribe en la misma transacción que actualiza el
+        paquete, así que queda cubierto por packages.updated_at.
+        """
+        from app.models.announcement_new import PackageAnnouncementNew
+        from app.models.message import MessageStatus
+
+        announcement_match = or_(
+            PackageAnnouncementNew.guide_number == query,
+            PackageAnnouncementNew.tracking_code == query
+        )
+        linked_ids = select(PackageAnnouncementNew.package_id).where(
+            announcement_match, PackageAnnouncementNew.package_id.isnot(None)
+        )
+        linked_guides = select(PackageAnnouncementNew.guide_number).where(announcement_match)
+        package_match = or_(
+            Package.tracking_number == query,
+            Package.id.in_(linked_ids),
+            Package.tracking_number.in_(linked_guides)
+        )
+        package_ids = select(Package.id).where(package_match)
+        customer_ids = select(Package.customer_id).where(package_match)
+
+        row = db.execute(select(
+            self._count_and_max(PackageAnnouncementNew, announcement_match),
+            self._count_and_max(Package, package_match),
+            select(func.max(Customer.updated_at)).where(Customer.id.in_(customer_ids)).scalar_subquery(),
+            self._count_and_max(FileUpload, FileUpload.package_id.in_(package_ids)),
+            select(func.count(Message.id)).where(
+                Message.tracking_code == query, Message.status == MessageStatus.ABIERTO
+            ).scalar_subquery()
+        )).one()
+        return tuple(row)
+
     def _get_or_create_customer(self, db: Session, name: str, phone: str) -> Customer:
         """Buscar cliente existente o crear uno nuevo"""
         customer = db.query(Customer).filter(Customer.phone == phone).first()
@@ -328,33 +522,19 @@ class PackageService(BaseService[Package, PackageCreate, PackageUpdate]):
         return self.customer_service.create_customer(db, customer_data)
 
     def _generate_tracking_number(self, db: Session) -> str:
-        """Generar número de tracking único"""
-        while True:
-            # Formato: PAP + YYYYMMDD + 4 caracteres alfanuméricos
-            today = datetime.utcnow().strftime('%Y%m%d')
-            random_part = ''.join(secrets.choice(string.ascii_uppercase + string.digits) for _ in range(4))
-            tracking_number = f"PAP{today}{random_part}"
-
-            # Verificar unicidad
-            if not db.query(Package).filter(Package.tracking_number == tracking_number).first():
-                return tracking_number
-
-    def _generate_access_code(self) -> str:
+        """Generar número de tracking único (PAP + YYYYMMDD + 4 caracteres)"""
+        return CodeGenerator.next_tracking_number(db)
+
+    def _generate_access_code(self, db: Session) -> str:
         """Generar código de acceso único"""
-        return ''.join(secrets.choice(string.ascii_letters + string.digits) for _ in range(8))
+        return CodeGenerator.next_access_code(db)
 
     def _calculate_fees(self, package_type: PackageType) -> tuple[Decimal, Decimal, Decimal]:
-        """Calcular tarifas según el tipo de paquete - DINÁMICO desde .env"""
-        from app.config import settings
-        
-        # Tarifa base de entrega según tipo de paquete (dinámico desde .env)
-        if package_type == PackageType.NORMAL:
-            base_fee = Decimal(str(settings.base_delivery_rate_normal))
-        elif package_type == PackageType.EXTRA_DIMENSIONADO:
-            base_fee = Decimal(str(settings.base_delivery_rate_extra_dimensioned))
-        else:
-            # Fallback para tipos no reconocidos
-            base_fee = Decimal(str(settings.base_delivery_rate_normal))
+        """Calcular tarifas según el tipo de paquete (proveedor de tarifas)"""
+        from app.services.rate_provider import get_rates
+
+        # Tarifa base de entrega según tipo de paquete
+        base_fee = get_rates().base_fee(package_type)
         
         # Tarifa de almacenamiento inicial es 0 (se calcula por días después)
         storage_fee = Decimal('0.00')
@@ -365,15 +545,10 @@ class PackageService(BaseService[Package, PackageCreate, PackageUpdate]):
 
     def recalculate_package_fees(self, db: Session, package: Package) -> Package:
         """Recalcular tarifas de un paquete existente según su tipo"""
-        from app.config import settings
-        
+        from app.services.rate_provider import get_rates
+
         # Recalcular tarifa base según tipo de paquete
-        if package.package_type == PackageType.NORMAL:
-            new_base_fee = Decimal(str(settings.base_delivery_rate_normal))
-        elif package.package_type == PackageType.EXTRA_DIMENSIONADO:
-            new_base_fee = Decimal(str(settings.base_delivery_rate_extra_dimensioned))
-        else:
-            new_base_fee = Decimal(str(settings.base_delivery_rate_normal))
+        new_base_fee = get_rates().base_fee(package.package_type)
         
         # Actualizar tarifa base
         package.base_fee = new_base_fee
@@ -402,18 +577,10 @@ class PackageService(BaseService[Package, PackageCreate, PackageUpdate]):
         return package
 
     def fix_all_packages_fees(self, db: Session) -> int:
-        """Corregir tarifas de todos los paquetes que tengan valores incorrectos"""
-        packages = db.query(Package).all()
-        fixed_count = 0
-        
-        for package in packages:
-            if package.update_fees_if_needed():
-                fixed_count += 1
-        
-        if fixed_count > 0:
-            db.commit()
-        
-        return fixed_count
+        """Corregir tarifas de todos los paquetes que tengan valores incorrectos (UPDATE por lotes)"""
+        from app.services.fee_service import FeeService
+
+        return FeeService().recalculate_fees(db)["updated_count"]
 
     def _validate_status_transition(self, old_status: PackageStatus, new_status: PackageStatus):
         """Validar transición de estados"""
@@ -564,24 +731,14 @@ class PackageService(BaseService[Package, PackageCreate, PackageUpdate]):
                 "deleted_at": self._get_current_timestamp()
             }
 
-            # Eliminar historial de paquetes
-            history_deleted = self._delete_package_history(db, package_id)
-
-            # Eliminar mensajes relacionados
-            messages_deleted = self._delete_messages_by_package_id(db, package_id)
-
-            # Eliminar notificaciones relacionadas
-            notifications_deleted = self._delete_notifications_by_package_id(db, package_id)
-
-            # Eliminar archivos subidos relacionados
-            files_deleted = self._delete_files_by_package_id(db, package_id)
-
-            # Desvincular el anuncio si existe
-            announcement_updated = self._unlink_announcement_from_package(db, package_id)
-
-            # Eliminar el paquete
-            db.delete(package)
-            db.commit()
+            # Eliminar historial, mensajes, notificaciones y archivos con sentencias
+            # de conjunto, desvincular anuncio/eventos y eliminar el paquete
+            counts = BulkDeletionService().delete_packages(db, [package_id])
+            history_deleted = counts["history_deleted"]
+            messages_deleted = counts["messages_deleted"]
+            notifications_deleted = counts["notifications_deleted"]
+            files_deleted = counts["files_deleted"]
+            announcement_updated = counts["announcements_updated"] > 0
 
             deletion_info.update({
                 "history_deleted": history_deleted,
@@ -593,9 +750,9 @@ class PackageService(BaseService[Package, PackageCreate, PackageUpdate]):
 
             return {
                 "success": True,
-                "message": f"Paquete {package.tracking_number} eliminado exitosamente",
+                "message": f"Paquete {deletion_info['tracking_number']} eliminado exitosamente",
                 "package_id": package_id,
-                "tracking_number": package.tracking_number,
+                "tracking_number": deletion_info["tracking_number"],
                 "history_deleted": history_deleted,
                 "messages_deleted": messages_deleted,
                 "notifications_deleted": notifications_deleted,
@@ -623,82 +780,9 @@ class PackageService(BaseService[Package, PackageCreate, PackageUpdate]):
     def _delete_messages_by_guide_number(self, db: Session, guide_number: str) -> int:
         """Eliminar mensajes relacionados con una guía"""
         # Eliminar mensajes donde tracking_code coincida con guide_number
-        messages = db.query(Message).filter(
+        return db.query(Message).filter(
             Message.tracking_code == guide_number
-        ).all()
-
-        count = len(messages)
-        for message in messages:
-            db.delete(message)
-
-        return count
-
-    def _delete_messages_by_package_id(self, db: Session, package_id: int) -> int:
-        """Eliminar mensajes relacionados con un paquete"""
-        messages = db.query(Message).filter(
-            Message.package_id == package_id
-        ).all()
-
-        count = len(messages)
-        for message in messages:
-            db.delete(message)
-
-        return count
-
-    def _delete_package_history(self, db: Session, package_id: int) -> int:
-        """Eliminar historial de un paquete"""
-        # Convertir package_id a UUID para la consulta
-        history_entries = db.query(PackageHistory).filter(
-            PackageHistory.package_id == package_id
-        ).all()
-
-        count = len(history_entries)
-        for entry in history_entries:
-            db.delete(entry)
-
-        return count
-
-    def _delete_notifications_by_package_id(self, db: Session, package_id: int) -> int:
-        """Eliminar notificaciones relacionadas con un paquete"""
-        notifications = db.query(Notification).filter(
-            Notification.package_id == package_id
-        ).all()
-
-        count = len(notifications)
-        for notification in notifications:
-            db.delete(notification)
-
-        return count
-
-    def _delete_files_by_package_id(self, db: Session, package_id: int) -> int:
-        """Eliminar archivos subidos relacionados con un paquete"""
-        files = db.query(FileUpload).filter(
-            FileUpload.package_id == package_id
-        ).all()
-
-        count = len(files)
-        for file in files:
-            db.delete(file)
-
-        return count
-
-    def _unlink_announcement_from_package(self, db: Session, package_id: int) -> bool:
-        """Desvincular anuncio de un paquete (poner package_id = NULL)"""
-        from sqlalchemy import text
-
-        # Usar consulta SQL directa con INTEGER
-        update_query = text("""
-            UPDATE package_announcements_new
-            SET package_id = NULL, is_processed = false, processed_at = NULL, updated_at = :updated_at
-            WHERE package_id = :package_id
-        """)
-
-        result = db.execute(update_query, {
-            "package_id": package_id,
-            "updated_at": self._get_current_timestamp()
-        })
-
-        return result.rowcount > 0
+        ).delete(synchronize_session=False)
 
     def _get_current_timestamp(self):
         """Obtener timestamp actual"""
@@ -2,7 +2,9 @@
 # PAQUETES EL CLUB v1.0 - Servicio de Estados
 # ========================================
 
-from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm.exc import StaleDataError
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 from uuid import UUID
@@ -13,10 +15,13 @@ from app.models.package_history import PackageHistory
 from app.models.package_event import PackageEvent, EventType
 from app.models.announcement_new import PackageAnnouncementNew
 from app.models.notification import NotificationEvent, NotificationPriority
-from app.models.user import User
 from app.models.customer import Customer
-from app.services.sms_service import SMSService
+from app.services.registry import get_sms_service
+from app.services.package_transitions import PackageTransitionEngine, OperatorInfo
+from app.services.rate_provider import get_rates
+from app.services.code_generator import CodeGenerator
 from app.utils.datetime_utils import get_colombia_now
+from app.utils.exceptions import PackageConflictException
 from app.config import settings
 from app.schemas.package import (
     PackageReceiveRequest, PackageDeliverRequest, PackageCancelRequest,
@@ -25,39 +30,24 @@ from app.schemas.package import (
 )
 from decimal import Decimal
 from typing import Tuple
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 class PackageStateService:
     """Servicio para manejar las transiciones de estado de los paquetes"""
 
-    # Transiciones de estado permitidas
-    ALLOWED_TRANSITIONS = {
-        PackageStatus.ANUNCIADO: [PackageStatus.RECIBIDO, PackageStatus.CANCELADO],
-        PackageStatus.RECIBIDO: [PackageStatus.ENTREGADO, PackageStatus.CANCELADO],
-        PackageStatus.ENTREGADO: [],  # Estado final
-        PackageStatus.CANCELADO: []   # Estado final
-    }
+    # Transiciones de estado permitidas (definidas en el motor de transiciones)
+    ALLOWED_TRANSITIONS = PackageTransitionEngine.ALLOWED_TRANSITIONS
 
     @classmethod
     def is_transition_allowed(cls, current_status: PackageStatus, new_status: PackageStatus) -> bool:
         """Verificar si una transición de estado está permitida"""
-        allowed = cls.ALLOWED_TRANSITIONS.get(current_status, [])
-        
-        # Comparar por valor (string) en lugar de por referencia de objeto
-        current_value = current_status.value if hasattr(current_status, 'value') else str(current_status)
-        new_value = new_status.value if hasattr(new_status, 'value') else str(new_status)
-        allowed_values = [status.value if hasattr(status, 'value') else str(status) for status in allowed]
-        
-        print(f"🔍 VALIDATION: current_status={current_status} (value: {current_value})")
-        print(f"🔍 VALIDATION: new_status={new_status} (value: {new_value})")
-        print(f"🔍 VALIDATION: allowed transitions={allowed} (values: {allowed_values})")
-        print(f"🔍 VALIDATION: new_value in allowed_values? {new_value in allowed_values}")
-        
-        # Usar comparación por valor
-        return new_value in allowed_values
+        return PackageTransitionEngine.is_transition_allowed(current_status, new_status)
 
     @classmethod
-    async def update_package_status(
+    def apply_status_change(
         cls,
         db: Session,
         package: Package,
@@ -66,79 +56,33 @@ class PackageStateService:
         additional_data: Optional[Dict[str, Any]] = None,
         observations: Optional[str] = None
     ) -> PackageHistory:
-        """Actualizar el estado de un paquete y registrar el cambio en el historial"""
-
-        # Verificar si la transición está permitida
-        if not cls.is_transition_allowed(package.status, new_status):
-            raise ValueError(f"Transición no permitida: {package.status.value} -> {new_status.value}")
-
-        # Guardar el estado anterior
-        previous_status = package.status
-
-        # Actualizar el estado del paquete
-        package.status = new_status
-        package.updated_at = get_colombia_now()
-
-        # Actualizar timestamps específicos según el estado
-        now = get_colombia_now()
-        if new_status == PackageStatus.RECIBIDO and not package.received_at:
-            package.received_at = now
-        elif new_status == PackageStatus.ENTREGADO and not package.delivered_at:
-            package.delivered_at = now
-        elif new_status == PackageStatus.CANCELADO and not package.cancelled_at:
-            package.cancelled_at = now
-
-        # Crear entrada en el historial
-        history_entry = PackageHistory(
-            id=uuid.uuid4(),
-            package_id=package.id,  # Usar Integer directamente
-            previous_status=previous_status.value if previous_status else None,
-            new_status=new_status.value,
-            changed_at=now,
-            changed_by=changed_by,
-            additional_data=additional_data or {},
-            observations=observations
+        """
+        Cambiar el estado de un paquete en una sola transacción: paquete
+        (con control de versión), historial, BAROTI y notificación en el outbox
+        """
+        operator = PackageTransitionEngine.resolve_operator(db, changed_by=changed_by)
+        return PackageTransitionEngine.apply(
+            db,
+            package,
+            new_status,
+            operator,
+            additional_data=additional_data,
+            observations=observations,
+            assign_baroti=new_status == PackageStatus.RECIBIDO
         )
 
-        # Guardar en la base de datos
-        db.add(history_entry)
-        db.commit()
-        db.refresh(history_entry)
-        db.refresh(package)
-
-        # INVALIDAR CACHÉ después de cambio de estado
-        try:
-            from app.cache_manager import cache_manager
-            cache_manager.invalidate_package_cache(
-                package_id=str(package.id),
-                customer_id=str(package.customer_id) if package.customer_id else None
-            )
-            import logging
-            logger = logging.getLogger("package_state_service")
-            logger.info(f"✅ Caché invalidado para paquete {package.id} después de cambio a {new_status.value}")
-        except Exception as e:
-            import logging
-            logger = logging.getLogger("package_state_service")
-            logger.warning(f"⚠️ Error invalidando caché para paquete {package.id}: {str(e)}")
-
-        # Enviar notificación SMS automáticamente si hay un cliente asociado
-        try:
-            await cls._send_sms_notification(db, package, new_status, changed_by)
-        except Exception as e:
-            # Log error but don't fail the package update
-            import logging
-            logger = logging.getLogger("package_state_service")
-            logger.warning(f"Error enviando SMS para paquete {package.id}: {str(e)}")
-
-        # Enviar notificación por email automáticamente si hay un cliente con email
-        try:
-            await cls._send_email_notification(db, package, new_status, changed_by)
-        except Exception as e:
-            import logging
-            logger = logging.getLogger("package_state_service")
-            logger.warning(f"Error enviando email para paquete {package.id}: {str(e)}")
-
-        return history_entry
+    @classmethod
+    async def update_package_status(
+        cls,
+        db: Session,
+        package: Package,
+        new_status: PackageStatus,
+        changed_by: str = "system",
+        additional_data: Optional[Dict[str, Any]] = None,
+        observations: Optional[str] = None
+    ) -> PackageHistory:
+        """Actualizar el estado de un paquete y registrar el cambio en el historial"""
+        return cls.apply_status_change(db, package, new_status, changed_by, additional_data, observations)
 
     @classmethod
     def get_package_history(cls, db: Session, package_id: int) -> List[PackageHistory]:
@@ -227,156 +171,146 @@ class PackageStateService:
         observations: str = "",
         changed_by: str = "system"
     ) -> Dict[str, Any]:
-        """Procesar un anuncio y cambiarlo a estado RECIBIDO - Maneja ambas tablas"""
+        """Procesar un anuncio (por número de guía) y dejar su paquete en estado RECIBIDO"""
 
-        # Buscar el anuncio existente
-        announcement = cls.get_announcement_by_guide_number(db, guide_number)
+        announcement = db.query(PackageAnnouncementNew).filter(
+            PackageAnnouncementNew.guide_number == guide_number.upper()
+        ).first()
         if not announcement:
             raise ValueError(f"No se encontró un anuncio con el número de guía: {guide_number}")
-
-        # Verificar que el anuncio no esté procesado
         if announcement.is_processed:
             raise ValueError(f"El anuncio {guide_number} ya fue procesado")
 
-        # Buscar si ya existe un paquete con este tracking_number
-        # Usar guide_number como tracking_number del paquete
-        package = cls.get_package_by_tracking_number(db, guide_number)
+        operator = PackageTransitionEngine.resolve_operator(db, changed_by=changed_by)
+        package, history_entry, _ = cls._receive_announcement(
+            db,
+            announcement,
+            package_type,
+            package_condition,
+            operator,
+            observations=f"Paquete recibido por {operator.name}. Tipo: {package_type.value}, Condición: {package_condition.value}",
+            additional_data={"observations": observations}
+        )
 
-        if package:
-            # Paquete ya existe - verificar que esté en estado ANUNCIADO
-            if package.status != PackageStatus.ANUNCIADO:
-                raise ValueError(f"El paquete {guide_number} no está en estado ANUNCIADO. Estado actual: {package.status.value}")
+        return {
+            "success": True,
+            "message": f"Anuncio {guide_number} procesado y paquete actualizado a estado RECIBIDO",
+            "announcement_id": str(announcement.id),
+            "package_id": str(package.id),
+            "status": PackageStatus.RECIBIDO.value,
+            "history_entry_id": str(history_entry.id) if history_entry else None
+        }
 
-            # Actualizar el paquete existente
-            package.package_type = package_type
-            package.package_condition = package_condition
-            # package.observations = observations  # Campo eliminado del modelo Package
+    @classmethod
+    def _receive_announcement(
+        cls,
+        db: Session,
+        announcement: PackageAnnouncementNew,
+        package_type,
+        package_condition,
+        operator: OperatorInfo,
+        observations: Optional[str] = None,
+        additional_data: Optional[Dict[str, Any]] = None,
+        event_observations: Optional[str] = None
+    ) -> Tuple[Package, Optional[PackageHistory], PackageFeeCalculation]:
+        """
+        Recepción de un anuncio en una sola transacción
 
-            # Cambiar el estado a RECIBIDO
-            history_entry = cls.update_package_status(
-                db=db,
-                package=package,
-                new_status=PackageStatus.RECIBIDO,
-                changed_by=changed_by,
-                additional_data={
-                    "package_type": package_type.value,
-                    "package_condition": package_condition.value,
-                    "observations": observations
-                },
-                observations=f"Paquete recibido. Tipo: {package_type.value}, Condición: {package_condition.value}"
-            )
+        Crea el paquete (o toma el existente en ANUNCIADO), asigna BAROTI,
+        tarifas y cliente, marca el anuncio como procesado y registra historial,
+        evento y notificación con un único commit. Dos operadores recibiendo la
+        misma guía a la vez: uno gana y el otro recibe PackageConflictException.
+        """
+        package_type = PackageType(package_type.value if hasattr(package_type, "value") else package_type)
+        package_condition = PackageCondition(package_condition.value if hasattr(package_condition, "value") else package_condition)
+        fee_calculation = cls._calculate_fees_for_new_package(package_type)
+        now = get_colombia_now()
 
-            package_id = str(package.id)
-        else:
-            # Crear nuevo paquete
-            # TODO: Buscar o crear cliente basado en customer_name y customer_phone
-            # Por ahora, asignar un customer_id temporal para testing
-            customer_id = None  # NULL temporal hasta implementar búsqueda de cliente
-
-            # Generar access_code único
-            import secrets
-            import string
-            access_code = ''.join(secrets.choice(string.ascii_uppercase + string.digits) for _ in range(6))
-
-            new_package = Package(
-                tracking_number=guide_number,
-                customer_id=customer_id,  # TODO: Implementar búsqueda/creación de cliente
-                status=PackageStatus.RECIBIDO,
-                package_type=package_type,
-                package_condition=package_condition,
+        package = cls.get_package_by_tracking_number(db, announcement.tracking_code)
+        customer = cls._find_or_create_customer_from_announcement(db, announcement)
+        if package is None:
+            with db.no_autoflush:
+                access_code = cls._generate_access_code(db)
+            package = Package(
+                tracking_number=announcement.tracking_code,  # Código único del paquete
+                guide_number=announcement.guide_number,      # Número de guía del transportador
+                status=PackageStatus.ANUNCIADO,
                 access_code=access_code,
                 announced_at=announcement.announced_at,
-                received_at=get_colombia_now(),
-                created_at=get_colombia_now(),
-                updated_at=get_colombia_now()
-            )
-
-            db.add(new_package)
-            db.commit()
-            db.refresh(new_package)
-
-            # Obtener nombre real del operador si es un ID de usuario
-            operator_name = changed_by
-            if changed_by and changed_by.startswith("user_"):
-                try:
-                    user_id = int(changed_by.replace("user_", ""))
-                    operator = db.query(User).filter(User.id == user_id).first()
-                    if operator:
-                        operator_name = operator.username or operator.first_name or f"Usuario {user_id}"
-                except (ValueError, AttributeError):
-                    operator_name = changed_by
-
-            # **IMPORTANTE: Crear primero el evento ANUNCIADO si no existe**
-            existing_announced = db.query(PackageHistory).filter(
-                PackageHistory.package_id == new_package.id,
-                PackageHistory.new_status == PackageStatus.ANUNCIADO.value
-            ).first()
-            
-            if not existing_announced:
-                # Crear evento ANUNCIADO
-                announced_entry = PackageHistory(
-                    id=uuid.uuid4(),
-                    package_id=new_package.id,
-                    previous_status=None,
-                    new_status=PackageStatus.ANUNCIADO.value,
-                    changed_at=announcement.announced_at,  # Usar fecha del anuncio
-                    changed_by="system",
-                    additional_data={
-                        "customer_name": announcement.customer_name,
-                        "customer_phone": announcement.customer_phone,
-                        "guide_number": announcement.guide_number,
-                        "tracking_code": announcement.tracking_code
-                    },
-                    observations=f"Paquete anunciado por {announcement.customer_name}"
-                )
-                db.add(announced_entry)
-
-            # Crear entrada en el historial para RECIBIDO
-            history_entry = PackageHistory(
-                id=uuid.uuid4(),
-                package_id=new_package.id,  # Usar Integer directamente
-                previous_status=PackageStatus.ANUNCIADO.value,
-                new_status=PackageStatus.RECIBIDO.value,
-                changed_at=get_colombia_now(),
-                changed_by=operator_name,  # Usar nombre real del operador
-                additional_data={
-                    "package_type": package_type.value,
-                    "package_condition": package_condition.value,
-                    "observations": observations,
-                    "operator_name": operator_name
-                },
-                observations=f"Paquete recibido por {operator_name}. Tipo: {package_type.value}, Condición: {package_condition.value}"
+                created_at=now
             )
 
-            db.add(history_entry)
+        previous_status = package.status
+        package.package_type = package_type
+        package.package_condition = package_condition
+        package.base_fee = fee_calculation.base_fee
+        package.storage_fee = fee_calculation.storage_fee
+        package.total_amount = fee_calculation.total_amount
+        if customer:
+            package.customer = customer
+            package.customer_id = customer.id
+
+        if not package.posicion:
+            package.posicion = PackageTransitionEngine.next_free_baroti(db)
 
-        # Actualizar el anuncio como procesado
         announcement.is_processed = True
-        announcement.processed_at = get_colombia_now()
-        announcement.updated_at = get_colombia_now()
-
-        # Determinar el package_id correcto
-        if package:
-            # Paquete ya existía
-            announcement.package_id = package.id  # Usar INTEGER directamente
-            package_id = str(package.id)
-        else:
-            # Paquete fue creado
-            announcement.package_id = new_package.id  # Usar INTEGER directamente
-            package_id = str(new_package.id)
-
-        db.commit()
-        db.refresh(announcement)
+        announcement.processed_at = now
+        announcement.updated_at = now
+        announcement.package = package
 
-        return {
-            "success": True,
-            "message": f"Anuncio {guide_number} procesado y paquete actualizado a estado RECIBIDO",
+        history_data = {
             "announcement_id": str(announcement.id),
-            "package_id": package_id,
-            "status": PackageStatus.RECIBIDO.value,
-            "history_entry_id": str(history_entry.id)
+            "guide_number": announcement.guide_number,
+            "package_type": package_type.value,
+            "package_condition": package_condition.value,
+            "posicion": package.posicion,
+            "operator_id": operator.id,
+            "operator_name": operator.name,
+            "fee_calculation": {
+                "base_fee": float(fee_calculation.base_fee),
+                "storage_fee": float(fee_calculation.storage_fee),
+                "storage_days": fee_calculation.storage_days,
+                "total_amount": float(fee_calculation.total_amount)
+            },
+            **(additional_data or {})
         }
 
+        if previous_status == PackageStatus.RECIBIDO:
+            # Paquete ya recibido con el anuncio sin marcar (estado inconsistente):
+            # vincular y corregir datos sin registrar una nueva transición
+            try:
+                db.commit()
+            except (StaleDataError, IntegrityError):
+                db.rollback()
+                raise PackageConflictException(details={"package_id": package.id})
+            return package, None, fee_calculation
+
+        history_entry = PackageTransitionEngine.apply(
+            db,
+            package,
+            PackageStatus.RECIBIDO,
+            operator,
+            previous_status=previous_status,
+            additional_data=history_data,
+            observations=observations,
+            event_factory=lambda pkg: PackageEvent.from_package_reception(
+                package=pkg,
+                announcement=announcement,
+                operator_id=operator.id,
+                operator_name=operator.name,
+                operator_role=operator.role,
+                fee_calculation=fee_calculation,
+                file_ids=None,  # Se actualizará cuando se suban las imágenes
+                observations=event_observations,
+                additional_data={
+                    "received_from": "anuncio",
+                    "baroti_generated": pkg.posicion
+                }
+            ),
+            extra=[announcement]
+        )
+        return package, history_entry, fee_calculation
+
     @classmethod
     async def _send_sms_notification(
         cls,
@@ -426,7 +360,7 @@ class PackageStateService:
             variables["delivered_at"] = package.delivered_at.strftime("%d/%m/%Y %H:%M")
 
         # Enviar SMS usando el servicio
-        sms_service = SMSService()
+        sms_service = get_sms_service()
         try:
             from app.schemas.notification import SMSByEventRequest
             await sms_service.send_sms_by_event(
@@ -438,12 +372,12 @@ class PackageStateService:
                     custom_variables=variables,
                     priority=NotificationPriority.MEDIA,
                     is_test=False
-                )
+                ),
+                package=package,
+                customer=package.customer
             )
         except Exception as e:
             # Log error but don't fail the package update
-            import logging
-            logger = logging.getLogger("package_state_service")
             logger.warning(f"No se pudo enviar SMS para paquete {package.id}: {str(e)}")
 
     @classmethod
@@ -455,8 +389,6 @@ class PackageStateService:
         changed_by: str
     ):
         """Enviar notificación por email cuando cambia el estado del paquete"""
-        import logging
-        logger = logging.getLogger("package_state_service")
         
         logger.info(f"🔍 [EMAIL] Iniciando envío de email para paquete {package.id}, estado: {new_status}")
         
@@ -516,8 +448,8 @@ class PackageStateService:
         logger.info(f"📦 [EMAIL] Variables: {variables}")
         
         try:
-            from app.services.email_service import EmailService
-            email_service = EmailService()
+            from app.services.registry import get_email_service
+            email_service = get_email_service()
             
             result = await email_service.send_email_by_event(
                 db=db,
@@ -549,7 +481,7 @@ class PackageStateService:
         package: Package,
         current_time: datetime = None
     ) -> PackageFeeCalculation:
-        """Calcular tarifas finales incluyendo almacenamiento por días - DINÁMICO desde .env"""
+        """Calcular tarifas finales incluyendo almacenamiento por días"""
 
         if current_time is None:
             current_time = get_colombia_now()
@@ -557,36 +489,10 @@ class PackageStateService:
         # Calcular días de almacenamiento
         storage_days = cls._calculate_storage_days(package, current_time)
 
-        # Tarifas base por tipo - DINÁMICO usando configuración desde .env
-        from app.config import settings
-
-        # Normalizar tipo de paquete a string para evitar problemas entre enums de modelo/esquema
-        if package.package_type is None:
-            package_type_value = "NORMAL"
-        elif hasattr(package.package_type, "value"):
-            # Puede ser Enum de modelo o de esquema
-            package_type_value = str(package.package_type.value)
-        else:
-            package_type_value = str(package.package_type)
-
-        package_type_value = package_type_value.upper()
-
-        if package_type_value == "NORMAL":
-            base_fee = Decimal(str(settings.base_delivery_rate_normal))
-            print(f"💰 Tarifa NORMAL aplicada: {base_fee} COP (desde .env)")
-        elif package_type_value in ("EXTRA_DIMENSIONADO", "EXTRA_DIMENSIONED"):
-            base_fee = Decimal(str(settings.base_delivery_rate_extra_dimensioned))
-            print(f"💰 Tarifa EXTRA DIMENSIONADO aplicada: {base_fee} COP (desde .env)")
-        else:
-            # Fallback para tipos no reconocidos
-            base_fee = Decimal(str(settings.base_delivery_rate_normal))
-            print(f"⚠️ Tipo no reconocido ({package_type_value}), usando tarifa NORMAL: {base_fee} COP")
-
-        # Tarifa de almacenamiento por día - usando configuración desde .env
-        storage_fee_per_day = Decimal(str(settings.base_storage_rate))
-        storage_fee = storage_fee_per_day * storage_days
-        
-        print(f"📦 Días de almacenamiento: {storage_days} | Tarifa por día: {storage_fee_per_day} COP | Total almacenamiento: {storage_fee} COP")
+        # Tarifas vigentes desde el proveedor de tarifas (instantánea en memoria)
+        rates = get_rates()
+        base_fee = rates.base_fee(package.package_type)
+        storage_fee = rates.storage_fee(storage_days)
 
         # Total final
         total_amount = base_fee + storage_fee
@@ -614,264 +520,34 @@ class PackageStateService:
 
         # Validar anuncio
         announcement = cls._validate_announcement_for_receipt(db, request.announcement_id)
-
-        # Verificar si ya existe un paquete con este tracking_code (que se usa como tracking_number)
-        # IMPORTANTE: El tracking_code del anuncio se convierte en tracking_number del paquete
-        existing_package = cls.get_package_by_tracking_number(db, announcement.tracking_code)
-        if existing_package:
-            # Si ya existe un paquete con este tracking_code, verificar si el anuncio ya fue procesado
-            if announcement.is_processed:
-                raise ValueError(f"El anuncio {announcement.tracking_code} ya fue procesado")
-            else:
-                # El paquete existe pero el anuncio no está marcado como procesado
-                # Esto indica un estado inconsistente - marcar el anuncio como procesado y actualizar el paquete existente
-                announcement.is_processed = True
-                announcement.processed_at = get_colombia_now()
-                announcement.updated_at = get_colombia_now()
-                announcement.package_id = existing_package.id
-                db.commit()
-                
-                # Actualizar el paquete existente en lugar de crear uno nuevo
-                # IMPORTANTE: Guardar el estado anterior ANTES de modificarlo
-                previous_status = existing_package.status
-                # Convertir a string si es un enum, siguiendo el patrón de update_package_status
-                if previous_status is None:
-                    previous_status_value = None
-                elif hasattr(previous_status, 'value'):
-                    previous_status_value = previous_status.value
-                elif isinstance(previous_status, str):
-                    previous_status_value = previous_status
-                else:
-                    previous_status_value = str(previous_status)
-                
-                existing_package.package_type = request.package_type.value
-                existing_package.package_condition = request.package_condition.value
-                
-                # Solo cambiar estado si aún no está recibido
-                new_status_value = PackageStatus.RECIBIDO.value
-                if previous_status_value != new_status_value:
-                    existing_package.status = new_status_value
-                    existing_package.received_at = get_colombia_now()
-                
-                existing_package.updated_at = get_colombia_now()
-                
-                # Calcular tarifas actualizadas
-                fee_calculation = cls._calculate_fees_for_new_package(request.package_type)
-                existing_package.base_fee = fee_calculation.base_fee
-                existing_package.storage_fee = fee_calculation.storage_fee
-                existing_package.total_amount = fee_calculation.total_amount
-                
-                # Si no tiene posición, generar una
-                if not existing_package.posicion:
-                    existing_package.posicion = cls._generate_baroti(db)
-                
-                # Actualizar cliente si es necesario
-                customer = cls._find_or_create_customer_from_announcement(db, announcement)
-                if customer:
-                    existing_package.customer_id = customer.id
-                
-                db.commit()
-                db.refresh(existing_package)
-                
-                # Obtener nombre del operador
-                operator_name = "Sistema"
-                if request.operator_id:
-                    try:
-                        operator = db.query(User).filter(User.id == request.operator_id).first()
-                        if operator:
-                            operator_name = operator.username or operator.first_name or f"Usuario {request.operator_id}"
-                    except Exception as e:
-                        print(f"⚠️ Error obteniendo nombre del operador: {e}")
-                        operator_name = f"Operador {request.operator_id}"
-                
-                # Registrar en historial si cambió de estado
-                # Comparar correctamente considerando None
-                # Si previous_status_value es None o vacío, usar None explícitamente
-                prev_status_for_history = None
-                if previous_status_value and isinstance(previous_status_value, str) and previous_status_value.strip():
-                    prev_status_for_history = previous_status_value
-                
-                if prev_status_for_history != new_status_value:
-                    history_entry = PackageHistory(
-                        id=uuid.uuid4(),
-                        package_id=existing_package.id,
-                        previous_status=prev_status_for_history,  # None o string válido
-                        new_status=new_status_value,
-                        changed_at=get_colombia_now(),
-                        changed_by=operator_name,
-                        additional_data={
-                            "announcement_id": str(request.announcement_id),
-                            "package_type": request.package_type.value,
-                            "package_condition": request.package_condition.value,
-                            "posicion": existing_package.posicion,
-                            "operator_id": request.operator_id,
-                            "operator_name": operator_name,
-                        },
-                        observations=request.observations
-                    )
-                    db.add(history_entry)
-                    db.commit()
-                
-                # Enviar notificaciones (SMS y Email) para estado RECIBIDO
-                try:
-                    await cls._send_sms_notification(db, existing_package, PackageStatus.RECIBIDO, operator_name)
-                except Exception as e:
-                    print(f"Error sending SMS for package {existing_package.id}: {str(e)}")
-
-                try:
-                    await cls._send_email_notification(db, existing_package, PackageStatus.RECIBIDO, operator_name)
-                except Exception as e:
-                    print(f"Error sending email for package {existing_package.id}: {str(e)}")
-
-                # Retornar respuesta
-                return PackageReceiveResponse(
-                    success=True,
-                    package_id=existing_package.id,
-                    tracking_number=existing_package.tracking_number,
-                    access_code=existing_package.access_code,
-                    baroti=existing_package.posicion,  # baroti es el nombre en el schema, posicion es el campo en la BD
-                    total_amount=existing_package.total_amount,
-                    base_fee=existing_package.base_fee,
-                    storage_fee=existing_package.storage_fee,
-                    storage_days=0,
-                    message=f"Paquete {announcement.guide_number} actualizado exitosamente",
-                    received_at=existing_package.received_at or get_colombia_now()
-                )
-
-        # Calcular tarifas basadas en el anuncio (sin días de almacenamiento aún)
-        fee_calculation = cls._calculate_fees_for_new_package(request.package_type)
-
-        # Generar access code único
-        access_code = cls._generate_access_code(db)
-        
-        # Generar BAROTI automáticamente
-        posicion = cls._generate_baroti(db)
-
-        # Buscar o crear cliente basado en los datos del anuncio
-        customer = cls._find_or_create_customer_from_announcement(db, announcement)
-        
-        # Crear paquete desde anuncio
-        new_package = Package(
-            tracking_number=announcement.tracking_code,  # Código único del paquete
-            guide_number=announcement.guide_number,      # Número de guía del transportador
-            customer_id=customer.id if customer else None,
-            status=PackageStatus.RECIBIDO.value,
-            package_type=request.package_type.value,
-            package_condition=request.package_condition.value,
-            access_code=access_code,
-            posicion=posicion,
-            announced_at=announcement.announced_at,
-            received_at=get_colombia_now(),
-            base_fee=fee_calculation.base_fee,
-            storage_fee=fee_calculation.storage_fee,
-            total_amount=fee_calculation.total_amount,
-            created_at=get_colombia_now(),
-            updated_at=get_colombia_now()
+        operator = PackageTransitionEngine.resolve_operator(db, operator_id=request.operator_id)
+
+        package, history_entry, fee_calculation = cls._receive_announcement(
+            db,
+            announcement,
+            request.package_type,
+            request.package_condition,
+            operator,
+            observations=f"Paquete recibido por {operator.name}. {request.observations or ''}",
+            additional_data={"announcement_id": str(request.announcement_id)},
+            event_observations=request.observations
         )
 
-        db.add(new_package)
-        db.commit()  # Commit package first to get ID
-        db.refresh(new_package)
-
-        # Actualizar anuncio
-        announcement.is_processed = True
-        announcement.processed_at = get_colombia_now()
-        announcement.package_id = new_package.id  # Usar INTEGER directamente
-        announcement.updated_at = get_colombia_now()
-
-        # Obtener nombre real del operador
-        operator_name = "Sistema"
-        if request.operator_id:
-            try:
-                operator = db.query(User).filter(User.id == request.operator_id).first()
-                if operator:
-                    operator_name = operator.username or operator.first_name or f"Usuario {request.operator_id}"
-            except Exception as e:
-                print(f"⚠️ Error obteniendo nombre del operador: {e}")
-                operator_name = f"Operador {request.operator_id}"
-
-        # Registrar en historial
-        history_entry = PackageHistory(
-            id=uuid.uuid4(),
-            package_id=new_package.id,  # Usar Integer directamente
-            previous_status=PackageStatus.ANUNCIADO.value,
-            new_status=PackageStatus.RECIBIDO.value,
-            changed_at=get_colombia_now(),
-            changed_by=operator_name,  # Usar nombre real del operador
-            additional_data={
-                "announcement_id": str(request.announcement_id),
-                "package_type": request.package_type.value,
-                "package_condition": request.package_condition.value,
-                "posicion": posicion,  # Usar la posición generada, no del request
-                "operator_id": request.operator_id,
-                "operator_name": operator_name,  # Incluir nombre del operador
-                "fee_calculation": {
-                    "base_fee": float(fee_calculation.base_fee),
-                    "storage_fee": float(fee_calculation.storage_fee),
-                    "storage_days": fee_calculation.storage_days,
-                    "total_amount": float(fee_calculation.total_amount)
-                }
-            },
-            observations=f"Paquete recibido por {operator_name}. {request.observations or ''}"
-        )
-
-        db.add(history_entry)
-
-        # NUEVO: Registrar evento completo en package_events
-        try:
-            # Obtener rol del operador
-            operator_role = "SISTEMA"
-            if request.operator_id:
-                operator = db.query(User).filter(User.id == request.operator_id).first()
-                if operator:
-                    operator_role = operator.role.value if hasattr(operator.role, 'value') else str(operator.role)
-            
-            package_event = PackageEvent.from_package_reception(
-                package=new_package,
-                announcement=announcement,
-                operator_id=request.operator_id,
-                operator_name=operator_name,
-                operator_role=operator_role,
-                fee_calculation=fee_calculation,
-                file_ids=None,  # Se actualizará cuando se suban las imágenes
-                observations=request.observations,
-                additional_data={
-                    "received_from": "anuncio",
-                    "baroti_generated": baroti
-                }
-            )
-            db.add(package_event)
-        except Exception as e:
-            print(f"⚠️ Error registrando evento de recepción: {e}")
-
-        # Commit announcement and history changes
-        db.commit()
-        db.refresh(announcement)
-        db.refresh(history_entry)
-
-        # Enviar notificaciones (SMS y Email) para estado RECIBIDO
-        try:
-            await cls._send_sms_notification(db, new_package, PackageStatus.RECIBIDO, f"operator_{request.operator_id}")
-        except Exception as e:
-            print(f"Error sending SMS for package {new_package.id}: {str(e)}")
-
-        try:
-            await cls._send_email_notification(db, new_package, PackageStatus.RECIBIDO, f"operator_{request.operator_id}")
-        except Exception as e:
-            print(f"Error sending email for package {new_package.id}: {str(e)}")
-
         return PackageReceiveResponse(
             success=True,
-            package_id=new_package.id,
-            tracking_number=new_package.tracking_number,
-            access_code=new_package.access_code,
-            baroti=new_package.posicion,  # baroti es el nombre en el schema, posicion es el campo en la BD
+            package_id=package.id,
+            tracking_number=package.tracking_number,
+            access_code=package.access_code,
+            baroti=package.posicion,  # baroti es el nombre en el schema, posicion es el campo en la BD
             total_amount=fee_calculation.total_amount,
             base_fee=fee_calculation.base_fee,
             storage_fee=fee_calculation.storage_fee,
             storage_days=fee_calculation.storage_days,
-            message=f"Paquete {announcement.guide_number} recibido exitosamente",
-            received_at=new_package.received_at
+            message=(
+                f"Paquete {announcement.guide_number} recibido exitosamente" if history_entry
+                else f"Paquete {announcement.guide_number} actualizado exitosamente"
+            ),
+            received_at=package.received_at or get_colombia_now()
         )
 
     @classmethod
@@ -883,28 +559,22 @@ class PackageStateService:
     ) -> PackageDeliverResponse:
         """Método completo para entrega con registro de pago"""
 
-        # Obtener paquete
-        package = db.query(Package).filter(Package.id == package_id).first()
+        # Obtener paquete (con cliente, lo usa el evento de entrega)
+        package = db.query(Package).options(joinedload(Package.customer)).filter(Package.id == package_id).first()
         if not package:
             raise ValueError(f"Paquete {package_id} no encontrado")
 
         # Validar que se puede entregar
         cls._validate_package_for_delivery(package, request.customer_id)
 
-        # Obtener operador
-        operator = db.query(User).filter(User.id == request.operator_id).first()
-        operator_name = operator.full_name if operator else f"Operador {request.operator_id}"
+        operator = PackageTransitionEngine.resolve_operator(db, operator_id=request.operator_id)
+        observations = f"Entregado por {operator.name}. Pago: {request.payment_method.value} - ${request.payment_amount}"
 
-        # Cambiar estado a DELIVERED
-        # Guardar datetime antes de actualizar estado para asegurar que delivered_at esté disponible
-        from app.utils.datetime_utils import get_colombia_now
-        delivery_datetime = get_colombia_now()
-        
-        history_entry = await cls.update_package_status(
-            db=db,
-            package=package,
-            new_status=PackageStatus.ENTREGADO,
-            changed_by=f"operator_{request.operator_id}",
+        PackageTransitionEngine.apply(
+            db,
+            package,
+            PackageStatus.ENTREGADO,
+            operator,
             additional_data={
                 "payment_method": request.payment_method.value,
                 "payment_amount": float(request.payment_amount),
@@ -912,50 +582,31 @@ class PackageStateService:
                 "operator_id": request.operator_id,
                 "customer_signature": request.customer_signature
             },
-            observations=f"Entregado por {operator_name}. Pago: {request.payment_method.value} - ${request.payment_amount}"
-        )
-        
-        # NUEVO: Registrar evento completo de entrega
-        try:
-            operator_role = operator.role.value if hasattr(operator.role, 'value') else str(operator.role) if operator else "OPERADOR"
-            
-            package_event = PackageEvent.from_package_delivery(
-                package=package,
+            observations=observations,
+            event_factory=lambda pkg: PackageEvent.from_package_delivery(
+                package=pkg,
                 payment_method=request.payment_method.value,
                 payment_amount=request.payment_amount,
                 operator_id=request.operator_id,
-                operator_name=operator_name,
-                operator_role=operator_role,
+                operator_name=operator.name,
+                operator_role=operator.role,
                 file_ids={"signature": []} if request.customer_signature else None,
-                observations=f"Entregado por {operator_name}. Pago: {request.payment_method.value}",
+                observations=f"Entregado por {operator.name}. Pago: {request.payment_method.value}",
                 additional_data={
                     "customer_signature": request.customer_signature,
                     "delivery_completed": True
                 }
             )
-            db.add(package_event)
-        except Exception as e:
-            print(f"⚠️ Error registrando evento de entrega: {e}")
-        
-        # Liberar código BAROTI
-        if package.posicion:
-            package.posicion = None
-        
-        # Asegurar commit final y refresh para obtener delivered_at actualizado
-        db.commit()
-        db.refresh(package)
-        
-        # Usar delivered_at del paquete si está disponible, sino usar el datetime que guardamos
-        final_delivered_at = package.delivered_at if package.delivered_at else delivery_datetime
+        )
 
         return PackageDeliverResponse(
             success=True,
             package_id=package.id,
             tracking_number=package.tracking_number,
-            delivered_at=final_delivered_at,  # Asegurado que siempre tenga valor
+            delivered_at=package.delivered_at,
             payment_method=request.payment_method,
             payment_amount=request.payment_amount,
-            operator_name=operator_name,
+            operator_name=operator.name,
             message=f"Paquete {package.tracking_number} entregado exitosamente"
         )
 
@@ -968,8 +619,8 @@ class PackageStateService:
     ) -> PackageCancelResponse:
         """Método completo para cancelación con lógica de reembolso"""
 
-        # Obtener paquete
-        package = db.query(Package).filter(Package.id == package_id).first()
+        # Obtener paquete (con cliente, lo usa el evento de cancelación)
+        package = db.query(Package).options(joinedload(Package.customer)).filter(Package.id == package_id).first()
         if not package:
             raise ValueError(f"Paquete {package_id} no encontrado")
 
@@ -977,62 +628,38 @@ class PackageStateService:
         if package.status == PackageStatus.ENTREGADO:
             raise ValueError("No se puede cancelar un paquete ya entregado")
 
-        # Cambiar estado a CANCELLED
-        # Guardar datetime antes de actualizar estado para asegurar que cancelled_at esté disponible
-        from app.utils.datetime_utils import get_colombia_now
-        cancellation_datetime = get_colombia_now()
-        
-        history_entry = await cls.update_package_status(
-            db=db,
-            package=package,
-            new_status=PackageStatus.CANCELADO,
-            changed_by=f"operator_{request.operator_id}",
+        operator = PackageTransitionEngine.resolve_operator(db, operator_id=request.operator_id)
+
+        PackageTransitionEngine.apply(
+            db,
+            package,
+            PackageStatus.CANCELADO,
+            operator,
             additional_data={
                 "cancellation_reason": request.reason.value,
                 "refund_amount": float(request.refund_amount),
                 "operator_id": request.operator_id
             },
-            observations=f"Cancelado por: {request.reason.value}. {request.observations or ''}"
-        )
-        
-        # NUEVO: Registrar evento completo de cancelación
-        try:
-            operator = db.query(User).filter(User.id == request.operator_id).first()
-            operator_name = operator.username if operator else f"Operador {request.operator_id}"
-            operator_role = operator.role.value if hasattr(operator.role, 'value') else str(operator.role) if operator else "OPERADOR"
-            
-            package_event = PackageEvent.from_package_cancellation(
-                package=package,
+            observations=f"Cancelado por: {request.reason.value}. {request.observations or ''}",
+            event_factory=lambda pkg: PackageEvent.from_package_cancellation(
+                package=pkg,
                 cancellation_reason=request.reason.value,
                 operator_id=request.operator_id,
-                operator_name=operator_name,
-                operator_role=operator_role,
+                operator_name=operator.name,
+                operator_role=operator.role,
                 observations=request.observations,
                 additional_data={
                     "refund_amount": float(request.refund_amount),
                     "cancellation_code": request.reason.value
                 }
             )
-            db.add(package_event)
-        except Exception as e:
-            print(f"⚠️ Error registrando evento de cancelación: {e}")
-        
-        # Liberar código BAROTI
-        if package.posicion:
-            package.posicion = None
-        
-        # Asegurar commit final y refresh para obtener cancelled_at actualizado
-        db.commit()
-        db.refresh(package)
-        
-        # Usar cancelled_at del paquete si está disponible, sino usar el datetime que guardamos
-        final_cancelled_at = package.cancelled_at if package.cancelled_at else cancellation_datetime
+        )
 
         return PackageCancelResponse(
             success=True,
             package_id=package.id,
             tracking_number=package.tracking_number,
-            cancelled_at=final_cancelled_at,  # Asegurado que siempre tenga valor
+            cancelled_at=package.cancelled_at,
             reason=request.reason,
             refund_amount=request.refund_amount,
             message=f"Paquete {package.tracking_number} cancelado exitosamente"
@@ -1105,33 +732,11 @@ class PackageStateService:
 
     @classmethod
     def _calculate_fees_for_new_package(cls, package_type) -> PackageFeeCalculation:
-        """Calcular tarifas para un paquete nuevo (sin días de almacenamiento) - DINÁMICO desde .env.
+        """Calcular tarifas para un paquete nuevo (sin días de almacenamiento).
 
         Acepta tanto enums de modelo/esquema como strings y normaliza internamente.
         """
-        from app.config import settings
-
-        # Normalizar tipo de paquete a string
-        if package_type is None:
-            package_type_value = "NORMAL"
-        elif hasattr(package_type, "value"):
-            package_type_value = str(package_type.value)
-        else:
-            package_type_value = str(package_type)
-
-        package_type_value = package_type_value.upper()
-
-        # Tarifas base por tipo usando configuración DINÁMICA desde .env
-        if package_type_value == "NORMAL":
-            base_fee = Decimal(str(settings.base_delivery_rate_normal))
-            print(f"💰 Tarifa NORMAL aplicada: {base_fee} COP (desde .env: BASE_DELIVERY_RATE_NORMAL)")
-        elif package_type_value in ("EXTRA_DIMENSIONADO", "EXTRA_DIMENSIONED"):
-            base_fee = Decimal(str(settings.base_delivery_rate_extra_dimensioned))
-            print(f"💰 Tarifa EXTRA DIMENSIONADO aplicada: {base_fee} COP (desde .env: BASE_DELIVERY_RATE_EXTRA_DIMENSIONED)")
-        else:
-            base_fee = Decimal(str(settings.base_delivery_rate_normal))
-            print(f"⚠️ Tipo de paquete no reconocido ({package_type_value}), usando tarifa NORMAL: {base_fee} COP")
-
+        base_fee = get_rates().base_fee(package_type)
         storage_fee = Decimal('0.00')  # Sin almacenamiento para paquetes nuevos
         total_amount = base_fee + storage_fee
 
@@ -1151,16 +756,7 @@ class PackageStateService:
     @classmethod
     def _generate_access_code(cls, db: Session) -> str:
         """Generar código de acceso único"""
-        import secrets
-        import string
-
-        while True:
-            access_code = ''.join(secrets.choice(string.ascii_uppercase + string.digits) for _ in range(8))
-
-            # Verificar unicidad
-            existing = db.query(Package).filter(Package.access_code == access_code).first()
-            if not existing:
-                return access_code
+        return CodeGenerator.next_access_code(db)
 
     @classmethod
     def _find_or_create_customer_from_announcement(cls, db: Session, announcement) -> Optional[Customer]:
@@ -1197,8 +793,7 @@ class PackageStateService:
                 updated_at=get_colombia_now()
             )
             db.add(new_customer)
-            db.commit()
-            db.refresh(new_customer)
+            db.flush()  # Se confirma junto con la recepción
             return new_customer
         
         return None
@@ -1206,48 +801,7 @@ class PackageStateService:
     @classmethod
     def _generate_baroti(cls, db: Session) -> str:
         """Generar código BAROTI único (00-99)"""
-        import random
-        import time
-        
-        # Obtener TODOS los códigos BAROTI ocupados (sin importar el estado)
-        # La restricción de unicidad aplica a todos los paquetes
-        occupied_posiciones = db.query(Package.posicion).filter(
-            Package.posicion.isnot(None)
-        ).all()
-        
-        occupied_set = {posicion[0] for posicion in occupied_posiciones if posicion[0]}
-        
-        # Si todos los BAROTIs están ocupados (00-99), lanzar error
-        if len(occupied_set) >= 100:
-            raise ValueError(
-                "No hay códigos BAROTI disponibles. Todos los códigos (00-99) están ocupados. "
-                "Por favor, libere algunos BAROTIs de paquetes entregados o cancelados."
-            )
-        
-        # Generar código único con reintentos limitados
-        max_attempts = 200  # Limitar reintentos para evitar loops infinitos
-        attempts = 0
-        
-        while attempts < max_attempts:
-            posicion = f"{random.randint(0, 99):02d}"
-            if posicion not in occupied_set:
-                # Verificar una vez más directamente en la BD antes de retornar (race condition)
-                exists = db.query(Package).filter(Package.posicion == posicion).first()
-                if not exists:
-                    return posicion
-                # Si existe, agregarlo al set y continuar
-                occupied_set.add(posicion)
-            
-            attempts += 1
-            # Pequeña pausa si hay muchos intentos (evitar carga excesiva)
-            if attempts % 50 == 0:
-                time.sleep(0.01)
-        
-        # Si llegamos aquí, algo salió mal
-        raise ValueError(
-            f"No se pudo generar un código BAROTI único después de {max_attempts} intentos. "
-            f"Códigos ocupados: {len(occupied_set)}/100"
-        )
+        return PackageTransitionEngine.next_free_baroti(db)
 
     @classmethod
     def _is_posicion_available(cls, db: Session, posicion: str) -> bool:
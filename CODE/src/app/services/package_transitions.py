@@ -0,0 +1,341 @@
+# -*- coding: utf-8 -*-
+"""
+PAQUETES EL CLUB v1.0 - Motor de Transiciones de Paquetes
+Versión: 1.0.0
+Fecha: 2025-11-10
+Autor: Equipo de Desarrollo
+
+Cada transición de estado (recepción, entrega, cancelación o cambio manual)
+se aplica en una sola transacción con un único commit:
+
+- INSERT o UPDATE del paquete; los UPDATE llevan control optimista por versión
+  (UPDATE ... WHERE id = :id AND version = :v, ver Package.version)
+- Entrada en package_history y, si corresponde, evento en package_events
+- Asignación del BAROTI al recibir y liberación al entregar o cancelar
+- Fila en package_notification_outbox con la notificación pendiente
+
+Si otro operador ganó la carrera (versión distinta, misma guía o mismo
+BAROTI) se hace rollback y se lanza PackageConflictException (HTTP 409).
+Las notificaciones se despachan después del commit con la tarea de Celery
+dispatch_package_notification; el barrido periódico reintenta las que queden
+pendientes.
+"""
+
+import logging
+import uuid
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Callable, Dict, Any, Iterable, Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm.exc import StaleDataError
+
+from app.config import settings
+from app.models.package import Package, PackageStatus
+from app.models.package_event import PackageEvent
+from app.models.package_history import PackageHistory
+from app.models.package_outbox import PackageNotificationOutbox, OutboxStatus
+from app.models.user import User
+from app.utils.datetime_utils import get_colombia_now
+from app.utils.exceptions import PackageConflictException
+
+logger = logging.getLogger(__name__)
+
+# Estados que liberan la posición física (BAROTI) del paquete
+TERMINAL_STATUSES = (PackageStatus.ENTREGADO, PackageStatus.CANCELADO)
+
+# Posición libre al azar en un solo SELECT (la restricción UNIQUE de
+# packages.posicion resuelve la carrera entre dos recepciones simultáneas)
+FREE_BAROTI_SQL = text("""
+    SELECT to_char(n, 'FM00') AS posicion
+    FROM generate_series(0, 99) AS n
+    WHERE to_char(n, 'FM00') NOT IN (
+        SELECT posicion FROM packages WHERE posicion IS NOT NULL
+    )
+    ORDER BY random()
+    LIMIT 1
+""")
+
+# Reclamar una fila del outbox (evita que la tarea y el barrido la envíen dos veces)
+CLAIM_OUTBOX_SQL = text("""
+    UPDATE package_notification_outbox
+    SET status = 'PROCESSING', attempts = attempts + 1, processed_at = :now
+    WHERE id = :id
+      AND (status = 'PENDING' OR (status = 'PROCESSING' AND processed_at < :stale_before))
+    RETURNING package_id, new_status, changed_by, attempts
+""")
+
+
+@dataclass(frozen=True)
+class OperatorInfo:
+    """Datos del operador que firma la transición"""
+    id: Optional[int]
+    name: str
+    role: str
+
+
+class PackageTransitionEngine:
+    """Aplicación atómica de transiciones de estado de paquetes"""
+
+    # Transiciones de estado permitidas
+    ALLOWED_TRANSITIONS = {
+        PackageStatus.ANUNCIADO: [PackageStatus.RECIBIDO, PackageStatus.CANCELADO],
+        PackageStatus.RECIBIDO: [PackageStatus.ENTREGADO, PackageStatus.CANCELADO],
+        PackageStatus.ENTREGADO: [],  # Estado final
+        PackageStatus.CANCELADO: []   # Estado final
+    }
+
+    @classmethod
+    def is_transition_allowed(cls, current_status, new_status) -> bool:
+        """Verificar si una transición está permitida (compara por valor)"""
+        current_value = getattr(current_status, "value", current_status)
+        new_value = getattr(new_status, "value", new_status)
+        for status, allowed in cls.ALLOWED_TRANSITIONS.items():
+            if status.value == current_value:
+                return new_value in [s.value for s in allowed]
+        return False
+
+    # ========================================
+    # DATOS DE APOYO
+    # ========================================
+
+    @staticmethod
+    def resolve_operator(
+        db: Session,
+        operator_id: Optional[int] = None,
+        changed_by: Optional[str] = None
+    ) -> OperatorInfo:
+        """
+        Nombre y rol del operador con un único SELECT de columnas
+
+        Acepta el ID directamente o el formato "user_<id>" / "operator_<id>"
+        que usan los callers antiguos en changed_by.
+        """
+        if operator_id is None and changed_by and changed_by.startswith(("user_", "operator_")):
+            try:
+                operator_id = int(changed_by.split("_", 1)[1])
+            except ValueError:
+                operator_id = None
+
+        if operator_id is None:
+            return OperatorInfo(id=None, name=changed_by or "Sistema", role="SISTEMA")
+
+        row = db.query(User.username, User.full_name, User.role).filter(User.id == operator_id).first()
+        if not row:
+            return OperatorInfo(id=operator_id, name=f"Operador {operator_id}", role="OPERADOR")
+        role = row.role.value if hasattr(row.role, "value") else str(row.role)
+        return OperatorInfo(id=operator_id, name=row.username or row.full_name or f"Usuario {operator_id}", role=role)
+
+    @staticmethod
+    def next_free_baroti(db: Session) -> str:
+        """Posición BAROTI libre (00-99)"""
+        # Sin autoflush: los cambios pendientes del paquete se escriben en el commit
+        with db.no_autoflush:
+            posicion = db.execute(FREE_BAROTI_SQL).scalar()
+        if posicion is None:
+            raise ValueError(
+                "No hay códigos BAROTI disponibles. Todos los códigos (00-99) están ocupados. "
+                "Por favor, libere algunos BAROTIs de paquetes entregados o cancelados."
+            )
+        return posicion
+
+    # ========================================
+    # TRANSICIÓN
+    # ========================================
+
+    @classmethod
+    def apply(
+        cls,
+        db: Session,
+        package: Package,
+        new_status: PackageStatus,
+        operator: OperatorInfo,
+        previous_status: Optional[PackageStatus] = None,
+        additional_data: Optional[Dict[str, Any]] = None,
+        observations: Optional[str] = None,
+        event_factory: Optional[Callable[[Package], PackageEvent]] = None,
+        assign_baroti: bool = False,
+        extra: Iterable[Any] = (),
+        notify: bool = True
+    ) -> PackageHistory:
+        """
+        Aplicar la transición y confirmarla con un único commit
+
+        previous_status: estado de partida si el paquete es nuevo (aún sin
+        persistir); por defecto el estado actual del paquete.
+        event_factory: construye el PackageEvent a partir del paquete ya
+        actualizado (con ID asignado).
+        extra: otros objetos modificados que deben confirmarse en la misma
+        transacción (p. ej. el anuncio procesado).
+        """
+        if previous_status is None:
+            previous_status = package.status
+        if not cls.is_transition_allowed(previous_status, new_status):
+            raise ValueError(
+                f"Transición no permitida: {getattr(previous_status, 'value', previous_status)} -> {new_status.value}"
+            )
+
+        now = get_colombia_now()
+        try:
+            package.status = new_status
+            package.updated_at = now
+            if new_status == PackageStatus.RECIBIDO and not package.received_at:
+                package.received_at = now
+            elif new_status == PackageStatus.ENTREGADO and not package.delivered_at:
+                package.delivered_at = now
+            elif new_status == PackageStatus.CANCELADO and not package.cancelled_at:
+                package.cancelled_at = now
+
+            if assign_baroti and not package.posicion:
+                package.posicion = cls.next_free_baroti(db)
+            elif new_status in TERMINAL_STATUSES:
+                package.posicion = None
+
+            db.add(package)
+            for obj in extra:
+                db.add(obj)
+            if package.id is None:
+                # INSERT ... RETURNING id: las filas dependientes necesitan el ID
+                db.flush()
+
+            history_entry = PackageHistory(
+                id=uuid.uuid4(),
+                package_id=package.id,
+                previous_status=getattr(previous_status, "value", previous_status),
+                new_status=new_status.value,
+                changed_at=now,
+                changed_by=operator.name,
+                additional_data=additional_data or {},
+                observations=observations
+            )
+            db.add(history_entry)
+
+            if event_factory:
+                event = event_factory(package)
+                event.status_before = getattr(previous_status, "value", previous_status)
+                db.add(event)
+
+            outbox_entry = None
+            if notify and package.customer_id:
+                outbox_entry = PackageNotificationOutbox(
+                    id=uuid.uuid4(),
+                    package_id=package.id,
+                    new_status=new_status.value,
+                    changed_by=operator.name,
+                    created_at=now
+                )
+                db.add(outbox_entry)
+
+            db.commit()
+        except StaleDataError:
+            db.rollback()
+            logger.warning("Conflicto de versión en paquete %s (%s)", package.id, new_status.value)
+            raise PackageConflictException(details={"package_id": package.id})
+        except IntegrityError as e:
+            db.rollback()
+            logger.warning("Conflicto de unicidad en transición de paquete: %s", e.orig)
+            raise PackageConflictException(
+                message="Otro usuario registró este paquete o tomó la misma posición, recargue e intente de nuevo",
+                details={"package_id": package.id}
+            )
+
+        cls._invalidate_cache(package)
+        if outbox_entry is not None:
+            cls.enqueue_notifications([outbox_entry.id])
+        return history_entry
+
+    @staticmethod
+    def _invalidate_cache(package: Package) -> None:
+        try:
+            from app.cache_manager import cache_manager
+            cache_manager.invalidate_package_cache(
+                package_id=str(package.id),
+                customer_id=str(package.customer_id) if package.customer_id else None
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Error invalidando caché para paquete {package.id}: {str(e)}")
+
+    # ========================================
+    # OUTBOX DE NOTIFICACIONES
+    # ========================================
+
+    @staticmethod
+    def enqueue_notifications(outbox_ids: Iterable[uuid.UUID]) -> None:
+        """Encolar el despacho; si Celery no está disponible lo hará el barrido periódico"""
+        try:
+            from app.tasks import dispatch_package_notification
+            for outbox_id in outbox_ids:
+                dispatch_package_notification.delay(str(outbox_id))
+        except Exception as e:
+            logger.warning(f"Notificaciones de paquete quedan pendientes en el outbox: {e}")
+
+    @classmethod
+    async def dispatch(cls, db: Session, outbox_id: str) -> bool:
+        """
+        Enviar SMS y email de una fila del outbox
+
+        Devuelve False si la fila ya fue reclamada por otro proceso o no existe.
+        """
+        from app.services.package_state_service import PackageStateService
+
+        now = get_colombia_now()
+        claimed = db.execute(CLAIM_OUTBOX_SQL, {
+            "id": outbox_id,
+            "now": now,
+            "stale_before": now - timedelta(seconds=settings.package_outbox_processing_timeout),
+        }).first()
+        db.commit()
+        if not claimed:
+            return False
+
+        entry = db.get(PackageNotificationOutbox, uuid.UUID(str(outbox_id)))
+        if entry is None:
+            # Borrada en cascada con su paquete (eliminación o archivo) tras reclamarla
+            logger.info(f"Notificación {outbox_id} ya no existe en el outbox; se omite")
+            return False
+        package = db.query(Package).options(joinedload(Package.customer)).filter(
+            Package.id == claimed.package_id
+        ).first()
+
+        try:
+            if package:
+                new_status = PackageStatus(claimed.new_status)
+                await PackageStateService._send_sms_notification(db, package, new_status, claimed.changed_by)
+                await PackageStateService._send_email_notification(db, package, new_status, claimed.changed_by)
+            entry.status = OutboxStatus.SENT.value
+            entry.last_error = None
+        except Exception as e:
+            db.rollback()
+            entry = db.get(PackageNotificationOutbox, uuid.UUID(str(outbox_id)))
+            if entry is None:
+                logger.warning(f"Error despachando notificación {outbox_id}, que ya no existe en el outbox: {e}")
+                return False
+            entry.last_error = str(e)
+            entry.status = (
+                OutboxStatus.FAILED.value
+                if claimed.attempts >= settings.package_outbox_max_attempts
+                else OutboxStatus.PENDING.value
+            )
+            logger.warning(f"Error despachando notificación {outbox_id} (intento {claimed.attempts}): {e}")
+        entry.processed_at = get_colombia_now()
+        db.commit()
+        return entry.status == OutboxStatus.SENT.value
+
+    @staticmethod
+    def pending_outbox_ids(db: Session, older_than_seconds: int, limit: int = 100) -> list:
+        """IDs pendientes (o reclamados y abandonados) para el barrido periódico"""
+        now = get_colombia_now()
+        rows = db.execute(text("""
+            SELECT id FROM package_notification_outbox
+            WHERE (status = 'PENDING' AND created_at < :pending_before)
+               OR (status = 'PROCESSING' AND processed_at < :stale_before)
+            ORDER BY created_at
+            LIMIT :limit
+        """), {
+            "pending_before": now - timedelta(seconds=older_than_seconds),
+            "stale_before": now - timedelta(seconds=settings.package_outbox_processing_timeout),
+            "limit": limit,
+        }).scalars().all()
+        return [str(row) for row in rows]
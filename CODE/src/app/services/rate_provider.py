@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+"""
+PAQUETES EL CLUB v1.0 - Proveedor de Tarifas
+Versión: 1.0.0
+Fecha: 2025-11-10
+Autor: Equipo de Desarrollo
+
+Fuente única de tarifas para todos los cálculos de cobro. Las tarifas activas
+de la tabla rates se cargan una vez en una instantánea inmutable (RateSnapshot);
+los valores de .env (settings) solo se usan como respaldo cuando no hay una
+tarifa activa para ese concepto.
+
+RateService publica un aviso en Redis (canal RATES_CHANGED_CHANNEL) cada vez que
+crea, actualiza o desactiva una tarifa. Cada proceso escucha el canal
+(ChangeChannel, un hilo por proceso iniciado en el primer uso), construye una
+instantánea nueva y reemplaza la referencia de forma atómica; los cálculos
+nunca consultan la base de datos ni el entorno.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from decimal import Decimal
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional
+
+from sqlalchemy import text
+
+from app.config import settings
+from app.models.package import PackageType
+from app.services.change_channel import ChangeChannel
+from app.utils.datetime_utils import get_colombia_now
+
+logger = logging.getLogger(__name__)
+
+RATES_CHANGED_CHANNEL = "paqueteria:rates:changed"
+
+ACTIVE_RATES_SQL = text("""
+    SELECT rate_type, name, base_price, daily_storage_rate
+    FROM rates
+    WHERE is_active = true
+      AND valid_from <= :now
+      AND (valid_to IS NULL OR valid_to > :now)
+    ORDER BY valid_from ASC
+""")
+
+
+def _package_type_key(package_type: Any) -> str:
+    """Normalizar un tipo de paquete (enum de modelo/esquema o string) a su valor"""
+    if package_type is None:
+        return PackageType.NORMAL.value
+    value = str(getattr(package_type, "value", package_type)).upper()
+    if value == "EXTRA_DIMENSIONED":
+        return PackageType.EXTRA_DIMENSIONADO.value
+    return value
+
+
+@dataclass(frozen=True)
+class RateSnapshot:
+    """Tarifas vigentes en un instante; nunca se modifica, se reemplaza"""
+    base_fees: Mapping[str, Decimal]
+    storage_per_day: Decimal
+    currency: str
+    source: str
+    version: str
+    loaded_at: float = field(default_factory=time.monotonic)
+
+    def base_fee(self, package_type: Any) -> Decimal:
+        """Tarifa base según tipo de paquete (NORMAL si el tipo no se reconoce)"""
+        key = _package_type_key(package_type)
+        return self.base_fees.get(key, self.base_fees[PackageType.NORMAL.value])
+
+    def storage_fee(self, storage_days: int) -> Decimal:
+        """Tarifa de almacenamiento por días completos"""
+        if not storage_days or storage_days <= 0:
+            return Decimal("0")
+        return self.storage_per_day * Decimal(storage_days)
+
+    def calculate(self, package_type: Any, storage_days: int = 0) -> Dict[str, Any]:
+        """Cálculo completo de tarifa (base + almacenamiento)"""
+        base_fee = self.base_fee(package_type)
+        storage_fee = self.storage_fee(storage_days)
+        return {
+            "base_fee": base_fee,
+            "storage_fee": storage_fee,
+            "storage_days": storage_days,
+            "total_fee": base_fee + storage_fee,
+            "package_type": _package_type_key(package_type),
+            "rates_source": self.source
+        }
+
+    def as_public_dict(self) -> Dict[str, Any]:
+        """Tarifas para el frontend (enteros en COP)"""
+        return {
+            "normal": int(self.base_fee(PackageType.NORMAL)),
+            "extra_dimensioned": int(self.base_fee(PackageType.EXTRA_DIMENSIONADO)),
+            "storage_per_day": int(self.storage_per_day),
+            "currency": self.currency
+        }
+
+
+def build_settings_snapshot(version: str = "settings") -> RateSnapshot:
+    """Instantánea solo con los valores de .env (respaldo)"""
+    return RateSnapshot(
+        base_fees=MappingProxyType({
+            PackageType.NORMAL.value: Decimal(str(settings.base_delivery_rate_normal)),
+            PackageType.EXTRA_DIMENSIONADO.value: Decimal(str(settings.base_delivery_rate_extra_dimensioned)),
+        }),
+        storage_per_day=Decimal(str(settings.base_storage_rate)),
+        currency=settings.currency,
+        source="env",
+        version=version
+    )
+
+
+def build_snapshot_from_rows(rows, version: str) -> RateSnapshot:
+    """
+    Construir una instantánea a partir de filas (rate_type, name, base_price, daily_storage_rate)
+
+    - package_type: base_price de la tarifa cuyo nombre es el tipo de paquete
+    - storage: daily_storage_rate de la tarifa de almacenamiento
+    Lo que no esté definido en la tabla se toma de .env.
+    """
+    fallback = build_settings_snapshot()
+    base_fees = dict(fallback.base_fees)
+    storage_per_day = fallback.storage_per_day
+    from_db = False
+
+    # Las filas vienen ordenadas por valid_from: la más reciente prevalece
+    for rate_type, name, base_price, daily_storage_rate in rows:
+        rate_type = str(getattr(rate_type, "value", rate_type)).lower()
+        if rate_type == "package_type":
+            key = _package_type_key(name)
+            if key in base_fees and base_price is not None:
+                base_fees[key] = Decimal(str(base_price))
+                from_db = True
+        elif rate_type == "storage" and daily_storage_rate is not None:
+            storage_per_day = Decimal(str(daily_storage_rate))
+            from_db = True
+
+    return RateSnapshot(
+        base_fees=MappingProxyType(base_fees),
+        storage_per_day=storage_per_day,
+        currency=settings.currency,
+        source="database" if from_db else "env",
+        version=version
+    )
+
+
+class RateProvider:
+    """
+    Proveedor de tarifas en memoria por proceso
+
+    La instantánea se carga de forma perezosa en el primer uso y se reemplaza
+    cuando llega un aviso por Redis. Si Redis no está disponible se recarga
+    como máximo cada settings.rates_snapshot_max_age segundos.
+    """
+
+    def __init__(self):
+        self._snapshot: Optional[RateSnapshot] = None
+        self._lock = threading.Lock()
+        self._changes = ChangeChannel(
+            RATES_CHANGED_CHANNEL,
+            on_change=self._on_change,
+            retry_interval=lambda: settings.rates_snapshot_max_age
+        )
+
+    # ========================================
+    # LECTURA
+    # ========================================
+
+    def get_snapshot(self) -> RateSnapshot:
+        """Instantánea vigente (sin acceso a base de datos salvo la primera carga)"""
+        self._changes.ensure_listening()
+        snapshot = self._snapshot
+        if snapshot is None or self._is_stale(snapshot):
+            with self._lock:
+                snapshot = self._snapshot
+                if snapshot is None or self._is_stale(snapshot):
+                    snapshot = self.reload()
+        return snapshot
+
+    def _is_stale(self, snapshot: RateSnapshot) -> bool:
+        if self._changes.listening:
+            return False
+        return time.monotonic() - snapshot.loaded_at > settings.rates_snapshot_max_age
+
+    def reload(self, version: Optional[str] = None) -> RateSnapshot:
+        """Cargar las tarifas activas y reemplazar la instantánea"""
+        from app.database import SessionLocal
+
+        version = version or str(int(time.time()))
+        db = SessionLocal()
+        try:
+            rows = db.execute(ACTIVE_RATES_SQL, {"now": get_colombia_now()}).fetchall()
+            snapshot = build_snapshot_from_rows(rows, version)
+        except Exception as e:
+            logger.warning(f"No se pudieron cargar tarifas desde la base de datos, usando .env: {e}")
+            snapshot = build_settings_snapshot(version)
+        finally:
+            db.close()
+
+        self._snapshot = snapshot
+        logger.info(f"Tarifas cargadas (fuente: {snapshot.source}, versión: {snapshot.version})")
+        return snapshot
+
+    # ========================================
+    # NOTIFICACIONES
+    # ========================================
+
+    def publish_change(self) -> None:
+        """Avisar a todos los procesos que las tarifas cambiaron y recargar localmente"""
+        version = str(int(time.time() * 1000))
+        self._changes.publish(version)
+        self.reload(version)
+
+    def _on_change(self, version: Optional[str]) -> None:
+        """Aviso recibido (None al suscribirse): recargar si la versión es otra"""
+        if version is None or self._snapshot is None or self._snapshot.version != version:
+            self.reload(version)
+
+
+# Instancia global del proveedor de tarifas
+rate_provider = RateProvider()
+
+
+def get_rates() -> RateSnapshot:
+    """Atajo para obtener la instantánea de tarifas vigente"""
+    return rate_provider.get_snapshot()
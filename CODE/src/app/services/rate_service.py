@@ -12,7 +12,7 @@ from app.models.rate import Rate, RateType
 from app.models.package import Package, PackageType
 from app.utils.exceptions import RateCalculationException
 from app.utils.datetime_utils import get_colombia_now
-from app.config import settings
+from app.services.rate_provider import get_rates, rate_provider
 
 class RateService:
     """Servicio para la lógica de negocio de tarifas"""
@@ -28,34 +28,18 @@ class RateService:
     ) -> Dict[str, Decimal]:
         """Calcular costos de un paquete con el nuevo sistema de tarifas"""
 
-        # Obtener tarifas activas
-        active_rates = self.get_active_rates()
-
-        # Tarifas base según configuración
-        base_rates = {
-            PackageType.NORMAL: Decimal(str(settings.base_delivery_rate)),
-            PackageType.EXTRA_DIMENSIONADO: Decimal(str(settings.base_delivery_rate * settings.normal_package_multiplier)),
-        }
+        # Tarifas vigentes (instantánea en memoria, ya incluye la tarifa por tipo)
+        rates = get_rates()
 
         # Costo base según tipo de paquete
-        base_cost = base_rates.get(package_type, Decimal(str(settings.base_delivery_rate)))
+        base_cost = rates.base_fee(package_type)
 
         # Costo de almacenamiento
-        storage_cost = Decimal('0')
-        if storage_days > 0:
-            daily_rate = Decimal(str(settings.base_storage_rate))
-            storage_cost = Decimal(storage_days) * daily_rate
+        storage_cost = rates.storage_fee(storage_days)
 
         # Costo de entrega
         delivery_cost = base_cost if delivery_required else Decimal('0')
 
-        # Aplicar multiplicadores de tarifa activa si existe
-        if 'package_type' in active_rates:
-            rate = active_rates['package_type']
-            multiplier = Decimal(str(rate.package_type_multiplier))
-            base_cost *= multiplier
-            delivery_cost *= multiplier
-
         total_cost = base_cost + storage_cost + delivery_cost
 
         return {
@@ -122,6 +106,7 @@ class RateService:
         self.db.add(new_rate)
         self.db.commit()
         self.db.refresh(new_rate)
+        rate_provider.publish_change()
 
         return new_rate
 
@@ -142,6 +127,7 @@ class RateService:
 
         self.db.commit()
         self.db.refresh(rate)
+        rate_provider.publish_change()
 
         return rate
 
@@ -158,6 +144,7 @@ class RateService:
 
         self.db.commit()
         self.db.refresh(rate)
+        rate_provider.publish_change()
 
         return rate
 
@@ -254,17 +241,8 @@ class RateService:
 
     def calculate_storage_fee(self, days: int) -> Decimal:
         """Calcular tarifa de almacenamiento"""
-        if days <= 0:
-            return Decimal('0')
-
-        daily_rate = Decimal(str(settings.base_storage_rate))
-        return Decimal(days) * daily_rate
+        return get_rates().storage_fee(days)
 
     def calculate_delivery_fee(self, package_type: PackageType) -> Decimal:
         """Calcular tarifa de entrega"""
-        base_rates = {
-            PackageType.NORMAL: Decimal(str(settings.base_delivery_rate)),
-            PackageType.EXTRA_DIMENSIONADO: Decimal(str(settings.base_delivery_rate * settings.normal_package_multiplier)),
-        }
-
-        return base_rates.get(package_type, Decimal(str(settings.base_delivery_rate)))
\ No newline at end of file
+        return get_rates().base_fee(package_type)
\ No newline at end of file
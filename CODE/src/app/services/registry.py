@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+PAQUETES EL CLUB v1.0 - Registro de Servicios por Proceso
+Versión: 1.0.0
+Fecha: 2025-11-10
+Autor: Equipo de Desarrollo
+
+S3Service, SMSService y EmailService se construyen una sola vez por proceso
+(worker de uvicorn o de Celery) y se reutilizan en todas las peticiones:
+
+- El cliente boto3 y su pool de conexiones, el token de Liwa cacheado y el
+  entorno Jinja2 de los emails dejan de crearse en cada llamada.
+- La creación es perezosa y thread-safe (doble verificación con lock); el
+  lifespan de FastAPI y el hook worker_process_init de Celery llaman a
+  warm_up() para pagar el costo al arrancar y no en la primera petición.
+- Si la construcción falla (p. ej. S3 sin credenciales) la excepción se
+  propaga igual que antes y se reintenta en la siguiente llamada.
+
+Uso en rutas: Depends(get_s3_service) o llamada directa get_s3_service().
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _build_s3_service():
+    from app.services.s3_service import S3Service
+    return S3Service()
+
+
+def _build_sms_service():
+    from app.services.sms_service import SMSService
+    return SMSService()
+
+
+def _build_email_service():
+    from app.services.email_service import EmailService
+    return EmailService()
+
+
+class ServiceRegistry:
+    """Instancias únicas por proceso de los servicios con clientes externos"""
+
+    def __init__(self, factories: Dict[str, Callable[[], Any]]):
+        self._factories = dict(factories)
+        self._instances: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> Any:
+        """Obtener (o construir la primera vez) la instancia del servicio"""
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        with self._lock:
+            instance = self._instances.get(name)
+            if instance is None:
+                instance = self._factories[name]()
+                self._instances[name] = instance
+            return instance
+
+    def warm_up(self, names: Optional[Iterable[str]] = None) -> Dict[str, bool]:
+        """
+        Construir los servicios por adelantado
+
+        Los fallos se registran y no interrumpen el arranque; el servicio se
+        volverá a intentar construir cuando se use.
+        """
+        results = {}
+        for name in names or self._factories:
+            try:
+                self.get(name)
+                results[name] = True
+            except Exception as e:
+                logger.warning("⚠️ Servicio '%s' no disponible al iniciar: %s", name, e)
+                results[name] = False
+        return results
+
+    def reset(self) -> None:
+        """Descartar las instancias (tras un fork o al cerrar la aplicación)"""
+        with self._lock:
+            self._instances.clear()
+
+
+service_registry = ServiceRegistry({
+    "s3": _build_s3_service,
+    "sms": _build_sms_service,
+    "email": _build_email_service,
+})
+
+
+# ========================================
+# DEPENDENCIAS / ACCESO DIRECTO
+# ========================================
+
+def get_s3_service():
+    """S3Service compartido del proceso"""
+    return service_registry.get("s3")
+
+
+def get_sms_service():
+    """SMSService compartido del proceso"""
+    return service_registry.get("sms")
+
+
+def get_email_service():
+    """EmailService compartido del proceso"""
+    return service_registry.get("email")
@@ -10,8 +10,11 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func, and_, or_, desc, asc, extract, case
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timedelta
+from pathlib import Path
 from uuid import UUID
 import json
+import logging
+import time
 
 from app.models.report import (
     Report, ReportTemplate, DashboardMetric, ReportSchedule,
@@ -22,7 +25,14 @@ from app.models.customer import Customer
 from app.models.user import User
 from app.models.message import Message
 from app.models.notification import Notification
+from app.config import settings
+from app.services.package_archive_service import with_archive
 from app.utils.datetime_utils import get_colombia_now
+from app.utils.report_exporters import (
+    REPORT_EXTENSIONS, REPORT_CONTENT_TYPES, export_report, build_report_summary
+)
+
+logger = logging.getLogger(__name__)
 
 
 class ReportService:
@@ -77,38 +87,27 @@ class ReportService:
         date_from = params.get("date_from")
         date_to = params.get("date_to")
 
-        # Consulta base
-        query = self.db.query(Package)
-
-        if date_from:
-            query = query.filter(Package.created_at >= date_from)
-        if date_to:
-            query = query.filter(Package.created_at <= date_to)
+        # Paquetes activos y archivados
+        packages = with_archive(Package, "id", "status", "package_type", "created_at")
+        period = and_(
+            packages.c.created_at >= date_from if date_from else True,
+            packages.c.created_at <= date_to if date_to else True
+        )
 
         # Estadísticas generales
-        total_packages = query.count()
+        total_packages = self.db.query(func.count(packages.c.id)).filter(period).scalar()
 
         # Por estado
         status_counts = self.db.query(
-            Package.status, func.count(Package.id)
-        ).filter(
-            and_(
-                Package.created_at >= date_from if date_from else True,
-                Package.created_at <= date_to if date_to else True
-            )
-        ).group_by(Package.status).all()
+            packages.c.status, func.count(packages.c.id)
+        ).filter(period).group_by(packages.c.status).all()
 
         status_summary = {status.value: count for status, count in status_counts}
 
         # Por tipo de paquete
         type_counts = self.db.query(
-            Package.package_type, func.count(Package.id)
-        ).filter(
-            and_(
-                Package.created_at >= date_from if date_from else True,
-                Package.created_at <= date_to if date_to else True
-            )
-        ).group_by(Package.package_type).all()
+            packages.c.package_type, func.count(packages.c.id)
+        ).filter(period).group_by(packages.c.package_type).all()
 
         type_summary = {ptype.value if ptype else "sin_tipo": count for ptype, count in type_counts}
 
@@ -152,14 +151,13 @@ class ReportService:
             )
         ).scalar()
 
-        # Top clientes por paquetes
+        # Top clientes por paquetes (contador histórico: incluye los archivados)
         top_customers = self.db.query(
             Customer.full_name,
             Customer.phone,
-            func.count(Package.id).label('package_count')
-        ).join(Package, Customer.id == Package.customer_id
-        ).group_by(Customer.id, Customer.full_name, Customer.phone
-        ).order_by(desc('package_count')
+            Customer.total_packages
+        ).filter(Customer.total_packages > 0
+        ).order_by(desc(Customer.total_packages), Customer.id
         ).limit(10).all()
 
         return {
@@ -199,29 +197,31 @@ class ReportService:
         date_from = params.get("date_from")
         date_to = params.get("date_to")
 
+        packages = with_archive(Package, "id", "status", "announced_at", "received_at")
+
         # Tiempos de procesamiento de paquetes
         processing_times = self.db.query(
             func.avg(
-                func.extract('epoch', Package.received_at) - func.extract('epoch', Package.announced_at)
+                func.extract('epoch', packages.c.received_at) - func.extract('epoch', packages.c.announced_at)
             ).label('avg_processing_hours')
         ).filter(
             and_(
-                Package.announced_at.isnot(None),
-                Package.received_at.isnot(None),
-                Package.announced_at >= date_from if date_from else True,
-                Package.announced_at <= date_to if date_to else True
+                packages.c.announced_at.isnot(None),
+                packages.c.received_at.isnot(None),
+                packages.c.announced_at >= date_from if date_from else True,
+                packages.c.announced_at <= date_to if date_to else True
             )
         ).scalar()
 
         avg_processing_hours = processing_times * 24 if processing_times else 0
 
         # Tasa de éxito de entregas
-        delivered_count = self.db.query(func.count(Package.id)).filter(
-            Package.status == PackageStatus.ENTREGADO
+        delivered_count = self.db.query(func.count(packages.c.id)).filter(
+            packages.c.status == PackageStatus.ENTREGADO
         ).scalar()
 
-        total_received = self.db.query(func.count(Package.id)).filter(
-            Package.status.in_([PackageStatus.RECIBIDO, PackageStatus.ENTREGADO])
+        total_received = self.db.query(func.count(packages.c.id)).filter(
+            packages.c.status.in_([PackageStatus.RECIBIDO, PackageStatus.ENTREGADO])
         ).scalar()
 
         delivery_rate = (delivered_count / total_received * 100) if total_received > 0 else 0
@@ -242,33 +242,23 @@ class ReportService:
         date_from = params.get("date_from")
         date_to = params.get("date_to")
 
-        # Estadísticas de SMS
-        total_sms = self.db.query(func.count(Notification.id)).filter(
-            and_(
-                Notification.created_at >= date_from if date_from else True,
-                Notification.created_at <= date_to if date_to else True
-            )
-        ).scalar()
+        # Estadísticas de SMS (activas y archivadas)
+        notifications = with_archive(Notification, "id", "status", "cost_cents", "created_at")
+        period = and_(
+            notifications.c.created_at >= date_from if date_from else True,
+            notifications.c.created_at <= date_to if date_to else True
+        )
+        total_sms = self.db.query(func.count(notifications.c.id)).filter(period).scalar()
 
         # Por estado
         status_counts = self.db.query(
-            Notification.status, func.count(Notification.id)
-        ).filter(
-            and_(
-                Notification.created_at >= date_from if date_from else True,
-                Notification.created_at <= date_to if date_to else True
-            )
-        ).group_by(Notification.status).all()
+            notifications.c.status, func.count(notifications.c.id)
+        ).filter(period).group_by(notifications.c.status).all()
 
         status_summary = {status.value: count for status, count in status_counts}
 
         # Costo total
-        total_cost = self.db.query(func.sum(Notification.cost_cents)).filter(
-            and_(
-                Notification.created_at >= date_from if date_from else True,
-                Notification.created_at <= date_to if date_to else True
-            )
-        ).scalar() or 0
+        total_cost = self.db.query(func.sum(notifications.c.cost_cents)).filter(period).scalar() or 0
 
         # Tasa de entrega
         delivered = status_summary.get('delivered', 0)
@@ -291,35 +281,25 @@ class ReportService:
         date_from = params.get("date_from")
         date_to = params.get("date_to")
 
-        # Estadísticas de mensajes
-        total_messages = self.db.query(func.count(Message.id)).filter(
-            and_(
-                Message.created_at >= date_from if date_from else True,
-                Message.created_at <= date_to if date_to else True
-            )
-        ).scalar()
+        # Estadísticas de mensajes (activos y archivados)
+        messages = with_archive(Message, "id", "status", "priority", "created_at")
+        period = and_(
+            messages.c.created_at >= date_from if date_from else True,
+            messages.c.created_at <= date_to if date_to else True
+        )
+        total_messages = self.db.query(func.count(messages.c.id)).filter(period).scalar()
 
         # Por estado
         status_counts = self.db.query(
-            Message.status, func.count(Message.id)
-        ).filter(
-            and_(
-                Message.created_at >= date_from if date_from else True,
-                Message.created_at <= date_to if date_to else True
-            )
-        ).group_by(Message.status).all()
+            messages.c.status, func.count(messages.c.id)
+        ).filter(period).group_by(messages.c.status).all()
 
         status_summary = {status.value: count for status, count in status_counts}
 
         # Por prioridad
         priority_counts = self.db.query(
-            Message.priority, func.count(Message.id)
-        ).filter(
-            and_(
-                Message.created_at >= date_from if date_from else True,
-                Message.created_at <= date_to if date_to else True
-            )
-        ).group_by(Message.priority).all()
+            messages.c.priority, func.count(messages.c.id)
+        ).filter(period).group_by(messages.c.priority).all()
 
         priority_summary = {priority.value: count for priority, count in priority_counts}
 
@@ -343,17 +323,19 @@ class ReportService:
         if not date_to:
             date_to = get_colombia_now()
 
-        # Consulta de paquetes por día
+        # Consulta de paquetes por día (activos y archivados)
+        packages = with_archive(Package, "id", "created_at")
+        day = func.date(packages.c.created_at)
         daily_stats = self.db.query(
-            func.date(Package.created_at).label('date'),
-            func.count(Package.id).label('count')
+            day.label('date'),
+            func.count(packages.c.id).label('count')
         ).filter(
             and_(
-                Package.created_at >= date_from,
-                Package.created_at <= date_to
+                packages.c.created_at >= date_from,
+                packages.c.created_at <= date_to
             )
-        ).group_by(func.date(Package.created_at)
-        ).order_by(func.date(Package.created_at)).all()
+        ).group_by(day
+        ).order_by(day).all()
 
         return [
             {
@@ -366,11 +348,16 @@ class ReportService:
 
     def create_report(self, title: str, report_type: ReportType,
                      parameters: Optional[Dict[str, Any]] = None,
-                     created_by_id: Optional[UUID] = None) -> Report:
+                     created_by_id: Optional[UUID] = None,
+                     report_format: ReportFormat = ReportFormat.PDF,
+                     description: Optional[str] = None) -> Report:
         """Crea un nuevo reporte"""
         report = Report(
             title=title,
+            description=description,
             report_type=report_type,
+            format=report_format,
+            status=ReportStatus.PENDING,
             parameters=parameters or {},
             created_by_id=created_by_id
         )
@@ -429,6 +416,148 @@ class ReportService:
 
         return reports, total
 
+    # === TRABAJOS DE REPORTES (GENERACIÓN EN SEGUNDO PLANO) ===
+
+    def run_report_job(self, report_id: UUID) -> Report:
+        """
+        Ejecuta un reporte encolado: genera los datos, los escribe como artefacto
+        (archivo local o S3) y deja en la fila solo el estado y un resumen compacto
+        """
+        report = self.get_report(report_id)
+        if not report:
+            raise ValueError(f"Reporte no encontrado: {report_id}")
+        if report.status == ReportStatus.COMPLETED:
+            return report
+
+        report.status = ReportStatus.PROCESSING
+        self.db.commit()
+
+        started = time.monotonic()
+        report_format = report.format or ReportFormat.PDF
+        local_path = Path(settings.reports_dir) / f"{report.id}.{REPORT_EXTENSIONS[report_format]}"
+
+        try:
+            data = self.generate_report(report.report_type, self._parse_report_parameters(report.parameters))
+            file_size = export_report(data, report_format, local_path, title=report.title)
+
+            report.file_path = self._store_report_artifact(local_path)
+            report.file_size = file_size
+            report.summary = build_report_summary(data)
+            report.data = None
+            report.status = ReportStatus.COMPLETED
+            report.completed_at = get_colombia_now()
+        except Exception as e:
+            logger.error(f"Error generando reporte {report_id}: {e}")
+            self.db.rollback()
+            report = self.get_report(report_id)
+            report.status = ReportStatus.FAILED
+            report.summary = {"error": str(e)}
+            if local_path.exists():
+                local_path.unlink()
+        finally:
+            report.processing_time = round(time.monotonic() - started, 3)
+            self.db.commit()
+            self.db.refresh(report)
+
+        return report
+
+    def get_report_artifact(self, report: Report) -> Dict[str, Any]:
+        """
+        Devuelve la ubicación del artefacto de un reporte completado
+
+        Returns:
+            Dict con "path" (archivo local) o "url" (URL firmada de S3),
+            además de "file_name" y "content_type"
+        """
+        if report.status != ReportStatus.COMPLETED or not report.file_path:
+            raise ValueError("El reporte aún no tiene un archivo disponible")
+
+        report_format = report.format or ReportFormat.PDF
+        artifact = {
+            "file_name": f"{report.report_type.value}_{report.id}.{REPORT_EXTENSIONS[report_format]}",
+            "content_type": REPORT_CONTENT_TYPES[report_format],
+        }
+
+        if report.file_path.startswith("s3://"):
+            from app.services.registry import get_s3_service
+            s3_key = report.file_path.split("/", 3)[3]
+            s3_service = get_s3_service()
+            artifact["url"] = s3_service.s3_client.generate_presigned_url(
+                "get_object",
+                Params={
+                    "Bucket": s3_service.bucket_name,
+                    "Key": s3_key,
+                    "ResponseContentDisposition": f'attachment; filename="{artifact["file_name"]}"'
+                },
+                ExpiresIn=settings.reports_download_expiration
+            )
+        else:
+            artifact["path"] = report.file_path
+
+        return artifact
+
+    def cleanup_old_reports(self, days_old: Optional[int] = None) -> Dict[str, Any]:
+        """Elimina reportes terminados más antiguos que la retención y sus artefactos"""
+        days_old = days_old or settings.reports_retention_days
+        cutoff_date = get_colombia_now() - timedelta(days=days_old)
+
+        old_reports = self.db.query(Report.id, Report.file_path).filter(
+            and_(
+                Report.created_at < cutoff_date,
+                Report.status.in_([ReportStatus.COMPLETED, ReportStatus.FAILED])
+            )
+        ).all()
+
+        s3_keys = []
+        for _, file_path in old_reports:
+            if not file_path:
+                continue
+            if file_path.startswith("s3://"):
+                s3_keys.append(file_path.split("/", 3)[3])
+            else:
+                Path(file_path).unlink(missing_ok=True)
+
+        if s3_keys:
+            from app.services.registry import get_s3_service
+            s3_service = get_s3_service()
+            for i in range(0, len(s3_keys), 1000):
+                s3_service.s3_client.delete_objects(
+                    Bucket=s3_service.bucket_name,
+                    Delete={"Objects": [{"Key": key} for key in s3_keys[i:i + 1000]], "Quiet": True}
+                )
+
+        deleted_count = 0
+        if old_reports:
+            deleted_count = self.db.query(Report).filter(
+                Report.id.in_([report_id for report_id, _ in old_reports])
+            ).delete(synchronize_session=False)
+            self.db.commit()
+
+        return {"deleted_count": deleted_count, "cutoff_date": cutoff_date.isoformat()}
+
+    def _store_report_artifact(self, local_path: Path) -> str:
+        """Mueve el artefacto a S3 si está configurado; devuelve la ruta almacenada"""
+        if settings.reports_storage != "s3":
+            return str(local_path)
+
+        from app.services.registry import get_s3_service
+        s3_service = get_s3_service()
+        s3_key = f"{settings.reports_s3_prefix.strip('/')}/{local_path.name}"
+        # upload_file transmite el archivo por partes sin cargarlo en memoria
+        s3_service.s3_client.upload_file(str(local_path), s3_service.bucket_name, s3_key)
+        local_path.unlink(missing_ok=True)
+        return f"s3://{s3_service.bucket_name}/{s3_key}"
+
+    @staticmethod
+    def _parse_report_parameters(parameters: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Convierte las fechas ISO guardadas en JSON de vuelta a datetime"""
+        params = dict(parameters or {})
+        for key in ("date_from", "date_to"):
+            value = params.get(key)
+            if isinstance(value, str) and value:
+                params[key] = datetime.fromisoformat(value)
+        return params
+
     # === MÉTODOS DE MÉTRICAS DE DASHBOARD ===
 
     def update_dashboard_metrics(self, period_start: datetime, period_end: datetime) -> List[DashboardMetric]:
@@ -10,8 +10,12 @@ import boto3
 import os
 import time
 from typing import Optional
+from botocore.config import Config
 from botocore.exceptions import ClientError
 from pathlib import Path
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 class S3Service:
@@ -27,10 +31,7 @@ class S3Service:
         self.region = settings.aws_region
         self.base_path = 'paquetes-recibidos-imagenes'
         
-        print(f"🪣 S3Service inicializado:")
-        print(f"   Bucket: {self.bucket_name}")
-        print(f"   Región: {self.region}")
-        print(f"   Base Path: {self.base_path}")
+        logger.debug("🪣 S3Service inicializado: bucket=%s región=%s base_path=%s", self.bucket_name, self.region, self.base_path)
 
         # Verificar que las credenciales estén configuradas en CODE/LOCAL/.env
         if not settings.aws_access_key_id or not settings.aws_secret_access_key:
@@ -39,12 +40,23 @@ class S3Service:
         if settings.aws_access_key_id in ['your-aws-access-key', ''] or settings.aws_secret_access_key in ['your-aws-secret-key', '']:
             raise ValueError("❌ Credenciales AWS de ejemplo detectadas. Configure credenciales reales en CODE/LOCAL/.env")
 
-        # Crear cliente S3 usando configuración centralizada
+        # Crear cliente S3 usando configuración centralizada. Los clientes boto3
+        # son thread-safe: una sola instancia (ver services/registry.py) comparte
+        # su pool de conexiones entre peticiones y hilos del worker
+        client_config = Config(max_pool_connections=settings.aws_max_pool_connections)
+        endpoint_kwargs = {}
+        if settings.aws_s3_endpoint_url:
+            # Endpoint compatible con S3 (pruebas de carga, entornos locales):
+            # direccionamiento por ruta, el bucket no es un subdominio
+            endpoint_kwargs["endpoint_url"] = settings.aws_s3_endpoint_url
+            client_config = client_config.merge(Config(s3={"addressing_style": "path"}))
         self.s3_client = boto3.client(
             's3',
             aws_access_key_id=settings.aws_access_key_id,
             aws_secret_access_key=settings.aws_secret_access_key,
-            region_name=self.region
+            region_name=self.region,
+            config=client_config,
+            **endpoint_kwargs
         )
 
     def upload_file(self, file_content: bytes, s3_key: str, content_type: str = None) -> str:
@@ -65,11 +77,10 @@ class S3Service:
                 filename = s3_key.split('/')[-1]
                 content_type = self._get_content_type(filename)
 
-            print(f"🔄 Subiendo archivo a S3:")
-            print(f"   📦 Bucket: {self.bucket_name}")
-            print(f"   🔑 Key: {s3_key}")
-            print(f"   📏 Tamaño: {len(file_content)} bytes")
-            print(f"   🏷️ Content-Type: {content_type}")
+            logger.debug(
+                "🔄 Subiendo archivo a S3: bucket=%s key=%s tamaño=%s bytes content_type=%s",
+                self.bucket_name, s3_key, len(file_content), content_type
+            )
 
             # Subir archivo a S3
             self.s3_client.put_object(
@@ -82,19 +93,17 @@ class S3Service:
 
             # Generar URL del archivo
             s3_url = f"https://{self.bucket_name}.s3.{self.region}.amazonaws.com/{s3_key}"
-            print(f"✅ Archivo subido exitosamente:")
-            print(f"   🔗 URL: {s3_url}")
-            print(f"   📍 Ubicación: s3://{self.bucket_name}/{s3_key}")
+            logger.info("✅ Archivo subido a s3://%s/%s", self.bucket_name, s3_key)
 
             return s3_url
 
         except ClientError as e:
             error_code = e.response['Error']['Code']
             error_message = e.response['Error']['Message']
-            print(f"❌ Error de S3 - Código: {error_code}, Mensaje: {error_message}")
+            logger.error(f"❌ Error de S3 - Código: {error_code}, Mensaje: {error_message}")
             raise Exception(f"Error uploading to S3 ({error_code}): {error_message}")
         except Exception as e:
-            print(f"❌ Error inesperado en S3: {str(e)}")
+            logger.error(f"❌ Error inesperado en S3: {str(e)}")
             raise Exception(f"Error uploading to S3: {str(e)}")
 
     def upload_file_legacy(self, file_content: bytes, filename: str, package_id: int, file_type: str = 'reception_image') -> dict:
@@ -118,7 +127,7 @@ class S3Service:
 
             # Crear la key S3 con estructura de carpetas
             s3_key = f"{self.base_path}/packages/{package_id}/{file_type}s/{unique_filename}"
-            print(f"🔧 Método legacy - Key generada: {s3_key}")
+            logger.debug("🔧 Método legacy - Key generada: %s", s3_key)
 
             # Subir archivo usando el nuevo método
             s3_url = self.upload_file(file_content, s3_key, self._get_content_type(filename))
@@ -145,9 +154,6 @@ class S3Service:
         Returns:
             str: URL firmada para acceso privado
         """
-        import logging
-        
-        logger = logging.getLogger(__name__)
         
         try:
             # Validar entrada
@@ -240,18 +246,18 @@ class S3Service:
         
         # Si ya incluye el base_path, usar tal como está
         if self.base_path in s3_key:
-            print(f"🔧 Key con base_path detectada: {s3_key}")
+            logger.debug("🔧 Key con base_path detectada: %s", s3_key)
             return s3_key
         
         # Si es estructura nueva (YYYY/MM/DD/packages/...), usar tal como está
         import re
         if re.match(r'^\d{4}/\d{2}/\d{2}/packages/', s3_key):
-            print(f"🔧 Estructura nueva detectada: {s3_key}")
+            logger.debug("🔧 Estructura nueva detectada: %s", s3_key)
             return s3_key
         
         # Si es estructura antigua sin base_path, agregarlo
         normalized_key = f"{self.base_path}/{s3_key}"
-        print(f"🔧 Key normalizada (estructura antigua): {normalized_key}")
+        logger.debug("🔧 Key normalizada (estructura antigua): %s", normalized_key)
         return normalized_key
     
     def _is_new_structure(self, s3_key: str) -> bool:
@@ -295,7 +301,7 @@ class S3Service:
             self.s3_client.delete_object(Bucket=self.bucket_name, Key=s3_key)
             return True
         except ClientError as e:
-            print(f"Error deleting file from S3: {str(e)}")
+            logger.error(f"Error deleting file from S3: {str(e)}")
             return False
 
     def _get_content_type(self, filename: str) -> str:
@@ -322,11 +328,8 @@ class S3Service:
         """
         OPCIÓN 1: Probar conexión con S3 con validaciones completas
         """
-        import logging
         from datetime import datetime
         
-        logger = logging.getLogger(__name__)
-        
         try:
             logger.info("🔄 Iniciando test de conexión S3...")
             
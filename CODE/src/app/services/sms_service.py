@@ -11,7 +11,7 @@ import json
 import re
 from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 import uuid
 
 from .base import BaseService
@@ -29,6 +29,16 @@ from app.schemas.notification import (
 from app.utils.datetime_utils import get_colombia_now
 from app.utils.exceptions import ValidationException, ExternalServiceException
 from app.config import settings
+from app.services.liwa_token_lease import liwa_token_lease
+from app.services.sms_templates import sms_template_cache, TEMPLATE_FOR_EVENT
+
+# Mapeo de eventos a texto de estado (UNIFICADO)
+STATUS_TEXT_FOR_EVENT = {
+    NotificationEvent.PACKAGE_ANNOUNCED: "ANUNCIADO",
+    NotificationEvent.PACKAGE_RECEIVED: "RECIBIDO en nuestras instalaciones",
+    NotificationEvent.PACKAGE_DELIVERED: "ENTREGADO exitosamente",
+    NotificationEvent.PACKAGE_CANCELLED: "CANCELADO"
+}
 
 class SMSService(BaseService[Notification, Any, Any]):
     """
@@ -37,8 +47,6 @@ class SMSService(BaseService[Notification, Any, Any]):
 
     def __init__(self):
         super().__init__(Notification)
-        self._cached_token = None
-        self._token_expires_at = None
 
     # ========================================
     # CONFIGURACIÓN Y AUTENTICACIÓN
@@ -55,7 +63,7 @@ class SMSService(BaseService[Notification, Any, Any]):
                 account_id=settings.liwa_account,
                 password=settings.liwa_password,
                 auth_url=settings.liwa_auth_url or "https://api.liwa.co/v2/auth/login",
-                api_url="https://api.liwa.co/v2/sms/single",  # Endpoint correcto
+                api_url=settings.liwa_api_url,  # Endpoint correcto
                 default_sender="PAQUETEX",
                 cost_per_sms_cents=50  # 50 centavos por SMS
             )
@@ -65,23 +73,16 @@ class SMSService(BaseService[Notification, Any, Any]):
         return config
 
     async def get_valid_token(self, config: SMSConfiguration) -> str:
-        """Obtiene un token válido, usando cache o renovando si es necesario"""
-        now = get_colombia_now()
-        
-        # Verificar si tenemos un token válido en cache
-        if (self._cached_token and 
-            self._token_expires_at and 
-            now < self._token_expires_at):
-            return self._cached_token
-        
-        # Necesitamos un nuevo token
-        token = await self.authenticate_liwa(config)
-        
-        # Cachear el token por 23 horas (renovar diariamente)
-        self._cached_token = token
-        self._token_expires_at = now + timedelta(hours=23)
-        
-        return token
+        """
+        Obtiene un token válido desde el lease compartido en Redis
+
+        Solo un worker hace login cuando el token vence o está por vencer; el
+        resto reutiliza el mismo token (ver services/liwa_token_lease.py).
+        """
+        return await liwa_token_lease.get_token(
+            config.account_id,
+            lambda: self.authenticate_liwa(config)
+        )
 
     async def authenticate_liwa(self, config: SMSConfiguration) -> str:
         """Autentica con Liwa.co y obtiene token"""
@@ -107,10 +108,10 @@ class SMSService(BaseService[Notification, Any, Any]):
         except Exception as e:
             raise ExternalServiceException(f"Error de conexión con Liwa: {str(e)}")
 
-    def clear_token_cache(self):
-        """Limpia el cache del token (útil cuando hay errores de autenticación)"""
-        self._cached_token = None
-        self._token_expires_at = None
+    def clear_token_cache(self, config: Optional[SMSConfiguration] = None, token: Optional[str] = None):
+        """Invalida el token compartido (útil cuando hay errores de autenticación)"""
+        account = config.account_id if config else settings.liwa_account
+        liwa_token_lease.invalidate(account, token)
 
     # ========================================
     # ENVÍO DE SMS
@@ -232,35 +233,29 @@ class SMSService(BaseService[Notification, Any, Any]):
     async def send_sms_by_event(
         self,
         db: Session,
-        event_request: SMSByEventRequest
+        event_request: SMSByEventRequest,
+        package: Optional[Package] = None,
+        customer: Optional[Customer] = None,
+        announcement: Optional[Any] = None
     ) -> SMSSendResponse:
-        """Envía SMS basado en evento usando plantilla"""
-        try:
-            # Obtener plantilla
-            template = self.get_template_by_event(db, event_request.event_type)
-            if not template:
-                raise ValidationException(f"No se encontró plantilla para el evento {event_request.event_type.value}")
+        """
+        Envía SMS basado en evento usando plantilla
 
-            # Preparar variables
-            variables = await self._prepare_event_variables(
-                db,
-                event_request.event_type,
-                event_request.package_id,
-                event_request.customer_id,
-                event_request.announcement_id,
-                event_request.custom_variables or {}
+        package / customer / announcement: entidades que el llamador ya tiene
+        cargadas; solo se consultan las que falten según los IDs del request.
+        """
+        try:
+            package, customer, announcement = self._load_event_entities(
+                db, event_request, package, customer, announcement
             )
 
-            # Renderizar mensaje
-            message = template.render_message(variables)
-
-            # Determinar destinatario
-            recipient = await self._get_event_recipient(
+            message, recipient = self.render_event_message(
                 db,
                 event_request.event_type,
-                event_request.package_id,
-                event_request.customer_id,
-                event_request.announcement_id
+                package=package,
+                customer=customer,
+                announcement=announcement,
+                custom_variables=event_request.custom_variables
             )
 
             if not recipient:
@@ -282,6 +277,151 @@ class SMSService(BaseService[Notification, Any, Any]):
         except Exception as e:
             raise ExternalServiceException(f"Error al enviar SMS por evento: {str(e)}")
 
+    async def send_sms_by_event_batch(
+        self,
+        db: Session,
+        event_type: NotificationEvent,
+        package_ids: Optional[List[int]] = None,
+        announcements: Optional[List[Any]] = None,
+        custom_variables: Optional[Dict[str, Any]] = None,
+        priority: NotificationPriority = NotificationPriority.MEDIA,
+        is_test: bool = False
+    ) -> SMSBulkSendResponse:
+        """
+        Envía el SMS del evento a varios destinatarios
+
+        Los mensajes se renderizan juntos con render_event_messages (una carga
+        de entidades, una plantilla); luego se envía uno por destinatario.
+        """
+        sent_count = 0
+        failed_count = 0
+        total_cost = 0
+        results = []
+
+        for rendered in self.render_event_messages(db, event_type, package_ids, announcements, custom_variables):
+            entity = {
+                "package_id": rendered["package_id"],
+                "announcement_id": rendered["announcement_id"]
+            }
+            if not rendered["recipient"]:
+                failed_count += 1
+                results.append({
+                    **entity,
+                    "status": "failed",
+                    "error": "No se pudo determinar el destinatario del SMS"
+                })
+                continue
+            try:
+                result = await self.send_sms(
+                    db=db,
+                    recipient=rendered["recipient"],
+                    message=rendered["message"],
+                    event_type=event_type,
+                    priority=priority,
+                    package_id=rendered["package_id"],
+                    customer_id=rendered["customer_id"],
+                    announcement_id=rendered["announcement_id"],
+                    is_test=is_test
+                )
+                sent_count += 1
+                total_cost += result.cost_cents
+                results.append({
+                    **entity,
+                    "recipient": rendered["recipient"],
+                    "status": "sent",
+                    "notification_id": str(result.notification_id),
+                    "cost_cents": result.cost_cents
+                })
+            except Exception as e:
+                failed_count += 1
+                results.append({
+                    **entity,
+                    "recipient": rendered["recipient"],
+                    "status": "failed",
+                    "error": str(e)
+                })
+
+        return SMSBulkSendResponse(
+            sent_count=sent_count,
+            failed_count=failed_count,
+            total_cost_cents=total_cost,
+            results=results
+        )
+
+    # ========================================
+    # RENDERIZADO DE MENSAJES
+    # ========================================
+
+    def render_event_message(
+        self,
+        db: Session,
+        event_type: NotificationEvent,
+        package: Optional[Package] = None,
+        customer: Optional[Customer] = None,
+        announcement: Optional[Any] = None,
+        custom_variables: Optional[Dict[str, Any]] = None
+    ) -> Tuple[str, Optional[str]]:
+        """
+        Mensaje y destinatario de un evento a partir de entidades ya cargadas
+
+        La plantilla sale de la caché compilada; no consulta la base de datos
+        salvo para recargar la caché.
+        """
+        template = sms_template_cache.get_for_event(db, event_type)
+        if not template:
+            raise ValidationException(f"No se encontró plantilla para el evento {event_type.value}")
+
+        variables = self._build_event_variables(event_type, package, announcement, custom_variables or {})
+        recipient = self._resolve_recipient(customer, package, announcement)
+        return template.render(variables), recipient
+
+    def render_event_messages(
+        self,
+        db: Session,
+        event_type: NotificationEvent,
+        package_ids: Optional[List[int]] = None,
+        announcements: Optional[List[Any]] = None,
+        custom_variables: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Renderizar el SMS del evento para varios paquetes y/o anuncios
+
+        Los paquetes y sus clientes se cargan con una sola consulta; los
+        anuncios llegan ya cargados (con su cliente). La plantilla se toma una
+        vez de la caché compilada.
+        """
+        template = sms_template_cache.get_for_event(db, event_type)
+        if not template:
+            raise ValidationException(f"No se encontró plantilla para el evento {event_type.value}")
+
+        packages = []
+        if package_ids:
+            packages = db.query(Package).options(joinedload(Package.customer)).filter(
+                Package.id.in_(package_ids)
+            ).all()
+
+        rendered = []
+        for package in packages:
+            variables = self._build_event_variables(event_type, package, None, custom_variables or {})
+            rendered.append({
+                "package_id": str(package.id),
+                "announcement_id": None,
+                "customer_id": str(package.customer_id) if package.customer_id else None,
+                "recipient": self._resolve_recipient(package.customer, package, None),
+                "message": template.render(variables)
+            })
+        for announcement in announcements or []:
+            customer = getattr(announcement, "customer", None)
+            variables = self._build_event_variables(event_type, None, announcement, custom_variables or {})
+            rendered.append({
+                "package_id": None,
+                "announcement_id": str(announcement.id),
+                "customer_id": str(announcement.customer_id) if announcement.customer_id else None,
+                "recipient": self._resolve_recipient(customer, None, announcement),
+                "message": template.render(variables)
+            })
+        return rendered
+
     # ========================================
     # PLANTILLAS (UNIFICADAS - Similar a EmailService)
     # ========================================
@@ -291,17 +431,7 @@ class SMSService(BaseService[Notification, Any, Any]):
         Obtiene plantilla por evento
         UNIFICADO: Usa plantilla única para cambios de estado de paquetes
         """
-        # Mapear eventos a plantillas (unificación de estados en una sola plantilla)
-        template_map = {
-            NotificationEvent.PACKAGE_ANNOUNCED: "status_change_unified",
-            NotificationEvent.PACKAGE_RECEIVED: "status_change_unified",
-            NotificationEvent.PACKAGE_DELIVERED: "status_change_unified",
-            NotificationEvent.PACKAGE_CANCELLED: "status_change_unified",
-            NotificationEvent.PAYMENT_DUE: "payment_due",
-            NotificationEvent.CUSTOM_MESSAGE: "custom_message"
-        }
-
-        template_id = template_map.get(event_type, "custom_message")
+        template_id = TEMPLATE_FOR_EVENT.get(event_type, "custom_message")
 
         return db.query(SMSMessageTemplate).filter(
             SMSMessageTemplate.template_id == template_id,
@@ -372,6 +502,7 @@ class SMSService(BaseService[Notification, Any, Any]):
                 templates.append(existing)
 
         db.commit()
+        sms_template_cache.invalidate()
         return templates
 
     # ========================================
@@ -386,9 +517,9 @@ class SMSService(BaseService[Notification, Any, Any]):
         try:
             logger.info(f"🔄 Iniciando envío SMS a {recipient}")
             
-            # Obtener token válido (con cache diario)
+            # Obtener token válido (compartido entre workers)
             token = await self.get_valid_token(config)
-            logger.info(f"✅ Token obtenido: {token[:50]}...")
+            logger.debug("✅ Token Liwa obtenido")
 
             # Preparar payload exactamente como funcionó en la prueba
             phone_number = recipient
@@ -417,12 +548,21 @@ class SMSService(BaseService[Notification, Any, Any]):
                 logger.info(f"📡 Headers preparados (API-KEY: {config.api_key[:20]}...)")
 
                 # Usar endpoint correcto (ya está configurado correctamente)
-                sms_url = "https://api.liwa.co/v2/sms/single"
+                sms_url = settings.liwa_api_url
                 logger.info(f"🌐 Enviando a URL: {sms_url}")
                 
                 response = await client.post(sms_url, json=payload, headers=headers)
                 logger.info(f"📡 Respuesta HTTP: {response.status_code}")
-                
+
+                # Token rechazado (revocado o vencido antes de tiempo): invalidarlo
+                # para todos los workers y reintentar una vez con uno nuevo
+                if response.status_code == 401:
+                    self.clear_token_cache(config, token)
+                    token = await self.get_valid_token(config)
+                    headers["Authorization"] = f"Bearer {token}"
+                    response = await client.post(sms_url, json=payload, headers=headers)
+                    logger.info(f"📡 Respuesta HTTP (reintento): {response.status_code}")
+
                 response.raise_for_status()
 
                 data = response.json()
@@ -446,7 +586,7 @@ class SMSService(BaseService[Notification, Any, Any]):
         except httpx.HTTPStatusError as e:
             # Si es error 401 (no autorizado), limpiar cache del token
             if e.response.status_code == 401:
-                self.clear_token_cache()
+                self.clear_token_cache(config, token)
             
             error_data = {}
             try:
@@ -533,13 +673,39 @@ class SMSService(BaseService[Notification, Any, Any]):
 
         return True
 
-    async def _prepare_event_variables(
+    def _load_event_entities(
         self,
         db: Session,
+        event_request: SMSByEventRequest,
+        package: Optional[Package],
+        customer: Optional[Customer],
+        announcement: Optional[Any]
+    ) -> Tuple[Optional[Package], Optional[Customer], Optional[Any]]:
+        """Cargar (una consulta por entidad, solo si falta) paquete, cliente y anuncio del evento"""
+        if package is None and event_request.package_id:
+            package = db.query(Package).options(joinedload(Package.customer)).filter(
+                Package.id == event_request.package_id
+            ).first()
+
+        if customer is None and event_request.customer_id:
+            if package is not None and package.customer_id == event_request.customer_id:
+                customer = package.customer
+            else:
+                customer = db.query(Customer).filter(Customer.id == event_request.customer_id).first()
+
+        if announcement is None and event_request.announcement_id:
+            from app.models.announcement_new import PackageAnnouncementNew
+            announcement = db.query(PackageAnnouncementNew).filter(
+                PackageAnnouncementNew.id == event_request.announcement_id
+            ).first()
+
+        return package, customer, announcement
+
+    def _build_event_variables(
+        self,
         event_type: NotificationEvent,
-        package_id: Optional[int],  # Corregido de str a int
-        customer_id: Optional[str],
-        announcement_id: Optional[str],
+        package: Optional[Package],
+        announcement: Optional[Any],
         custom_variables: Dict[str, Any]
     ) -> Dict[str, Any]:
         """
@@ -547,107 +713,80 @@ class SMSService(BaseService[Notification, Any, Any]):
         UNIFICADO: Incluye status_text dinámico para plantilla unificada
         """
         variables = dict(custom_variables)
+        now = get_colombia_now()
+        tracking_base_url = settings.tracking_base_url or "https://paquetex.papyrus.com.co/search"
 
         # Variables comunes
         variables.update({
             "company_name": settings.company_display_name or "PAQUETES EL CLUB",
             "company_phone": settings.company_phone or "3334004007",
-            "current_date": get_colombia_now().strftime("%d/%m/%Y"),
-            "current_time": get_colombia_now().strftime("%H:%M")
+            "current_date": now.strftime("%d/%m/%Y"),
+            "current_time": now.strftime("%H:%M")
         })
 
-        # Mapeo de eventos a texto de estado (UNIFICADO)
-        status_text_map = {
-            NotificationEvent.PACKAGE_ANNOUNCED: "ANUNCIADO",
-            NotificationEvent.PACKAGE_RECEIVED: "RECIBIDO en nuestras instalaciones",
-            NotificationEvent.PACKAGE_DELIVERED: "ENTREGADO exitosamente",
-            NotificationEvent.PACKAGE_CANCELLED: "CANCELADO"
-        }
-
         # Agregar status_text para plantilla unificada
-        variables["status_text"] = status_text_map.get(event_type, "en proceso")
+        variables["status_text"] = STATUS_TEXT_FOR_EVENT.get(event_type, "en proceso")
 
         # Variables específicas por evento
-        if event_type == NotificationEvent.PACKAGE_ANNOUNCED and announcement_id:
-            # Obtener datos del anuncio
-            from app.models.announcement_new import PackageAnnouncementNew
-            announcement = db.query(PackageAnnouncementNew).filter(
-                PackageAnnouncementNew.id == announcement_id
-            ).first()
-            if announcement:
-                variables.update({
-                    "guide_number": announcement.guide_number,
-                    "consult_code": announcement.tracking_code,
-                    "tracking_code": announcement.tracking_code,
-                    "customer_name": announcement.customer_name,
-                    "tracking_url": f"{settings.tracking_base_url or 'https://paquetex.papyrus.com.co/search'}?auto_search={announcement.tracking_code}"
-                })
-
-        elif event_type in [NotificationEvent.PACKAGE_RECEIVED, NotificationEvent.PACKAGE_DELIVERED, NotificationEvent.PACKAGE_CANCELLED] and package_id:
-            package = db.query(Package).filter(Package.id == package_id).first()
-            if package:
-                variables.update({
-                    "guide_number": package.guide_number or package.tracking_number,  # Número de guía real del transportador
-                    "consult_code": package.tracking_number,  # Código de consulta público
-                    "tracking_code": package.tracking_number,
-                    "customer_name": package.customer.full_name if package.customer else "Cliente",
-                    "received_at": package.received_at.strftime("%d/%m/%Y %H:%M") if hasattr(package, 'received_at') and package.received_at else "",
-                    "delivered_at": package.delivered_at.strftime("%d/%m/%Y %H:%M") if hasattr(package, 'delivered_at') and package.delivered_at else "",
-                    "package_type": package.package_type.value if hasattr(package, 'package_type') and package.package_type else "normal",
-                    "package_condition": package.package_condition.value if hasattr(package, 'package_condition') and package.package_condition else "bueno",
-                    "tracking_url": f"{settings.tracking_base_url or 'https://paquetex.papyrus.com.co/search'}?auto_search={package.tracking_number}"
-                })
-
-        elif event_type == NotificationEvent.PAYMENT_DUE and package_id:
-            package = db.query(Package).filter(Package.id == package_id).first()
-            if package:
-                variables.update({
-                    "guide_number": package.guide_number or package.tracking_number,  # Número de guía real
-                    "consult_code": package.tracking_number,  # Código de consulta públicoer),
-                    "customer_name": package.customer.full_name if package.customer else "Cliente",
-                    "amount": custom_variables.get("amount", "0"),
-                    "due_date": custom_variables.get("due_date", get_colombia_now().strftime("%d/%m/%Y"))
-                })
+        if event_type == NotificationEvent.PACKAGE_ANNOUNCED and announcement is not None:
+            variables.update({
+                "guide_number": announcement.guide_number,
+                "consult_code": announcement.tracking_code,
+                "tracking_code": announcement.tracking_code,
+                "customer_name": announcement.customer_name,
+                "tracking_url": f"{tracking_base_url}?auto_search={announcement.tracking_code}"
+            })
+
+        elif event_type in [NotificationEvent.PACKAGE_RECEIVED, NotificationEvent.PACKAGE_DELIVERED, NotificationEvent.PACKAGE_CANCELLED] and package is not None:
+            variables.update({
+                "guide_number": package.guide_number or package.tracking_number,  # Número de guía real del transportador
+                "consult_code": package.tracking_number,  # Código de consulta público
+                "tracking_code": package.tracking_number,
+                "customer_name": package.customer.full_name if package.customer else "Cliente",
+                "received_at": package.received_at.strftime("%d/%m/%Y %H:%M") if package.received_at else "",
+                "delivered_at": package.delivered_at.strftime("%d/%m/%Y %H:%M") if package.delivered_at else "",
+                "package_type": package.package_type.value if package.package_type else "normal",
+                "package_condition": package.package_condition.value if package.package_condition else "bueno",
+                "tracking_url": f"{tracking_base_url}?auto_search={package.tracking_number}"
+            })
+
+        elif event_type == NotificationEvent.PAYMENT_DUE and package is not None:
+            variables.update({
+                "guide_number": package.guide_number or package.tracking_number,  # Número de guía real
+                "consult_code": package.tracking_number,  # Código de consulta público
+                "customer_name": package.customer.full_name if package.customer else "Cliente",
+                "amount": custom_variables.get("amount", "0"),
+                "due_date": custom_variables.get("due_date", now.strftime("%d/%m/%Y"))
+            })
 
         # Asegurar que siempre haya valores por defecto
         variables.setdefault("guide_number", "N/A")
         variables.setdefault("consult_code", "N/A")
         variables.setdefault("tracking_code", "N/A")
         variables.setdefault("customer_name", "Cliente")
-        variables.setdefault("tracking_url", settings.tracking_base_url or "https://paquetex.papyrus.com.co/search")
+        variables.setdefault("tracking_url", tracking_base_url)
 
         return variables
 
-    async def _get_event_recipient(
-        self,
-        db: Session,
-        event_type: NotificationEvent,
-        package_id: Optional[int],  # Corregido de str a int
-        customer_id: Optional[str],
-        announcement_id: Optional[str]
+    @staticmethod
+    def _resolve_recipient(
+        customer: Optional[Customer],
+        package: Optional[Package],
+        announcement: Optional[Any]
     ) -> Optional[str]:
         """
         Determina el destinatario basado en el evento
-        Prioridad: customer_id > package_id > announcement_id
+        Prioridad: cliente > cliente del paquete > anuncio
         """
-        if customer_id:
-            customer = db.query(Customer).filter(Customer.id == customer_id).first()
-            if customer and hasattr(customer, 'phone'):
-                return customer.phone
+        if customer is not None and customer.phone:
+            return customer.phone
 
-        if package_id:
-            package = db.query(Package).filter(Package.id == package_id).first()
-            if package and package.customer and hasattr(package.customer, 'phone'):
-                return package.customer.phone
+        if package is not None and package.customer and package.customer.phone:
+            return package.customer.phone
 
         # Obtener teléfono del anuncio si está disponible
-        if announcement_id:
-            from app.models.announcement_new import PackageAnnouncementNew
-            announcement = db.query(PackageAnnouncementNew).filter(
-                PackageAnnouncementNew.id == announcement_id
-            ).first()
-            if announcement and hasattr(announcement, 'customer_phone'):
-                return announcement.customer_phone
+        if announcement is not None and getattr(announcement, 'customer_phone', None):
+            return announcement.customer_phone
 
         return None
 
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""
+PAQUETES EL CLUB v1.0 - Caché de Plantillas SMS Compiladas
+Versión: 1.0.0
+Fecha: 2025-11-10
+Autor: Equipo de Desarrollo
+
+Las plantillas activas de sms_message_templates se cargan todas con una sola
+consulta y se compilan una vez: el texto se parte en fragmentos literales y
+placeholders {variable}, de modo que renderizar es un join sin consultas ni
+reemplazos sucesivos.
+
+Cada vez que se crea, actualiza o elimina una plantilla se llama a
+invalidate(), que descarta la caché del proceso y publica un aviso en Redis
+(canal TEMPLATES_CHANGED_CHANNEL, el mismo mecanismo que las tarifas). Los
+demás procesos descartan su caché al recibirlo y la recargan en el siguiente
+uso. Sin Redis se recarga como máximo cada
+settings.sms_template_cache_check_interval segundos.
+"""
+
+import logging
+import re
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.notification import SMSMessageTemplate, NotificationEvent
+from app.services.change_channel import ChangeChannel
+
+logger = logging.getLogger(__name__)
+
+TEMPLATES_CHANGED_CHANNEL = "paqueteria:sms_templates:changed"
+
+# Mapear eventos a plantillas (unificación de estados en una sola plantilla)
+TEMPLATE_FOR_EVENT = MappingProxyType({
+    NotificationEvent.PACKAGE_ANNOUNCED: "status_change_unified",
+    NotificationEvent.PACKAGE_RECEIVED: "status_change_unified",
+    NotificationEvent.PACKAGE_DELIVERED: "status_change_unified",
+    NotificationEvent.PACKAGE_CANCELLED: "status_change_unified",
+    NotificationEvent.PAYMENT_DUE: "payment_due",
+    NotificationEvent.CUSTOM_MESSAGE: "custom_message"
+})
+
+_PLACEHOLDER = re.compile(r"\{(\w+)\}")
+
+
+@dataclass(frozen=True)
+class CompiledSMSTemplate:
+    """Plantilla SMS compilada; fragmentos (literal, variable o None)"""
+    template_id: str
+    language: str
+    source: str
+    pieces: Tuple[Tuple[str, Optional[str]], ...]
+
+    def render(self, variables: Mapping[str, Any]) -> str:
+        """
+        Renderizar con las variables dadas
+
+        Igual que SMSMessageTemplate.render_message: los placeholders sin
+        variable se dejan tal cual.
+        """
+        parts = []
+        for literal, name in self.pieces:
+            parts.append(literal)
+            if name is not None:
+                parts.append(str(variables[name]) if name in variables else f"{{{name}}}")
+        return "".join(parts)
+
+
+def compile_template(template_id: str, language: str, source: str) -> CompiledSMSTemplate:
+    """Partir el texto de la plantilla en fragmentos literales y placeholders"""
+    pieces = []
+    position = 0
+    for match in _PLACEHOLDER.finditer(source):
+        pieces.append((source[position:match.start()], match.group(1)))
+        position = match.end()
+    pieces.append((source[position:], None))
+    return CompiledSMSTemplate(
+        template_id=template_id,
+        language=language,
+        source=source,
+        pieces=tuple(pieces)
+    )
+
+
+class SMSTemplateCache:
+    """Plantillas SMS activas compiladas, en memoria por proceso"""
+
+    def __init__(self):
+        self._templates: Optional[Dict[Tuple[str, str], CompiledSMSTemplate]] = None
+        self._loaded_at = 0.0
+        self._version: Optional[str] = None
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._changes = ChangeChannel(
+            TEMPLATES_CHANGED_CHANNEL,
+            on_change=self._on_change,
+            retry_interval=lambda: settings.sms_template_cache_check_interval
+        )
+
+    def _load(self, db: Session) -> Dict[Tuple[str, str], CompiledSMSTemplate]:
+        rows = db.query(
+            SMSMessageTemplate.template_id,
+            SMSMessageTemplate.language,
+            SMSMessageTemplate.message_template
+        ).filter(SMSMessageTemplate.is_active == True).all()
+        templates = {
+            (row.template_id, row.language): compile_template(row.template_id, row.language, row.message_template)
+            for row in rows
+        }
+        logger.info(f"Plantillas SMS compiladas: {len(templates)}")
+        return templates
+
+    def _is_stale(self) -> bool:
+        if self._changes.listening:
+            return False
+        return time.monotonic() - self._loaded_at > settings.sms_template_cache_check_interval
+
+    def _templates_for(self, db: Session) -> Dict[Tuple[str, str], CompiledSMSTemplate]:
+        self._changes.ensure_listening()
+        templates = self._templates
+        if templates is not None and not self._is_stale():
+            return templates
+
+        with self._lock:
+            if self._templates is not None and not self._is_stale():
+                return self._templates
+            generation = self._generation
+            templates = self._load(db)
+            # Un aviso llegado durante la carga la deja para la siguiente consulta
+            if generation == self._generation:
+                self._templates = templates
+                self._loaded_at = time.monotonic()
+            return templates
+
+    def _on_change(self, version: Optional[str]) -> None:
+        """Aviso recibido (None al suscribirse): descartar la caché del proceso"""
+        if version is not None and version == self._version:
+            return  # Aviso propio, ya descartado en invalidate()
+        self._version = version
+        self._generation += 1
+        self._templates = None
+
+    def get(self, db: Session, template_id: str, language: str = "es") -> Optional[CompiledSMSTemplate]:
+        """Plantilla compilada por ID (None si no existe o está inactiva)"""
+        return self._templates_for(db).get((template_id, language))
+
+    def get_for_event(self, db: Session, event_type: NotificationEvent, language: str = "es") -> Optional[CompiledSMSTemplate]:
+        """Plantilla compilada que corresponde al evento"""
+        return self.get(db, TEMPLATE_FOR_EVENT.get(event_type, "custom_message"), language)
+
+    def invalidate(self) -> None:
+        """Descartar la caché en este proceso y avisar a los demás"""
+        version = str(int(time.time() * 1000))
+        self._on_change(version)
+        self._changes.publish(version)
+
+
+# Instancia global de la caché de plantillas
+sms_template_cache = SMSTemplateCache()
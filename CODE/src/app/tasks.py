@@ -9,12 +9,21 @@ Autor: Equipo de Desarrollo
 from .celery_app import celery_app
 from .database import SessionLocal
 from .services.report_service import ReportService
-from .services.sms_service import SMSService
-from .services.email_service import EmailService
+from .services.registry import get_sms_service, get_email_service
 from .services.file_management_service import FileManagementService
 from .services.admin_service import AdminService
+from .services.bulk_deletion_service import BulkDeletionService
+from .services.fee_service import FeeService
+from .services.customer_counter_service import CustomerCounterService
+from .services.package_event_partitions import PackageEventPartitionService
+from .services.package_archive_service import PackageArchiveService
+from .services.code_generator import CodeGenerator
+from .services.announcement_ingestion_service import AnnouncementIngestionService
+from .services.package_transitions import PackageTransitionEngine
+from .config import settings
 from .models.user import User
 from .models.notification import Notification
+from .models.report import ReportType, ReportFormat
 from typing import Dict, Any, List
 import logging
 
@@ -25,50 +34,56 @@ logger = logging.getLogger(__name__)
 # ========================================
 
 @celery_app.task(bind=True, name="src.tasks.generate_report")
-def generate_report(self, report_type: str, parameters: Dict[str, Any] = None, user_id: str = None):
-    """Generar reporte de forma asíncrona"""
-    logger.info(f"Iniciando generación de reporte: {report_type}")
+def generate_report(self, report_id: str):
+    """Generar reporte encolado y guardar su artefacto (archivo local o S3)"""
+    logger.info(f"Iniciando generación de reporte: {report_id}")
 
     db = SessionLocal()
     try:
-        report_service = ReportService()
+        report = ReportService(db).run_report_job(report_id)
 
-        # Actualizar estado del reporte a "processing"
-        if user_id:
-            # Aquí iría la lógica para actualizar el estado en la BD
-            pass
-
-        # Generar el reporte
-        result = report_service.generate_report(report_type, parameters)
-
-        logger.info(f"Reporte {report_type} generado exitosamente")
-        return result
+        logger.info(f"Reporte {report_id} finalizado con estado {report.status.value}")
+        return {
+            "report_id": str(report.id),
+            "status": report.status.value,
+            "file_size": report.file_size,
+            "processing_time": report.processing_time
+        }
 
     except Exception as e:
-        logger.error(f"Error generando reporte {report_type}: {str(e)}")
+        logger.error(f"Error generando reporte {report_id}: {str(e)}")
         raise self.retry(countdown=60, max_retries=3, exc=e)
     finally:
         db.close()
 
 @celery_app.task(bind=True, name="src.tasks.generate_bulk_reports")
 def generate_bulk_reports(self, report_requests: List[Dict[str, Any]]):
-    """Generar múltiples reportes en lote"""
-    logger.info(f"Generando {len(report_requests)} reportes en lote")
-
-    results = []
-    for request in report_requests:
-        try:
-            result = generate_report.apply(args=[
-                request["report_type"],
-                request.get("parameters"),
-                request.get("user_id")
-            ]).get(timeout=300)  # 5 minutos timeout
-            results.append({"success": True, "result": result})
-        except Exception as e:
-            logger.error(f"Error en reporte lote: {str(e)}")
-            results.append({"success": False, "error": str(e)})
-
-    return results
+    """Crear múltiples reportes en lote y encolar cada uno por separado"""
+    logger.info(f"Encolando {len(report_requests)} reportes en lote")
+
+    db = SessionLocal()
+    try:
+        report_service = ReportService(db)
+        results = []
+        for request in report_requests:
+            try:
+                report = report_service.create_report(
+                    title=request.get("title") or request["report_type"],
+                    report_type=ReportType(request["report_type"]),
+                    parameters=request.get("parameters"),
+                    created_by_id=request.get("user_id"),
+                    report_format=ReportFormat(request.get("format", ReportFormat.CSV.value))
+                )
+                generate_report.delay(str(report.id))
+                results.append({"success": True, "report_id": str(report.id)})
+            except Exception as e:
+                logger.error(f"Error en reporte lote: {str(e)}")
+                db.rollback()
+                results.append({"success": False, "error": str(e)})
+
+        return results
+    finally:
+        db.close()
 
 # ========================================
 # TAREAS DE SMS
@@ -81,7 +96,7 @@ def send_bulk_sms(self, sms_requests: List[Dict[str, Any]], user_id: str = None)
 
     db = SessionLocal()
     try:
-        sms_service = SMSService()
+        sms_service = get_sms_service()
 
         results = []
         for sms_data in sms_requests:
@@ -106,6 +121,23 @@ def send_bulk_sms(self, sms_requests: List[Dict[str, Any]], user_id: str = None)
     finally:
         db.close()
 
+@celery_app.task(bind=True, name="src.tasks.send_announcement_notifications")
+def send_announcement_notifications(self, announcement_ids: List[str]):
+    """Enviar las confirmaciones (SMS y email) de anuncios creados por lote"""
+    import asyncio
+
+    db = SessionLocal()
+    try:
+        result = asyncio.run(AnnouncementIngestionService().send_notifications(db, announcement_ids))
+        logger.info(f"Confirmaciones de anuncios: {result['sms']} SMS, {result['email']} emails, {result['failed']} fallidos")
+        return result
+    except Exception as e:
+        logger.error(f"Error enviando confirmaciones de anuncios: {str(e)}")
+        db.rollback()
+        raise self.retry(countdown=60, max_retries=3, exc=e)
+    finally:
+        db.close()
+
 @celery_app.task(bind=True, name="src.tasks.send_sms_by_event")
 def send_sms_by_event(self, event_type: str, entity_id: str, user_id: str = None):
     """Enviar SMS basado en eventos (anuncio creado, paquete recibido, etc.)"""
@@ -113,7 +145,7 @@ def send_sms_by_event(self, event_type: str, entity_id: str, user_id: str = None
 
     db = SessionLocal()
     try:
-        sms_service = SMSService()
+        sms_service = get_sms_service()
 
         # Lógica para determinar el destinatario y mensaje basado en el evento
         if event_type == "announcement_created":
@@ -202,14 +234,13 @@ def cleanup_temp_files(self, hours_old: int = 24):
 # ========================================
 
 @celery_app.task(bind=True, name="src.tasks.cleanup_old_reports")
-def cleanup_old_reports(self, days_old: int = 30):
-    """Limpiar reportes antiguos"""
-    logger.info(f"Limpiando reportes de más de {days_old} días")
+def cleanup_old_reports(self, days_old: int = None):
+    """Limpiar reportes antiguos y sus artefactos"""
+    logger.info(f"Limpiando reportes de más de {days_old or 'retención configurada'} días")
 
     db = SessionLocal()
     try:
-        admin_service = AdminService()
-        result = admin_service.cleanup_old_reports(days_old)
+        result = ReportService(db).cleanup_old_reports(days_old)
 
         logger.info(f"Limpieza de reportes completada: {result.get('deleted_count', 0)} reportes eliminados")
         return result
@@ -220,6 +251,157 @@ def cleanup_old_reports(self, days_old: int = 30):
     finally:
         db.close()
 
+@celery_app.task(bind=True, name="src.tasks.cleanup_invalid_customers")
+def cleanup_invalid_customers(self, customer_ids: List[str] = None):
+    """Eliminar clientes inválidos con sentencias de conjunto por lotes"""
+    logger.info("Iniciando limpieza de clientes inválidos")
+
+    db = SessionLocal()
+    try:
+        result = BulkDeletionService().cleanup_invalid_customers(db, customer_ids)
+        result["customers"] = [
+            {key: str(value) if key == "id" else value for key, value in row.items()}
+            for row in result["customers"]
+        ]
+
+        logger.info(f"Limpieza de clientes completada: {result['customers_deleted']} eliminados")
+        return result
+
+    except Exception as e:
+        logger.error(f"Error limpiando clientes inválidos: {str(e)}")
+        raise self.retry(countdown=300, max_retries=2, exc=e)
+    finally:
+        db.close()
+
+@celery_app.task(bind=True, name="src.tasks.bulk_delete_packages")
+def bulk_delete_packages(self, package_ids: List[int]):
+    """Eliminar paquetes y sus referencias (incluidos objetos S3) por lotes"""
+    logger.info(f"Eliminando {len(package_ids)} paquetes en lote")
+
+    db = SessionLocal()
+    try:
+        result = BulkDeletionService().delete_packages(db, package_ids)
+
+        logger.info(f"Eliminación masiva completada: {result['packages_deleted']} paquetes")
+        return result
+
+    except Exception as e:
+        logger.error(f"Error en eliminación masiva de paquetes: {str(e)}")
+        raise self.retry(countdown=300, max_retries=2, exc=e)
+    finally:
+        db.close()
+
+@celery_app.task(bind=True, name="src.tasks.recalculate_package_fees")
+def recalculate_package_fees(self, chunk_size: int = None):
+    """Recalcular tarifas de todos los paquetes por lotes, reportando progreso"""
+    logger.info("Iniciando recálculo masivo de tarifas")
+
+    def report_progress(current_id: int, last_id: int, updated_count: int):
+        self.update_state(
+            state="PROGRESS",
+            meta={"current_id": current_id, "last_id": last_id, "updated_count": updated_count}
+        )
+
+    db = SessionLocal()
+    try:
+        result = FeeService().recalculate_fees(db, chunk_size=chunk_size, progress_callback=report_progress)
+
+        logger.info(f"Recálculo de tarifas completado: {result['updated_count']} paquetes")
+        return result
+
+    except Exception as e:
+        logger.error(f"Error recalculando tarifas: {str(e)}")
+        raise self.retry(countdown=300, max_retries=2, exc=e)
+    finally:
+        db.close()
+
+@celery_app.task(bind=True, name="src.tasks.backfill_customer_counters")
+def backfill_customer_counters(self, batch_size: int = None):
+    """Recalcular los contadores de paquetes de todos los clientes por lotes"""
+    logger.info("Iniciando recálculo de contadores de clientes")
+
+    def report_progress(processed: int, updated_count: int):
+        self.update_state(
+            state="PROGRESS",
+            meta={"customers_processed": processed, "updated_count": updated_count}
+        )
+
+    db = SessionLocal()
+    try:
+        result = CustomerCounterService().backfill(db, batch_size=batch_size, progress_callback=report_progress)
+
+        logger.info(f"Contadores de clientes recalculados: {result['updated_count']} corregidos")
+        return result
+
+    except Exception as e:
+        logger.error(f"Error recalculando contadores de clientes: {str(e)}")
+        raise self.retry(countdown=300, max_retries=2, exc=e)
+    finally:
+        db.close()
+
+@celery_app.task(bind=True, name="src.tasks.maintain_package_event_partitions")
+def maintain_package_event_partitions(self):
+    """Crear las particiones futuras de package_events y archivar las viejas"""
+    db = SessionLocal()
+    try:
+        service = PackageEventPartitionService()
+        created = service.ensure_partitions(db)
+        result = service.archive_old_partitions(db)
+
+        logger.info(
+            f"Particiones de eventos: {created} creadas, {len(result['archived'])} archivadas, "
+            f"{len(result['failed'])} con error"
+        )
+        return {"created": created, **result}
+
+    except Exception as e:
+        logger.error(f"Error en mantenimiento de particiones de eventos: {str(e)}")
+        raise self.retry(countdown=600, max_retries=3, exc=e)
+    finally:
+        db.close()
+
+@celery_app.task(bind=True, name="src.tasks.archive_terminal_packages")
+def archive_terminal_packages(self, older_than_days: int = None, batch_size: int = None):
+    """Mover los paquetes entregados y cancelados antiguos a las tablas de archivo"""
+    logger.info("Iniciando archivado de paquetes terminales")
+
+    def report_progress(archived: int, batches: int):
+        self.update_state(
+            state="PROGRESS",
+            meta={"packages_archived": archived, "batches": batches}
+        )
+
+    db = SessionLocal()
+    try:
+        result = PackageArchiveService().archive_terminal_packages(
+            db, older_than_days=older_than_days, batch_size=batch_size, progress_callback=report_progress
+        )
+
+        logger.info(f"Paquetes archivados: {result['archived']['packages']} en {result['batches']} lotes")
+        return result
+
+    except Exception as e:
+        logger.error(f"Error archivando paquetes terminales: {str(e)}")
+        raise self.retry(countdown=600, max_retries=3, exc=e)
+    finally:
+        db.close()
+
+@celery_app.task(bind=True, name="src.tasks.refill_tracking_code_pool")
+def refill_tracking_code_pool(self, target: int = None):
+    """Completar el pool de códigos de consulta públicos"""
+    db = SessionLocal()
+    try:
+        added = CodeGenerator.refill_tracking_code_pool(db, target=target)
+        if added:
+            logger.info(f"Pool de códigos de consulta: {added} códigos agregados")
+        return {"added": added}
+
+    except Exception as e:
+        logger.error(f"Error reponiendo el pool de códigos de consulta: {str(e)}")
+        raise self.retry(countdown=60, max_retries=3, exc=e)
+    finally:
+        db.close()
+
 @celery_app.task(bind=True, name="src.tasks.update_dashboard_metrics")
 def update_dashboard_metrics(self):
     """Actualizar métricas del dashboard"""
@@ -284,12 +466,12 @@ def process_notifications_queue(self, batch_size: int = 50):
             try:
                 # Procesar notificación según tipo
                 if notification.notification_type == NotificationType.EMAIL:
-                    email_service = EmailService()
+                    email_service = get_email_service()
                     # Re-enviar email si está pendiente
                     # (implementación simplificada - normalmente se procesaría según el evento)
                     logger.info(f"Procesando email notification {notification.id}")
                 elif notification.notification_type == NotificationType.SMS:
-                    sms_service = SMSService()
+                    sms_service = get_sms_service()
                     logger.info(f"Procesando SMS notification {notification.id}")
 
                 processed += 1
@@ -310,6 +492,50 @@ def process_notifications_queue(self, batch_size: int = 50):
     finally:
         db.close()
 
+@celery_app.task(bind=True, name="src.tasks.dispatch_package_notification")
+def dispatch_package_notification(self, outbox_id: str):
+    """Despachar (SMS y email) una notificación de cambio de estado del outbox"""
+    import asyncio
+
+    db = SessionLocal()
+    try:
+        sent = asyncio.run(PackageTransitionEngine.dispatch(db, outbox_id))
+        return {"outbox_id": outbox_id, "sent": sent}
+    except Exception as e:
+        logger.error(f"Error despachando notificación {outbox_id}: {str(e)}")
+        db.rollback()
+        raise self.retry(countdown=60, max_retries=3, exc=e)
+    finally:
+        db.close()
+
+@celery_app.task(bind=True, name="src.tasks.dispatch_pending_package_notifications")
+def dispatch_pending_package_notifications(self):
+    """Barrido periódico: reintentar notificaciones del outbox que quedaron pendientes"""
+    import asyncio
+
+    db = SessionLocal()
+    try:
+        outbox_ids = PackageTransitionEngine.pending_outbox_ids(db, settings.package_outbox_sweep_interval)
+
+        async def dispatch_all() -> int:
+            # Un solo event loop para todo el lote
+            sent = 0
+            for outbox_id in outbox_ids:
+                if await PackageTransitionEngine.dispatch(db, outbox_id):
+                    sent += 1
+            return sent
+
+        sent = asyncio.run(dispatch_all()) if outbox_ids else 0
+        if outbox_ids:
+            logger.info(f"Barrido de outbox: {sent}/{len(outbox_ids)} notificaciones enviadas")
+        return {"processed": len(outbox_ids), "sent": sent}
+    except Exception as e:
+        logger.error(f"Error en barrido de outbox de notificaciones: {str(e)}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
 # ========================================
 # TAREAS DE EMAIL
 # ========================================
@@ -324,7 +550,7 @@ def send_email(self, recipient: str, subject: str, html_content: str, text_conte
     db = SessionLocal()
     try:
         from .models.notification import NotificationEvent, NotificationPriority
-        email_service = EmailService()
+        email_service = get_email_service()
         
         event_enum = NotificationEvent[event_type.upper()] if hasattr(NotificationEvent, event_type.upper()) else NotificationEvent.CUSTOM_MESSAGE
         
@@ -357,7 +583,7 @@ def send_bulk_emails(self, email_requests: List[Dict[str, Any]], user_id: str =
 
     db = SessionLocal()
     try:
-        email_service = EmailService()
+        email_service = get_email_service()
         results = []
 
         import asyncio
@@ -406,7 +632,7 @@ def process_email_queue(self, batch_size: int = 50):
         ).limit(batch_size).all()
 
         processed = 0
-        email_service = EmailService()
+        email_service = get_email_service()
 
         import asyncio
         for notification in pending_emails:
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+PAQUETES EL CLUB v1.0 - Bundles Estáticos con Hash de Contenido
+Versión: 1.0.0
+Fecha: 2025-11-10
+Autor: Equipo de Desarrollo
+
+El JavaScript y el CSS propios de las páginas grandes (paquetes, búsqueda,
+mensajes, clientes) viven en static/js/pages y static/css/pages. build_assets()
+los minifica, los copia a static/dist con el hash del contenido en el nombre y
+genera las variantes .gz y .br; el mapeo nombre lógico -> archivo queda en
+static/dist/manifest.json.
+
+Las plantillas usan el global de Jinja asset_url('js/pages/packages.js'): con
+manifest devuelve la URL con hash (cacheable un año), sin manifest (desarrollo)
+la del archivo fuente.
+
+Minificación y Brotli son opcionales: sin rjsmin/rcssmin se copia el fuente tal
+cual y sin brotli solo se genera la variante .gz.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Directorios (relativos a static/) cuyos archivos se publican como bundles
+BUNDLE_DIRS = ("js/pages", "css/pages")
+DIST_DIR = "dist"
+MANIFEST_NAME = "manifest.json"
+STATIC_URL_PREFIX = "/static/"
+
+_manifest: Optional[Dict[str, str]] = None
+_manifest_mtime: Optional[float] = None
+_manifest_lock = threading.Lock()
+_missing_minifiers = set()
+
+
+def resolve_static_dir() -> str:
+    """Resolver ruta de static compatible con Docker y entorno local."""
+    candidates = [
+        os.environ.get("STATIC_DIR"),
+        "/app/src/static",
+        os.path.join(os.getcwd(), "src", "static"),
+        os.path.join(os.path.dirname(__file__), "..", "..", "static"),
+    ]
+    for path in candidates:
+        if path and os.path.isdir(path):
+            return os.path.abspath(path)
+    return os.path.abspath(os.path.join(os.getcwd(), "src", "static"))
+
+
+# ========================================
+# CONSTRUCCIÓN
+# ========================================
+
+def _minify(source: str, extension: str) -> str:
+    try:
+        if extension == ".js":
+            import rjsmin
+            return rjsmin.jsmin(source)
+        if extension == ".css":
+            import rcssmin
+            return rcssmin.cssmin(source)
+    except ImportError:
+        if extension not in _missing_minifiers:
+            _missing_minifiers.add(extension)
+            logger.warning(f"Minificador para {extension} no instalado, se publica el archivo sin minificar")
+    return source
+
+
+def _write_if_missing(path: str, data: bytes) -> None:
+    """Escritura atómica; los archivos con hash nunca cambian de contenido"""
+    if os.path.exists(path):
+        return
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _write_precompressed(path: str, data: bytes) -> None:
+    _write_if_missing(f"{path}.gz", gzip.compress(data, compresslevel=9, mtime=0))
+    try:
+        import brotli
+        _write_if_missing(f"{path}.br", brotli.compress(data, quality=11))
+    except ImportError:
+        pass
+
+
+def build_assets(static_dir: Optional[str] = None) -> Dict[str, str]:
+    """
+    Construir los bundles con hash y escribir el manifest
+
+    Es idempotente: si el contenido no cambió el nombre con hash es el mismo y
+    no se reescribe. Los bundles que ya no están en el manifest se eliminan.
+    Devuelve el manifest (nombre lógico -> ruta relativa a static/).
+    """
+    static_dir = static_dir or resolve_static_dir()
+    dist_dir = os.path.join(static_dir, DIST_DIR)
+    manifest: Dict[str, str] = {}
+
+    for bundle_dir in BUNDLE_DIRS:
+        source_dir = os.path.join(static_dir, bundle_dir)
+        if not os.path.isdir(source_dir):
+            continue
+        for filename in sorted(os.listdir(source_dir)):
+            stem, extension = os.path.splitext(filename)
+            if extension not in (".js", ".css"):
+                continue
+            with open(os.path.join(source_dir, filename), encoding="utf-8") as f:
+                data = _minify(f.read(), extension).encode("utf-8")
+
+            digest = hashlib.sha256(data).hexdigest()[:12]
+            relative = f"{DIST_DIR}/{bundle_dir}/{stem}.{digest}{extension}"
+            target = os.path.join(static_dir, relative)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            _write_if_missing(target, data)
+            _write_precompressed(target, data)
+            manifest[f"{bundle_dir}/{filename}"] = relative
+
+    os.makedirs(dist_dir, exist_ok=True)
+    _write_manifest(os.path.join(dist_dir, MANIFEST_NAME), manifest)
+    _remove_stale(dist_dir, static_dir, set(manifest.values()))
+    return manifest
+
+
+def _write_manifest(path: str, manifest: Dict[str, str]) -> None:
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _remove_stale(dist_dir: str, static_dir: str, current: set) -> None:
+    """Eliminar bundles (y sus variantes comprimidas) de construcciones anteriores"""
+    for root, _, files in os.walk(dist_dir):
+        for filename in files:
+            if filename == MANIFEST_NAME or filename.endswith(".tmp"):
+                continue
+            path = os.path.join(root, filename)
+            relative = os.path.relpath(path, static_dir).replace(os.sep, "/")
+            for suffix in (".gz", ".br"):
+                if relative.endswith(suffix):
+                    relative = relative[:-len(suffix)]
+                    break
+            if relative not in current:
+                os.remove(path)
+
+
+# ========================================
+# RESOLUCIÓN DE URLS (GLOBAL DE JINJA)
+# ========================================
+
+def _load_manifest() -> Dict[str, str]:
+    global _manifest, _manifest_mtime
+    path = os.path.join(resolve_static_dir(), DIST_DIR, MANIFEST_NAME)
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        mtime = None
+
+    if _manifest is not None and mtime == _manifest_mtime:
+        return _manifest
+
+    with _manifest_lock:
+        if _manifest is None or mtime != _manifest_mtime:
+            manifest: Dict[str, str] = {}
+            if mtime is not None:
+                try:
+                    with open(path, encoding="utf-8") as f:
+                        manifest = json.load(f)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"No se pudo leer el manifest de assets: {e}")
+            _manifest = manifest
+            _manifest_mtime = mtime
+        return _manifest
+
+
+def asset_url(name: str) -> str:
+    """URL de un bundle: con hash si está construido, la del fuente si no"""
+    from app.config import settings
+
+    manifest = _manifest if (_manifest is not None and not settings.templates_auto_reload) else _load_manifest()
+    return STATIC_URL_PREFIX + manifest.get(name, name)
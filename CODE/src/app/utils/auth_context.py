@@ -17,6 +17,9 @@ from typing import Dict, Any, Optional
 from .auth import verify_token
 from app.models.user import User
 from app.dependencies import get_current_active_user_from_cookies
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 def get_auth_context(request: Request) -> Dict[str, Any]:
@@ -49,7 +52,7 @@ def get_auth_context(request: Request) -> Dict[str, Any]:
                     user_role = payload.get("role", user_role)
             except Exception as e:
                 # Token inválido o expirado
-                print(f"Token inválido en get_auth_context: {e}")
+                logger.debug("Token inválido en get_auth_context: %s", e)
                 is_authenticated = False
 
         context = {
@@ -66,7 +69,7 @@ def get_auth_context(request: Request) -> Dict[str, Any]:
 
         return context
     except Exception as e:
-        print(f"Error en get_auth_context: {e}")
+        logger.error(f"Error en get_auth_context: {e}")
         # Retornar contexto básico en caso de error
         return {
             "request": request,
@@ -102,7 +105,7 @@ def get_auth_context_from_request(request: Request) -> Dict[str, Any]:
 
         return context
     except Exception as e:
-        print(f"Error en get_auth_context_from_request: {e}")
+        logger.error(f"Error en get_auth_context_from_request: {e}")
         # Retornar contexto básico en caso de error
         return {
             "is_authenticated": False,
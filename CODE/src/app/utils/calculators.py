@@ -29,25 +29,18 @@ def calculate_storage_fee(received_at: datetime, delivered_at: Optional[datetime
     # Calcular días de bodegaje (restar 1 día de gracia)
     storage_days = days - 1
     
-    # Costo por día usando configuración
-    from app.config import settings
-    daily_rate = Decimal(str(settings.base_storage_rate))
-    
-    return Decimal(storage_days) * daily_rate
+    # Costo por día desde el proveedor de tarifas
+    from app.services.rate_provider import get_rates
+    return get_rates().storage_fee(storage_days)
 
 def calculate_total_amount(package_type: str, storage_fee: Decimal) -> Decimal:
     """
     Calcula monto total a pagar - CORREGIDO usando configuración
     """
-    from app.config import settings
-    
-    # Tarifa base según tipo de paquete usando configuración
-    if package_type == "extra_dimensioned":
-        base_fee = Decimal(str(settings.base_delivery_rate_extra_dimensioned))
-    else:  # normal
-        base_fee = Decimal(str(settings.base_delivery_rate_normal))
+    from app.services.rate_provider import get_rates
     
-    return base_fee + storage_fee
+    # Tarifa base según tipo de paquete desde el proveedor de tarifas
+    return get_rates().base_fee(package_type) + storage_fee
 
 def calculate_days_in_storage(received_at: datetime, delivered_at: Optional[datetime] = None) -> int:
     """
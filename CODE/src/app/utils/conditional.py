@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+PAQUETES EL CLUB v1.0 - Respuestas Condicionales (ETag / 304)
+Versión: 1.0.0
+Fecha: 2025-11-10
+Autor: Equipo de Desarrollo
+
+Los endpoints JSON que el frontend consulta periódicamente (listado de
+paquetes, detalle, búsqueda por guía o código y contadores del header)
+calculan un validador barato -una consulta de agregados, sin construir el
+payload- y lo publican como ETag débil. Si el navegador envía el mismo valor
+en If-None-Match se responde 304 sin cuerpo.
+
+Uso en una ruta:
+
+    etag = make_etag("packages", *validator_parts)
+    not_modified = not_modified_response(request, etag)
+    if not_modified:
+        return not_modified
+    set_etag(response, etag)
+"""
+
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Request, Response
+
+# El navegador guarda la respuesta pero debe revalidarla en cada uso
+CONDITIONAL_CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """ETag débil a partir de las partes del validador (None cuenta como vacío)"""
+    raw = "|".join("" if part is None else str(part) for part in parts)
+    return f'W/"{hashlib.sha1(raw.encode("utf-8")).hexdigest()}"'
+
+
+def _opaque_tag(tag: str) -> str:
+    """Valor sin el prefijo W/ (comparación débil, RFC 9110 §8.8.3.2)"""
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True si If-None-Match contiene el ETag actual (o '*')"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    current = _opaque_tag(etag)
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or _opaque_tag(candidate) == current:
+            return True
+    return False
+
+
+def set_etag(response: Response, etag: str) -> None:
+    """Publicar el validador en la respuesta completa"""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CONDITIONAL_CACHE_CONTROL
+
+
+def not_modified_response(request: Request, etag: str) -> Optional[Response]:
+    """Respuesta 304 si el cliente ya tiene esta versión, None si hay que construirla"""
+    if not etag_matches(request, etag):
+        return None
+    return Response(
+        status_code=304,
+        headers={"ETag": etag, "Cache-Control": CONDITIONAL_CACHE_CONTROL}
+    )
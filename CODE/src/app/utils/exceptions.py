@@ -60,6 +60,21 @@ class PackageException(PaqueteriaException):
         super().__init__(message, status_code, details)
 
 
+class PackageConflictException(PackageException):
+    """
+    Conflicto de concurrencia: otro usuario modificó el paquete (o tomó la
+    misma guía / BAROTI) entre la lectura y la escritura
+    """
+
+    def __init__(
+        self,
+        message: str = "El paquete fue modificado por otro usuario, recargue e intente de nuevo",
+        status_code: int = 409,
+        details: Optional[Dict[str, Any]] = None
+    ):
+        super().__init__(message, status_code, details)
+
+
 class NotificationException(PaqueteriaException):
     """
     Excepciones relacionadas con notificaciones
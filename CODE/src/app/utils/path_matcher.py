@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+PAQUETES EL CLUB v1.0 - Coincidencia de Rutas Precompilada
+Versión: 1.0.0
+Fecha: 2025-11-10
+Autor: Equipo de Desarrollo
+
+Clasificación de rutas para los middlewares: rutas exactas en un frozenset y
+prefijos en un trie por segmentos, construidos una sola vez. Cada consulta
+cuesta una búsqueda en el conjunto y a lo sumo un paso por segmento de la
+ruta, sin recorrer la lista de prefijos.
+"""
+
+from typing import Dict, Iterable
+
+_PREFIX_END = ""  # Clave de fin de prefijo: ningún segmento de un prefijo es vacío
+
+
+class PathMatcher:
+    """
+    Rutas exactas y prefijos por segmento
+
+    Un prefijo "/static" (o "/static/") coincide con "/static/..." pero no con
+    "/static" ni con "/staticfiles"; para incluir la ruta misma se agrega
+    también como exacta.
+    """
+
+    __slots__ = ("exact", "_trie")
+
+    def __init__(self, exact: Iterable[str] = (), prefixes: Iterable[str] = ()):
+        self.exact = frozenset(exact)
+        self._trie: Dict[str, dict] = {}
+        for prefix in prefixes:
+            segments = [segment for segment in prefix.split("/") if segment]
+            if not segments:
+                continue
+            node = self._trie
+            for segment in segments:
+                node = node.setdefault(segment, {})
+            node[_PREFIX_END] = {}
+
+    def matches(self, path: str) -> bool:
+        return path in self.exact or self.matches_prefix(path)
+
+    def matches_prefix(self, path: str) -> bool:
+        node = self._trie
+        start = 1  # Las rutas ASGI empiezan con "/"
+        while node:
+            end = path.find("/", start)
+            if end < 0:
+                # Último segmento: un prefijo necesita algo después de su "/"
+                return False
+            node = node.get(path[start:end])
+            if node is None:
+                return False
+            if _PREFIX_END in node:
+                return True
+            start = end + 1
+        return False
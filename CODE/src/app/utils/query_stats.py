@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+"""
+PAQUETES EL CLUB v1.0 - Instrumentación SQL por Petición
+Versión: 1.0.0
+Fecha: 2025-11-10
+Autor: Equipo de Desarrollo
+
+Los eventos before/after_cursor_execute del engine acumulan en un
+QueryStats (contextvar que fija QueryMetricsMiddleware) el número de
+consultas, las filas y el tiempo de base de datos de la petición en curso,
+junto con cuántas veces se repite cada forma de consulta (SQL normalizado,
+sin literales ni parámetros): una misma forma repetida muchas veces es el
+síntoma de un N+1.
+
+El QueryStats es mutable y el contextvar se copia a los hilos del
+threadpool, así que las rutas síncronas también suman a la petición.
+Fuera de una petición (Celery, scripts) solo se registra el log de
+consultas lentas, salvo dentro de track_queries().
+
+Uso en pruebas:
+
+    with query_budget(max_queries=5, max_repeats=2):
+        PackageService.list_dashboard_page(db, ...)
+
+    response = client.get("/api/packages/")
+    assert_response_budget(response, max_queries=5, max_repeats=2)
+"""
+
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Iterator, Optional
+
+from prometheus_client import Counter as PrometheusCounter, Histogram
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+
+logger = logging.getLogger("app.sql")
+
+# Estadísticas de la petición en curso (None fuera de una petición)
+query_stats_var: ContextVar[Optional["QueryStats"]] = ContextVar("query_stats", default=None)
+
+# ========================================
+# MÉTRICAS DE PROMETHEUS
+# ========================================
+
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request",
+    "Consultas SQL por petición",
+    ("method", "route"),
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144)
+)
+DB_TIME_PER_REQUEST = Histogram(
+    "db_time_per_request_seconds",
+    "Tiempo de base de datos por petición",
+    ("method", "route"),
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+)
+DB_ROWS_PER_REQUEST = Histogram(
+    "db_rows_per_request",
+    "Filas devueltas o afectadas por petición",
+    ("method", "route"),
+    buckets=(0, 1, 10, 100, 1000, 10000, 100000)
+)
+DB_SLOW_QUERIES = PrometheusCounter(
+    "db_slow_queries_total",
+    "Consultas más lentas que SQL_SLOW_QUERY_MS",
+    ("route",)
+)
+DB_REPEATED_STATEMENTS = PrometheusCounter(
+    "db_repeated_statement_requests_total",
+    "Peticiones con una forma de consulta repetida más de SQL_REPEAT_THRESHOLD veces (posible N+1)",
+    ("method", "route")
+)
+
+
+# ========================================
+# NORMALIZACIÓN
+# ========================================
+
+_COMMENTS = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_PARAMS = re.compile(r"%\([^)]+\)s|%s|:\w+|\$\d+")
+_NUMBERS = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_IN_LISTS = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_VALUES_LISTS = re.compile(r"(VALUES\s*\([^)]*\))(?:\s*,\s*\([^)]*\))+", re.IGNORECASE)
+_SPACES = re.compile(r"\s+")
+
+NORMALIZED_MAX_LENGTH = 1000
+
+
+@lru_cache(maxsize=4096)
+def normalize_sql(statement: str) -> str:
+    """
+    Forma de la consulta: sin comentarios, literales ni parámetros, listas
+    IN (...) y VALUES (...), (...) colapsadas y espacios simplificados
+    """
+    sql = _COMMENTS.sub(" ", statement)
+    sql = _STRINGS.sub("?", sql)
+    sql = _PARAMS.sub("?", sql)
+    sql = _NUMBERS.sub("?", sql)
+    sql = _IN_LISTS.sub("IN (?)", sql)
+    sql = _VALUES_LISTS.sub(r"\1", sql)
+    sql = _SPACES.sub(" ", sql).strip()
+    return sql[:NORMALIZED_MAX_LENGTH]
+
+
+# ========================================
+# ESTADÍSTICAS
+# ========================================
+
+class QueryBudgetExceeded(AssertionError):
+    """Una petición o bloque superó el presupuesto de consultas"""
+
+
+@dataclass
+class QueryStats:
+    """Consultas de una petición (o de un bloque con track_queries)"""
+    count: int = 0
+    rows: int = 0
+    db_time: float = 0.0  # Segundos
+    slow: int = 0
+    route: str = ""  # Plantilla de la ruta (la fija el middleware)
+    shapes: Counter = field(default_factory=Counter)
+
+    def record(self, shape: str, duration: float, rows: int):
+        self.count += 1
+        self.rows += rows
+        self.db_time += duration
+        self.shapes[shape] += 1
+
+    @property
+    def max_repeats(self) -> int:
+        """Veces que se ejecutó la forma de consulta más repetida"""
+        return max(self.shapes.values(), default=0)
+
+    def most_repeated(self, limit: int = 3):
+        return self.shapes.most_common(limit)
+
+    def server_timing(self) -> str:
+        """Valor de la cabecera Server-Timing (count, rows y repeat son parámetros propios)"""
+        return (
+            f'db;dur={self.db_time * 1000:.2f};desc="SQL";'
+            f'count={self.count};rows={self.rows};repeat={self.max_repeats}'
+        )
+
+    def check(self, max_queries: Optional[int] = None, max_repeats: Optional[int] = None):
+        """QueryBudgetExceeded si se superó alguno de los límites"""
+        problems = []
+        if max_queries is not None and self.count > max_queries:
+            problems.append(f"{self.count} consultas (máximo {max_queries})")
+        if max_repeats is not None and self.max_repeats > max_repeats:
+            shape, times = self.most_repeated(1)[0]
+            problems.append(f"consulta repetida {times} veces (máximo {max_repeats}): {shape}")
+        if problems:
+            raise QueryBudgetExceeded("; ".join(problems))
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Acumular las consultas del bloque (servicios, tareas Celery, pruebas)"""
+    stats = QueryStats()
+    token = query_stats_var.set(stats)
+    try:
+        yield stats
+    finally:
+        query_stats_var.reset(token)
+
+
+@contextmanager
+def query_budget(max_queries: Optional[int] = None, max_repeats: Optional[int] = None) -> Iterator[QueryStats]:
+    """Ayuda para pruebas: falla si el bloque supera el presupuesto de consultas"""
+    with track_queries() as stats:
+        yield stats
+    stats.check(max_queries, max_repeats)
+
+
+_SERVER_TIMING_PARAM = re.compile(r"(\w+)=([\w.]+)")
+
+
+def parse_server_timing(header: Optional[str]) -> Optional[QueryStats]:
+    """QueryStats (sin formas) a partir de la entrada db de Server-Timing"""
+    for entry in (header or "").split(","):
+        name, _, params = entry.strip().partition(";")
+        if name != "db":
+            continue
+        values = dict(_SERVER_TIMING_PARAM.findall(params))
+        stats = QueryStats(
+            count=int(values.get("count", 0)),
+            rows=int(values.get("rows", 0)),
+            db_time=float(values.get("dur", 0)) / 1000
+        )
+        repeat = int(values.get("repeat", 0))
+        if repeat:
+            stats.shapes["(forma más repetida)"] = repeat
+        return stats
+    return None
+
+
+def assert_response_budget(response, max_queries: Optional[int] = None, max_repeats: Optional[int] = None) -> QueryStats:
+    """
+    Ayuda para pruebas HTTP (TestClient, httpx): falla si la petición superó el
+    presupuesto según su cabecera Server-Timing (requiere SQL_SERVER_TIMING=true)
+    """
+    stats = parse_server_timing(response.headers.get("server-timing"))
+    if stats is None:
+        raise QueryBudgetExceeded("La respuesta no tiene la métrica db de Server-Timing")
+    stats.check(max_queries, max_repeats)
+    return stats
+
+
+# ========================================
+# EVENTOS DEL ENGINE
+# ========================================
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_started_at = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started_at = getattr(context, "_query_started_at", None)
+    if started_at is None:
+        return
+    duration = time.perf_counter() - started_at
+    rows = max(cursor.rowcount or 0, 0)
+    stats = query_stats_var.get()
+    slow = duration * 1000 >= settings.sql_slow_query_ms
+    if stats is not None:
+        stats.record(normalize_sql(statement), duration, rows)
+    if slow:
+        route = (stats.route if stats is not None else "") or "-"
+        if stats is not None:
+            stats.slow += 1
+        DB_SLOW_QUERIES.labels(route=route).inc()
+        logger.warning(
+            "Consulta lenta: %.1f ms", duration * 1000,
+            extra={
+                "duration_ms": round(duration * 1000, 1),
+                "rows": rows,
+                "route": route,
+                "sql": normalize_sql(statement)
+            }
+        )
+
+
+def install_query_hooks(engine: Engine) -> None:
+    """Registrar los eventos de instrumentación en el engine (idempotente)"""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
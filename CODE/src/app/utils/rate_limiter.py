@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+"""
+PAQUETES EL CLUB v1.0 - Limitador de Peticiones GCRA en Redis
+Versión: 1.0.0
+Fecha: 2025-11-10
+Autor: Equipo de Desarrollo
+
+Límite por cliente y regla con GCRA (generic cell rate algorithm): Redis
+guarda por clave un único valor, el instante teórico de la siguiente
+llegada (TAT). Un límite "5/minute" deja pasar una ráfaga de 5 y después una
+petición cada 12 s, sin el doble de ráfaga que permite una ventana fija en
+el cambio de ventana.
+
+- La decisión es un solo EVALSHA atómico con la hora del servidor Redis
+  (todas las réplicas de la aplicación usan el mismo reloj).
+- Las reglas se compilan una vez en RouteLimitTable: ruta exacta en un dict
+  y prefijo más largo en un trie por segmentos, con memoización acotada.
+- Un cliente rechazado queda en una caché local hasta su Retry-After: sus
+  peticiones siguientes se rechazan sin consultar Redis. Es seguro porque
+  un rechazo no mueve el TAT y solo otras peticiones aceptadas lo adelantan.
+- Si Redis no responde dentro de RATE_LIMIT_REDIS_TIMEOUT la petición pasa
+  (fail-open) y se cuenta como decisión "error".
+"""
+
+import logging
+import math
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+
+from prometheus_client import Counter, Histogram
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "paqueteria:ratelimit"
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+# ========================================
+# MÉTRICAS DE PROMETHEUS
+# ========================================
+
+RATE_LIMIT_DECISIONS = Counter(
+    "rate_limit_decisions_total",
+    "Decisiones del limitador por regla (allowed, rejected, fast_rejected, error)",
+    ("rule", "decision")
+)
+RATE_LIMIT_REDIS_LATENCY = Histogram(
+    "rate_limit_redis_seconds",
+    "Duración del EVALSHA del limitador",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)
+)
+
+# ========================================
+# GCRA
+# ========================================
+
+# KEYS[1]: clave del cliente en la regla
+# ARGV[1]: límite, ARGV[2]: periodo en milisegundos
+# Devuelve {permitido, restantes, reintentar_en_ms, reinicio_en_ms}
+GCRA_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local emission = period / limit
+
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then
+    tat = now
+end
+local new_tat = tat + emission
+local allow_at = new_tat - period
+
+if now < allow_at then
+    return {0, 0, math.ceil(allow_at - now), math.ceil(tat - now)}
+end
+
+redis.call('SET', KEYS[1], new_tat, 'PX', math.ceil(new_tat - now))
+return {1, math.floor((now - allow_at) / emission), 0, math.ceil(new_tat - now)}
+"""
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """Regla de límite: `limit` peticiones por `period` segundos"""
+    rule: str
+    limit: int
+    period: int
+
+    @classmethod
+    def parse(cls, rule: str, value: str) -> "RateLimit":
+        """"5/minute" -> RateLimit(rule, 5, 60)"""
+        amount, _, unit = value.partition("/")
+        return cls(rule=rule, limit=int(amount), period=PERIODS[unit.strip().rstrip("s")])
+
+    def __str__(self) -> str:
+        return f"{self.limit}/{self.period}s"
+
+
+@dataclass(frozen=True)
+class Decision:
+    allowed: bool
+    limit: RateLimit
+    remaining: int
+    retry_after: float  # segundos
+    reset_after: float  # segundos hasta recuperar toda la ráfaga
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+# ========================================
+# TABLA DE RUTAS
+# ========================================
+
+_RULE = ""  # Clave de la regla en un nodo del trie (ningún segmento es vacío)
+
+
+class RouteLimitTable:
+    """
+    Regla aplicable a una ruta: coincidencia exacta o el prefijo más largo
+    (por segmentos: "/api/admin" cubre "/api/admin/users/5" pero no
+    "/api/administrador"). Un valor None en las reglas exime a la ruta.
+    """
+
+    def __init__(
+        self,
+        exact: Mapping[str, Optional[str]],
+        prefixes: Mapping[str, Optional[str]],
+        default: Optional[str] = None,
+        cache_size: int = 4096
+    ):
+        self._exact: Dict[str, Optional[RateLimit]] = {
+            path: self._compile(path, value) for path, value in exact.items()
+        }
+        self._trie: dict = {}
+        for prefix, value in prefixes.items():
+            node = self._trie
+            for segment in self._segments(prefix):
+                node = node.setdefault(segment, {})
+            node[_RULE] = self._compile(prefix, value)
+        self._default = self._compile("default", default)
+        self.resolve = lru_cache(maxsize=cache_size)(self._resolve)
+
+    @staticmethod
+    def _compile(rule: str, value: Optional[str]) -> Optional[RateLimit]:
+        return RateLimit.parse(rule, value) if value else None
+
+    @staticmethod
+    def _segments(path: str) -> Iterable[str]:
+        return [segment for segment in path.split("/") if segment]
+
+    def _resolve(self, path: str) -> Optional[RateLimit]:
+        if path in self._exact:
+            return self._exact[path]
+        node = self._trie
+        found = self._default
+        for segment in self._segments(path):
+            node = node.get(segment)
+            if node is None:
+                break
+            if _RULE in node:
+                found = node[_RULE]
+        return found
+
+    def rules(self) -> Dict[str, str]:
+        """Reglas compiladas (para monitoreo)"""
+        compiled = {}
+
+        def walk(node: dict, path: str):
+            for segment, child in node.items():
+                if segment == _RULE:
+                    compiled[path + "/*"] = str(child) if child else "sin límite"
+                else:
+                    walk(child, f"{path}/{segment}")
+
+        walk(self._trie, "")
+        compiled.update({path: str(rule) if rule else "sin límite" for path, rule in self._exact.items()})
+        compiled["default"] = str(self._default) if self._default else "sin límite"
+        return compiled
+
+
+# ========================================
+# LIMITADOR
+# ========================================
+
+class RateLimiter:
+    """Decisiones GCRA en Redis con caché local de clientes rechazados"""
+
+    def __init__(self, redis_url: Optional[str] = None, fast_reject_size: Optional[int] = None):
+        self.redis_url = redis_url or settings.redis_url
+        self.fast_reject_size = fast_reject_size or settings.rate_limit_fast_reject_size
+        self._client = None
+        self._script = None
+        self._blocked: Dict[Tuple[str, str], Tuple[float, float]] = {}  # (regla, cliente) -> (reintentar, reinicio)
+
+    def _redis_script(self):
+        if self._script is None:
+            import redis.asyncio as redis
+            self._client = redis.from_url(
+                self.redis_url,
+                socket_timeout=settings.rate_limit_redis_timeout,
+                socket_connect_timeout=settings.rate_limit_redis_timeout
+            )
+            # register_script usa EVALSHA y carga el script solo ante NOSCRIPT
+            self._script = self._client.register_script(GCRA_SCRIPT)
+        return self._script
+
+    async def hit(self, limit: RateLimit, client_id: str) -> Decision:
+        now = time.monotonic()
+        blocked = self._blocked.get((limit.rule, client_id))
+        if blocked:
+            retry_at, reset_at = blocked
+            if now < retry_at:
+                RATE_LIMIT_DECISIONS.labels(limit.rule, "fast_rejected").inc()
+                return Decision(False, limit, 0, retry_at - now, reset_at - now)
+            del self._blocked[(limit.rule, client_id)]
+
+        started = time.perf_counter()
+        try:
+            allowed, remaining, retry_ms, reset_ms = await self._redis_script()(
+                keys=[f"{KEY_PREFIX}:{limit.rule}:{client_id}"],
+                args=[limit.limit, limit.period * 1000]
+            )
+        except Exception as e:
+            RATE_LIMIT_DECISIONS.labels(limit.rule, "error").inc()
+            logger.warning(f"Limitador sin Redis, petición permitida ({limit.rule}): {e}")
+            return Decision(True, limit, limit.limit, 0, 0)
+        finally:
+            RATE_LIMIT_REDIS_LATENCY.observe(time.perf_counter() - started)
+
+        decision = Decision(bool(allowed), limit, int(remaining), retry_ms / 1000, reset_ms / 1000)
+        if decision.allowed:
+            RATE_LIMIT_DECISIONS.labels(limit.rule, "allowed").inc()
+        else:
+            RATE_LIMIT_DECISIONS.labels(limit.rule, "rejected").inc()
+            self._remember_rejection(limit.rule, client_id, now + decision.retry_after, now + decision.reset_after)
+        return decision
+
+    def _remember_rejection(self, rule: str, client_id: str, retry_at: float, reset_at: float) -> None:
+        if len(self._blocked) >= self.fast_reject_size:
+            now = time.monotonic()
+            self._blocked = {key: value for key, value in self._blocked.items() if value[0] > now}
+            if len(self._blocked) >= self.fast_reject_size:
+                return
+        self._blocked[(rule, client_id)] = (retry_at, reset_at)
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._script = None
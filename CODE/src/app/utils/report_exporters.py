@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+PAQUETES EL CLUB v1.0 - Exportadores de Reportes
+Versión: 1.0.0
+Fecha: 2025-10-19
+Autor: Equipo de Desarrollo
+
+Convierte el resultado de los generadores de ReportService (diccionarios
+anidados) en secciones tabulares y las escribe fila a fila en un archivo
+del formato solicitado, sin mantener el documento completo en memoria.
+"""
+
+import csv
+import html
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+from app.models.report import ReportFormat
+
+# Extensión y Content-Type por formato
+REPORT_EXTENSIONS = {
+    ReportFormat.CSV: "csv",
+    ReportFormat.EXCEL: "xlsx",
+    ReportFormat.PDF: "pdf",
+    ReportFormat.JSON: "json",
+    ReportFormat.HTML: "html",
+}
+
+REPORT_CONTENT_TYPES = {
+    ReportFormat.CSV: "text/csv; charset=utf-8",
+    ReportFormat.EXCEL: "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    ReportFormat.PDF: "application/pdf",
+    ReportFormat.JSON: "application/json",
+    ReportFormat.HTML: "text/html; charset=utf-8",
+}
+
+# Una sección es (nombre, encabezados, iterador de filas)
+Section = Tuple[str, List[str], Iterator[List[Any]]]
+
+
+def _to_cell(value: Any) -> Any:
+    """Normalizar un valor para escribirlo en una celda"""
+    if value is None:
+        return ""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, default=str)
+    return value
+
+
+def iter_report_sections(data: Dict[str, Any], title: str = "resumen") -> Iterator[Section]:
+    """
+    Dividir el resultado de un reporte en secciones tabulares
+
+    - Los valores escalares de primer nivel forman la sección de resumen
+    - Los diccionarios planos se exportan como pares clave/valor
+    - Las listas de diccionarios se exportan como tablas
+    - Los diccionarios anidados (p. ej. get_dashboard_statistics) se recorren
+      recursivamente con el nombre de la clave como prefijo
+    """
+    scalars = []
+    nested = []
+
+    for key, value in data.items():
+        if isinstance(value, dict):
+            nested.append((key, value))
+        elif isinstance(value, list):
+            nested.append((key, value))
+        else:
+            scalars.append([key, _to_cell(value)])
+
+    if scalars:
+        yield title, ["campo", "valor"], iter(scalars)
+
+    for key, value in nested:
+        section_name = f"{title}.{key}" if title != "resumen" else key
+        if isinstance(value, list):
+            dict_rows = [row for row in value if isinstance(row, dict)]
+            if dict_rows:
+                headers = list(dict_rows[0].keys())
+                yield section_name, headers, (
+                    [_to_cell(row.get(h)) for h in headers] for row in dict_rows
+                )
+            elif value:
+                yield section_name, ["valor"], ([_to_cell(item)] for item in value)
+        elif any(isinstance(v, (dict, list)) for v in value.values()) and key != "period":
+            yield from iter_report_sections(value, section_name)
+        else:
+            yield section_name, ["campo", "valor"], (
+                [k, _to_cell(v)] for k, v in value.items()
+            )
+
+
+def build_report_summary(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Extraer un resumen compacto (solo escalares de primer y segundo nivel)
+    para guardarlo en Report.summary en lugar del resultado completo
+    """
+    summary: Dict[str, Any] = {}
+    for key, value in data.items():
+        if isinstance(value, dict):
+            scalars = {k: _to_cell(v) for k, v in value.items() if not isinstance(v, (dict, list))}
+            if scalars:
+                summary[key] = scalars
+        elif not isinstance(value, list):
+            summary[key] = _to_cell(value)
+    return summary
+
+
+def _write_csv(data: Dict[str, Any], path: Path, title: str) -> None:
+    with open(path, "w", newline="", encoding="utf-8-sig") as fh:
+        writer = csv.writer(fh)
+        first = True
+        for name, headers, rows in iter_report_sections(data):
+            if not first:
+                writer.writerow([])
+            first = False
+            writer.writerow([f"# {name}"])
+            writer.writerow(headers)
+            writer.writerows(rows)
+
+
+def _write_json(data: Dict[str, Any], path: Path, title: str) -> None:
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump({"title": title, "data": data}, fh, ensure_ascii=False, default=_to_cell)
+
+
+def _write_html(data: Dict[str, Any], path: Path, title: str) -> None:
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.write(f"<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>{html.escape(title)}</title></head><body>")
+        fh.write(f"<h1>{html.escape(title)}</h1>")
+        for name, headers, rows in iter_report_sections(data):
+            fh.write(f"<h2>{html.escape(name)}</h2><table border=\"1\"><thead><tr>")
+            fh.write("".join(f"<th>{html.escape(str(h))}</th>" for h in headers))
+            fh.write("</tr></thead><tbody>")
+            for row in rows:
+                fh.write("<tr>" + "".join(f"<td>{html.escape(str(c))}</td>" for c in row) + "</tr>")
+            fh.write("</tbody></table>")
+        fh.write("</body></html>")
+
+
+def _write_excel(data: Dict[str, Any], path: Path, title: str) -> None:
+    try:
+        from openpyxl import Workbook
+    except ImportError as e:
+        raise ValueError("Exportación a Excel no disponible: instale openpyxl") from e
+
+    # write_only evita mantener todas las celdas en memoria
+    workbook = Workbook(write_only=True)
+    used_titles = set()
+    for name, headers, rows in iter_report_sections(data):
+        # Excel limita el nombre de hoja a 31 caracteres y sin duplicados
+        sheet_title = name[:31]
+        suffix = 1
+        while sheet_title in used_titles:
+            suffix += 1
+            sheet_title = f"{name[:28]}_{suffix}"
+        used_titles.add(sheet_title)
+
+        sheet = workbook.create_sheet(title=sheet_title)
+        sheet.append(headers)
+        for row in rows:
+            sheet.append(row)
+    workbook.save(path)
+
+
+def _write_pdf(data: Dict[str, Any], path: Path, title: str) -> None:
+    try:
+        from reportlab.lib import colors
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib.styles import getSampleStyleSheet
+        from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+    except ImportError as e:
+        raise ValueError("Exportación a PDF no disponible: instale reportlab") from e
+
+    styles = getSampleStyleSheet()
+    story = [Paragraph(html.escape(title), styles["Title"])]
+    for name, headers, rows in iter_report_sections(data):
+        story.append(Paragraph(html.escape(name), styles["Heading2"]))
+        table = Table([headers] + [[str(c) for c in row] for row in rows], repeatRows=1)
+        table.setStyle(TableStyle([
+            ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+            ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
+            ("FONTSIZE", (0, 0), (-1, -1), 8),
+        ]))
+        story.append(table)
+        story.append(Spacer(1, 12))
+    SimpleDocTemplate(str(path), pagesize=A4, title=title).build(story)
+
+
+_WRITERS = {
+    ReportFormat.CSV: _write_csv,
+    ReportFormat.EXCEL: _write_excel,
+    ReportFormat.PDF: _write_pdf,
+    ReportFormat.JSON: _write_json,
+    ReportFormat.HTML: _write_html,
+}
+
+
+def export_report(data: Dict[str, Any], report_format: ReportFormat, path: Path, title: str = "Reporte") -> int:
+    """
+    Escribir el reporte en disco en el formato indicado
+
+    Returns:
+        int: Tamaño del archivo generado en bytes
+    """
+    writer = _WRITERS.get(ReportFormat(report_format))
+    if not writer:
+        raise ValueError(f"Formato de reporte no soportado: {report_format}")
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    writer(data, path, title)
+    return path.stat().st_size
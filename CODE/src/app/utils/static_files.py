@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+PAQUETES EL CLUB v1.0 - Archivos Estáticos con Variantes Precomprimidas
+Versión: 1.0.0
+Fecha: 2025-11-10
+Autor: Equipo de Desarrollo
+"""
+
+import mimetypes
+import stat
+
+import anyio
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse
+from starlette.types import Scope
+
+from app.utils.assets import DIST_DIR
+
+# Los bundles llevan el hash en el nombre: su contenido nunca cambia
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Preferencia de codificación: Brotli antes que gzip
+PRECOMPRESSED_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    StaticFiles que sirve los bundles de static/dist ya comprimidos
+
+    Si el navegador acepta br o gzip y existe el archivo .br/.gz generado por
+    build_assets(), se entrega ese archivo con Content-Encoding; así ni la
+    aplicación ni nginx comprimen en cada petición.
+    """
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if scope["method"] not in ("GET", "HEAD") or not path.replace("\\", "/").startswith(f"{DIST_DIR}/"):
+            return await super().get_response(path, scope)
+
+        request_headers = Headers(scope=scope)
+        accept_encoding = request_headers.get("accept-encoding", "")
+        for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+            if encoding not in accept_encoding:
+                continue
+            full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path + suffix)
+            if stat_result is None or not stat.S_ISREG(stat_result.st_mode):
+                continue
+            response = FileResponse(
+                full_path,
+                stat_result=stat_result,
+                method=scope["method"],
+                media_type=mimetypes.guess_type(path)[0] or "application/octet-stream",
+                headers={
+                    "Content-Encoding": encoding,
+                    "Vary": "Accept-Encoding",
+                    "Cache-Control": IMMUTABLE_CACHE_CONTROL
+                }
+            )
+            if self.is_not_modified(response.headers, request_headers):
+                return NotModifiedResponse(response.headers)
+            return response
+
+        response = await super().get_response(path, scope)
+        if response.status_code in (200, 304):
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+            response.headers["Vary"] = "Accept-Encoding"
+        return response
@@ -1,5 +1,20 @@
+import logging
 import os
+import threading
+from typing import Optional
+
 from fastapi.templating import Jinja2Templates
+from jinja2 import FileSystemBytecodeCache, TemplateError
+
+from app.config import settings
+from app.utils.assets import asset_url
+
+logger = logging.getLogger(__name__)
+
+# Instancia única por proceso: todas las rutas comparten el mismo Environment
+# y por lo tanto la misma caché de plantillas compiladas
+_templates: Optional[Jinja2Templates] = None
+_templates_lock = threading.Lock()
 
 
 def _resolve_templates_dir() -> str:
@@ -20,9 +35,49 @@ def _resolve_templates_dir() -> str:
     return os.path.abspath(os.path.join(os.getcwd(), "src", "templates"))
 
 
+def _bytecode_cache() -> Optional[FileSystemBytecodeCache]:
+    """Caché de bytecode en disco compartida por los workers (None si no se puede crear)."""
+    cache_dir = settings.templates_bytecode_cache_dir
+    if not cache_dir:
+        return None
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+    except OSError as e:
+        logger.warning(f"No se pudo crear la caché de bytecode de plantillas en {cache_dir}: {e}")
+        return None
+    return FileSystemBytecodeCache(cache_dir, pattern="paqueteria-%s.cache")
+
+
 def get_templates() -> Jinja2Templates:
-    """Obtener instancia de Jinja2Templates con auto_reload y ruta resuelta."""
-    templates_dir = _resolve_templates_dir()
-    return Jinja2Templates(directory=templates_dir, auto_reload=True)
+    """Obtener la instancia compartida de Jinja2Templates configurada desde Settings."""
+    global _templates
+    if _templates is None:
+        with _templates_lock:
+            if _templates is None:
+                _templates = Jinja2Templates(
+                    directory=_resolve_templates_dir(),
+                    auto_reload=settings.templates_auto_reload,
+                    bytecode_cache=_bytecode_cache(),
+                    cache_size=settings.templates_cache_size
+                )
+                _templates.env.globals["asset_url"] = asset_url
+    return _templates
+
 
+def precompile_templates() -> int:
+    """
+    Compilar todas las plantillas HTML al iniciar el worker.
 
+    Con auto_reload desactivado quedan en la caché del Environment y ninguna
+    petición vuelve a compilar ni a consultar el disco. Devuelve cuántas se
+    compilaron.
+    """
+    env = get_templates().env
+    compiled = 0
+    for name in env.list_templates(extensions=["html"]):
+        try:
+            env.get_template(name)
+            compiled += 1
+        except TemplateError as e:
+            logger.warning(f"No se pudo precompilar la plantilla {name}: {e}")
+    return compiled
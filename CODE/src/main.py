@@ -9,41 +9,44 @@ Autor: Equipo de Desarrollo
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from contextlib import asynccontextmanager
 import logging
 import os
 
-# Configuración de logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler()
-    ]
-)
+# Importaciones locales
+from src.app.config import settings
+# Mismo módulo que importan las rutas (app.*) para compartir el contextvar del request_id
+from app.logging_config import setup_logging, shutdown_logging
+# Igual para el registro de servicios: una sola instancia compartida con las rutas
+from app.services.registry import service_registry, get_email_service
+# Y para el entorno de plantillas: las rutas lo obtienen con get_templates()
+from app.utils.template_loader import get_templates, precompile_templates
+# Mismo módulo que registra los eventos del engine (contextvar y métricas compartidas)
+from app.middleware.query_metrics import QueryMetricsMiddleware
+# Y para el limitador (cliente Redis, caché de rechazos y métricas del proceso)
+from app.middleware.rate_limiting import RateLimitMiddleware, rate_limiter
+
+# Configuración de logging (JSON, no bloqueante vía QueueHandler)
+setup_logging()
 
 logger = logging.getLogger(__name__)
 
-# Importaciones locales
-from src.app.config import settings
 from src.app.utils.exceptions import PaqueteriaException
 from src.app.database import init_db
 from src.app.routes.api import router as api_router
 from src.app.routes.views import router as views_router
 from src.app.routes.public import router as public_router
-from src.app.routes import auth, protected, customers, rates, notifications, messages, files, admin, announcements, profile, packages
+from src.app.routes import auth, protected, customers, rates, notifications, messages, files, admin, announcements, profile, packages, reports
 from src.app.routes.header_notifications import router as header_notifications
 from src.app.routes.upload import router as upload_router
 from src.app.routes.images import router as images_router
 from src.app.routes.debug_standalone import router as debug_standalone_router
 from src.app.routes.package_events import router as package_events_router
-from src.app.middleware.rate_limiting import limiter, rate_limit_exceeded_handler
 from src.app.middleware.error_handler import setup_error_handlers
 from src.app.middleware.auth_redirect import AuthRedirectMiddleware
-from slowapi import _rate_limit_exceeded_handler
-from slowapi.middleware import SlowAPIMiddleware
+from src.app.middleware.request_id import RequestIdMiddleware
+from src.app.utils.static_files import PrecompressedStaticFiles
 from prometheus_fastapi_instrumentator import Instrumentator
 
 @asynccontextmanager
@@ -57,10 +60,20 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"❌ Error al inicializar la base de datos: {e}")
     
+    # Construir una vez por worker los servicios con clientes externos (S3, SMS, Email)
+    service_registry.warm_up()
+
+    # Compilar las plantillas antes de aceptar peticiones
+    if settings.templates_precompile:
+        try:
+            compiled = precompile_templates()
+            logger.info(f"✅ Plantillas precompiladas: {compiled} (auto_reload={settings.templates_auto_reload})")
+        except Exception as e:
+            logger.warning(f"⚠️ No se pudieron precompilar las plantillas: {e}")
+
     # Validar configuración SMTP al iniciar (solo si está configurada)
     try:
-        from app.services.email_service import EmailService
-        email_service = EmailService()
+        email_service = get_email_service()
         smtp_test = await email_service.test_smtp_connection()
         if smtp_test.get("success"):
             logger.info(f"✅ Conexión SMTP validada: {smtp_test.get('server')}:{smtp_test.get('port')}")
@@ -72,13 +85,18 @@ async def lifespan(app: FastAPI):
     
     yield
     logger.info("Cerrando PAQUETES EL CLUB v1.0...")
+    service_registry.reset()
+    await rate_limiter.close()
+    shutdown_logging()
 
 # Crear aplicación FastAPI
 app = FastAPI(
     title=settings.app_name,
     version=settings.app_version,
     description="Sistema de gestión de paquetería optimizado para producción",
-    lifespan=lifespan
+    lifespan=lifespan,
+    # Serialización JSON con orjson (más rápida y con fechas/UUID nativos)
+    default_response_class=ORJSONResponse
 )
 
 # Configurar métricas de Prometheus
@@ -96,13 +114,17 @@ app.add_middleware(
 # Middleware de redirección de autenticación
 app.add_middleware(AuthRedirectMiddleware, login_url="/auth/login")
 
-# Configuración de Rate Limiting
-app.add_middleware(SlowAPIMiddleware)
-app.state.limiter = limiter  # Set the limiter in app state for middleware
-app.add_exception_handler(429, rate_limit_exceeded_handler)
+# Rate limiting por IP y ruta (GCRA en Redis, reglas precompiladas)
+app.add_middleware(RateLimitMiddleware)
+
+# Consultas SQL por petición: histogramas por ruta y cabecera Server-Timing
+app.add_middleware(QueryMetricsMiddleware)
+
+# Request ID para correlación de logs (el más externo, se agrega al final)
+app.add_middleware(RequestIdMiddleware)
 
-# Montar archivos estáticos (sin cache para desarrollo, permite cambios en tiempo real)
-app.mount("/static", StaticFiles(directory="/app/src/static"), name="static")
+# Montar archivos estáticos (los bundles de /static/dist se sirven precomprimidos y con cache inmutable)
+app.mount("/static", PrecompressedStaticFiles(directory="/app/src/static"), name="static")
 
 # Montar uploads desde /app/uploads (volumen dedicado)
 # Crear directorio si no existe
@@ -111,8 +133,8 @@ uploads_dir = Path("/app/uploads")
 uploads_dir.mkdir(parents=True, exist_ok=True)
 app.mount("/uploads", StaticFiles(directory=str(uploads_dir)), name="uploads")
 
-# Configuración de templates
-templates = Jinja2Templates(directory="/app/src/templates", auto_reload=True)
+# Configuración de templates (instancia compartida con las rutas)
+templates = get_templates()
 
 # Manejadores de excepciones
 def handle_paqueteria_exception(request: Request, exc: PaqueteriaException):
@@ -161,6 +183,7 @@ app.include_router(messages, prefix="/api/messages", tags=["Mensajes"])
 app.include_router(header_notifications, prefix="/api/header", tags=["Notificaciones del Header"])
 app.include_router(files, prefix="/api/files", tags=["Archivos"])
 app.include_router(admin, prefix="/api/admin", tags=["Administración"])
+app.include_router(reports, prefix="/api/reports", tags=["Reportes"])
 app.include_router(profile, prefix="/profile", tags=["Perfil"])
 app.include_router(upload_router, tags=["Upload"])
 app.include_router(images_router, tags=["Imágenes"])
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+PAQUETES EL CLUB v1.0 - Benchmark de Serialización del Listado de Paquetes
+Compara el CPU por cada 1.000 filas del listado del dashboard:
+
+- anterior: dict por fila con fechas en isoformat(), normalize_package_item,
+  jsonable_encoder y json.dumps (lo que hacía la respuesta por defecto)
+- actual: PackageListRow (dataclass con __slots__) serializado con orjson; los
+  archivos llegan ya como JSON desde json_agg (PackageReadModel)
+
+Las filas son sintéticas: no necesita base de datos.
+
+Uso:
+    python -m scripts.bench_package_list
+    python -m scripts.bench_package_list --rows 5000 --repeat 20
+
+@version 1.0.0
+@date 2025-11-10
+@author Equipo de Desarrollo
+"""
+
+import argparse
+import json
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+# Agregar el directorio raíz al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+
+from app.models.package import PackageCondition, PackageStatus, PackageType
+from app.schemas.package_list import PackageListRow
+from app.utils.normalization import normalize_package_item
+
+
+def _synthetic_rows(count: int) -> list:
+    """Filas con la misma forma que las de PackageReadModel.dashboard_page"""
+    now = datetime(2025, 11, 10, 10, 30, 15, 123456)
+    statuses = list(PackageStatus)
+    rows = []
+    for i in range(count):
+        created_at = now - timedelta(minutes=i)
+        upload = _upload(i + 1, created_at)
+        upload["created_at"] = upload["created_at"].isoformat()
+        rows.append(SimpleNamespace(
+            is_announcement=False,
+            package_id=i + 1,
+            tracking_number=f"{i % 10000:04d}",
+            guide_number=f"GUIA{i:08d}",
+            package_type=PackageType.NORMAL,
+            status=statuses[i % len(statuses)],
+            package_condition=PackageCondition.BUENO,
+            access_code=f"{i % 10000:04d}",
+            posicion=f"{i % 100:02d}",
+            announced_at=created_at,
+            received_at=created_at + timedelta(hours=1),
+            delivered_at=None,
+            cancelled_at=None,
+            base_fee=1500,
+            customer_id=uuid.uuid4(),
+            created_at=created_at,
+            updated_at=created_at + timedelta(hours=1),
+            customer_name=f"Cliente {i}",
+            customer_phone=f"+57300{i:07d}",
+            customer_email=f"cliente{i}@example.com",
+            storage_days=i % 7,
+            storage_fee=(i % 7) * 1000,
+            total_amount=1500 + (i % 7) * 1000,
+            file_uploads=[upload]
+        ))
+    return rows
+
+
+def _upload(i: int, created_at: datetime) -> dict:
+    return {
+        "id": i, "filename": f"foto_{i}.jpg", "s3_key": f"packages/{i}.jpg",
+        "s3_url": f"https://s3.example.com/packages/{i}.jpg", "file_type": "IMAGEN",
+        "file_size": 204800, "content_type": "image/jpeg", "created_at": created_at
+    }
+
+
+def legacy_render(rows: list) -> bytes:
+    """Camino anterior: dict + isoformat + normalize_package_item + jsonable_encoder + json.dumps"""
+    items = []
+    for row in rows:
+        upload = _upload(row.package_id, row.created_at)
+        upload["created_at"] = upload["created_at"].isoformat()
+        items.append(normalize_package_item({
+            'id': row.package_id,
+            'tracking_number': row.tracking_number,
+            'guide_number': row.guide_number,
+            'customer_name': row.customer_name,
+            'customer_phone': row.customer_phone,
+            'customer_email': row.customer_email,
+            'package_type': row.package_type.value,
+            'status': row.status.value,
+            'package_condition': row.package_condition.value,
+            'access_code': row.access_code,
+            'baroti': row.posicion,
+            'observations': None,
+            'announced_at': row.announced_at.isoformat() if row.announced_at else None,
+            'received_at': row.received_at.isoformat() if row.received_at else None,
+            'delivered_at': row.delivered_at.isoformat() if row.delivered_at else None,
+            'cancelled_at': row.cancelled_at.isoformat() if row.cancelled_at else None,
+            'base_fee': float(row.base_fee),
+            'storage_fee': float(row.storage_fee),
+            'storage_days': row.storage_days,
+            'total_amount': float(row.total_amount),
+            'customer_id': row.customer_id,
+            'created_at': row.created_at.isoformat() if row.created_at else None,
+            'updated_at': row.updated_at.isoformat() if row.updated_at else None,
+            'is_announcement': False,
+            'file_uploads': [upload]
+        }))
+    items.sort(key=lambda x: x['created_at'] or '', reverse=True)
+    return json.dumps({"packages": jsonable_encoder(items)}, ensure_ascii=False).encode("utf-8")
+
+
+def current_render(rows: list) -> bytes:
+    """Camino actual: PackageListRow + orjson en una sola pasada"""
+    items = [PackageListRow.from_page_row(row, 1500.0) for row in rows]
+    return orjson.dumps({"packages": items})
+
+
+def _cpu_per_thousand(render, rows: list, repeat: int) -> float:
+    """Mejor tiempo de CPU (ms) por cada 1.000 filas entre las repeticiones"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.process_time()
+        render(rows)
+        best = min(best, time.process_time() - start)
+    return best * 1000 * 1000 / len(rows)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="CPU por 1.000 filas del listado de paquetes")
+    parser.add_argument("--rows", type=int, default=1000, help="Filas sintéticas por iteración")
+    parser.add_argument("--repeat", type=int, default=10, help="Repeticiones (se toma la mejor)")
+    args = parser.parse_args()
+
+    rows = _synthetic_rows(args.rows)
+    # Ambos caminos deben producir el mismo JSON
+    if json.loads(legacy_render(rows)) != json.loads(current_render(rows)):
+        print("❌ Los dos caminos no producen el mismo JSON")
+        return 1
+
+    legacy_ms = _cpu_per_thousand(legacy_render, rows, args.repeat)
+    current_ms = _cpu_per_thousand(current_render, rows, args.repeat)
+    print(f"Filas: {args.rows}  repeticiones: {args.repeat}")
+    print(f"  anterior (dict + jsonable_encoder + json): {legacy_ms:8.2f} ms CPU / 1k filas")
+    print(f"  actual   (dataclass + orjson):             {current_ms:8.2f} ms CPU / 1k filas")
+    print(f"  mejora: x{legacy_ms / current_ms:.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
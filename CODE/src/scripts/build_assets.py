@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+PAQUETES EL CLUB v1.0 - Construcción de Bundles Estáticos
+Minifica static/js/pages y static/css/pages, publica las copias con hash en
+static/dist junto con sus variantes .gz/.br y escribe static/dist/manifest.json
+
+Se ejecuta al iniciar el contenedor (antes de uvicorn) y es idempotente: si un
+archivo no cambió, su bundle no se reescribe.
+
+Uso:
+    python -m scripts.build_assets
+    python -m scripts.build_assets --static-dir /app/src/static
+
+@version 1.0.0
+@date 2025-11-10
+@author Equipo de Desarrollo
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# Agregar el directorio raíz al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.utils.assets import build_assets, resolve_static_dir
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Construir bundles estáticos con hash")
+    parser.add_argument("--static-dir", default=None, help="Directorio static (por defecto se detecta)")
+    args = parser.parse_args()
+
+    static_dir = args.static_dir or resolve_static_dir()
+    try:
+        manifest = build_assets(static_dir)
+    except Exception as e:
+        logger.error(f"❌ Error construyendo bundles: {e}", exc_info=True)
+        return 1
+
+    for name, bundle in sorted(manifest.items()):
+        logger.info(f"   {name} -> {bundle}")
+    logger.info(f"✅ {len(manifest)} bundles en {static_dir}/dist")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
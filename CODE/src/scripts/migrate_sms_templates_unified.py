@@ -23,6 +23,7 @@ from sqlalchemy.orm import Session
 from app.database import SessionLocal, engine
 from app.models.notification import SMSMessageTemplate, NotificationEvent
 from app.services.sms_service import SMSService
+from app.services.sms_templates import sms_template_cache
 from app.utils.datetime_utils import get_colombia_now
 
 
@@ -165,6 +166,7 @@ def rollback_migration(db: Session):
         print(f"   ✓ Desactivada: status_change_unified")
     
     db.commit()
+    sms_template_cache.invalidate()
     
     print()
     print("✅ ROLLBACK COMPLETADO")
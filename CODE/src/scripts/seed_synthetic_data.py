@@ -0,0 +1,689 @@
+# -*- coding: utf-8 -*-
+"""
+PAQUETES EL CLUB v1.0 - Generador de Datos Sintéticos a Gran Escala
+Carga con COPY un volumen configurable de datos realistas para benchmarks,
+pruebas de carga y planes de ejecución (EXPLAIN):
+
+- clientes con teléfono y documento únicos
+- un anuncio procesado por paquete y anuncios pendientes (activos y cancelados)
+- paquetes en todos los PackageStatus con la ocupación BAROTI indicada
+  (solo los RECIBIDO ocupan posición, como en PackageTransitionEngine)
+- historial (package_history) y eventos (package_events) de cada transición
+- fotos de recepción (file_uploads), consultas (messages) y SMS (notifications)
+
+Los datos son reproducibles: la misma semilla, los mismos parámetros y la
+misma --end-date generan exactamente las mismas filas. Los paquetes se
+generan en fragmentos de CHUNK_SIZE, cada uno con su propia secuencia
+aleatoria e ids derivados del id del paquete, así que varios procesos los
+generan en paralelo sin cambiar el resultado; el proceso principal solo
+hace COPY de cada fragmento (en orden de llaves foráneas, un commit por
+fragmento) y la memoria no crece con --packages.
+
+Las tablas sembradas deben estar vacías (o usar --truncate, que las vacía y
+reinicia sus secuencias). Al final se fijan las secuencias, se recalculan
+los contadores de clientes y se ejecuta ANALYZE.
+
+Uso:
+    python -m scripts.seed_synthetic_data --packages 100000
+    python -m scripts.seed_synthetic_data --packages 1000000 --seed 7 --end-date 2025-11-10 --truncate
+
+@version 1.0.0
+@date 2025-11-10
+@author Equipo de Desarrollo
+"""
+
+import argparse
+import csv
+import io
+import json
+import math
+import multiprocessing
+import os
+import random
+import secrets
+import string
+import sys
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Agregar el directorio raíz al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+
+from app.database import engine
+from app.models.package import PackageCondition, PackageStatus, PackageType
+from app.services.rate_provider import build_settings_snapshot
+
+COLOMBIA_TZ = timezone(timedelta(hours=-5))
+
+# Paquetes por fragmento de generación (fija las secuencias aleatorias: no cambiar)
+CHUNK_SIZE = 10_000
+
+# Alfabeto de los códigos de guía públicos (sin 0 ni O, igual que el formulario de anuncio)
+TRACKING_ALPHABET = string.ascii_uppercase.replace('O', '') + string.digits.replace('0', '')
+ACCESS_ALPHABET = string.ascii_uppercase + string.digits
+
+# Columnas cargadas por tabla, en orden de llaves foráneas (se vacían en orden inverso)
+TABLE_COLUMNS = {
+    "customers": (
+        "id", "first_name", "last_name", "full_name", "phone", "email", "document_type",
+        "document_number", "address_city", "address_country", "tower", "apartment",
+        "preferred_language", "is_active", "is_vip", "total_packages_received",
+        "total_packages_delivered", "total_spent", "created_at", "updated_at"
+    ),
+    "packages": (
+        "id", "tracking_number", "customer_id", "package_type", "status", "package_condition",
+        "access_code", "guide_number", "posicion", "announced_at", "received_at", "delivered_at",
+        "cancelled_at", "base_fee", "storage_fee", "total_amount", "created_by", "updated_by",
+        "version", "created_at", "updated_at"
+    ),
+    "package_announcements_new": (
+        "id", "customer_name", "customer_phone", "guide_number", "tracking_code", "is_active",
+        "is_processed", "announced_at", "processed_at", "created_at", "updated_at", "customer_id",
+        "package_id"
+    ),
+    "package_history": (
+        "id", "package_id", "previous_status", "new_status", "changed_at", "changed_by", "observations"
+    ),
+    "package_events": (
+        "id", "package_id", "announcement_id", "event_type", "event_timestamp", "tracking_number",
+        "guide_number", "access_code", "tracking_code", "status_before", "status_after",
+        "package_type", "package_condition", "posicion", "customer_id", "customer_name",
+        "customer_phone", "customer_email", "base_fee", "storage_fee", "storage_days",
+        "total_amount", "payment_method", "payment_amount", "payment_received", "operator_id",
+        "operator_name", "operator_role", "file_ids", "observations", "cancellation_reason",
+        "created_at"
+    ),
+    "file_uploads": (
+        "id", "package_id", "filename", "s3_key", "s3_url", "file_type", "file_size",
+        "content_type", "created_at", "updated_at"
+    ),
+    "messages": (
+        "id", "subject", "content", "message_type", "priority", "status", "is_read", "package_id",
+        "customer_id", "sender_name", "sender_phone", "recipient_role", "answer", "answered_at",
+        "answered_by", "tracking_code", "created_at", "updated_at"
+    ),
+    "notifications": (
+        "id", "package_id", "customer_id", "announcement_id", "notification_type", "event_type",
+        "priority", "recipient", "recipient_name", "message", "status", "sent_at", "delivered_at",
+        "error_message", "cost_cents", "retry_count", "max_retries", "is_scheduled", "is_test",
+        "created_at", "updated_at"
+    )
+}
+SEEDED_TABLES = tuple(TABLE_COLUMNS)
+
+# Tablas con id serial que reciben valores explícitos
+SERIAL_TABLES = ("packages", "file_uploads", "messages", "notifications")
+
+# Ids derivados del id del paquete (independientes del fragmento que los genera)
+MAX_UPLOADS_PER_PACKAGE = 3
+NOTIFICATIONS_PER_PACKAGE = 2
+
+FIRST_NAMES = (
+    "JUAN", "MARIA", "CARLOS", "ANA", "LUIS", "CAMILA", "ANDRES", "VALENTINA", "JORGE", "DANIELA",
+    "FELIPE", "LAURA", "SANTIAGO", "SOFIA", "DIEGO", "PAULA", "MIGUEL", "CATALINA", "JULIAN", "NATALIA"
+)
+LAST_NAMES = (
+    "GARCIA", "RODRIGUEZ", "MARTINEZ", "LOPEZ", "GONZALEZ", "HERNANDEZ", "PEREZ", "SANCHEZ", "RAMIREZ",
+    "TORRES", "FLOREZ", "RIVERA", "GOMEZ", "DIAZ", "MORENO", "JIMENEZ", "VARGAS", "ROJAS", "CASTRO", "ORTIZ"
+)
+CARRIERS = ("SERV", "INTER", "COORD", "ENVIA", "TCC", "DEPRISA")
+CANCELLATION_REASONS = ("CLIENTE_SOLICITA", "PAQUETE_DANADO", "DIRECCION_INCORRECTA", "NO_RECLAMADO")
+
+
+@dataclass
+class SeedConfig:
+    """Parámetros de la siembra (con la semilla determinan los datos)"""
+    packages: int = 100_000
+    customers: Optional[int] = None  # Por defecto uno por cada 10 paquetes
+    pending_announcements: int = 500
+    baroti_occupancy: float = 0.7  # Fracción de las 100 posiciones BAROTI ocupadas
+    days: int = 365  # Ventana de fechas que termina en end_date
+    end_date: Optional[date] = None  # Por defecto hoy (fijarla para reproducir)
+    seed: int = 42
+    message_ratio: float = 0.05  # Paquetes con una consulta del cliente
+
+    @property
+    def customer_count(self) -> int:
+        return self.customers or max(1, self.packages // 10)
+
+
+class AffineCodes:
+    """
+    Códigos únicos pseudoaleatorios: i → (a·i + b) mod base^width en el alfabeto
+
+    Es una biyección (a coprimo con el módulo), así que no hace falta un set
+    de códigos usados para garantizar unicidad aunque sean millones.
+    """
+
+    def __init__(self, rng: random.Random, alphabet: str, count: int, min_width: int):
+        self.alphabet = alphabet
+        base = len(alphabet)
+        self.width = max(min_width, math.ceil(math.log(max(count, 2), base)))
+        self.modulus = base ** self.width
+        self.a = rng.randrange(1, self.modulus)
+        while math.gcd(self.a, self.modulus) != 1:
+            self.a += 1
+        self.b = rng.randrange(self.modulus)
+
+    def __call__(self, i: int) -> str:
+        value = (self.a * i + self.b) % self.modulus
+        base = len(self.alphabet)
+        chars = []
+        for _ in range(self.width):
+            value, digit = divmod(value, base)
+            chars.append(self.alphabet[digit])
+        return "".join(reversed(chars))
+
+
+class CopyBuffer:
+    """Filas CSV de una tabla pendientes de COPY (None = campo vacío = NULL)"""
+
+    def __init__(self, table: str):
+        self.table = table
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+        self.rows = 0
+
+    def add(self, *values):
+        self.writer.writerow(values)
+        self.rows += 1
+
+
+def copy_rows(cursor, table: str, data: str):
+    """COPY de un bloque CSV en la tabla"""
+    cursor.copy_expert(
+        f"COPY {table} ({', '.join(TABLE_COLUMNS[table])}) FROM STDIN WITH (FORMAT csv)",
+        io.StringIO(data)
+    )
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _naive(moment: Optional[datetime]) -> Optional[str]:
+    """Hora local de Colombia sin zona (columnas DateTime sin timezone)"""
+    return moment.replace(tzinfo=None).isoformat(sep=" ") if moment else None
+
+
+def _aware(moment: Optional[datetime]) -> Optional[str]:
+    return moment.isoformat(sep=" ") if moment else None
+
+
+def _utc_naive(moment: datetime) -> str:
+    """UTC sin zona (package_history.changed_at usa datetime.utcnow)"""
+    return moment.astimezone(timezone.utc).replace(tzinfo=None).isoformat(sep=" ")
+
+
+def _bool(value: bool) -> str:
+    return "t" if value else "f"
+
+
+class SeedPlan:
+    """
+    Datos compartidos por todos los fragmentos: ventana de fechas, tarifas,
+    códigos, clientes, operadores y posiciones BAROTI. Se copia a cada proceso
+    generador y no cambia durante la siembra.
+    """
+
+    def __init__(self, config: SeedConfig, operators: List[tuple]):
+        self.config = config
+        self.operators = operators
+        rng = random.Random(config.seed)
+        end_date = config.end_date or date.today()
+        self.end = datetime.combine(end_date, dt_time(20, 0), tzinfo=COLOMBIA_TZ)
+        self.start = self.end - timedelta(days=config.days)
+
+        rates = build_settings_snapshot()
+        self.base_fees = {package_type: rates.base_fee(package_type) for package_type in PackageType}
+        self.storage_per_day = Decimal(rates.storage_per_day)
+
+        self.tracking_codes = AffineCodes(rng, TRACKING_ALPHABET, config.packages + config.pending_announcements, 4)
+        self.access_codes = AffineCodes(rng, ACCESS_ALPHABET, config.packages, 8)
+        self.phones = AffineCodes(rng, string.digits, config.customer_count, 9)
+        self.baroti = self._baroti_plan(rng)
+        self.customers: List[tuple] = []
+        self.customer_rows = self._generate_customers(rng)
+
+    def moment(self, fraction: float) -> datetime:
+        return self.start + (self.end - self.start) * fraction
+
+    def _baroti_plan(self, rng: random.Random) -> Dict[int, str]:
+        """Posición BAROTI de los paquetes RECIBIDO (elegidos entre los más recientes)"""
+        packages = self.config.packages
+        occupied = min(100, max(0, round(self.config.baroti_occupancy * 100)), packages)
+        recent = min(packages, max(occupied * 20, 500))
+        indexes = rng.sample(range(packages - recent, packages), occupied)
+        positions = rng.sample(range(100), occupied)
+        return {index: f"{position:02d}" for index, position in zip(indexes, positions)}
+
+    def _generate_customers(self, rng: random.Random) -> CopyBuffer:
+        """Clientes; los primeros concentran más paquetes (ver ChunkWriter.pick_customer)"""
+        buffer = CopyBuffer("customers")
+        for i in range(self.config.customer_count):
+            first_name = rng.choice(FIRST_NAMES)
+            last_name = f"{rng.choice(LAST_NAMES)} {rng.choice(LAST_NAMES)}"
+            full_name = f"{first_name} {last_name}"
+            phone = f"+573{self.phones(i)}"
+            email = f"cliente{i}@example.com" if rng.random() < 0.6 else None
+            created_at = self.moment(rng.random() * 0.5)
+            customer_id = _uuid(rng)
+            buffer.add(
+                customer_id, first_name, last_name, full_name, phone, email, "CC", str(10_000_000 + i),
+                "Barranquilla", "Colombia", str(rng.randint(1, 12)), str(rng.randint(101, 1504)),
+                "es", "t", _bool(rng.random() < 0.03), 0, 0, 0, _naive(created_at), _naive(created_at)
+            )
+            self.customers.append((customer_id, full_name, phone, email))
+        return buffer
+
+    @property
+    def chunk_count(self) -> int:
+        return math.ceil(self.config.packages / CHUNK_SIZE)
+
+    def generate_chunk(self, index: int) -> Dict[str, Tuple[str, int]]:
+        """CSV por tabla de los paquetes del fragmento index"""
+        writer = ChunkWriter(self, random.Random(f"{self.config.seed}:{index}"))
+        first = index * CHUNK_SIZE
+        for i in range(first, min(first + CHUNK_SIZE, self.config.packages)):
+            writer.package(i)
+        return writer.result()
+
+    def generate_pending(self) -> Dict[str, Tuple[str, int]]:
+        """CSV por tabla de los anuncios sin procesar"""
+        writer = ChunkWriter(self, random.Random(f"{self.config.seed}:pending"))
+        for i in range(self.config.pending_announcements):
+            writer.pending_announcement(i)
+        return writer.result()
+
+
+class ChunkWriter:
+    """Genera las filas de un fragmento con su propia secuencia aleatoria"""
+
+    def __init__(self, plan: SeedPlan, rng: random.Random):
+        self.plan = plan
+        self.rng = rng
+        self.buffers = {table: CopyBuffer(table) for table in SEEDED_TABLES if table != "customers"}
+
+    def result(self) -> Dict[str, Tuple[str, int]]:
+        return {table: (buffer.buffer.getvalue(), buffer.rows) for table, buffer in self.buffers.items()}
+
+    def pick_customer(self) -> tuple:
+        # Distribución sesgada: pocos clientes reciben muchos paquetes
+        customers = self.plan.customers
+        return customers[int(len(customers) * self.rng.random() ** 2)]
+
+    def _fees(self, package_type: PackageType, received_at, until) -> tuple:
+        base_fee = self.plan.base_fees[package_type]
+        storage_days = 0
+        if received_at and until:
+            storage_days = max(0, int((until - received_at).total_seconds() // 86400))
+        storage_fee = self.plan.storage_per_day * storage_days
+        return base_fee, storage_fee, storage_days, base_fee + storage_fee
+
+    def package(self, i: int):
+        """Un paquete con su anuncio, transiciones, fotos, consulta y SMS"""
+        plan, rng = self.plan, self.rng
+        package_id = i + 1
+        customer = self.pick_customer()
+        customer_id, customer_name, customer_phone, _ = customer
+        tracking_code = plan.tracking_codes(i)
+        guide_number = f"{rng.choice(CARRIERS)}{i:010d}"
+        access_code = plan.access_codes(i)
+        package_type = PackageType.EXTRA_DIMENSIONADO if rng.random() < 0.08 else PackageType.NORMAL
+        condition = rng.choices(list(PackageCondition), weights=(90, 3, 7))[0]
+        posicion = plan.baroti.get(i)
+
+        announced_at = plan.moment((i + rng.random()) / plan.config.packages)
+        received_at = delivered_at = cancelled_at = None
+        if posicion is not None:
+            status = PackageStatus.RECIBIDO
+            received_at = min(plan.end - timedelta(minutes=5), announced_at + timedelta(hours=rng.uniform(1, 24)))
+        else:
+            status = rng.choices(
+                (PackageStatus.ENTREGADO, PackageStatus.CANCELADO, PackageStatus.ANUNCIADO),
+                weights=(93, 5, 2)
+            )[0]
+            # La mitad de las cancelaciones ocurre antes de recibir el paquete
+            if status != PackageStatus.ANUNCIADO and not (status == PackageStatus.CANCELADO and rng.random() < 0.5):
+                received_at = announced_at + timedelta(days=rng.expovariate(1 / 1.5))
+                if received_at >= plan.end:
+                    status, received_at = PackageStatus.ANUNCIADO, None
+            if status == PackageStatus.ENTREGADO:
+                delivered_at = min(plan.end, received_at + timedelta(days=rng.expovariate(1 / 2.5)))
+            elif status == PackageStatus.CANCELADO:
+                cancelled_at = min(plan.end, (received_at or announced_at) + timedelta(days=rng.expovariate(1)))
+
+        base_fee, storage_fee, storage_days, total_amount = self._fees(
+            package_type, received_at, delivered_at or cancelled_at or (plan.end if received_at else None)
+        )
+        created_at = received_at or announced_at
+        updated_at = delivered_at or cancelled_at or created_at
+        operator_id, operator_username, operator_name, operator_role = rng.choice(plan.operators)
+        announcement_id = _uuid(rng)
+
+        self.buffers["packages"].add(
+            package_id, tracking_code, customer_id, package_type.name, status.name, condition.name,
+            access_code, guide_number, posicion, _aware(announced_at), _aware(received_at), _aware(delivered_at),
+            _aware(cancelled_at), base_fee, storage_fee, total_amount, operator_id, operator_id,
+            1 + (received_at is not None) + (delivered_at is not None or cancelled_at is not None),
+            _naive(created_at), _naive(updated_at)
+        )
+        processed_at = received_at or cancelled_at
+        self.buffers["package_announcements_new"].add(
+            announcement_id, customer_name, customer_phone, guide_number, tracking_code,
+            _bool(status != PackageStatus.CANCELADO), "t", _naive(announced_at), _naive(processed_at),
+            _naive(announced_at), _naive(processed_at or announced_at), customer_id, package_id
+        )
+
+        # Transiciones: (momento, estado anterior, estado nuevo, tipo de evento)
+        transitions = [(announced_at, None, PackageStatus.ANUNCIADO, "ANUNCIO")]
+        if received_at:
+            transitions.append((received_at, PackageStatus.ANUNCIADO, PackageStatus.RECIBIDO, "RECEPCION"))
+        if delivered_at:
+            transitions.append((delivered_at, PackageStatus.RECIBIDO, PackageStatus.ENTREGADO, "ENTREGA"))
+        if cancelled_at:
+            previous = PackageStatus.RECIBIDO if received_at else PackageStatus.ANUNCIADO
+            transitions.append((cancelled_at, previous, PackageStatus.CANCELADO, "CANCELACION"))
+
+        file_ids = self._uploads(package_id, tracking_code, received_at) if received_at else []
+        # Los paquetes ya entregados ocuparon alguna posición mientras estuvieron en bodega
+        historic_position = posicion or f"{rng.randrange(100):02d}"
+        for moment, previous, new, event_type in transitions:
+            self.buffers["package_history"].add(
+                _uuid(rng), package_id, previous.value if previous else None, new.value,
+                _utc_naive(moment), operator_username, None
+            )
+            is_delivery = event_type == "ENTREGA"
+            announced_only = new == PackageStatus.ANUNCIADO
+            self.buffers["package_events"].add(
+                _uuid(rng), package_id, announcement_id, event_type, _aware(moment), tracking_code,
+                guide_number, access_code if received_at else None, tracking_code,
+                previous.value if previous else None, new.value, package_type.value, condition.value,
+                historic_position if event_type in ("RECEPCION", "ENTREGA") else None,
+                *customer,
+                base_fee, 0 if announced_only else storage_fee, storage_days if is_delivery else 0,
+                base_fee if announced_only else total_amount,
+                "efectivo" if is_delivery else None, total_amount if is_delivery else None, _bool(is_delivery),
+                operator_id, operator_name, operator_role,
+                json.dumps({"images": file_ids}) if event_type == "RECEPCION" and file_ids else None,
+                None, rng.choice(CANCELLATION_REASONS) if event_type == "CANCELACION" else None,
+                _naive(moment)
+            )
+
+        notification_id = (package_id - 1) * NOTIFICATIONS_PER_PACKAGE
+        self._notification(notification_id + 1, package_id, customer, announcement_id, "PACKAGE_ANNOUNCED",
+                           announced_at, f"Tu paquete con guía {guide_number} fue anunciado. Código: {tracking_code}")
+        if received_at:
+            self._notification(notification_id + 2, package_id, customer, announcement_id, "PACKAGE_RECEIVED",
+                               received_at,
+                               f"Tu paquete {tracking_code} llegó a PAQUETES EL CLUB. Código de retiro: {access_code}")
+        if rng.random() < plan.config.message_ratio:
+            self._message(package_id, customer, tracking_code, announced_at, status, operator_id)
+
+    def _uploads(self, package_id: int, tracking_code: str, received_at: datetime) -> List[int]:
+        """Fotos de recepción con la estructura de llaves de S3 de la aplicación"""
+        ids = []
+        count = self.rng.choices(range(MAX_UPLOADS_PER_PACKAGE + 1), weights=(15, 45, 25, 15))[0]
+        stamp = received_at.strftime("%Y%m%d_%H%M%S")
+        for k in range(1, count + 1):
+            upload_id = (package_id - 1) * MAX_UPLOADS_PER_PACKAGE + k
+            filename = f"{tracking_code}_{stamp}_{k:03d}.jpg"
+            s3_key = f"{received_at:%Y/%m/%d}/packages/announcement_{tracking_code}/receive/{filename}"
+            self.buffers["file_uploads"].add(
+                upload_id, package_id, filename, s3_key, f"https://seed-bucket.s3.amazonaws.com/{s3_key}",
+                "IMAGEN", self.rng.randint(80_000, 400_000), "image/jpeg", _aware(received_at), _aware(received_at)
+            )
+            ids.append(upload_id)
+        return ids
+
+    def _notification(self, notification_id: int, package_id, customer: tuple, announcement_id: str,
+                      event: str, moment: datetime, message: str):
+        failed = self.rng.random() < 0.02
+        sent_at = moment + timedelta(seconds=self.rng.uniform(1, 30))
+        self.buffers["notifications"].add(
+            notification_id, package_id, customer[0], announcement_id, "SMS", event, "MEDIA",
+            customer[2], customer[1], message, "FAILED" if failed else "SENT",
+            None if failed else _naive(sent_at), None, "Error HTTP 500" if failed else None,
+            0 if failed else 50, 1 if failed else 0, 3, "f", "f", _naive(moment), _naive(sent_at)
+        )
+
+    def _message(self, package_id: int, customer: tuple, tracking_code: str, moment: datetime, status, operator_id: int):
+        """Consulta del cliente (id = id del paquete: como máximo una por paquete)"""
+        answered = status != PackageStatus.ANUNCIADO
+        asked_at = moment + timedelta(hours=self.rng.uniform(1, 48))
+        answered_at = asked_at + timedelta(hours=self.rng.uniform(0.5, 12)) if answered else None
+        self.buffers["messages"].add(
+            package_id, f"Consulta sobre paquete {tracking_code}",
+            "Buenas, ¿mi paquete ya llegó? ¿Hasta qué hora puedo recogerlo?", "CONSULTA",
+            self.rng.choice(("BAJA", "MEDIA", "MEDIA", "ALTA")), "CERRADO" if answered else "ABIERTO",
+            _bool(answered), package_id, customer[0], customer[1], customer[2], "operator",
+            "Sí, ya está disponible en portería." if answered else None, _aware(answered_at),
+            operator_id if answered else None, tracking_code, _aware(asked_at), _aware(answered_at or asked_at)
+        )
+
+    def pending_announcement(self, i: int):
+        """Anuncio sin procesar de los últimos 14 días (10 % cancelados)"""
+        plan, rng = self.plan, self.rng
+        customer = self.pick_customer()
+        customer_id, customer_name, customer_phone, _ = customer
+        tracking_code = plan.tracking_codes(plan.config.packages + i)
+        guide_number = f"{rng.choice(CARRIERS)}P{i:09d}"
+        announced_at = plan.end - timedelta(days=rng.uniform(0, 14))
+        is_active = rng.random() >= 0.1
+        announcement_id = _uuid(rng)
+        updated_at = announced_at if is_active else min(plan.end, announced_at + timedelta(hours=rng.uniform(1, 48)))
+        self.buffers["package_announcements_new"].add(
+            announcement_id, customer_name, customer_phone, guide_number, tracking_code, _bool(is_active), "f",
+            _naive(announced_at), None, _naive(announced_at), _naive(updated_at), customer_id, None
+        )
+        operator_id, _, operator_name, operator_role = rng.choice(plan.operators)
+        self.buffers["package_events"].add(
+            _uuid(rng), None, announcement_id, "ANUNCIO", _aware(announced_at), None, guide_number, None,
+            tracking_code, None, PackageStatus.ANUNCIADO.value, None, None, None, *customer,
+            None, None, None, None, None, None, "f", operator_id, operator_name, operator_role,
+            None, None, None, _naive(announced_at)
+        )
+        self._notification(plan.config.packages * NOTIFICATIONS_PER_PACKAGE + i + 1, None, customer,
+                           announcement_id, "PACKAGE_ANNOUNCED", announced_at,
+                           f"Tu paquete con guía {guide_number} fue anunciado. Código: {tracking_code}")
+
+
+# Plan del proceso generador (se fija una vez por proceso del pool)
+_worker_plan: Optional[SeedPlan] = None
+
+
+def _init_worker(plan: SeedPlan):
+    global _worker_plan
+    _worker_plan = plan
+
+
+def _generate_chunk(index: int) -> Dict[str, Tuple[str, int]]:
+    return _worker_plan.generate_chunk(index)
+
+
+class SyntheticSeeder:
+    """Prepara la base, genera los fragmentos (en paralelo) y los carga con COPY"""
+
+    def __init__(self, config: SeedConfig, workers: int = 1):
+        self.config = config
+        self.workers = max(1, workers)
+        self.totals: Dict[str, int] = {table: 0 for table in SEEDED_TABLES}
+
+    def prepare(self, conn, truncate: bool) -> List[tuple]:
+        """Verificar (o vaciar) las tablas y devolver los operadores"""
+        if truncate:
+            conn.execute(text(
+                f"TRUNCATE {', '.join(reversed(SEEDED_TABLES))} RESTART IDENTITY CASCADE"
+            ))
+        else:
+            for table in SEEDED_TABLES:
+                if conn.execute(text(f"SELECT EXISTS (SELECT 1 FROM {table})")).scalar():
+                    raise RuntimeError(f"La tabla {table} tiene datos: use --truncate o una base vacía")
+
+        operators = [tuple(row) for row in conn.execute(text(
+            "SELECT id, username, full_name, role::text FROM users "
+            "WHERE role IN ('ADMIN', 'OPERADOR') AND is_active ORDER BY id"
+        ))]
+        return operators or self._create_operators(conn)
+
+    def _create_operators(self, conn, count: int = 5) -> List[tuple]:
+        """Operadores sintéticos (contraseña aleatoria desconocida: no pueden iniciar sesión)"""
+        from app.utils.auth import get_password_hash
+
+        password_hash = get_password_hash(secrets.token_urlsafe(24))
+        operators = []
+        for i in range(1, count + 1):
+            row = conn.execute(text("""
+                INSERT INTO users (username, email, password_hash, full_name, role, is_active, created_at, updated_at)
+                VALUES (:username, :email, :password_hash, :full_name, 'OPERADOR', true, now(), now())
+                RETURNING id, username, full_name, role::text
+            """), {
+                "username": f"seed_operador_{i}",
+                "email": f"seed_operador_{i}@example.com",
+                "password_hash": password_hash,
+                "full_name": f"OPERADOR SINTETICO {i}"
+            }).one()
+            operators.append(tuple(row))
+        return operators
+
+    def _load(self, conn, chunk: Dict[str, Tuple[str, int]]):
+        """COPY de un fragmento en orden de llaves foráneas"""
+        cursor = conn.connection.cursor()
+        try:
+            for table in SEEDED_TABLES:
+                data, rows = chunk.get(table, ("", 0))
+                if rows:
+                    copy_rows(cursor, table, data)
+                    self.totals[table] += rows
+        finally:
+            cursor.close()
+
+    def _chunks(self, plan: SeedPlan) -> Iterator[Dict[str, Tuple[str, int]]]:
+        """Fragmentos en orden; con varios workers se generan en paralelo"""
+        if self.workers == 1:
+            for index in range(plan.chunk_count):
+                yield plan.generate_chunk(index)
+            return
+        with multiprocessing.Pool(self.workers, initializer=_init_worker, initargs=(plan,)) as pool:
+            yield from pool.imap(_generate_chunk, range(plan.chunk_count))
+
+    def run(self, truncate: bool = False, progress=print) -> Dict[str, int]:
+        """Sembrar la base; devuelve las filas cargadas por tabla"""
+        started = time.perf_counter()
+        with engine.begin() as conn:
+            operators = self.prepare(conn, truncate)
+            plan = SeedPlan(self.config, operators)
+            # Particiones mensuales de package_events para toda la ventana
+            conn.execute(
+                text("SELECT package_events_ensure_partitions(:start, :end)"),
+                {"start": plan.start, "end": plan.end}
+            )
+            self._load(conn, {"customers": (plan.customer_rows.buffer.getvalue(), plan.customer_rows.rows)})
+        plan.customer_rows = None
+        progress(f"  clientes: {self.config.customer_count:,}")
+
+        for index, chunk in enumerate(self._chunks(plan)):
+            with engine.begin() as conn:
+                conn.execute(text("SET LOCAL synchronous_commit = off"))
+                # Sin el trigger de contadores por fila: _finalize los recalcula
+                conn.execute(text("SET LOCAL app.skip_customer_counters = 'on'"))
+                self._load(conn, chunk)
+            loaded = min((index + 1) * CHUNK_SIZE, self.config.packages)
+            if (index + 1) % 10 == 0 or loaded == self.config.packages:
+                rate = loaded / max(time.perf_counter() - started, 1e-9)
+                progress(f"  paquetes: {loaded:,}/{self.config.packages:,} ({rate:,.0f}/s)")
+
+        with engine.begin() as conn:
+            conn.execute(text("SET LOCAL app.skip_customer_counters = 'on'"))
+            self._load(conn, plan.generate_pending())
+            self._finalize(conn)
+        progress(f"  anuncios pendientes: {self.config.pending_announcements:,}")
+
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            for table in SEEDED_TABLES:
+                conn.execute(text(f"ANALYZE {table}"))
+        return dict(self.totals)
+
+    def _finalize(self, conn):
+        """Secuencias después de los ids explícitos, pool de códigos y contadores de clientes"""
+        for table in SERIAL_TABLES:
+            conn.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE(MAX(id), 0) + 1, false) FROM {table}"
+            ))
+        # Los códigos sembrados no pasan por CodeGenerator: los libres del pool
+        # pueden coincidir con ellos y se vuelven a generar con la tarea
+        conn.execute(text("DELETE FROM tracking_code_pool"))
+        conn.execute(text("""
+            UPDATE customers c
+            SET total_packages = s.total,
+                active_announced_packages = s.announced,
+                active_received_packages = s.received_active,
+                total_packages_delivered = s.delivered,
+                total_packages_cancelled = s.cancelled,
+                total_packages_received = s.received,
+                total_spent = s.spent
+            FROM (
+                SELECT customer_id,
+                       count(*) AS total,
+                       count(*) FILTER (WHERE status = 'ANUNCIADO') AS announced,
+                       count(*) FILTER (WHERE status = 'RECIBIDO') AS received_active,
+                       count(*) FILTER (WHERE status = 'ENTREGADO') AS delivered,
+                       count(*) FILTER (WHERE status = 'CANCELADO') AS cancelled,
+                       count(*) FILTER (WHERE received_at IS NOT NULL) AS received,
+                       COALESCE(sum(round(total_amount * 100)) FILTER (WHERE status = 'ENTREGADO'), 0)::integer AS spent
+                FROM packages
+                GROUP BY customer_id
+            ) s
+            WHERE s.customer_id = c.id
+        """))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Carga masiva determinista de datos sintéticos (COPY)")
+    parser.add_argument("--packages", type=int, default=100_000, help="Paquetes a generar")
+    parser.add_argument("--customers", type=int, default=None, help="Clientes (por defecto paquetes / 10)")
+    parser.add_argument("--pending-announcements", type=int, default=500, help="Anuncios sin procesar")
+    parser.add_argument("--baroti-occupancy", type=float, default=0.7, help="Fracción de posiciones BAROTI ocupadas (0-1)")
+    parser.add_argument("--days", type=int, default=365, help="Días de historia")
+    parser.add_argument("--end-date", type=date.fromisoformat, default=None, help="Último día (AAAA-MM-DD, por defecto hoy)")
+    parser.add_argument("--seed", type=int, default=42, help="Semilla")
+    parser.add_argument("--message-ratio", type=float, default=0.05, help="Fracción de paquetes con consulta")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Procesos generadores")
+    parser.add_argument("--truncate", action="store_true", help="Vaciar las tablas sembradas antes de cargar")
+    args = parser.parse_args()
+
+    if not 0 <= args.baroti_occupancy <= 1:
+        parser.error("--baroti-occupancy debe estar entre 0 y 1")
+
+    config = SeedConfig(
+        packages=args.packages,
+        customers=args.customers,
+        pending_announcements=args.pending_announcements,
+        baroti_occupancy=args.baroti_occupancy,
+        days=args.days,
+        end_date=args.end_date,
+        seed=args.seed,
+        message_ratio=args.message_ratio
+    )
+    print(f"🌱 Sembrando {config.packages:,} paquetes (semilla {config.seed}, hasta {config.end_date or date.today()})")
+    started = time.perf_counter()
+    try:
+        totals = SyntheticSeeder(config, workers=args.workers).run(truncate=args.truncate)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return 1
+    for table, rows in totals.items():
+        print(f"  {table:<28} {rows:>12,}")
+    print(f"✅ Listo en {time.perf_counter() - started:.1f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
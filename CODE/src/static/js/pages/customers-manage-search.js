@@ -0,0 +1,217 @@
+// Variables globales para el autocompletado
+let searchSuggestionsDebounce = null;
+
+// Función para manejar el input de búsqueda con autocompletado
+async function handleSearchInput(event) {
+    const input = event.target;
+    const query = input.value.trim();
+    
+    // Guardar la posición del cursor ANTES de cualquier operación
+    const cursorPos = input.selectionStart;
+    
+    // Limpiar el debounce anterior
+    if (searchSuggestionsDebounce) {
+        clearTimeout(searchSuggestionsDebounce);
+    }
+    
+    // Si la consulta es muy corta, limpiar sugerencias
+    if (query.length < 2) {
+        Alpine.store('searchData').searchSuggestions = [];
+        Alpine.store('searchData').showSuggestions = false;
+        Alpine.store('searchData').selectedIndex = -1;
+        return;
+    }
+    
+    // Debounce de 300ms
+    searchSuggestionsDebounce = setTimeout(async () => {
+        try {
+            const response = await fetch(`/api/customers/search-suggestions?q=${encodeURIComponent(query)}&limit=5`, {
+                method: 'GET',
+                headers: {
+                    'Content-Type': 'application/json',
+                },
+                credentials: 'include',
+            });
+            
+            if (response.ok) {
+                const data = await response.json();
+                
+                // Actualizar el store sin afectar el input
+                const store = Alpine.store('searchData');
+                store.searchSuggestions = data.suggestions || [];
+                store.showSuggestions = store.searchSuggestions.length > 0;
+                store.selectedIndex = -1;
+                
+                // NO tocar el input ni su cursor aquí
+            }
+        } catch (error) {
+            console.error('Error al obtener sugerencias:', error);
+        }
+    }, 300);
+}
+
+// Navegar por las sugerencias con flechas
+function navigateSuggestions(direction) {
+    const searchData = Alpine.store('searchData');
+    const maxIndex = searchData.searchSuggestions.length - 1;
+    
+    searchData.selectedIndex += direction;
+    
+    if (searchData.selectedIndex < -1) {
+        searchData.selectedIndex = -1;
+    } else if (searchData.selectedIndex > maxIndex) {
+        searchData.selectedIndex = maxIndex;
+    }
+}
+
+// Seleccionar una sugerencia
+function selectSuggestion(index) {
+    const searchData = Alpine.store('searchData');
+    
+    if (index >= 0 && index < searchData.searchSuggestions.length) {
+        const suggestion = searchData.searchSuggestions[index];
+        selectSuggestionData(suggestion);
+    } else {
+        // Si no hay selección, hacer submit del form
+        const form = document.querySelector('form[action="/customers/manage"]');
+        if (form) {
+            form.submit();
+        }
+    }
+}
+
+// Seleccionar una sugerencia por click
+function selectSuggestionData(suggestion) {
+    // Cerrar sugerencias
+    Alpine.store('searchData').showSuggestions = false;
+    Alpine.store('searchData').searchSuggestions = [];
+    Alpine.store('searchData').selectedIndex = -1;
+    
+    // Actualizar el input y hacer submit SIN perder la posición del cursor
+    const input = document.getElementById('customerSearchInput');
+    const form = document.querySelector('form[action="/customers/manage"]');
+    
+    if (input && form && suggestion) {
+        // Guardar la posición del cursor actual
+        const cursorPosition = input.selectionStart;
+        
+        // Actualizar el valor
+        input.value = suggestion.full_name;
+        
+        // NO restaurar el cursor, simplemente hacer submit inmediatamente
+        form.submit();
+    }
+}
+
+// Inicializar el store de Alpine para búsqueda
+document.addEventListener('alpine:init', () => {
+    Alpine.store('searchData', {
+        searchSuggestions: [],
+        showSuggestions: false,
+        selectedIndex: -1
+    });
+});
+
+// Función optimizada para cargar los contadores de paquetes de todos los clientes de una vez
+async function loadPackageCounts() {
+    const rows = document.querySelectorAll('tbody tr[data-customer-id]');
+    
+    if (rows.length === 0) return;
+    
+    // Recopilar todos los IDs de clientes
+    const customerIds = Array.from(rows).map(row => row.getAttribute('data-customer-id')).filter(id => id);
+    
+    if (customerIds.length === 0) return;
+    
+    try {
+        // Hacer una sola petición para todos los clientes
+        const response = await fetch(`/api/customers/package-counts/batch?customer_ids=${customerIds.join(',')}`);
+        
+        if (!response.ok) {
+            throw new Error('Error al cargar contadores de paquetes');
+        }
+        
+        const countsData = await response.json();
+        
+        // Actualizar cada badge con los datos recibidos
+        rows.forEach(row => {
+            const customerId = row.getAttribute('data-customer-id');
+            if (!customerId) return;
+            
+            const badgeContainer = row.querySelector(`[data-customer-id="${customerId}"]`);
+            if (!badgeContainer) return;
+            
+            const announcedBadge = badgeContainer.querySelector('.package-count-announced');
+            const receivedBadge = badgeContainer.querySelector('.package-count-received');
+            const deliveredBadge = badgeContainer.querySelector('.package-count-delivered');
+            const cancelledBadge = badgeContainer.querySelector('.package-count-cancelled');
+            
+            const announcedBadgeParent = announcedBadge?.parentElement;
+            const receivedBadgeParent = receivedBadge?.parentElement;
+            const deliveredBadgeParent = deliveredBadge?.parentElement;
+            const cancelledBadgeParent = cancelledBadge?.parentElement;
+            
+            // Obtener los contadores para este cliente
+            const counts = countsData[customerId] || { announced: 0, received: 0, delivered: 0, cancelled: 0 };
+            
+            // Actualizar badge de Anunciados
+            if (announcedBadge && announcedBadgeParent) {
+                announcedBadge.textContent = counts.announced;
+                announcedBadgeParent.classList.remove('animate-pulse');
+                if (counts.announced > 0) {
+                    announcedBadgeParent.classList.add('ring-1', 'ring-yellow-400');
+                }
+            }
+            
+            // Actualizar badge de Recibidos
+            if (receivedBadge && receivedBadgeParent) {
+                receivedBadge.textContent = counts.received;
+                receivedBadgeParent.classList.remove('animate-pulse');
+                if (counts.received > 0) {
+                    receivedBadgeParent.classList.add('ring-1', 'ring-blue-400');
+                }
+            }
+            
+            // Actualizar badge de Entregados
+            if (deliveredBadge && deliveredBadgeParent) {
+                deliveredBadge.textContent = counts.delivered;
+                deliveredBadgeParent.classList.remove('animate-pulse');
+                if (counts.delivered > 0) {
+                    deliveredBadgeParent.classList.add('ring-1', 'ring-green-400');
+                }
+            }
+            
+            // Actualizar badge de Cancelados
+            if (cancelledBadge && cancelledBadgeParent) {
+                cancelledBadge.textContent = counts.cancelled;
+                cancelledBadgeParent.classList.remove('animate-pulse');
+                if (counts.cancelled > 0) {
+                    cancelledBadgeParent.classList.add('ring-1', 'ring-red-400');
+                }
+            }
+        });
+        
+    } catch (error) {
+        console.error('Error al cargar contadores de paquetes:', error);
+        
+        // En caso de error, mostrar 0 en todos los badges
+        rows.forEach(row => {
+            const badgeContainer = row.querySelector(`[data-customer-id]`);
+            if (!badgeContainer) return;
+            
+            const badges = badgeContainer.querySelectorAll('[data-badge-type]');
+            badges.forEach(badge => {
+                const span = badge.querySelector('span');
+                if (span) {
+                    span.textContent = '0';
+                    badge.classList.remove('animate-pulse');
+                }
+            });
+        });
+    }
+}
+
+// Cargar los contadores cuando la página esté lista
+document.addEventListener('DOMContentLoaded', () => {
+    loadPackageCounts();
+});
@@ -0,0 +1,867 @@
+// Funciones globales para acceso desde onclick
+let customerApp = null;
+let manageSearchDebounce = null;
+
+function cancelManageSearchDebounce() {
+    if (manageSearchDebounce) {
+        clearTimeout(manageSearchDebounce);
+        manageSearchDebounce = null;
+    }
+}
+
+function buildManageUrl(extraParams = {}) {
+    const baseUrl = new URL('/customers/manage', window.location.origin);
+    const currentParams = new URLSearchParams(window.location.search);
+    const preservedKeys = ['search', 'limit', 'page'];
+
+    preservedKeys.forEach((key) => {
+        const value = currentParams.get(key);
+        if (value) {
+            baseUrl.searchParams.set(key, value);
+        }
+    });
+
+    Object.entries(extraParams).forEach(([key, value]) => {
+        if (value === null) {
+            baseUrl.searchParams.delete(key);
+        } else if (value !== undefined) {
+            baseUrl.searchParams.set(key, value);
+        }
+    });
+
+    return baseUrl.pathname + (baseUrl.search ? baseUrl.search : '');
+}
+
+function submitManageSearch() {
+    cancelManageSearchDebounce();
+    const input = document.getElementById('customerSearchInput');
+    if (!input) {
+        return;
+    }
+
+    const value = input.value ? input.value.trim() : '';
+    const params = { page: '1' };
+
+    if (value) {
+        params.search = value;
+    } else {
+        params.search = null;
+    }
+
+    const targetUrl = buildManageUrl(params);
+    const currentUrl = window.location.pathname + window.location.search;
+
+    if (targetUrl !== currentUrl) {
+        window.location.href = targetUrl;
+    }
+}
+
+function clearManageSearch() {
+    const input = document.getElementById('customerSearchInput');
+    if (!input) {
+        return;
+    }
+
+    input.value = '';
+    cancelManageSearchDebounce();
+    submitManageSearch();
+    input.focus();
+}
+
+function initManageSearchAutoSubmit() {
+    const input = document.getElementById('customerSearchInput');
+    if (!input) {
+        return;
+    }
+
+    // Auto focus al cargar la vista
+    if (document.activeElement !== input) {
+        input.focus();
+    }
+
+    input.addEventListener('input', () => {
+        cancelManageSearchDebounce();
+        manageSearchDebounce = setTimeout(() => {
+            submitManageSearch();
+        }, 400);
+    });
+}
+
+document.addEventListener('DOMContentLoaded', initManageSearchAutoSubmit);
+
+function customerManagement() {
+    return {
+        showModal: false,
+        showViewModal: false,
+        showDeleteModal: false,
+        showCleanupModal: false,
+        isEditMode: false,
+        customerId: null,
+        formData: {
+            first_name: '',
+            last_name: '',
+            phone: '',
+            email: '',
+            address_street: '',
+            building_name: '',
+            tower: '',
+            apartment: ''
+        },
+        viewData: {
+            first_name: '',
+            last_name: '',
+            phone: '',
+            email: '',
+            address_street: '',
+            building_name: '',
+            tower: '',
+            apartment: '',
+            is_active: '',
+            packages: [],
+            loadingPackages: false,
+            customerId: null
+        },
+        deleteData: {
+            customerId: null,
+            customerName: ''
+        },
+        cleanupData: {
+            invalidCustomersCount: 0,
+            invalidCustomersList: [],
+            isLoading: false,
+            hasError: false,
+            packagesWithoutCustomer: 0,
+            message: ''
+        },
+        validation: {
+            phoneExists: false,
+            emailExists: false,
+            phoneCustomer: null,
+            emailCustomer: null,
+            checkingPhone: false,
+            checkingEmail: false
+        },
+        debounceTimers: {
+            phone: null,
+            email: null
+        },
+        
+        init() {
+            // Guardar referencia global para acceso desde funciones onclick
+            customerApp = this;
+            window.customerAppInstance = this;
+        },
+        
+        openCreateModal() {
+            cancelManageSearchDebounce();
+            console.log('openCreateModal ejecutado');
+            this.isEditMode = false;
+            this.customerId = null;
+            this.formData = {
+                first_name: '',
+                last_name: '',
+                phone: '',
+                email: '',
+                address_street: '',
+                building_name: '',
+                tower: '',
+                apartment: ''
+            };
+            // Resetear validación
+            this.validation = {
+                phoneExists: false,
+                emailExists: false,
+                phoneCustomer: null,
+                emailCustomer: null,
+                checkingPhone: false,
+                checkingEmail: false
+            };
+            this.showModal = true;
+            console.log('showModal:', this.showModal);
+        },
+        
+        openEditModal(id, firstName, lastName, phone, email, address, building, tower, apartment) {
+            cancelManageSearchDebounce();
+            console.log('openEditModal ejecutado', id);
+            this.isEditMode = true;
+            this.customerId = id;
+            this.formData = {
+                first_name: firstName || '',
+                last_name: lastName || '',
+                phone: phone || '',
+                email: email || '',
+                address_street: address || '',
+                building_name: building || '',
+                tower: tower || '',
+                apartment: apartment || ''
+            };
+            // Resetear validación
+            this.validation = {
+                phoneExists: false,
+                emailExists: false,
+                phoneCustomer: null,
+                emailCustomer: null,
+                checkingPhone: false,
+                checkingEmail: false
+            };
+            this.showModal = true;
+            console.log('showModal:', this.showModal, 'formData:', this.formData);
+        },
+        
+        closeModal() {
+            this.showModal = false;
+            this.isEditMode = false;
+            this.customerId = null;
+        },
+        
+        openViewModal(id, firstName, lastName, phone, email, address, building, tower, apartment, isActive) {
+            cancelManageSearchDebounce();
+            console.log('openViewModal ejecutado', id);
+            this.viewData = {
+                first_name: firstName || '',
+                last_name: lastName || '',
+                phone: phone || '',
+                email: email || '',
+                address_street: address || '',
+                building_name: building || '',
+                tower: tower || '',
+                apartment: apartment || '',
+                is_active: isActive || 'Activo',
+                customerId: id,
+                packages: [],
+                loadingPackages: true
+            };
+            this.showViewModal = true;
+            // Cargar paquetes del cliente
+            this.loadCustomerPackages(id);
+        },
+        
+        closeViewModal() {
+            this.showViewModal = false;
+            this.viewData = {
+                first_name: '',
+                last_name: '',
+                phone: '',
+                email: '',
+                address_street: '',
+                building_name: '',
+                tower: '',
+                apartment: '',
+                is_active: '',
+                packages: [],
+                loadingPackages: false,
+                customerId: null
+            };
+        },
+        
+        async loadCustomerPackages(customerId) {
+            try {
+                this.viewData.loadingPackages = true;
+                this.viewData.packages = [];
+                
+                const response = await fetch(`/api/customers/${customerId}/packages?limit=10`, {
+                    method: 'GET',
+                    headers: {
+                        'Content-Type': 'application/json',
+                    },
+                    credentials: 'include',
+                });
+                
+                if (response.ok) {
+                    const data = await response.json();
+                    // La API puede devolver {packages: [...]} o directamente [...]
+                    this.viewData.packages = Array.isArray(data) ? data : (data.packages || []);
+                    console.log(`✅ Cargados ${this.viewData.packages.length} paquetes para el cliente ${customerId}`);
+                } else {
+                    console.error('Error al cargar paquetes del cliente:', response.status);
+                    this.viewData.packages = [];
+                }
+            } catch (error) {
+                console.error('Error al cargar paquetes del cliente:', error);
+                this.viewData.packages = [];
+            } finally {
+                this.viewData.loadingPackages = false;
+            }
+        },
+        
+        // Validación de duplicados en tiempo real
+        checkDuplicatePhone() {
+            // Limpiar el timer anterior
+            if (this.debounceTimers.phone) {
+                clearTimeout(this.debounceTimers.phone);
+            }
+            
+            // Si no hay teléfono, resetear validación
+            if (!this.formData.phone || this.formData.phone.trim().length < 7) {
+                this.validation.phoneExists = false;
+                this.validation.phoneCustomer = null;
+                return;
+            }
+            
+            // Debounce de 500ms
+            this.debounceTimers.phone = setTimeout(async () => {
+                try {
+                    this.validation.checkingPhone = true;
+                    
+                    const params = new URLSearchParams({
+                        phone: this.formData.phone.trim()
+                    });
+                    
+                    // Si estamos editando, excluir el cliente actual
+                    if (this.isEditMode && this.customerId) {
+                        params.append('customer_id', this.customerId);
+                    }
+                    
+                    const response = await fetch(`/api/customers/check-duplicate?${params.toString()}`, {
+                        method: 'GET',
+                        headers: {
+                            'Content-Type': 'application/json',
+                        },
+                        credentials: 'include',
+                    });
+                    
+                    if (response.ok) {
+                        const data = await response.json();
+                        this.validation.phoneExists = data.phone_exists;
+                        this.validation.phoneCustomer = data.phone_customer;
+                    }
+                } catch (error) {
+                    console.error('Error al verificar teléfono duplicado:', error);
+                } finally {
+                    this.validation.checkingPhone = false;
+                }
+            }, 500);
+        },
+        
+        checkDuplicateEmail() {
+            // Limpiar el timer anterior
+            if (this.debounceTimers.email) {
+                clearTimeout(this.debounceTimers.email);
+            }
+            
+            // Si no hay email, resetear validación
+            if (!this.formData.email || this.formData.email.trim().length < 3) {
+                this.validation.emailExists = false;
+                this.validation.emailCustomer = null;
+                return;
+            }
+            
+            // Debounce de 500ms
+            this.debounceTimers.email = setTimeout(async () => {
+                try {
+                    this.validation.checkingEmail = true;
+                    
+                    const params = new URLSearchParams({
+                        email: this.formData.email.trim()
+                    });
+                    
+                    // Si estamos editando, excluir el cliente actual
+                    if (this.isEditMode && this.customerId) {
+                        params.append('customer_id', this.customerId);
+                    }
+                    
+                    const response = await fetch(`/api/customers/check-duplicate?${params.toString()}`, {
+                        method: 'GET',
+                        headers: {
+                            'Content-Type': 'application/json',
+                        },
+                        credentials: 'include',
+                    });
+                    
+                    if (response.ok) {
+                        const data = await response.json();
+                        this.validation.emailExists = data.email_exists;
+                        this.validation.emailCustomer = data.email_customer;
+                    }
+                } catch (error) {
+                    console.error('Error al verificar email duplicado:', error);
+                } finally {
+                    this.validation.checkingEmail = false;
+                }
+            }, 500);
+        },
+        
+        openDeleteModal(customerId, customerName) {
+            cancelManageSearchDebounce();
+            this.deleteData = {
+                customerId: customerId,
+                customerName: customerName
+            };
+            this.showDeleteModal = true;
+        },
+        
+        closeDeleteModal() {
+            this.showDeleteModal = false;
+            this.deleteData = {
+                customerId: null,
+                customerName: ''
+            };
+        },
+        
+        async confirmDelete() {
+            const customerId = this.deleteData.customerId;
+            const customerName = this.deleteData.customerName;
+            
+            if (!customerId) {
+                this.showErrorToast('Error', 'ID de cliente no válido');
+                this.closeDeleteModal();
+                return;
+            }
+
+            try {
+                // Obtener token de cookies
+                const token = this.getAuthToken();
+                const headers = {
+                    'Content-Type': 'application/json',
+                };
+                
+                // Agregar token al header si existe
+                if (token) {
+                    headers['Authorization'] = `Bearer ${token}`;
+                }
+                
+                // Cerrar modal antes de hacer la petición
+                this.closeDeleteModal();
+                
+                // Mostrar notificación de carga
+                this.showInfoToast('Eliminando...', 'Por favor espera mientras se elimina el cliente');
+                
+                const response = await fetch(`/api/customers/${customerId}`, {
+                    method: 'DELETE',
+                    headers: headers,
+                    credentials: 'include',
+                });
+
+                if (response.ok || response.status === 204) {
+                    this.showSuccessToast('Éxito', 'Cliente eliminado exitosamente');
+                    // Redirigir después de un breve delay para que se vea la notificación
+                    setTimeout(() => {
+                        const redirectUrl = buildManageUrl({ success: 'Cliente eliminado exitosamente' });
+                        window.location.href = redirectUrl;
+                    }, 1000);
+                } else {
+                    const errorData = await response.json().catch(() => ({ detail: 'Error desconocido' }));
+                    const errorMessage = errorData.detail || errorData.message || 'Error desconocido';
+                    this.showErrorToast('Error', `Error al eliminar cliente: ${errorMessage}`);
+                }
+            } catch (error) {
+                console.error('Error en confirmDelete:', error);
+                this.showErrorToast('Error', `Error al eliminar cliente: ${error.message || 'Error desconocido'}`);
+            }
+        },
+        
+        showSuccessToast(title, message, duration = 5000) {
+            this.showToast('success', title, message, duration);
+        },
+        
+        showErrorToast(title, message, duration = 7000) {
+            this.showToast('error', title, message, duration);
+        },
+        
+        showInfoToast(title, message, duration = 5000) {
+            this.showToast('info', title, message, duration);
+        },
+        
+        async openCleanupModal() {
+            cancelManageSearchDebounce();
+            // Mostrar el modal primero
+            this.showCleanupModal = true;
+            this.cleanupData.isLoading = true;
+            this.cleanupData.hasError = false;
+            this.cleanupData.invalidCustomersCount = 0;
+            this.cleanupData.invalidCustomersList = [];
+            
+            try {
+                // Obtener lista de clientes inválidos
+                const token = this.getAuthToken();
+                const headers = {
+                    'Content-Type': 'application/json',
+                };
+                
+                if (token) {
+                    headers['Authorization'] = `Bearer ${token}`;
+                }
+                
+                const listResponse = await fetch('/api/customers/cleanup/invalid/list', {
+                    method: 'GET',
+                    headers: headers,
+                    credentials: 'include',
+                });
+                
+                if (listResponse.ok) {
+                    const listResult = await listResponse.json();
+                    if (listResult.success) {
+                        this.cleanupData.invalidCustomersCount = listResult.count || 0;
+                        this.cleanupData.invalidCustomersList = listResult.customers || [];
+                        // Si hay paquetes sin cliente, mostrar información
+                        if (listResult.packages_without_customer > 0) {
+                            this.cleanupData.packagesWithoutCustomer = listResult.packages_without_customer;
+                            this.cleanupData.message = listResult.message || '';
+                        } else {
+                            this.cleanupData.packagesWithoutCustomer = 0;
+                            this.cleanupData.message = '';
+                        }
+                    } else {
+                        this.cleanupData.hasError = true;
+                    }
+                } else {
+                    this.cleanupData.hasError = true;
+                    console.error('Error al obtener lista de clientes inválidos:', listResponse.status);
+                }
+            } catch (error) {
+                console.error('Error al obtener lista de clientes inválidos:', error);
+                this.cleanupData.hasError = true;
+            } finally {
+                this.cleanupData.isLoading = false;
+            }
+        },
+        
+        closeCleanupModal() {
+            this.showCleanupModal = false;
+            this.cleanupData.invalidCustomersCount = 0;
+            this.cleanupData.invalidCustomersList = [];
+            this.cleanupData.isLoading = false;
+            this.cleanupData.hasError = false;
+            this.cleanupData.packagesWithoutCustomer = 0;
+            this.cleanupData.message = '';
+        },
+        
+        async confirmCleanup() {
+            try {
+                // Cerrar el modal
+                this.closeCleanupModal();
+                
+                // Mostrar notificación de carga
+                this.showInfoToast('Limpiando...', 'Eliminando clientes inválidos, por favor espera...');
+                
+                // Obtener token de cookies
+                const token = this.getAuthToken();
+                const headers = {
+                    'Content-Type': 'application/json',
+                };
+                
+                // Agregar token al header si existe
+                if (token) {
+                    headers['Authorization'] = `Bearer ${token}`;
+                }
+                
+                // Hacer petición al endpoint
+                const response = await fetch('/api/customers/cleanup/invalid', {
+                    method: 'DELETE',
+                    headers: headers,
+                    credentials: 'include',
+                });
+                
+                const result = await response.json();
+                
+                if (response.ok && result.success) {
+                    // Mostrar mensaje de éxito
+                    const message = result.message || `Limpieza completada: ${result.deleted_count} cliente(s) eliminado(s)`;
+                    this.showSuccessToast('Éxito', message);
+                    
+                    // Si hay errores, mostrarlos también
+                    if (result.error_count > 0) {
+                        this.showErrorToast('Advertencia', `${result.error_count} cliente(s) no se pudieron eliminar`);
+                    }
+                    
+                    // Redirigir después de un breve delay para que se vea la notificación
+                    setTimeout(() => {
+                        const redirectUrl = buildManageUrl({ success: message });
+                        window.location.href = redirectUrl;
+                    }, 2000);
+                } else {
+                    const errorMessage = result.detail || result.message || 'Error al limpiar clientes inválidos';
+                    this.showErrorToast('Error', errorMessage);
+                }
+            } catch (error) {
+                console.error('Error al limpiar clientes inválidos:', error);
+                this.showErrorToast('Error', `Error al limpiar clientes inválidos: ${error.message || 'Error desconocido'}`);
+            }
+        },
+        
+        showToast(type, title, message, duration = 5000) {
+            const container = document.getElementById('toastContainer');
+            if (!container) {
+                console.error('Toast container no encontrado');
+                return;
+            }
+            
+            const toastId = 'toast-' + Date.now() + '-' + Math.random().toString(36).substr(2, 9);
+            
+            const icons = {
+                success: '<svg class="w-5 h-5" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M9 12l2 2 4-4m6 2a9 9 0 11-18 0 9 9 0 0118 0z"></path></svg>',
+                error: '<svg class="w-5 h-5" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M12 8v4m0 4h.01M21 12a9 9 0 11-18 0 9 9 0 0118 0z"></path></svg>',
+                info: '<svg class="w-5 h-5" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M13 16h-1v-4h-1m1-4h.01M21 12a9 9 0 11-18 0 9 9 0 0118 0z"></path></svg>',
+                warning: '<svg class="w-5 h-5" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M12 9v2m0 4h.01m-6.938 4h13.856c1.54 0 2.502-1.667 1.732-3L13.732 4c-.77-1.333-2.694-1.333-3.464 0L3.34 16c-.77 1.333.192 3 1.732 3z"></path></svg>'
+            };
+            
+            const toastHTML = `
+                <div id="${toastId}" class="toast ${type}">
+                    <div class="toast-icon">${icons[type] || icons.info}</div>
+                    <div class="toast-content">
+                        <div class="toast-title">${title}</div>
+                        <div class="toast-message">${message}</div>
+                    </div>
+                    <button class="toast-close" onclick="removeToast('${toastId}')">
+                        <svg class="w-4 h-4" fill="none" stroke="currentColor" viewBox="0 0 24 24">
+                            <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M6 18L18 6M6 6l12 12"></path>
+                        </svg>
+                    </button>
+                    <div class="toast-progress" style="width: 100%;"></div>
+                </div>
+            `;
+            
+            container.insertAdjacentHTML('beforeend', toastHTML);
+            
+            const toast = document.getElementById(toastId);
+            const progress = toast.querySelector('.toast-progress');
+            
+            // Mostrar toast
+            setTimeout(() => {
+                toast.classList.add('show');
+            }, 100);
+            
+            // Iniciar barra de progreso
+            setTimeout(() => {
+                progress.style.width = '0%';
+                progress.style.transition = `width ${duration}ms linear`;
+            }, 100);
+            
+            // Auto-remover después de la duración
+            setTimeout(() => {
+                removeToast(toastId);
+            }, duration);
+        },
+        
+        formatPhone(event) {
+            // Usar la utilidad de phone-utils.js
+            if (window.formatPhoneInput) {
+                window.formatPhoneInput(event);
+            }
+        },
+        
+        getAuthToken() {
+            // Obtener token de cookies
+            const cookies = document.cookie.split(';');
+            for (let cookie of cookies) {
+                const [name, value] = cookie.trim().split('=');
+                if (name === 'access_token') {
+                    return value;
+                }
+            }
+            return null;
+        },
+        
+        async saveCustomer() {
+            console.log('saveCustomer llamado', { isEditMode: this.isEditMode, customerId: this.customerId, formData: this.formData });
+            
+            // Validaciones
+            if (!this.formData.first_name || this.formData.first_name.trim().length === 0) {
+                this.showErrorToast('Error de validación', 'El nombre es obligatorio');
+                return;
+            }
+            
+            if (!this.formData.phone || this.formData.phone.trim().length === 0) {
+                this.showErrorToast('Error de validación', 'El teléfono es obligatorio');
+                return;
+            }
+            
+            // Validar formato de teléfono
+            if (window.validatePhone && !window.validatePhone(this.formData.phone)) {
+                this.showErrorToast('Error de validación', 'Número de teléfono inválido. Use formato: +573001234567');
+                return;
+            }
+            
+            // Normalizar teléfono
+            if (window.normalizePhone) {
+                this.formData.phone = window.normalizePhone(this.formData.phone);
+            }
+            
+            // Validación de duplicados
+            if (this.validation.phoneExists) {
+                this.showErrorToast('Error de validación', 'Este teléfono ya está registrado por otro cliente');
+                return;
+            }
+            
+            if (this.validation.emailExists) {
+                this.showErrorToast('Error de validación', 'Este email ya está registrado por otro cliente');
+                return;
+            }
+            
+            // Limpiar espacios y construir objeto de datos
+            const data = {};
+            
+            // Campos obligatorios
+            data.first_name = this.formData.first_name.trim();
+            data.phone = this.formData.phone.trim();
+            data.address_street = this.formData.address_street.trim();
+            
+            // Campos opcionales - incluir siempre, incluso si están vacíos (para permitir limpiar valores)
+            if (this.formData.last_name !== undefined) {
+                data.last_name = this.formData.last_name.trim() || null;
+            }
+            if (this.formData.email !== undefined) {
+                data.email = this.formData.email.trim() || null;
+            }
+            if (this.formData.building_name !== undefined) {
+                data.building_name = this.formData.building_name.trim() || null;
+            }
+            if (this.formData.tower !== undefined) {
+                data.tower = this.formData.tower.trim() || null;
+            }
+            if (this.formData.apartment !== undefined) {
+                data.apartment = this.formData.apartment.trim() || null;
+            }
+            
+            console.log('Datos a enviar:', data);
+            
+            try {
+                const url = this.isEditMode ? `/api/customers/${this.customerId}` : '/api/customers';
+                const method = this.isEditMode ? 'PUT' : 'POST';
+                
+                console.log('Enviando petición:', { url, method, data });
+                
+                // Obtener token de cookies
+                const token = this.getAuthToken();
+                const headers = {
+                    'Content-Type': 'application/json',
+                };
+                
+                // Agregar token al header si existe
+                if (token) {
+                    headers['Authorization'] = `Bearer ${token}`;
+                }
+                
+                const response = await fetch(url, {
+                    method: method,
+                    headers: headers,
+                    credentials: 'include',
+                    body: JSON.stringify(data)
+                });
+                
+                console.log('Respuesta recibida:', { status: response.status, ok: response.ok });
+                
+                if (response.ok) {
+                    const successMessage = this.isEditMode ? 'Cliente actualizado exitosamente' : 'Cliente creado exitosamente';
+                    this.showSuccessToast('Éxito', successMessage);
+                    setTimeout(() => {
+                        const redirectUrl = buildManageUrl({ success: successMessage });
+                        window.location.href = redirectUrl;
+                    }, 1000);
+                } else {
+                    const errorData = await response.json().catch(() => ({ detail: 'Error desconocido' }));
+                    console.error('Error en respuesta:', errorData);
+                    const errorMessage = errorData.detail || errorData.message || 'Error desconocido';
+                    this.showErrorToast('Error', `Error al ${this.isEditMode ? 'actualizar' : 'crear'} cliente: ${errorMessage}`);
+                }
+            } catch (error) {
+                console.error('Error en saveCustomer:', error);
+                this.showErrorToast('Error', `Error al ${this.isEditMode ? 'actualizar' : 'crear'} cliente: ${error.message || 'Error desconocido'}`);
+            }
+        },
+        
+    }
+}
+
+function getCustomerAppInstance() {
+    return window.customerAppInstance || customerApp || null;
+}
+
+// Función para remover toasts
+function removeToast(toastId) {
+    const toast = document.getElementById(toastId);
+    if (toast) {
+        toast.style.animation = 'slideOut 0.3s ease-out forwards';
+        setTimeout(() => {
+            toast.remove();
+        }, 300);
+    }
+}
+
+window.openCreateModalFunc = function() {
+    cancelManageSearchDebounce();
+    const app = getCustomerAppInstance();
+    if (app && typeof app.openCreateModal === 'function') {
+        app.openCreateModal();
+        return;
+    }
+    setTimeout(() => window.openCreateModalFunc(), 100);
+};
+
+function openViewModalFromRow(button) {
+    cancelManageSearchDebounce();
+    const row = button ? button.closest('tr') : null;
+    if (!row) {
+        console.error('No se encontró la fila del cliente');
+        return;
+    }
+
+    const customerId = row.getAttribute('data-customer-id');
+    const firstName = row.getAttribute('data-customer-first-name') || '';
+    const lastName = row.getAttribute('data-customer-last-name') || '';
+    const phone = row.getAttribute('data-customer-phone') || '';
+    const email = row.getAttribute('data-customer-email') || '';
+    const address = row.getAttribute('data-customer-address') || '';
+    const building = row.getAttribute('data-customer-building') || '';
+    const tower = row.getAttribute('data-customer-tower') || '';
+    const apartment = row.getAttribute('data-customer-apartment') || '';
+    const isActive = row.getAttribute('data-customer-is-active') || 'Activo';
+
+    window.openViewModal(customerId, firstName, lastName, phone, email, address, building, tower, apartment, isActive);
+}
+
+window.openViewModal = function(id, firstName, lastName, phone, email, address, building, tower, apartment, isActive) {
+    cancelManageSearchDebounce();
+    const app = getCustomerAppInstance();
+    if (app && typeof app.openViewModal === 'function') {
+        app.openViewModal(id, firstName, lastName, phone, email, address, building, tower, apartment, isActive);
+        return;
+    }
+    setTimeout(() => window.openViewModal(id, firstName, lastName, phone, email, address, building, tower, apartment, isActive), 100);
+};
+
+function openEditModalFromRow(button) {
+    cancelManageSearchDebounce();
+    const row = button ? button.closest('tr') : null;
+    if (!row) {
+        console.error('No se encontró la fila del cliente');
+        return;
+    }
+
+    const customerId = row.getAttribute('data-customer-id');
+    const firstName = row.getAttribute('data-customer-first-name') || '';
+    const lastName = row.getAttribute('data-customer-last-name') || '';
+    const phone = row.getAttribute('data-customer-phone') || '';
+    const email = row.getAttribute('data-customer-email') || '';
+    const address = row.getAttribute('data-customer-address') || '';
+    const building = row.getAttribute('data-customer-building') || '';
+    const tower = row.getAttribute('data-customer-tower') || '';
+    const apartment = row.getAttribute('data-customer-apartment') || '';
+
+    window.openEditModal(customerId, firstName, lastName, phone, email, address, building, tower, apartment);
+}
+
+window.openEditModal = function(id, firstName, lastName, phone, email, address, building, tower, apartment) {
+    cancelManageSearchDebounce();
+    const app = getCustomerAppInstance();
+    if (app && typeof app.openEditModal === 'function') {
+        app.openEditModal(id, firstName, lastName, phone, email, address, building, tower, apartment);
+        return;
+    }
+    setTimeout(() => window.openEditModal(id, firstName, lastName, phone, email, address, building, tower, apartment), 100);
+};
+
+function deleteCustomer(customerId) {
+    deleteCustomerHandler(customerId, '');
+}
+
+function deleteCustomerHandler(customerId, customerName) {
+    cancelManageSearchDebounce();
+    const app = getCustomerAppInstance();
+    if (app && typeof app.openDeleteModal === 'function') {
+        app.openDeleteModal(customerId, customerName || 'el cliente');
+        return;
+    }
+    setTimeout(() => deleteCustomerHandler(customerId, customerName), 100);
+}
+
@@ -0,0 +1,103 @@
+    // OPCIÓN 1: Función de fallback para carga de imágenes con retry logic
+    function loadImageWithFallback(imgElement, primaryUrl, filename, index) {
+        console.log(`🖼️ Error cargando imagen ${index + 1}: ${filename}`);
+        console.log(`🔗 URL original: ${primaryUrl}`);
+        
+        // Marcar que esta imagen tuvo error
+        imgElement.setAttribute('data-error', 'true');
+        
+        // Intentar diferentes estrategias de fallback
+        const fallbackStrategies = [
+            // Estrategia 1: Reintentar la URL original después de un delay
+            () => {
+                console.log(`🔄 Estrategia 1: Reintentando URL original para ${filename}`);
+                setTimeout(() => {
+                    const newImg = new Image();
+                    newImg.onload = () => {
+                        console.log(`✅ Estrategia 1 exitosa para ${filename}`);
+                        imgElement.src = primaryUrl;
+                        imgElement.removeAttribute('data-error');
+                    };
+                    newImg.onerror = () => {
+                        console.log(`❌ Estrategia 1 falló para ${filename}`);
+                        tryNextStrategy();
+                    };
+                    newImg.src = primaryUrl + '?retry=' + Date.now();
+                }, 2000);
+            },
+            
+            // Estrategia 2: Intentar con endpoint de fallback directo
+            () => {
+                console.log(`🔄 Estrategia 2: Usando endpoint de fallback para ${filename}`);
+                const fallbackUrl = `/api/images/fallback?filename=${encodeURIComponent(filename)}&timestamp=${Date.now()}`;
+                const newImg = new Image();
+                newImg.onload = () => {
+                    console.log(`✅ Estrategia 2 exitosa para ${filename}`);
+                    imgElement.src = fallbackUrl;
+                    imgElement.removeAttribute('data-error');
+                };
+                newImg.onerror = () => {
+                    console.log(`❌ Estrategia 2 falló para ${filename}`);
+                    tryNextStrategy();
+                };
+                newImg.src = fallbackUrl;
+            },
+            
+            // Estrategia 3: Mostrar placeholder con información del error
+            () => {
+                console.log(`🔄 Estrategia 3: Mostrando placeholder para ${filename}`);
+                showImagePlaceholder(imgElement, filename, index);
+            }
+        ];
+        
+        let currentStrategy = 0;
+        
+        function tryNextStrategy() {
+            if (currentStrategy < fallbackStrategies.length) {
+                fallbackStrategies[currentStrategy]();
+                currentStrategy++;
+            }
+        }
+        
+        // Iniciar con la primera estrategia
+        tryNextStrategy();
+    }
+    
+    function showImagePlaceholder(imgElement, filename, index) {
+        console.log(`🖼️ Mostrando placeholder para ${filename}`);
+        
+        // Ocultar la imagen original
+        imgElement.style.display = 'none';
+        
+        // Buscar el contenedor de error (debe existir en el HTML)
+        const errorContainer = imgElement.parentElement.querySelector('.hidden');
+        if (errorContainer) {
+            errorContainer.classList.remove('hidden');
+            errorContainer.classList.add('flex');
+            
+            // Actualizar información del error
+            const errorInfo = errorContainer.querySelector('.error-info');
+            if (errorInfo) {
+                errorInfo.textContent = `${filename} - No disponible`;
+            }
+        } else {
+            // Crear placeholder dinámico si no existe contenedor de error
+            const placeholder = document.createElement('div');
+            placeholder.className = 'absolute inset-0 flex items-center justify-center bg-gray-100 text-gray-400 flex-col p-2';
+            placeholder.innerHTML = `
+                <svg class="w-8 h-8 mb-2" fill="none" stroke="currentColor" viewBox="0 0 24 24">
+                    <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M4 16l4.586-4.586a2 2 0 012.828 0L16 16m-2-2l1.586-1.586a2 2 0 012.828 0L20 14m-6-6h.01M6 20h12a2 2 0 002-2V6a2 2 0 00-2-2H6a2 2 0 002 2z"></path>
+                </svg>
+                <span class="text-xs text-center">Imagen no disponible</span>
+                <span class="text-xs text-center text-gray-500">${filename}</span>
+            `;
+            
+            imgElement.parentElement.appendChild(placeholder);
+        }
+    }
+    
+    // Función para manejar errores de imagen (legacy - mantener compatibilidad)
+    function handleImageError(imgElement, filename, error) {
+        console.log(`❌ handleImageError (legacy): ${filename} - ${error}`);
+        loadImageWithFallback(imgElement, imgElement.src, filename, 0);
+    }
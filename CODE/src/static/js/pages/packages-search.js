@@ -0,0 +1,2274 @@
+    // Protección adicional para search.html
+    (function() {
+        if (typeof document !== 'undefined' && document.querySelectorAll) {
+            const originalQuerySelectorAll = document.querySelectorAll;
+            document.querySelectorAll = function(selector) {
+                try {
+                    return originalQuerySelectorAll.call(this, selector);
+                } catch (error) {
+                    console.warn('Error en search.html querySelectorAll:', error);
+                    return [];
+                }
+            };
+        }
+    })();
+
+    // Funciones utilitarias para WhatsApp (copiadas de base.html para asegurar disponibilidad)
+    function createWhatsAppLink(phoneNumber, message = '') {
+        if (!phoneNumber || phoneNumber === 'undefined' || phoneNumber === 'Sin teléfono') {
+            return null;
+        }
+
+        // Limpiar el número (quitar espacios, guiones, paréntesis)
+        const cleanPhone = phoneNumber.replace(/[\s\-\(\)]/g, '');
+
+        // Si tiene +, mantenerlo; si no, agregar código de país por defecto (Colombia)
+        const formattedPhone = cleanPhone.startsWith('+') ? cleanPhone : `+57${cleanPhone}`;
+
+        // Crear enlace
+        const encodedMessage = encodeURIComponent(message);
+        return `https://wa.me/${formattedPhone}?text=${encodedMessage}`;
+    }
+
+    function createWhatsAppLinkHTML(phoneNumber, message = '', className = '') {
+        const whatsappLink = createWhatsAppLink(phoneNumber, message);
+
+        if (!whatsappLink) {
+            return `<span class="text-sm text-gray-500">Sin teléfono</span>`;
+        }
+
+        return `
+            <a href="${whatsappLink}"
+               target="_blank"
+               rel="noopener noreferrer"
+               class="inline-flex items-center text-green-600 hover:text-green-700 transition-colors duration-200 ${className}"
+               aria-label="Contactar por WhatsApp">
+                <svg class="w-4 h-4 mr-1" fill="currentColor" viewBox="0 0 24 24">
+                    <path d="M17.472 14.382c-.297-.149-1.758-.867-2.03-.967-.273-.099-.471-.148-.67.15-.197.297-.767.966-.94 1.164-.173.199-.347.223-.644.075-.297-.15-1.255-.463-2.39-1.475-.883-.788-1.48-1.761-1.653-2.059-.173-.297-.018-.458.13-.606.134-.133.298-.347.446-.52.149-.174.198-.298.298-.497.099-.198.05-.371-.025-.52-.075-.149-.669-1.612-.916-2.207-.242-.579-.487-.5-.669-.51-.173-.008-.371-.01-.57-.01-.198 0-.52.074-.792.372-.272.297-1.04 1.016-1.04 2.479 0 1.462 1.065 2.875 1.213 3.074.149.198 2.096 3.2 5.077 4.487.709.306 1.262.489 1.694.625.712.227 1.36.195 1.871.118.571-.085 1.758-.719 2.006-1.413.248-.694.248-1.289.173-1.413-.074-.124-.272-.198-.57-.347m-5.421 7.403h-.004a9.87 9.87 0 01-5.031-1.378l-.361-.214-3.741.982.998-3.648-.235-.374a9.86 9.86 0 01-1.51-5.26c.001-5.45 4.436-9.884 9.888-9.884 2.64 0 5.122 1.03 6.988 2.898a9.825 9.825 0 012.893 6.994c-.003 5.45-4.437 9.884-9.885 9.884m8.413-18.297A11.815 11.815 0 0012.05 0C5.495 0 .16 5.335.157 11.892c0 2.096.547 4.142 1.588 5.945L.057 24l6.305-1.654a11.882 11.882 0 005.683 1.448h.005c6.554 0 11.89-5.335 11.893-11.893A11.821 11.821 0 0020.885 3.488"/>
+                </svg>
+                ${phoneNumber}
+            </a>
+        `;
+    }
+
+    // Funcionalidad de búsqueda
+    console.log('🚀🚀🚀 INICIALIZANDO JAVASCRIPT DE BÚSQUEDA - VERSIÓN 2025-09-07-12:30 🚀🚀🚀');
+    
+    document.addEventListener('DOMContentLoaded', function() {
+        console.log('DOM cargado, configurando event listener...');
+
+        // Verificar si hay un parámetro auto_search en la URL
+        const urlParams = new URLSearchParams(window.location.search);
+        const autoSearchQuery = urlParams.get('auto_search') || urlParams.get('searchQuery');
+
+        const searchQueryField = document.getElementById('searchQuery');
+        if (searchQueryField) {
+            if (autoSearchQuery) {
+                // Si hay auto_search o searchQuery, llenar el campo y ejecutar búsqueda automáticamente
+                console.log('Auto-búsqueda detectada:', autoSearchQuery);
+                searchQueryField.value = autoSearchQuery;
+
+                // Ejecutar búsqueda automáticamente después de un breve delay
+                setTimeout(() => {
+                    console.log('🚀 Ejecutando búsqueda automática para:', autoSearchQuery);
+                    console.log('🔧 URL actual:', window.location.href);
+                    showLoading();
+                    searchPackage(autoSearchQuery);
+                }, 500);
+            } else {
+                // Focus automático normal si no hay parámetros de búsqueda
+                searchQueryField.focus();
+            }
+        }
+
+        const searchForm = document.getElementById('searchForm');
+        if (searchForm) {
+            console.log('Formulario encontrado, agregando event listener...');
+            searchForm.addEventListener('submit', function(e) {
+                console.log('Formulario enviado!');
+                e.preventDefault();
+                
+                const searchQuery = document.getElementById('searchQuery').value.trim();
+                console.log('Query de búsqueda:', searchQuery);
+                
+                if (!searchQuery) {
+                    showWarningMessage('📝 Por favor, ingresa el número de guía de tu paquete para buscar');
+                    return;
+                }
+                
+                // Mostrar loading
+                showLoading();
+                
+                // Realizar búsqueda
+                searchPackage(searchQuery);
+            });
+        } else {
+            console.error('❌ Formulario de búsqueda NO encontrado!');
+        }
+    });
+
+    function showLoading() {
+        const searchResults = document.getElementById('searchResults');
+        const errorMessage = document.getElementById('errorMessage');
+        const loadingSpinner = document.getElementById('loadingSpinner');
+        
+        if (searchResults) searchResults.classList.add('hidden');
+        if (errorMessage) errorMessage.classList.add('hidden');
+        if (loadingSpinner) loadingSpinner.classList.remove('hidden');
+        
+        const button = document.getElementById('searchButton');
+        const buttonText = document.getElementById('searchButtonText');
+        if (button) button.disabled = true;
+        if (buttonText) buttonText.textContent = 'Buscando...';
+    }
+
+    function hideLoading() {
+        const loadingSpinner = document.getElementById('loadingSpinner');
+        if (loadingSpinner) {
+            loadingSpinner.classList.add('hidden');
+        }
+        
+        const button = document.getElementById('searchButton');
+        const buttonText = document.getElementById('searchButtonText');
+        if (button) button.disabled = false;
+        if (buttonText) buttonText.textContent = 'Consultar Paquete';
+    }
+
+    async function searchPackage(query) {
+        try {
+            const response = await fetch(`/api/announcements/search/package?query=${encodeURIComponent(query)}`);
+            
+            if (!response.ok) {
+                hideLoading();
+                if (response.status === 404) {
+                    showSearchError('NOT_FOUND');
+                } else {
+                    showSearchError('SEARCH_ERROR');
+                }
+                return;
+            }
+            
+            const data = await response.json();
+            
+            if (!data.success) {
+                hideLoading();
+                showSearchError(data.message === 'NOT_FOUND' ? 'NOT_FOUND' : 'SEARCH_ERROR');
+                return;
+            }
+            
+            hideLoading();
+            displayResults(data);
+            
+        } catch (error) {
+            console.error('Error en búsqueda:', error);
+            hideLoading();
+            showSearchError('SEARCH_ERROR');
+        }
+    }
+
+    function displayResults(data) {
+        // Ocultar mensajes de error
+        const errorMessage = document.getElementById('errorMessage');
+        if (errorMessage) errorMessage.classList.add('hidden');
+        
+        // SECCIÓN 1: Mostrar Historial del Paquete
+        const searchResults = document.getElementById('searchResults');
+        if (searchResults) {
+            searchResults.classList.remove('hidden');
+            // Agregar clase para animación de entrada
+            searchResults.classList.add('animate-fade-in');
+        }
+        
+        // Llenar información del paquete
+        const customerName = document.getElementById('customerName');
+        const customerPhone = document.getElementById('customerPhone');
+        const guideNumber = document.getElementById('guideNumber');
+        const trackingCode = document.getElementById('trackingCode');
+        
+        // Debug logs para customer_phone
+        console.log('🔧 DEBUG: data.announcement:', data.announcement);
+        console.log('🔧 DEBUG: data.announcement exists:', data.announcement !== undefined && data.announcement !== null);
+
+        // Validar que data.announcement existe
+        if (!data.announcement) {
+            console.error('❌ ERROR: data.announcement es undefined o null');
+            // Mostrar mensaje de error en lugar de intentar acceder a propiedades
+            if (customerName) customerName.textContent = 'No disponible';
+            if (customerPhone) customerPhone.innerHTML = '<span class="text-sm text-gray-500">No disponible</span>';
+            if (guideNumber) guideNumber.textContent = 'No disponible';
+            if (trackingCode) trackingCode.textContent = 'No disponible';
+            return;
+        }
+
+        console.log('🔧 DEBUG: data.announcement.customer_phone:', data.announcement.customer_phone);
+        console.log('🔧 DEBUG: typeof data.announcement.customer_phone:', typeof data.announcement.customer_phone);
+        console.log('🔧 DEBUG: customerPhone element:', customerPhone);
+
+        if (customerName) customerName.textContent = data.announcement.customer_name || 'No disponible';
+        if (customerPhone) {
+            console.log('🔧 DEBUG: Setting customerPhone with WhatsApp link:', data.announcement.customer_phone);
+
+            // Validación robusta para customer_phone y crear enlace de WhatsApp
+            const phoneValue = data.announcement.customer_phone;
+            if (phoneValue !== undefined && phoneValue !== null && phoneValue !== 'undefined' && phoneValue !== '') {
+                // Crear enlace de WhatsApp con mensaje personalizado
+                const message = `Hola, tengo una consulta sobre mi paquete ${data.announcement.tracking_code || data.announcement.guide_number}`;
+                customerPhone.innerHTML = createWhatsAppLinkHTML(phoneValue, message);
+                console.log('🔧 DEBUG: customerPhone updated with WhatsApp link');
+            } else {
+                console.error('❌ ERROR: customer_phone es undefined, null, vacío o string "undefined"');
+                console.error('❌ Valor recibido:', phoneValue);
+                console.error('❌ Tipo:', typeof phoneValue);
+                customerPhone.innerHTML = '<span class="text-sm text-gray-500">No disponible</span>';
+            }
+        }
+        if (guideNumber) guideNumber.textContent = data.announcement.guide_number || 'No disponible';
+        // No mostrar el código de consulta en datos básicos (mantenerlo solo en memoria)
+        if (trackingCode) trackingCode.textContent = '';
+        
+        // Mostrar estado actual
+        displayCurrentStatus(data.current_status);
+        
+                // Guardar el estado actual en variable global para uso en otras funciones
+                window.currentPackageStatus = data.current_status;
+                console.log('🔍 Estado guardado en window.currentPackageStatus:', window.currentPackageStatus);
+                
+                // Mostrar información de validación y nomenclatura
+                if (data.validation) {
+                    console.log('🔍 Validación de identificador:', data.validation);
+                }
+                if (data.nomenclature) {
+                    console.log('🔍 Información de nomenclatura:', data.nomenclature);
+                }
+        
+        // Usar la información del backend para controlar la visibilidad de las secciones
+        const queryType = data.query_type;
+        const inquiryInfo = data.inquiry_info;
+        
+        // Controlar visibilidad del timeline del paquete
+        console.log('🔧 DEBUG: queryType =', queryType);
+        console.log('🔧 DEBUG: inquiryInfo =', inquiryInfo);
+        console.log('🔧 DEBUG: should_show_history =', queryType ? queryType.should_show_history : 'undefined');
+        
+        if (queryType && queryType.should_show_history) {
+            // Es consulta por código de tracking: mostrar timeline del paquete
+            console.log('✅ MOSTRANDO timeline del paquete para tracking code');
+            console.log('🔍 Datos del historial:', data.history);
+            const packageHistory = document.getElementById('packageHistory');
+            console.log('🔍 Elemento packageHistory encontrado:', packageHistory);
+            if (packageHistory) {
+                packageHistory.classList.remove('hidden');
+                console.log('✅ Clase hidden removida de packageHistory');
+                displayTimeline(data.history);
+            } else {
+                console.log('❌ No se encontró el elemento packageHistory');
+            }
+        } else {
+            // Es consulta por número de guía: ocultar timeline del paquete
+            console.log('❌ OCULTANDO timeline del paquete para número de guía');
+            const packageHistory = document.getElementById('packageHistory');
+            if (packageHistory) packageHistory.classList.add('hidden');
+            // Limpiar el contenido del timeline para evitar que se muestre
+            const timelineContainer = document.getElementById('timelineEvents');
+            if (timelineContainer) {
+                timelineContainer.innerHTML = '';
+            }
+        }
+        
+        // SECCIÓN 2: Mostrar Preguntas y Respuestas (solo para búsquedas por tracking code)
+        const conversationHistory = document.getElementById('conversationHistory');
+        if (conversationHistory && data.query_type && data.query_type.type === 'tracking_code') {
+            // Solo mostrar conversaciones para búsquedas por código de tracking
+            // El endpoint público solo muestra información básica de estado
+            displayConversationHistory(data.announcement.tracking_code);
+        } else if (conversationHistory) {
+            // Ocultar conversaciones para búsquedas por número de guía
+            conversationHistory.classList.add('hidden');
+        }
+        
+        // SECCIÓN 3: Mostrar formulario de consulta según la lógica del backend
+        const inquiryFormContainer = document.getElementById('inquiryFormContainer');
+        if (inquiryFormContainer) {
+            // Verificar que el estado del paquete permita consultas (solo ANUNCIADO y RECIBIDO)
+            const currentStatus = data.current_status;
+            const allowedStatuses = ['ANUNCIADO', 'RECIBIDO'];
+            const canMakeInquiries = allowedStatuses.includes(currentStatus);
+            
+            console.log('🔍 Estado actual del paquete:', currentStatus);
+            console.log('🔍 ¿Puede hacer consultas?', canMakeInquiries);
+            
+            if (data.query_type && data.query_type.should_show_inquiry_form && data.announcement && canMakeInquiries) {
+                // Verificar adicionalmente que no hay mensajes pendientes
+                const hasPendingMessages = data.inquiry_info && data.inquiry_info.has_pending_messages;
+
+                if (!hasPendingMessages) {
+                    // Mostrar formulario solo si hay datos de anuncio disponibles, NO hay mensajes pendientes y el estado permite consultas
+                    console.log('✅ MOSTRANDO FORMULARIO - Estado permite consultas:', currentStatus);
+                    inquiryFormContainer.classList.remove('hidden');
+
+                    // Establecer información del paquete para el envío del formulario
+                    window.currentPackageInfo = {
+                        customer_name: data.announcement.customer_name || '',
+                        customer_phone: data.announcement.customer_phone || '',
+                        guide_number: data.announcement.guide_number || '',
+                        tracking_code: data.announcement.tracking_code || ''
+                    };
+                    console.log('✅ Información del paquete establecida para envío:', window.currentPackageInfo);
+                } else {
+                    // Ocultar formulario si hay mensajes pendientes
+                    inquiryFormContainer.classList.add('hidden');
+                    console.log('❌ Formulario ocultado - hay mensajes pendientes para este paquete');
+                }
+            } else {
+                // Ocultar formulario si no hay datos de anuncio, no se permite consulta, o el estado no permite consultas
+                console.log('❌ OCULTANDO FORMULARIO - Estado:', currentStatus, 'CanMakeInquiries:', canMakeInquiries);
+                inquiryFormContainer.classList.add('hidden');
+                if (!canMakeInquiries) {
+                    console.log('❌ Formulario ocultado - el estado del paquete (' + currentStatus + ') no permite consultas. Solo se permiten consultas para estados ANUNCIADO y RECIBIDO');
+                } else {
+                    console.log('❌ Formulario ocultado - no hay datos de anuncio disponibles o no se permite consulta');
+                }
+            }
+        }
+        
+        // Scroll automático desactivado - el usuario puede navegar manualmente
+        // if (searchResults) {
+        //     // Esperar un momento para que se complete la renderización
+        //     setTimeout(() => {
+        //         // Scroll suave a la sección
+        //         searchResults.scrollIntoView({ 
+        //             behavior: 'smooth',
+        //             block: 'start',
+        //             inline: 'nearest'
+        //         });
+        //         
+        //         // Agregar efecto visual para destacar la sección
+        //         searchResults.classList.add('package-history-highlight');
+        //         
+        //         // Remover el efecto después de 2 segundos
+        //         setTimeout(() => {
+        //             searchResults.classList.remove('package-history-highlight');
+        //         }, 2000);
+        //     }, 200);
+        // }
+    }
+
+    function displayCurrentStatus(status) {
+        const statusBadge = document.getElementById('statusBadge');
+        if (!statusBadge) return;
+        
+        let statusText, statusClass;
+        
+        switch(status) {
+            case 'ANUNCIADO':
+                statusText = 'Anunciado';
+                statusClass = 'bg-blue-100 text-blue-800';
+                break;
+            case 'RECIBIDO':
+                statusText = 'Recibido';
+                statusClass = 'bg-yellow-100 text-yellow-800';
+                break;
+            case 'ENTREGADO':
+                statusText = 'Entregado';
+                statusClass = 'bg-green-100 text-green-800';
+                break;
+            case 'CANCELADO':
+                statusText = 'Cancelado';
+                statusClass = 'bg-red-100 text-red-800';
+                break;
+            default:
+                statusText = status;
+                statusClass = 'bg-gray-100 text-gray-800';
+        }
+        
+        statusBadge.className = `inline-flex items-center px-4 py-2 rounded-lg text-base font-medium shadow-sm ${statusClass}`;
+        statusBadge.textContent = statusText;
+    }
+
+    function formatDateShort(dateString) {
+        try {
+            // Crear fecha y convertir a zona horaria de Bogotá (UTC-5)
+            const date = new Date(dateString);
+            
+            // Convertir a zona horaria de Bogotá (UTC-5)
+            const bogotaOffset = -5 * 60; // -5 horas en minutos
+            const utc = date.getTime() + (date.getTimezoneOffset() * 60000);
+            const bogotaTime = new Date(utc + (bogotaOffset * 60000));
+            
+            // Extraer componentes de la fecha en zona horaria de Bogotá
+            const day = String(bogotaTime.getDate()).padStart(2, '0');
+            const month = String(bogotaTime.getMonth() + 1).padStart(2, '0');
+            const year = bogotaTime.getFullYear();
+            
+            // Formatear hora con AM/PM en zona horaria de Bogotá
+            const hours = bogotaTime.getHours();
+            const minutes = String(bogotaTime.getMinutes()).padStart(2, '0');
+            const ampm = hours >= 12 ? 'PM' : 'AM';
+            const displayHours = hours % 12 || 12; // Convertir 0 a 12 para formato 12h
+            const displayMinutes = String(minutes).padStart(2, '0');
+            
+            return `${day}/${month}/${year} ${displayHours}:${displayMinutes} ${ampm}`;
+        } catch (error) {
+            console.error('Error formateando fecha:', error);
+            return dateString;
+        }
+    }
+
+    function formatUserName(username) {
+        if (!username) return '';
+        
+        // Mapeo de nombres de operadores conocidos
+        const operatorMapping = {
+            'operator_4': 'Jveyes',
+            'Operator_4': 'Jveyes',
+            'operator_1': 'Admin',
+            'operator_2': 'Operador2',
+            'operator_3': 'Operador3'
+        };
+        
+        // Si es un operador conocido, usar el nombre real
+        if (operatorMapping[username]) {
+            return operatorMapping[username];
+        }
+        
+        // Convertir primera letra a mayúscula y el resto a minúscula
+        return username.charAt(0).toUpperCase() + username.slice(1).toLowerCase();
+    }
+
+    function formatPackageType(packageType) {
+        if (!packageType) return '';
+        switch (packageType.toUpperCase()) {
+            case 'MEDIA':
+                return 'Normal';
+            case 'EXTRA_DIMENSIONADO':
+            case 'EXTRA DIMENSIONADO':
+            case 'EXTRA_DIMENSIONED':
+                return 'Extra Dimensionado';
+            default:
+                return packageType;
+        }
+    }
+
+    function formatPackageCondition(condition) {
+        if (!condition) return '';
+        switch (condition.toUpperCase()) {
+            case 'BUENO':
+            case 'BUENO':
+                return 'Bueno';
+            case 'DAÑADO':
+            case 'DANADO':
+                return 'Dañado';
+            case 'REGULAR':
+            case 'INCOMPLETO':
+                return 'Regular';
+            default:
+                return condition;
+        }
+    }
+
+    function getFirstName(fullName) {
+        if (!fullName) return 'Cliente';
+        
+        // Dividir el nombre completo por espacios y tomar solo el primer elemento
+        const nameParts = fullName.trim().split(' ');
+        return nameParts[0] || 'Cliente';
+    }
+
+    function displayTimeline(history) {
+        console.log('🚀 INICIANDO displayTimeline con historial:', history);
+        const timelineContainer = document.getElementById('timelineEvents');
+        console.log('🔍 Elemento timelineContainer encontrado:', timelineContainer);
+        if (!timelineContainer) {
+            console.log('❌ No se encontró el elemento timelineContainer');
+            return;
+        }
+        
+        timelineContainer.innerHTML = '';
+        console.log('✅ Contenido de timelineContainer limpiado');
+        
+        // Filtrar solo eventos con información (timestamp o details relevantes)
+        const filtered = (history || []).filter(item => {
+            if (!item) return false;
+            const hasTimestamp = !!item.timestamp;
+            const hasDetails = !!(item.details && (Object.keys(item.details).length > 0));
+            return hasTimestamp || hasDetails; // solo eventos con datos
+        });
+
+        // Ordenar historial por timestamp
+        filtered.sort((a, b) => new Date(a.timestamp) - new Date(b.timestamp));
+        console.log('✅ Historial ordenado:', history);
+        
+        filtered.forEach((item, index) => {
+            const isLast = index === history.length - 1;
+            const timelineItem = document.createElement('div');
+            timelineItem.className = 'relative flex items-start space-x-4';
+            
+            // Configuración según el estado
+            const statusConfig = getStatusConfig(item.status);
+            
+            // Formatear fecha en formato dd/mm/yyyy hh:mm {am/pm}
+            const timestamp = formatDateShort(item.timestamp);
+            
+            timelineItem.innerHTML = `
+                <!-- Icono del evento -->
+                <div class="flex-shrink-0">
+                    <div class="relative">
+                        <div class="w-12 h-12 rounded-full ${statusConfig.bgClass} flex items-center justify-center shadow-sm border-3 border-white">
+                            <svg class="w-6 h-6 ${statusConfig.textClass}" fill="none" stroke="currentColor" viewBox="0 0 24 24">
+                                ${statusConfig.icon}
+                            </svg>
+                        </div>
+                    </div>
+                </div>
+                
+                <!-- Contenido del evento -->
+                <div class="flex-1 min-w-0 bg-white rounded-lg shadow-sm border border-gray-200 p-4 ml-4">
+                    <div class="flex items-center justify-between mb-2">
+                        <h5 class="text-base font-semibold ${statusConfig.textClass}">${item.description}</h5>
+                    </div>
+                    
+                    <div class="text-sm text-gray-600 mb-2 flex items-center">
+                        <svg class="w-4 h-4 mr-1 flex-shrink-0" fill="none" stroke="currentColor" viewBox="0 0 24 24">
+                            <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M8 7V3m8 4V3m-9 8h10M5 21h14a2 2 0 002-2V7a2 2 0 00-2-2H5a2 2 0 00-2 2v12a2 2 0 002 2z"></path>
+                        </svg>
+                        <span class="font-medium">${timestamp}</span>
+                    </div>
+                    
+                    ${formatEventDetails(item.details, item.status)}
+                </div>
+            `;
+            
+            timelineContainer.appendChild(timelineItem);
+        });
+        
+        console.log('✅ Timeline completado. Elementos agregados:', timelineContainer.children.length);
+        console.log('🔍 Contenido final de timelineContainer:', timelineContainer.innerHTML.substring(0, 200) + '...');
+    }
+
+    function displayConversationHistory(trackingCode) {
+        console.log('🚀 INICIANDO displayConversationHistory para tracking:', trackingCode);
+        console.log('🔍 Estado inicial de conversationHistory:', document.getElementById('conversationHistory')?.classList.toString());
+        
+        const conversationContainer = document.getElementById('conversationContainer');
+        const conversationHistory = document.getElementById('conversationHistory');
+        
+        if (!conversationContainer) {
+            console.log('❌ No se encontró conversationContainer');
+            return;
+        }
+        
+        console.log('✅ conversationContainer encontrado');
+        conversationContainer.innerHTML = '';
+        
+        // Hacer llamada a la API para obtener los mensajes
+        fetch(`/api/messages/tracking/${encodeURIComponent(trackingCode)}`)
+            .then(response => {
+                console.log('📡 Response status para mensajes:', response.status);
+                if (!response.ok) {
+                    throw new Error('Error al obtener mensajes');
+                }
+                return response.json();
+            })
+            .then(messages => {
+                console.log('✅ Mensajes recibidos:', messages);
+                console.log('🔍 Tipo de messages:', typeof messages);
+                console.log('🔍 Es array:', Array.isArray(messages));
+                console.log('🔍 Longitud:', messages ? messages.length : 'undefined');
+                
+                if (!messages || !Array.isArray(messages) || messages.length === 0) {
+                    // Ocultar la sección completa si no hay mensajes
+                    if (conversationHistory) {
+                        conversationHistory.classList.add('hidden');
+                        console.log('✅ Sección de conversaciones ocultada - no hay mensajes');
+                    }
+                    return;
+                }
+                
+                // Mostrar la sección solo si hay mensajes
+                if (conversationHistory) {
+                    conversationHistory.classList.remove('hidden');
+                    console.log('✅ Sección de conversaciones mostrada - hay mensajes');
+                }
+                
+                // Ordenar mensajes por fecha (más antiguos primero para mostrar conversación cronológica)
+                messages.sort((a, b) => new Date(a.created_at) - new Date(b.created_at));
+                
+                // Mostrar cada mensaje (cada mensaje ya contiene la pregunta y posible respuesta)
+                messages.forEach((message, index) => {
+                    
+                    // Crear contenedor para el grupo de conversación
+                    const conversationGroup = document.createElement('div');
+                    conversationGroup.className = 'mb-6 space-y-4';
+                    
+                    // 1. PREGUNTA DEL CLIENTE
+                    const inquiryDiv = document.createElement('div');
+                    inquiryDiv.className = 'bg-blue-50 rounded-lg border border-blue-200 p-4';
+                    
+                    // Estado de la pregunta (usar los valores proporcionados por el backend)
+                    let statusText = message.status_text || 'PENDIENTE';
+                    let statusClass = message.status_class || 'bg-yellow-100 text-yellow-800';
+                    
+                    // Formatear fecha con formato dd/mm/yyyy hh:mm {am/pm}
+                    const inquiryDate = formatDateShort(message.created_at);
+                    
+                    inquiryDiv.innerHTML = `
+                        <div class="flex items-start justify-between mb-3">
+                            <div class="flex items-center space-x-3">
+                                <div class="flex-shrink-0">
+                                    <!-- Icono eliminado -->
+                                </div>
+                                <div>
+                                    <h4 class="text-sm font-medium text-gray-900">${message.customer_name || 'Cliente'}</h4>
+                                    <p class="text-xs text-gray-500">${inquiryDate}</p>
+                                </div>
+                            </div>
+                            <span class="inline-flex items-center px-2.5 py-0.5 rounded-full text-xs font-medium ${statusClass}">${statusText}</span>
+                        </div>
+                        
+                        <div class="text-sm text-gray-700 leading-relaxed">
+                            ${message.content}
+                        </div>
+                    `;
+                    
+                    conversationGroup.appendChild(inquiryDiv);
+                    
+                    // 2. RESPUESTA DEL ADMINISTRADOR (si existe)
+                    if (message.admin_response) {
+                        const responseDiv = document.createElement('div');
+                        responseDiv.className = 'bg-green-50 rounded-lg border border-green-200 p-4 ml-8';
+                        
+                        // Formatear fecha de respuesta
+                        const responseDate = message.answered_at ? formatDateShort(message.answered_at) : formatDateShort(message.created_at);
+                        
+                        // Username del administrador (con primera letra en mayúscula)
+                        const adminUsername = message.admin_username ? 
+                            message.admin_username.charAt(0).toUpperCase() + message.admin_username.slice(1).toLowerCase() : 
+                            'Administrador';
+                        
+                        responseDiv.innerHTML = `
+                            <div class="flex items-start justify-between mb-3">
+                                <div class="flex items-center space-x-3">
+                                    <div class="flex-shrink-0">
+                                        <svg class="w-5 h-5 text-green-500" fill="none" stroke="currentColor" viewBox="0 0 24 24">
+                                            <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M9 12l2 2 4-4m6 2a9 9 0 11-18 0 9 9 0 0118 0z"></path>
+                                        </svg>
+                                    </div>
+                                    <div>
+                                        <h4 class="text-sm font-medium text-gray-900">Respuesta de ${adminUsername}</h4>
+                                        <p class="text-xs text-gray-500">${responseDate}</p>
+                                    </div>
+                                </div>
+                            </div>
+                            
+                            <div class="text-sm text-gray-700 leading-relaxed">
+                                ${message.admin_response}
+                            </div>
+                        `;
+                        
+                        conversationGroup.appendChild(responseDiv);
+                    }
+                    
+                    conversationContainer.appendChild(conversationGroup);
+                });
+                
+                console.log('✅ Historial de conversaciones mostrado');
+            })
+            .catch(error => {
+                console.error('❌ Error obteniendo mensajes:', error);
+                // En caso de error, ocultar la sección
+                if (conversationHistory) {
+                    conversationHistory.classList.add('hidden');
+                    console.log('✅ Sección de conversaciones ocultada - error al cargar mensajes');
+                }
+                conversationContainer.innerHTML = `
+                    <div class="text-center py-8 text-red-500">
+                        <svg class="mx-auto h-12 w-12 text-red-400 mb-4" fill="none" stroke="currentColor" viewBox="0 0 24 24">
+                            <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M12 8v4m0 4h.01M21 12a9 9 0 11-18 0 9 9 0 0118 0z"></path>
+                        </svg>
+                        <p class="text-sm">Error al cargar las conversaciones</p>
+                    </div>
+                `;
+            });
+    }
+
+    function getStatusConfig(status) {
+        switch(status) {
+            case 'ANUNCIADO':
+                return {
+                    icon: '<path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M20 7l-8-4-8 4m16 0l-8 4m8-4v10l-8 4m0-10L4 7m8 4v10M4 7v10l8 4"></path>',
+                    statusText: 'Anunciado',
+                    bgClass: 'bg-blue-100',
+                    textClass: 'text-blue-800',
+                    badgeClass: 'bg-blue-100 text-blue-800',
+                    lineClass: 'bg-blue-200'
+                };
+            case 'RECIBIDO':
+                return {
+                    icon: '<path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M7 16a4 4 0 01-.88-7.903A5 5 0 1115.9 6L16 6a5 5 0 011 9.9M9 19l3 3m0 0l3-3m-3 3V10"></path>',
+                    statusText: 'Recibido',
+                    bgClass: 'bg-yellow-100',
+                    textClass: 'text-yellow-800',
+                    badgeClass: 'bg-yellow-100 text-yellow-800',
+                    lineClass: 'bg-yellow-200'
+                };
+            case 'ENTREGADO':
+                return {
+                    icon: '<path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M9 12l2 2 4-4m6 2a9 9 0 11-18 0 9 9 0 0118 0z"></path>',
+                    statusText: 'Entregado',
+                    bgClass: 'bg-green-100',
+                    textClass: 'text-green-800',
+                    badgeClass: 'bg-green-100 text-green-800',
+                    lineClass: 'bg-green-200'
+                };
+            case 'CANCELADO':
+                return {
+                    icon: '<path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M6 18L18 6M6 6l12 12"></path>',
+                    statusText: 'Cancelado',
+                    bgClass: 'bg-red-100',
+                    textClass: 'text-red-800',
+                    badgeClass: 'bg-red-100 text-red-800',
+                    lineClass: 'bg-red-200'
+                };
+            default:
+                return {
+                    icon: '<path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M8.228 9c.549-1.165 2.03-2 3.772-2 2.21 0 4 1.343 4 3 0 1.4-1.278 2.575-3.006 2.907-.542.104-.994.54-.994 1.093m0 3h.01M21 12a9 9 0 11-18 0 9 9 0 0118 0z"></path>',
+                    statusText: status,
+                    bgClass: 'bg-gray-100',
+                    textClass: 'text-gray-800',
+                    badgeClass: 'bg-gray-100 text-gray-800',
+                    lineClass: 'bg-gray-200'
+                };
+        }
+    }
+
+    function formatEventDetails(details, status) {
+        if (!details) return '';
+        
+        let detailsHTML = '<div class="bg-gray-50 rounded-lg p-4 space-y-2">';
+        
+        switch(status) {
+            case 'ANUNCIADO':
+                detailsHTML += `
+                    <div class="flex items-center text-sm">
+                        <svg class="w-4 h-4 mr-2 text-blue-500" fill="none" stroke="currentColor" viewBox="0 0 24 24">
+                            <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M16 7a4 4 0 11-8 0 4 4 0 018 0zM12 14a7 7 0 00-7 7h14a7 7 0 00-7-7z"></path>
+                        </svg>
+                        <span class="font-medium">Cliente:</span>
+                        <span class="ml-2 font-semibold uppercase">${(details.customer_name || '').toUpperCase()}</span>
+                    </div>
+                    <div class="flex items-center text-sm">
+                        <svg class="w-4 h-4 mr-2 text-blue-500" fill="none" stroke="currentColor" viewBox="0 0 24 24">
+                            <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M3 5a2 2 0 012-2h3.28a1 1 0 01.948.684l1.498 4.493a1 1 0 01-.502 1.21l-2.257 1.13a11.042 11.042 0 005.516 5.516l1.13-2.257a1 1 0 011.21-.502l4.493 1.498a1 1 0 01.684.949V19a2 2 0 01-2 2h-1C9.716 21 3 14.284 3 6V5z"></path>
+                        </svg>
+                        <span class="font-medium">Teléfono:</span>
+                        <span class="ml-2">${createWhatsAppLinkHTML(details.customer_phone, `PAQUETE ${details.guide_number || details.tracking_code}`)}</span>
+                    </div>
+                `;
+                break;
+            case 'RECIBIDO':
+                detailsHTML += `
+                    <div class="flex items-center text-sm">
+                        <svg class="w-4 h-4 mr-2 text-yellow-500" fill="none" stroke="currentColor" viewBox="0 0 24 24">
+                            <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M16 7a4 4 0 11-8 0 4 4 0 018 0zM12 14a7 7 0 00-7 7h14a7 7 0 00-7-7z"></path>
+                        </svg>
+                        <span class="font-medium">Recibió:</span>
+                        <span class="ml-2 font-semibold uppercase">${(formatUserName(details.received_by) || 'Sistema').toUpperCase()}</span>
+                    </div>
+                    <div class="flex items-center text-sm">
+                        <svg class="w-4 h-4 mr-2 text-yellow-500" fill="none" stroke="currentColor" viewBox="0 0 24 24">
+                            <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M20 7l-8-4-8 4m16 0l-8 4m8-4v10l-8 4m0-10L4 7m8 4v10M4 7v10l8 4"></path>
+                        </svg>
+                        <span class="font-medium">Tipo:</span>
+                        <span class="ml-2 font-semibold uppercase">${(formatPackageType(details.package_type) || 'No especificado').toUpperCase()}</span>
+                    </div>
+                    <div class="flex items-center text-sm">
+                        <svg class="w-4 h-4 mr-2 text-yellow-500" fill="none" stroke="currentColor" viewBox="0 0 24 24">
+                            <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M9 12l2 2 4-4m6 2a9 9 0 11-18 0 9 9 0 0118 0z"></path>
+                        </svg>
+                        <span class="font-medium">Condición:</span>
+                        <span class="ml-2 font-semibold uppercase">${(formatPackageCondition(details.package_condition) || 'No especificada').toUpperCase()}</span>
+                    </div>
+                    ${details.images && details.images.length > 0 ? `
+                    <div class="mt-4">
+                        <div class="flex items-center mb-3">
+                            <svg class="w-5 h-5 text-blue-500 mr-2" fill="none" stroke="currentColor" viewBox="0 0 24 24">
+                                <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M4 16l4.586-4.586a2 2 0 012.828 0L16 16m-2-2l1.586-1.586a2 2 0 012.828 0L20 14m-6-6h.01M6 20h12a2 2 0 002-2V6a2 2 0 00-2-2H6a2 2 0 00-2 2v12a2 2 0 002 2z"></path>
+                            </svg>
+                            <h4 class="text-sm font-medium text-gray-700">Imágenes</h4>
+                            <span class="ml-2 bg-blue-100 text-blue-800 text-xs px-2 py-1 rounded-full">${details.images.length} imagen${details.images.length > 1 ? 'es' : ''}</span>
+                        </div>
+                        <div class="grid grid-cols-2 sm:grid-cols-3 md:grid-cols-4 gap-3">
+                            ${details.images.map((img, index) => `
+                                ${img.s3_url ? `
+                                <div class="group block cursor-pointer image-gallery-trigger" data-images='${JSON.stringify(details.images)}' data-index="${index}" style="cursor: pointer;">
+                                    <div class="aspect-square bg-gray-100 rounded-lg overflow-hidden border-2 border-gray-200 group-hover:border-blue-400 transition-all duration-200 shadow-sm group-hover:shadow-md relative">
+                                        <img src="${img.s3_url}"
+                                             alt="Imagen del paquete ${index + 1}"
+                                             class="w-full h-full object-cover group-hover:scale-105 transition-transform duration-200"
+                                             loading="lazy"
+                                             onerror="loadImageWithFallback(this, '${img.s3_url}', '${img.filename}', ${index})">
+                                        <div class="hidden absolute inset-0 items-center justify-center bg-gray-100 text-gray-400 flex-col p-2">
+                                            <svg class="w-8 h-8 mb-2" fill="none" stroke="currentColor" viewBox="0 0 24 24">
+                                                <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M4 16l4.586-4.586a2 2 0 012.828 0L16 16m-2-2l1.586-1.586a2 2 0 012.828 0L20 14m-6-6h.01M6 20h12a2 2 0 002-2V6a2 2 0 00-2-2H6a2 2 0 00-2 2v12a2 2 0 002 2z"></path>
+                                            </svg>
+                                            <span class="error-info text-xs text-center">Imagen no disponible</span>
+                                        </div>
+
+                                        <!-- 
+                                        <div class="absolute bottom-2 left-2 right-2 bg-blue-600 bg-opacity-90 text-white text-xs px-2 py-1 rounded text-center opacity-0 group-hover:opacity-100 transition-opacity duration-200 flex items-center justify-center">
+                                            <svg class="w-3 h-3 mr-1" fill="none" stroke="currentColor" viewBox="0 0 24 24">
+                                                <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M15 12a3 3 0 11-6 0 3 3 0 016 0z"></path>
+                                                <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M2.458 12C3.732 7.943 7.523 5 12 5c4.478 0 8.268 2.943 9.542 7-1.274 4.057-5.064 7-9.542 7-4.477 0-8.268-2.943-9.542-7z"></path>
+                                            </svg>
+                                            Ver galería
+                                        </div> 
+                                        -->
+                                    </div>
+                                </div>
+                                ` : `
+                                <div class="group block">
+                                    <div class="aspect-square bg-gray-100 rounded-lg overflow-hidden border-2 border-gray-300 relative opacity-60">
+                                        <div class="absolute inset-0 items-center justify-center bg-gray-100 text-gray-400 flex">
+                                            <svg class="w-8 h-8" fill="none" stroke="currentColor" viewBox="0 0 24 24">
+                                                <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M4 16l4.586-4.586a2 2 0 012.828 0L16 16m-2-2l1.586-1.586a2 2 0 012.828 0L20 14m-6-6h.01M6 20h12a2 2 0 002-2V6a2 2 0 00-2-2H6a2 2 0 00-2 2v12a2 2 0 002 2z"></path>
+                                            </svg>
+                                        </div>
+                                        <div class="absolute top-2 right-2 bg-gray-500 bg-opacity-60 text-white text-xs px-2 py-1 rounded-full">
+                                            ${index + 1}
+                                        </div>
+                                        <div class="absolute bottom-2 left-2 right-2 bg-red-500 bg-opacity-80 text-white text-xs px-2 py-1 rounded text-center">
+                                            No disponible
+                                        </div>
+                                    </div>
+                                </div>
+                                `}
+                            `).join('')}
+                        </div>
+                    </div>
+                    ` : `
+                    <div class="mt-4 p-4 bg-gray-50 rounded-lg border border-gray-200">
+                        <div class="flex items-center justify-center text-gray-500">
+                            <svg class="w-6 h-6 mr-2" fill="none" stroke="currentColor" viewBox="0 0 24 24">
+                                <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M4 16l4.586-4.586a2 2 0 012.828 0L16 16m-2-2l1.586-1.586a2 2 0 012.828 0L20 14m-6-6h.01M6 20h12a2 2 0 002-2V6a2 2 0 00-2-2H6a2 2 0 00-2 2v12a2 2 0 002 2z"></path>
+                            </svg>
+                            <span class="text-sm">No hay imágenes disponibles para este paquete</span>
+                        </div>
+                    </div>
+                    `}
+                `;
+                break;
+
+            case 'ENTREGADO':
+                detailsHTML += `
+                    <div class="flex items-center text-sm">
+                        <svg class="w-4 h-4 mr-2 text-green-500" fill="none" stroke="currentColor" viewBox="0 0 24 24">
+                            <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M16 7a4 4 0 11-8 0 4 4 0 018 0zM12 14a7 7 0 00-7 7h14a7 7 0 00-7-7z"></path>
+                        </svg>
+                        <span class="font-medium">Entregado a:</span>
+                        <span class="ml-2 font-semibold uppercase">${getFirstName(details.delivered_to || details.customer_name || 'Cliente').toUpperCase()}</span>
+                    </div>
+                    ${details.total_cost ? `
+                    <div class="flex items-center text-sm">
+                        <svg class="w-4 h-4 mr-2 text-green-500" fill="none" stroke="currentColor" viewBox="0 0 24 24">
+                            <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M12 8c-1.657 0-3 .895-3 2s1.343 2 3 2 3 .895 3 2-1.343 2-3 2m0-8c1.11 0 2.08.402 2.599 1M12 8V7m0 1v8m0 0v1m0-1c-1.11 0-2.08-.402-2.599-1"></path>
+                        </svg>
+                        <span class="font-medium">Costo total:</span>
+                        <span class="ml-2">$${details.total_cost}</span>
+                    </div>
+                    ` : ''}
+                `;
+                break;
+            case 'CANCELADO':
+                detailsHTML += `
+                    <div class="flex items-center text-sm">
+                        <svg class="w-4 h-4 mr-2 text-red-500" fill="none" stroke="currentColor" viewBox="0 0 24 24">
+                            <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M12 9v2m0 4h.01m-6.938 4h13.856c1.54 0 2.502-1.667 1.732-2.5L13.732 4c-.77-.833-1.964-.833-2.732 0L3.732 16.5c-.77.833.192 2.5 1.732 2.5z"></path>
+                        </svg>
+                        <span class="font-medium">Motivo:</span>
+                        <span class="ml-2">${details.reason || 'Cancelado por administrador'}</span>
+                    </div>
+                `;
+                break;
+        }
+        
+        detailsHTML += '</div>';
+        return detailsHTML;
+    }
+
+    function showSearchError(errorType) {
+        // Ocultar resultados de búsqueda y loading
+        const searchResults = document.getElementById('searchResults');
+        const loadingSpinner = document.getElementById('loadingSpinner');
+        
+        if (searchResults) searchResults.classList.add('hidden');
+        if (loadingSpinner) loadingSpinner.classList.add('hidden');
+        
+        const errorMessages = {
+            'NOT_FOUND': '❌ No se encontró ningún paquete con ese número de guía o código de consulta.',
+            'SEARCH_ERROR': '⚠️ Hubo un problema al buscar tu paquete. Por favor, intenta nuevamente.',
+            'VALIDATION_ERROR': '⚠️ Por favor, ingresa un número de guía o código de consulta válido.'
+        };
+        
+        const errorMessage = errorMessages[errorType] || '❌ Error inesperado. Por favor, contacta al administrador.';
+        const searchField = document.getElementById('searchQuery');
+        
+        if (searchField && typeof window.mostrarErrorTooltip === 'function') {
+            window.mostrarErrorTooltip(searchField, errorMessage);
+        } else {
+            showErrorFallback(errorType);
+        }
+    }
+    
+    function showErrorFallback(errorType) {
+        // Sistema de fallback sin tooltips
+        let errorMessage = '';
+        let errorTitle = '';
+        
+        switch(errorType) {
+            case 'NOT_FOUND':
+            case 'NO ENCONTRADO':
+                errorTitle = '🔍 Paquete no encontrado';
+                errorMessage = 'No encontramos ningún paquete con ese número de guía. Por favor, verifica que el número sea correcto e intenta nuevamente.';
+                break;
+            case 'SEARCH_ERROR':
+            case 'ERROR AL BUSCAR EL PAQUETE':
+                errorTitle = '⚠️ Problema en la búsqueda';
+                errorMessage = 'Hubo un problema al buscar tu paquete. Por favor, intenta nuevamente en unos momentos.';
+                break;
+            default:
+                errorTitle = '❌ Algo salió mal';
+                errorMessage = errorType || 'Algo salió mal. Por favor, intenta nuevamente o contacta al administrador.';
+        }
+        
+        // Crear mensaje de error modal
+        const newErrorDiv = document.createElement('div');
+        newErrorDiv.id = 'dynamicErrorMessage';
+        newErrorDiv.style.cssText = `
+            position: fixed;
+            top: 50%;
+            left: 50%;
+            transform: translate(-50%, -50%);
+            background: white;
+            border: 2px solid #ef4444;
+            border-radius: 12px;
+            padding: 24px;
+            box-shadow: 0 20px 25px -5px rgba(0, 0, 0, 0.1), 0 10px 10px -5px rgba(0, 0, 0, 0.04);
+            z-index: 9999;
+            max-width: 400px;
+            width: 90%;
+            text-align: center;
+        `;
+        
+        newErrorDiv.innerHTML = `
+            <div style="margin-bottom: 16px;">
+                <div style="width: 48px; height: 48px; background: #fef2f2; border-radius: 50%; display: flex; align-items: center; justify-content: center; margin: 0 auto 12px;">
+                    <svg style="width: 24px; height: 24px; color: #ef4444;" fill="none" stroke="currentColor" viewBox="0 0 24 24">
+                        <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M12 9v2m0 4h.01m-6.938 4h13.856c1.54 0 2.502-1.667 1.732-2.5L13.732 4c-.77-.833-1.964-.833-2.732 0L3.732 16.5c-.77.833.192 2.5 1.732 2.5z"></path>
+                    </svg>
+                </div>
+                <h2 style="font-size: 24px; font-weight: 600; color: #111827; margin: 0 0 12px;">${errorTitle}</h2>
+                <p style="color: #6b7280; margin: 0; font-size: 16px; line-height: 1.5;">${errorMessage}</p>
+            </div>
+            <div style="margin-top: 20px;">
+                <button onclick="document.getElementById('dynamicErrorMessage').remove()" 
+                        style="background: #3b82f6; color: white; border: none; padding: 10px 20px; border-radius: 6px; cursor: pointer; font-size: 14px;">
+                    Cerrar
+                </button>
+            </div>
+        `;
+        
+        // Remover mensaje anterior si existe
+        const existingError = document.getElementById('dynamicErrorMessage');
+        if (existingError) {
+            existingError.remove();
+        }
+        
+        // Agregar al DOM
+        document.body.appendChild(newErrorDiv);
+    }
+
+    // Funcionalidad del formulario de consulta
+    document.addEventListener('DOMContentLoaded', function() {
+        const inquiryForm = document.getElementById('inquiryForm');
+        if (inquiryForm) {
+            inquiryForm.addEventListener('submit', function(e) {
+                e.preventDefault();
+                submitInquiry();
+            });
+        }
+        
+        // Inicializar contador de caracteres y palabras
+        updateContentCounter();
+        
+        // Event listener para verificar consultas existentes cuando el usuario escriba en el email
+        const emailField = document.getElementById('customer_email');
+        if (emailField) {
+            let checkTimeout;
+            emailField.addEventListener('input', function() {
+                // Limpiar timeout anterior
+                clearTimeout(checkTimeout);
+                
+                // Esperar 1 segundo después de que el usuario deje de escribir
+                checkTimeout = setTimeout(() => {
+                    const trackingCode = window.currentPackageInfo && window.currentPackageInfo.tracking_code ? window.currentPackageInfo.tracking_code : null;
+                    if (trackingCode) {
+                        checkExistingInquiry(trackingCode);
+                    }
+                }, 1000);
+            });
+        }
+    });
+
+    function checkExistingEmailForTracking(trackingCode) {
+        console.log('🔍 Verificando si existe email registrado para tracking:', trackingCode);
+        
+        // Verificar el estado del paquete antes de mostrar el formulario
+        const currentStatus = window.currentPackageStatus || 'UNKNOWN';
+        const allowedStatuses = ['ANUNCIADO', 'RECIBIDO'];
+        const canMakeInquiries = allowedStatuses.includes(currentStatus);
+        
+        if (!canMakeInquiries) {
+            console.log('❌ checkExistingEmailForTracking - No se puede mostrar formulario para estado:', currentStatus);
+            return;
+        }
+        
+        // Hacer llamada a la API para verificar si existe un email registrado para este tracking code
+        fetch(`/api/messages/check-tracking-inquiries?package_tracking_code=${encodeURIComponent(trackingCode)}`)
+            .then(response => {
+                console.log('📡 Response status para verificar email:', response.status);
+                if (!response.ok) {
+                    throw new Error('Error al verificar email registrado');
+                }
+                return response.json();
+            })
+            .then(data => {
+                console.log('✅ Datos de verificación de email:', data);
+                
+                // Verificar si existe un mensaje PENDING o UNREAD para este tracking code
+                if (data.exists && data.count > 0) {
+                    // Verificar si hay algún mensaje con estado PENDING o UNREAD
+                    if (data.has_pending || data.has_unread) {
+                        console.log('🚫 MENSAJE PENDIENTE ENCONTRADO - No se puede enviar nueva consulta');
+                        showPendingMessageWarning(data);
+                        return;
+                    }
+                    
+                    // Si no hay mensajes PENDING o UNREAD, verificar si existe email registrado
+                    if (data.latest_inquiry && data.latest_inquiry.customer_email) {
+                        console.log('🔥🔥🔥 EMAIL YA REGISTRADO:', data.latest_inquiry.customer_email);
+                        
+                        // Guardar el email registrado en una variable global para usar en el envío
+                        window.registeredEmailForTracking = data.latest_inquiry.customer_email;
+                        
+                        // Crear objeto con la información del email registrado
+                        const emailInfo = {
+                            has_existing_email: true,
+                            registered_email: data.latest_inquiry.customer_email,
+                            inquiry_count: data.count,
+                            latest_inquiry_date: data.latest_inquiry.created_at
+                        };
+                        
+                        showEmailRegisteredMessage(emailInfo);
+                    } else {
+                        console.log('✅ No existe email registrado, mostrando formulario completo');
+                        // Limpiar la variable global
+                        window.registeredEmailForTracking = null;
+                        showInquiryFormContainer();
+                    }
+                } else {
+                    console.log('✅ No existe email registrado, mostrando formulario completo');
+                    // Limpiar la variable global
+                    window.registeredEmailForTracking = null;
+                    showInquiryFormContainer();
+                }
+            })
+            .catch(error => {
+                console.error('❌ Error verificando email registrado:', error);
+                // En caso de error, limpiar variable y mostrar formulario completo
+                window.registeredEmailForTracking = null;
+                showInquiryFormContainer();
+            });
+    }
+
+    function showInquiryFormWithInfo(announcement, inquiryInfo) {
+        console.log('🚀 INICIANDO showInquiryFormWithInfo');
+        console.log('📋 announcement:', announcement);
+        console.log('📋 inquiryInfo:', inquiryInfo);
+
+        // Verificar el estado del paquete antes de mostrar el formulario
+        const currentStatus = window.currentPackageStatus || 'UNKNOWN';
+        const allowedStatuses = ['ANUNCIADO', 'RECIBIDO'];
+        const canMakeInquiries = allowedStatuses.includes(currentStatus);
+        
+        console.log('🔍 showInquiryFormWithInfo - Estado actual:', currentStatus);
+        console.log('🔍 showInquiryFormWithInfo - ¿Puede hacer consultas?', canMakeInquiries);
+        
+        if (!canMakeInquiries) {
+            console.log('❌ showInquiryFormWithInfo - No se puede mostrar formulario para estado:', currentStatus);
+            return;
+        }
+
+        // Validar que announcement existe
+        if (!announcement) {
+            console.error('❌ ERROR: announcement es undefined o null en showInquiryFormWithInfo');
+            return;
+        }
+
+        // Guardar información del paquete en variables globales para usar en submitInquiry
+        window.currentPackageInfo = {
+            customer_name: announcement.customer_name || '',
+            customer_phone: announcement.customer_phone || '',
+            guide_number: announcement.guide_number || '',
+            tracking_code: announcement.tracking_code || ''
+        };
+        
+        console.log('📋 Mostrando formulario de consulta con información:', inquiryInfo);
+        console.log('🔧 DEBUG: inquiryInfo es null/undefined?', inquiryInfo === null || inquiryInfo === undefined);
+        console.log('🔧 DEBUG: inquiryInfo.has_existing_email =', inquiryInfo ? inquiryInfo.has_existing_email : 'undefined');
+        
+        // Verificar si ya existen consultas con email para este tracking code
+        if (announcement && announcement.tracking_code) {
+            checkExistingEmailForTracking(announcement.tracking_code);
+        } else if (inquiryInfo && inquiryInfo.has_existing_email) {
+            console.log('🔥🔥🔥 YA EXISTE EMAIL REGISTRADO, MOSTRANDO MENSAJE INFORMATIVO 🔥🔥🔥');
+            showEmailRegisteredMessage(inquiryInfo);
+        } else {
+            console.log('✅ No existe email registrado, mostrando formulario completo');
+            console.log('🔧 DEBUG: Llamando a showInquiryFormContainer');
+            showInquiryFormContainer();
+        }
+    }
+    
+    function showInquiryForm(announcement) {
+        // Función legacy - mantener para compatibilidad
+        showInquiryFormWithInfo(announcement, null);
+    }
+    
+    function checkTrackingInquiries(trackingCode) {
+        console.log('🔍 Verificando consultas existentes para tracking:', trackingCode);
+        
+        fetch(`/api/messages/check-tracking-inquiries?package_tracking_code=${encodeURIComponent(trackingCode)}`)
+            .then(response => {
+                console.log('📡 Response status:', response.status);
+                if (!response.ok) {
+                    throw new Error('Error al verificar consultas del tracking');
+                }
+                return response.json();
+            })
+            .then(data => {
+                console.log('✅ Datos de consultas del tracking:', data);
+                if (data.exists && data.count > 0) {
+                    // Ya existen consultas para este tracking code
+                    console.log('❌ Ya existen consultas para este tracking code:', data.count);
+                    hideEmailFieldAndShowMessage(data.latest_inquiry.created_at);
+                } else {
+                    // No existen consultas, mostrar formulario completo
+                    console.log('✅ No existen consultas previas, mostrando formulario completo');
+                    showInquiryFormContainer();
+                }
+            })
+            .catch(error => {
+                console.error('❌ Error verificando consultas del tracking:', error);
+                // En caso de error, mostrar el formulario por defecto
+                showInquiryFormContainer();
+            });
+    }
+    
+    function checkExistingInquiry(trackingCode) {
+        // Verificar el estado del paquete antes de mostrar el formulario
+        const currentStatus = window.currentPackageStatus || 'UNKNOWN';
+        const allowedStatuses = ['ANUNCIADO', 'RECIBIDO'];
+        const canMakeInquiries = allowedStatuses.includes(currentStatus);
+        
+        if (!canMakeInquiries) {
+            console.log('❌ checkExistingInquiry - No se puede mostrar formulario para estado:', currentStatus);
+            return;
+        }
+        
+        // Obtener el email del campo si está lleno
+        const emailField = document.getElementById('customer_email');
+        const customerEmail = emailField ? emailField.value.trim() : '';
+        
+        // Si no hay email, mostrar el formulario directamente
+        if (!customerEmail) {
+            showInquiryFormContainer();
+            return;
+        }
+        
+        // Verificar si ya existe una consulta con este email y código de tracking
+        console.log('🔍 Verificando consulta existente para:', customerEmail, 'y tracking:', trackingCode);
+        
+        fetch(`/api/messages/check-inquiry-exists?customer_email=${encodeURIComponent(customerEmail)}&package_tracking_code=${encodeURIComponent(trackingCode)}`)
+            .then(response => {
+                console.log('📡 Response status:', response.status);
+                if (!response.ok) {
+                    throw new Error('Error al verificar consulta existente');
+                }
+                return response.json();
+            })
+            .then(data => {
+                console.log('✅ Datos de verificación:', data);
+                if (data.exists && data.has_pending) {
+                    // Ya existe una consulta PENDIENTE, ocultar el campo de email y mostrar mensaje
+                    console.log('❌ Ya existe una consulta PENDIENTE para este email y paquete');
+                    hideEmailFieldAndShowMessage(data.created_at);
+                } else if (data.exists && !data.has_pending) {
+                    // Existe una consulta pero está RESUELTA, permitir nueva consulta
+                    console.log('✅ Existe consulta RESUELTA, permitiendo nueva consulta');
+                    showInquiryFormContainer();
+                } else {
+                    // No existe consulta previa, mostrar el formulario completo
+                    console.log('✅ No existe consulta previa, mostrando formulario completo');
+                    showInquiryFormContainer();
+                }
+            })
+            .catch(error => {
+                console.error('❌ Error verificando consulta existente:', error);
+                // En caso de error, mostrar el formulario por defecto
+                showInquiryFormContainer();
+            });
+    }
+    
+    function showInquiryFormContainer() {
+        // Verificar el estado del paquete antes de mostrar el formulario
+        const currentStatus = window.currentPackageStatus || 'UNKNOWN';
+        const allowedStatuses = ['ANUNCIADO', 'RECIBIDO'];
+        const canMakeInquiries = allowedStatuses.includes(currentStatus);
+        
+        console.log('🔍 showInquiryFormContainer - Estado actual:', currentStatus);
+        console.log('🔍 showInquiryFormContainer - ¿Puede hacer consultas?', canMakeInquiries);
+        
+        if (!canMakeInquiries) {
+            console.log('❌ showInquiryFormContainer - No se puede mostrar formulario para estado:', currentStatus);
+            return;
+        }
+        
+        // Mostrar el formulario completo
+        const inquiryFormContainer = document.getElementById('inquiryFormContainer');
+        if (inquiryFormContainer) {
+            inquiryFormContainer.classList.remove('hidden');
+            // Scroll al formulario
+            // Scroll automático desactivado
+            // inquiryFormContainer.scrollIntoView({ 
+            //     behavior: 'smooth' 
+            // });
+        }
+        
+        // Asegurar que el campo de email esté visible y los mensajes ocultos
+        const emailFieldContainer = document.getElementById('emailFieldContainer');
+        const emailField = document.getElementById('customer_email');
+        const existingInquiryMessage = document.getElementById('existingInquiryMessage');
+        const existingEmailMessage = document.getElementById('existingEmailMessage');
+        
+        if (emailFieldContainer) emailFieldContainer.classList.remove('hidden');
+        if (existingInquiryMessage) existingInquiryMessage.classList.add('hidden');
+        if (existingEmailMessage) existingEmailMessage.classList.add('hidden');
+        
+        // Restaurar el atributo required del campo de email cuando se muestra
+        if (emailField) {
+            emailField.setAttribute('required', 'required');
+            console.log('✅ Atributo required restaurado en el campo de email');
+        }
+        
+        // Restaurar campos de contenido y botón de envío
+        const contentField = document.getElementById('content');
+        const submitButton = document.getElementById('submitInquiryButton');
+        const submitButtonText = document.getElementById('submitInquiryButtonText');
+        
+        if (contentField) {
+            contentField.style.display = 'block';
+            console.log('✅ Campo de contenido restaurado');
+        }
+        
+        if (submitButton) {
+            submitButton.style.display = 'inline-flex';
+            submitButton.disabled = false;
+            submitButton.classList.remove('opacity-50', 'cursor-not-allowed');
+            console.log('✅ Botón de envío restaurado');
+        }
+        
+        if (submitButtonText) {
+            submitButtonText.style.display = 'inline';
+        }
+    }
+    
+    function showPendingMessageWarning(data) {
+        console.log('🚀 INICIANDO showPendingMessageWarning');
+        console.log('🔧 DEBUG: showPendingMessageWarning ejecutándose con:', data);
+        
+        // Verificar el estado del paquete antes de mostrar el formulario
+        const currentStatus = window.currentPackageStatus || 'UNKNOWN';
+        const allowedStatuses = ['ANUNCIADO', 'RECIBIDO'];
+        const canMakeInquiries = allowedStatuses.includes(currentStatus);
+        
+        if (!canMakeInquiries) {
+            console.log('❌ showPendingMessageWarning - No se puede mostrar formulario para estado:', currentStatus);
+            return;
+        }
+        
+        // Mostrar el formulario pero con mensaje de advertencia
+        const inquiryFormContainer = document.getElementById('inquiryFormContainer');
+        if (inquiryFormContainer) {
+            inquiryFormContainer.classList.remove('hidden');
+            // Scroll al formulario
+            // Scroll automático desactivado
+            // inquiryFormContainer.scrollIntoView({ 
+            //     behavior: 'smooth' 
+            // });
+        }
+        
+        // Ocultar el campo de email
+        const emailFieldContainer = document.getElementById('emailFieldContainer');
+        if (emailFieldContainer) {
+            emailFieldContainer.classList.add('hidden');
+            console.log('✅ Campo de email ocultado');
+        }
+        
+        // Mostrar mensaje de consulta pendiente
+        const existingInquiryMessage = document.getElementById('existingInquiryMessage');
+        const existingInquiryDate = document.getElementById('existingInquiryDate');
+        
+        if (existingInquiryMessage) {
+            existingInquiryMessage.classList.remove('hidden');
+            console.log('✅ Mensaje de consulta pendiente mostrado');
+            
+            // Mostrar información de la consulta pendiente
+            const inquiryMessageContainer = document.getElementById('existingInquiryMessage');
+            if (inquiryMessageContainer) {
+                const messageText = inquiryMessageContainer.querySelector('#existingInquiryMessage p');
+                if (messageText) {
+                    messageText.textContent = 'Ya tienes una consulta PENDIENTE para este paquete. Espera a que te respondamos antes de enviar otra consulta.';
+                }
+            }
+            if (existingInquiryDate) {
+                existingInquiryDate.textContent = '';
+            }
+        }
+        
+        // Ocultar otros mensajes
+        const existingEmailMessage = document.getElementById('existingEmailMessage');
+        if (existingEmailMessage) {
+            existingEmailMessage.classList.add('hidden');
+        }
+        
+        // Ocultar el campo de texto y botón de envío completamente
+        const contentField = document.getElementById('content');
+        const submitButton = document.getElementById('submitInquiryButton');
+        const submitButtonText = document.getElementById('submitInquiryButtonText');
+        
+        if (contentField) {
+            contentField.style.display = 'none';
+            console.log('✅ Campo de contenido ocultado');
+        }
+        
+        if (submitButton) {
+            submitButton.style.display = 'none';
+            console.log('✅ Botón de envío ocultado');
+        }
+        
+        if (submitButtonText) {
+            submitButtonText.style.display = 'none';
+        }
+        
+        console.log('✅ Formulario mostrado con restricción completa de consulta PENDIENTE');
+    }
+
+    function showEmailRegisteredMessage(inquiryInfo) {
+        console.log('🚀 INICIANDO showEmailRegisteredMessage');
+        console.log('🔧 DEBUG: showEmailRegisteredMessage ejecutándose con:', inquiryInfo);
+        
+        // Verificar el estado del paquete antes de mostrar el formulario
+        const currentStatus = window.currentPackageStatus || 'UNKNOWN';
+        const allowedStatuses = ['ANUNCIADO', 'RECIBIDO'];
+        const canMakeInquiries = allowedStatuses.includes(currentStatus);
+        
+        if (!canMakeInquiries) {
+            console.log('❌ showEmailRegisteredMessage - No se puede mostrar formulario para estado:', currentStatus);
+            return;
+        }
+        
+        // Mostrar el formulario
+        const inquiryFormContainer = document.getElementById('inquiryFormContainer');
+        if (inquiryFormContainer) {
+            inquiryFormContainer.classList.remove('hidden');
+            // Scroll automático desactivado - el usuario puede navegar manualmente
+            // inquiryFormContainer.scrollIntoView({ 
+            //     behavior: 'smooth' 
+            // });
+        }
+        
+        // Ocultar el campo de email
+        const emailFieldContainer = document.getElementById('emailFieldContainer');
+        const emailField = document.getElementById('customer_email');
+        if (emailFieldContainer) {
+            emailFieldContainer.classList.add('hidden');
+            console.log('✅ Campo de email ocultado');
+        }
+        
+        // Remover el atributo required del campo de email para evitar errores de validación
+        if (emailField) {
+            emailField.removeAttribute('required');
+            console.log('✅ Atributo required removido del campo de email');
+        }
+        
+        // Mostrar mensaje de email registrado
+        const existingEmailMessage = document.getElementById('existingEmailMessage');
+        const registeredEmail = document.getElementById('registeredEmail');
+        
+        console.log('🔧 DEBUG: existingEmailMessage encontrado?', existingEmailMessage !== null);
+        console.log('🔧 DEBUG: registeredEmail encontrado?', registeredEmail !== null);
+        
+        if (existingEmailMessage) {
+            existingEmailMessage.classList.add('hidden');
+            console.log('✅ Mensaje de email registrado OCULTADO');
+        } else {
+            console.log('❌ No se encontró existingEmailMessage');
+        }
+        
+        // Ocultar otros mensajes
+        const existingInquiryMessage = document.getElementById('existingInquiryMessage');
+        if (existingInquiryMessage) {
+            existingInquiryMessage.classList.add('hidden');
+        }
+    }
+    
+    function hideEmailFieldAndShowMessage(createdAt) {
+        console.log('🔧 DEBUG: hideEmailFieldAndShowMessage ejecutándose con fecha:', createdAt);
+        
+        // Ocultar el campo de email
+        const emailFieldContainer = document.getElementById('emailFieldContainer');
+        const existingInquiryMessage = document.getElementById('existingInquiryMessage');
+        const existingInquiryDate = document.getElementById('existingInquiryDate');
+        
+        console.log('🔧 DEBUG: emailFieldContainer encontrado?', emailFieldContainer !== null);
+        console.log('🔧 DEBUG: existingInquiryMessage encontrado?', existingInquiryMessage !== null);
+        
+        if (emailFieldContainer) {
+            emailFieldContainer.classList.add('hidden');
+            console.log('✅ Campo de email ocultado');
+        } else {
+            console.log('❌ No se encontró emailFieldContainer');
+        }
+        
+        // Mostrar mensaje informativo
+        if (existingInquiryMessage) {
+            existingInquiryMessage.classList.remove('hidden');
+            console.log('✅ Mensaje de consulta existente mostrado');
+            
+            // Formatear fecha si está disponible
+            if (createdAt && existingInquiryDate) {
+                try {
+                    const date = new Date(createdAt);
+                    const formattedDate = date.toLocaleDateString('es-CO', {
+                        year: 'numeric',
+                        month: 'long',
+                        day: 'numeric',
+                        hour: '2-digit',
+                        minute: '2-digit'
+                    });
+                    existingInquiryDate.textContent = `Consulta enviada el ${formattedDate}. Te responderemos pronto.`;
+                    console.log('✅ Fecha formateada y mostrada:', formattedDate);
+                } catch (error) {
+                    existingInquiryDate.textContent = 'Ya has enviado una consulta PENDIENTE para este paquete anteriormente.';
+                    console.log('⚠️ Error formateando fecha, usando mensaje por defecto');
+                }
+            }
+        } else {
+            console.log('❌ No se encontró existingInquiryMessage');
+        }
+        
+        // Verificar el estado del paquete antes de mostrar el formulario
+        const currentStatus = window.currentPackageStatus || 'UNKNOWN';
+        const allowedStatuses = ['ANUNCIADO', 'RECIBIDO'];
+        const canMakeInquiries = allowedStatuses.includes(currentStatus);
+        
+        if (!canMakeInquiries) {
+            console.log('❌ hideEmailFieldAndShowMessage - No se puede mostrar formulario para estado:', currentStatus);
+            return;
+        }
+        
+        // Mostrar el formulario (sin el campo de email)
+        const inquiryFormContainer = document.getElementById('inquiryFormContainer');
+        if (inquiryFormContainer) {
+            inquiryFormContainer.classList.remove('hidden');
+            console.log('✅ Formulario de consulta mostrado');
+            // Scroll al formulario
+            // Scroll automático desactivado
+            // inquiryFormContainer.scrollIntoView({ 
+            //     behavior: 'smooth' 
+            // });
+        } else {
+            console.log('❌ No se encontró inquiryFormContainer');
+        }
+    }
+    
+    function hideInquiryForm() {
+        const inquiryFormContainer = document.getElementById('inquiryFormContainer');
+        if (inquiryFormContainer) {
+            inquiryFormContainer.classList.add('hidden');
+        }
+    }
+    
+    
+    function submitInquiry() {
+        const submitButton = document.getElementById('submitInquiryButton');
+        const submitButtonText = document.getElementById('submitInquiryButtonText');
+        
+        // Obtener datos del formulario
+        const customerEmailField = document.getElementById('customer_email');
+        const contentField = document.getElementById('content');
+        
+        if (!customerEmailField || !contentField) {
+            showInquiryError('Error: No se pudieron encontrar los campos del formulario.');
+            return;
+        }
+        
+        const formData = {
+            customer_email: customerEmailField.value.trim(),
+            content: contentField.value.trim()
+        };
+        
+        // Obtener datos del paquete consultado desde la variable global
+        const announcement = window.currentPackageInfo || {};
+
+        // Validar que tenemos información del paquete
+        if (!announcement || !announcement.tracking_code) {
+            showInquiryError('No se pudo obtener la información del paquete. Por favor, intenta buscar nuevamente.');
+            return;
+        }
+
+        // Validación básica
+        if (!formData.content) {
+            showInquiryError('Por favor completa el campo de consulta.');
+            return;
+        }
+
+        // Validar longitud mínima del contenido
+        if (formData.content.length < 3) {
+            showInquiryError('La consulta debe tener al menos 3 caracteres. Actualmente tienes ' + formData.content.length + ' caracteres.');
+            return;
+        }
+
+        // Validar longitud máxima del contenido (500 caracteres)
+        if (formData.content.length > 500) {
+            showInquiryError('La consulta no puede exceder los 500 caracteres. Actualmente tienes ' + formData.content.length + ' caracteres.');
+            return;
+        }
+
+        // Validar límite de palabras (100 palabras)
+        const wordCount = formData.content.split(/\s+/).filter(word => word.length > 0).length;
+        if (wordCount > 100) {
+            showInquiryError('La consulta no puede exceder las 100 palabras. Actualmente tienes ' + wordCount + ' palabras.');
+            return;
+        }
+
+        // Validar email solo si se proporciona
+        if (formData.customer_email) {
+            const emailRegex = /^[^\s@]+@[^\s@]+\.[^\s@]+$/;
+            if (!emailRegex.test(formData.customer_email)) {
+                showInquiryError('Por favor ingresa un email válido.');
+                return;
+            }
+        }
+
+        // Usar email del formulario o el email registrado previamente
+        const emailToUse = formData.customer_email || window.registeredEmailForTracking || null;
+
+        if (window.registeredEmailForTracking && !formData.customer_email) {
+            console.log('📧 Usando email registrado previamente (enviado de forma oculta):', window.registeredEmailForTracking);
+        }
+
+        // Preparar datos completos para enviar
+        const completeData = {
+            customer_name: announcement.customer_name || '',
+            customer_phone: announcement.customer_phone || '',
+            customer_email: emailToUse,
+            package_guide_number: announcement.guide_number || '',
+            package_tracking_code: announcement.tracking_code,
+            subject: `PAQUETE ${announcement.tracking_code}`,
+            content: formData.content
+        };
+        
+        console.log('📤 Datos que se van a enviar:', completeData);
+        console.log('📤 JSON que se va a enviar:', JSON.stringify(completeData, null, 2));
+        
+        // Mostrar estado de carga
+        if (submitButton) submitButton.disabled = true;
+        if (submitButtonText) submitButtonText.textContent = 'Enviando...';
+        hideInquiryMessages();
+        
+        // Enviar consulta
+        fetch('/api/messages/customer-inquiry', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify(completeData)
+        })
+        .then(response => {
+            console.log('📡 Response status:', response.status);
+            console.log('📡 Response headers:', response.headers);
+            
+            if (!response.ok) {
+                // Para errores 422, intentar obtener detalles del error
+                if (response.status === 422) {
+                    return response.json().then(errorData => {
+                        console.error('❌ Error 422 - Detalles:', errorData);
+                        throw new Error(`Error de validación: ${JSON.stringify(errorData)}`);
+                    });
+                } else {
+                    throw new Error(`Error HTTP ${response.status}: ${response.statusText}`);
+                }
+            }
+            return response.json();
+        })
+        .then(data => {
+            console.log('Consulta enviada:', data);
+            
+            // Mostrar éxito inmediatamente
+            showInquirySuccess();
+            
+            // Resetear formulario de forma asíncrona para no bloquear la UI
+            requestAnimationFrame(() => {
+                const inquiryForm = document.getElementById('inquiryForm');
+                if (inquiryForm) inquiryForm.reset();
+                
+                // Resetear contador de caracteres y palabras
+                updateContentCounter();
+                
+                // Actualizar restricción en segundo plano
+                updateInquiryRestriction();
+            });
+        })
+        .catch(error => {
+            console.error('Error al enviar consulta:', error);
+            console.error('Tipo de error:', typeof error);
+            console.error('Error completo:', JSON.stringify(error, null, 2));
+            
+            // Determinar el tipo de error y mostrar mensaje específico
+            let errorMessage = 'Error desconocido al enviar la consulta';
+            
+            if (error && typeof error.message === 'string') {
+                errorMessage = `Error del servidor: ${error.message}`;
+            } else if (error && typeof error === 'string') {
+                errorMessage = `Error de red: ${error}`;
+            } else if (error && error.name) {
+                errorMessage = `Error ${error.name}: ${error.message || 'Error de conexión'}`;
+            } else if (error && error.toString && error.toString() !== '[object Object]') {
+                errorMessage = `Error de sistema: ${error.toString()}`;
+            } else if (error && error.status) {
+                errorMessage = `Error HTTP ${error.status}: ${error.statusText || 'Error del servidor'}`;
+            } else {
+                errorMessage = `Error de validación o conexión. Detalles: ${JSON.stringify(error)}`;
+            }
+            
+            showInquiryError(errorMessage);
+        })
+        .finally(() => {
+            // Restaurar botón
+            if (submitButton) submitButton.disabled = false;
+            if (submitButtonText) submitButtonText.textContent = 'Enviar Consulta';
+        });
+    }
+
+    function showInquirySuccess() {
+        // Optimización: Obtener elementos una sola vez
+        const inquirySuccess = document.getElementById('inquirySuccess');
+        const inquiryError = document.getElementById('inquiryError');
+        const inquiryFormContainer = document.getElementById('inquiryFormContainer');
+        const conversationHistory = document.getElementById('conversationHistory');
+        
+        // Aplicar cambios de visibilidad inmediatamente
+        if (inquirySuccess) inquirySuccess.classList.remove('hidden');
+        if (inquiryError) inquiryError.classList.add('hidden');
+        
+        // NUEVA FUNCIONALIDAD: Ocultar formulario y mostrar conversación
+        if (inquiryFormContainer) {
+            inquiryFormContainer.classList.add('hidden');
+            console.log('✅ Formulario de consulta ocultado después del envío exitoso');
+        }
+        
+        // Mostrar la sección de conversación
+        if (conversationHistory) {
+            conversationHistory.classList.remove('hidden');
+            console.log('✅ Sección de conversación mostrada después del envío exitoso');
+            
+            // Actualizar la conversación con la nueva pregunta
+            updateConversationWithNewMessage();
+        }
+        
+        // Desactivar formulario de forma asíncrona para no bloquear la UI
+        requestAnimationFrame(() => {
+            disableInquiryForm();
+        });
+    }
+
+    function updateConversationWithNewMessage() {
+        console.log('🔄 Actualizando conversación con nueva pregunta enviada');
+        
+        // Obtener la pregunta que se acaba de enviar
+        const contentField = document.getElementById('content');
+        const customerEmailField = document.getElementById('customer_email');
+        
+        if (!contentField) {
+            console.log('❌ No se encontró el campo de contenido');
+            return;
+        }
+        
+        const newQuestion = contentField.value.trim();
+        const customerEmail = customerEmailField ? customerEmailField.value.trim() : 'Usuario';
+        
+        if (!newQuestion) {
+            console.log('❌ No hay pregunta para agregar a la conversación');
+            return;
+        }
+        
+        // Obtener el contenedor de conversación
+        const conversationContainer = document.getElementById('conversationContainer');
+        if (!conversationContainer) {
+            console.log('❌ No se encontró conversationContainer');
+            return;
+        }
+        
+        // Crear el elemento de la nueva pregunta
+        const newMessageElement = createMessageElement({
+            content: newQuestion,
+            customer_email: customerEmail,
+            created_at: new Date().toISOString(),
+            is_customer: true,
+            is_new: true // Marcar como nueva para estilos especiales
+        });
+        
+        // Agregar la nueva pregunta al final de la conversación
+        conversationContainer.appendChild(newMessageElement);
+        
+        // Scroll suave a la nueva pregunta
+        setTimeout(() => {
+            newMessageElement.scrollIntoView({ 
+                behavior: 'smooth',
+                block: 'nearest'
+            });
+        }, 100);
+        
+        console.log('✅ Nueva pregunta agregada a la conversación');
+    }
+    
+    function createMessageElement(message) {
+        const messageDiv = document.createElement('div');
+        messageDiv.className = `mb-4 ${message.is_new ? 'animate-pulse bg-blue-50 border-l-4 border-blue-400' : ''}`;
+        
+        const isCustomer = message.is_customer;
+        const messageClass = isCustomer ? 'bg-blue-50 border-blue-200' : 'bg-gray-50 border-gray-200';
+        const textClass = isCustomer ? 'text-blue-900' : 'text-gray-900';
+        const timeClass = isCustomer ? 'text-blue-600' : 'text-gray-600';
+        
+        const formattedDate = new Date(message.created_at).toLocaleString('es-CO', {
+            year: 'numeric',
+            month: '2-digit',
+            day: '2-digit',
+            hour: '2-digit',
+            minute: '2-digit'
+        });
+        
+        messageDiv.innerHTML = `
+            <div class="bg-white rounded-lg border ${messageClass} p-4 shadow-sm">
+                <div class="flex justify-between items-start mb-2">
+                    <div class="flex items-center space-x-2">
+                        <div class="w-8 h-8 rounded-full ${isCustomer ? 'bg-blue-500' : 'bg-gray-500'} flex items-center justify-center">
+                            <svg class="w-4 h-4 text-white" fill="currentColor" viewBox="0 0 20 20">
+                                <path fill-rule="evenodd" d="M10 9a3 3 0 100-6 3 3 0 000 6zm-7 9a7 7 0 1114 0H3z" clip-rule="evenodd"></path>
+                            </svg>
+                        </div>
+                        <div>
+                            <p class="text-sm font-medium ${textClass}">
+                                ${isCustomer ? (message.customer_email || 'Usuario') : 'Administrador'}
+                            </p>
+                            <p class="text-xs ${timeClass}">${formattedDate}</p>
+                        </div>
+                    </div>
+                    ${message.is_new ? '<span class="inline-flex items-center px-2 py-1 rounded-full text-xs font-medium bg-blue-100 text-blue-800">Nueva</span>' : ''}
+                </div>
+                <div class="text-sm ${textClass} leading-relaxed">
+                    ${message.content.replace(/\n/g, '<br>')}
+                </div>
+            </div>
+        `;
+        
+        return messageDiv;
+    }
+
+    // Función para actualizar el contador de caracteres y palabras
+    function updateContentCounter() {
+        const contentField = document.getElementById('content');
+        const charCountSpan = document.getElementById('charCount');
+        const wordCountSpan = document.getElementById('wordCount');
+        const warningSpan = document.getElementById('contentWarning');
+        
+        if (!contentField || !charCountSpan || !wordCountSpan || !warningSpan) return;
+        
+        const text = contentField.value.trim();
+        const charCount = contentField.value.length;
+        const wordCount = text.length > 0 ? text.split(/\s+/).filter(word => word.length > 0).length : 0;
+        
+        // Actualizar contadores
+        charCountSpan.textContent = charCount;
+        wordCountSpan.textContent = wordCount;
+        
+        // Mostrar advertencia si se excede el límite de palabras
+        if (wordCount > 100) {
+            warningSpan.classList.remove('hidden');
+            charCountSpan.parentElement.classList.add('text-red-600');
+            charCountSpan.parentElement.classList.remove('text-gray-500');
+        } else {
+            warningSpan.classList.add('hidden');
+            charCountSpan.parentElement.classList.remove('text-red-600');
+            charCountSpan.parentElement.classList.add('text-gray-500');
+        }
+    }
+
+    function showInquiryError(message) {
+        const errorMessage = document.getElementById('inquiryError');
+        const errorText = document.getElementById('inquiryErrorText');
+        const inquirySuccess = document.getElementById('inquirySuccess');
+        
+        if (errorText) errorText.textContent = message;
+        if (errorMessage) {
+            errorMessage.classList.remove('hidden');
+            // Scroll automático desactivado
+            // errorMessage.scrollIntoView({ 
+            //     behavior: 'smooth' 
+            // });
+        }
+        if (inquirySuccess) inquirySuccess.classList.add('hidden');
+    }
+
+    function disableInquiryForm() {
+        // Optimización: Obtener elementos una sola vez
+        const elements = {
+            customerEmail: document.getElementById('customer_email'),
+            content: document.getElementById('content'),
+            submitButton: document.getElementById('submitButton'),
+            submitButtonText: document.getElementById('submitButtonText'),
+            formContainer: document.querySelector('#inquiryFormContainer .bg-white'),
+            inquiryFormContainer: document.getElementById('inquiryFormContainer')
+        };
+        
+        // Aplicar cambios de forma batch para mejor rendimiento
+        const disableClass = 'opacity-50 cursor-not-allowed';
+        
+        // Desactivar campos principales
+        if (elements.customerEmail) {
+            elements.customerEmail.disabled = true;
+            elements.customerEmail.classList.add(disableClass);
+        }
+        
+        if (elements.content) {
+            elements.content.disabled = true;
+            elements.content.classList.add(disableClass);
+        }
+        
+        if (elements.submitButton) {
+            elements.submitButton.disabled = true;
+            elements.submitButton.classList.add(disableClass);
+        }
+        
+        if (elements.submitButtonText) {
+            elements.submitButtonText.textContent = 'Consulta Enviada';
+        }
+        
+        // DESACTIVAR TODA LA SECCIÓN (contenedor enmarcado en rojo)
+        if (elements.inquiryFormContainer) {
+            elements.inquiryFormContainer.classList.add('opacity-60', 'pointer-events-none');
+            elements.inquiryFormContainer.style.transition = 'opacity 0.3s ease';
+        }
+        
+        // Crear mensaje informativo solo si no existe
+        if (elements.formContainer && !document.getElementById('formDisabledMessage')) {
+            const disabledMessage = document.createElement('div');
+            disabledMessage.id = 'formDisabledMessage';
+            disabledMessage.className = 'mt-4 p-3 bg-blue-50 border border-blue-200 rounded-lg';
+            disabledMessage.innerHTML = `
+                <div class="flex items-center">
+                    <svg class="h-5 w-5 text-blue-400 mr-2" fill="none" stroke="currentColor" viewBox="0 0 24 24">
+                        <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M13 16h-1v-4h-1m1-4h.01M21 12a9 9 0 11-18 0 9 9 0 0118 0z"></path>
+                    </svg>
+                    <p class="text-sm text-blue-700">Ya tienes una consulta pendiente. Te responderemos pronto.</p>
+                </div>
+            `;
+            elements.formContainer.appendChild(disabledMessage);
+        }
+    }
+
+    function hideInquiryMessages() {
+        const inquirySuccess = document.getElementById('inquirySuccess');
+        const inquiryError = document.getElementById('inquiryError');
+        
+        if (inquirySuccess) inquirySuccess.classList.add('hidden');
+        if (inquiryError) inquiryError.classList.add('hidden');
+    }
+    
+    function updateInquiryRestriction() {
+        console.log('🔄 Actualizando restricción de consulta inmediatamente...');
+
+        // Obtener el tracking code actual
+        const trackingCode = window.currentPackageInfo && window.currentPackageInfo.tracking_code ? window.currentPackageInfo.tracking_code : null;
+        if (!trackingCode) {
+            console.log('❌ No hay tracking code disponible para actualizar restricción');
+            return;
+        }
+        
+        // Verificar inmediatamente si hay consultas pendientes
+        fetch(`/api/messages/check-tracking-inquiries?package_tracking_code=${encodeURIComponent(trackingCode)}`)
+            .then(response => {
+                if (!response.ok) {
+                    throw new Error('Error al verificar restricción');
+                }
+                return response.json();
+            })
+            .then(data => {
+                console.log('✅ Datos de restricción actualizados:', data);
+                
+                // Si hay consultas pendientes, aplicar restricción inmediatamente
+                if (data.exists && data.count > 0) {
+                    if (data.has_pending || data.has_unread) {
+                        console.log('🚫 Aplicando restricción inmediata - hay consultas PENDIENTES');
+                        showPendingMessageWarning(data);
+                    } else {
+                        console.log('✅ No hay consultas pendientes, manteniendo formulario abierto');
+                        // Mantener el formulario abierto si no hay consultas pendientes
+                    }
+                }
+            })
+            .catch(error => {
+                console.error('❌ Error actualizando restricción:', error);
+                // En caso de error, mantener el formulario como está
+            });
+    }
+
+    // ========================================
+    // GALERÍA DE IMÁGENES
+    // ========================================
+    
+    let galleryImages = [];
+    let currentImageIndex = 0;
+
+    function openImageGallery(images, startIndex = 0) {
+        console.log('🖼️ Abriendo galería con', images.length, 'imágenes');
+        console.log('🖼️ Imágenes recibidas:', images);
+        console.log('🖼️ Índice inicial:', startIndex);
+        
+        if (!images || !Array.isArray(images)) {
+            console.error('❌ Error: images no es un array válido');
+            return;
+        }
+        
+        galleryImages = images.filter(img => img && img.s3_url); // Solo imágenes con URL válida
+        currentImageIndex = startIndex;
+        
+        console.log('🖼️ Imágenes filtradas:', galleryImages.length);
+        
+        if (galleryImages.length === 0) {
+            console.log('❌ No hay imágenes válidas para mostrar');
+            showInfoMessage('No hay imágenes disponibles para mostrar');
+            return;
+        }
+
+        const modal = document.getElementById('imageGalleryModal');
+        const galleryImage = document.getElementById('galleryImage');
+        const imageCounter = document.getElementById('galleryImageCounter');
+        const thumbnailContainer = document.getElementById('thumbnailContainer');
+        
+        if (!modal) {
+            console.error('❌ Error: No se encontró el modal imageGalleryModal');
+            return;
+        }
+        
+        console.log('✅ Modal encontrado, mostrando galería');
+        
+        // Mostrar modal
+        modal.classList.remove('hidden');
+        modal.classList.add('show');
+        
+        // Cargar imagen inicial
+        loadGalleryImage(currentImageIndex);
+        
+        // Actualizar contador
+        updateImageCounter();
+        
+        // Generar thumbnails
+        generateThumbnails();
+        
+        // Prevenir scroll del body
+        document.body.style.overflow = 'hidden';
+    }
+
+    function closeImageGallery() {
+        console.log('🚪 Cerrando galería');
+        
+        const modal = document.getElementById('imageGalleryModal');
+        modal.classList.add('hidden');
+        modal.classList.remove('show');
+        
+        // Restaurar scroll del body
+        document.body.style.overflow = '';
+        
+        // Limpiar datos
+        galleryImages = [];
+        currentImageIndex = 0;
+    }
+
+    function loadGalleryImage(index) {
+        if (index < 0 || index >= galleryImages.length) return;
+        
+        const galleryImage = document.getElementById('galleryImage');
+        const imageLoader = document.getElementById('imageLoader');
+        
+        // Mostrar loader
+        imageLoader.classList.remove('hidden');
+        galleryImage.style.opacity = '0.5';
+        
+        // Cargar nueva imagen
+        const img = new Image();
+        img.onload = function() {
+            galleryImage.src = this.src;
+            galleryImage.style.opacity = '1';
+            imageLoader.classList.add('hidden');
+            console.log('✅ Imagen cargada:', galleryImages[index].s3_url);
+        };
+        
+        img.onerror = function() {
+            console.error('❌ Error cargando imagen:', galleryImages[index].s3_url);
+            imageLoader.classList.add('hidden');
+            galleryImage.style.opacity = '1';
+            // Mostrar imagen de error o placeholder
+            galleryImage.src = 'data:image/svg+xml;base64,PHN2ZyB3aWR0aD0iMjAwIiBoZWlnaHQ9IjIwMCIgdmlld0JveD0iMCAwIDIwMCAyMDAiIGZpbGw9Im5vbmUiIHhtbG5zPSJodHRwOi8vd3d3LnczLm9yZy8yMDAwL3N2ZyI+CjxyZWN0IHdpZHRoPSIyMDAiIGhlaWdodD0iMjAwIiBmaWxsPSIjRjNGNEY2Ii8+CjxwYXRoIGQ9Ik0xMDAgMTAwTDEwMCAxMDBaIiBzdHJva2U9IiM5Q0EzQUYiIHN0cm9rZS13aWR0aD0iMiIvPgo8L3N2Zz4K';
+        };
+        
+        img.src = galleryImages[index].s3_url;
+        currentImageIndex = index;
+    }
+
+    function updateImageCounter() {
+        const imageCounter = document.getElementById('galleryImageCounter');
+        imageCounter.textContent = `${currentImageIndex + 1} de ${galleryImages.length}`;
+    }
+
+    function generateThumbnails() {
+        const thumbnailContainer = document.getElementById('thumbnailContainer');
+        thumbnailContainer.innerHTML = '';
+        
+        if (galleryImages.length <= 1) {
+            thumbnailContainer.style.display = 'none';
+            return;
+        }
+        
+        thumbnailContainer.style.display = 'flex';
+        
+        galleryImages.forEach((image, index) => {
+            const thumbnail = document.createElement('img');
+            thumbnail.src = image.s3_url;
+            thumbnail.className = `thumbnail object-cover ${index === currentImageIndex ? 'active' : ''}`;
+            thumbnail.alt = `Thumbnail ${index + 1}`;
+            
+            thumbnail.addEventListener('click', () => {
+                loadGalleryImage(index);
+                updateImageCounter();
+                updateThumbnailsActive();
+            });
+            
+            thumbnailContainer.appendChild(thumbnail);
+        });
+    }
+
+    function updateThumbnailsActive() {
+        const thumbnails = document.querySelectorAll('.thumbnail');
+        thumbnails.forEach((thumb, index) => {
+            if (index === currentImageIndex) {
+                thumb.classList.add('active');
+            } else {
+                thumb.classList.remove('active');
+            }
+        });
+    }
+
+    function nextImage() {
+        if (currentImageIndex < galleryImages.length - 1) {
+            loadGalleryImage(currentImageIndex + 1);
+            updateImageCounter();
+            updateThumbnailsActive();
+        }
+    }
+
+    function prevImage() {
+        if (currentImageIndex > 0) {
+            loadGalleryImage(currentImageIndex - 1);
+            updateImageCounter();
+            updateThumbnailsActive();
+        }
+    }
+
+    // MANEJO DE ERRORES DE IMÁGENES
+    // ========================================
+    
+    function handleImageError(imgElement, filename, errorMsg) {
+        console.error(`❌ Error cargando imagen: ${filename} - ${errorMsg}`);
+        
+        // OPCIÓN 1: Sistema de fallback mejorado
+        const originalSrc = imgElement.src;
+        
+        // Si ya intentamos el fallback, mostrar placeholder
+        if (imgElement.dataset.fallbackAttempted === 'true') {
+            console.log(`🔧 Fallback ya intentado, mostrando placeholder: ${filename}`);
+            showImagePlaceholder(imgElement, filename, 'Imagen no disponible');
+            return;
+        }
+        
+        // Marcar que estamos intentando fallback
+        imgElement.dataset.fallbackAttempted = 'true';
+        
+        // Intentar diferentes estrategias de fallback
+        console.log(`🔄 Intentando fallback para: ${filename}`);
+        
+        // Estrategia 1: Si es URL interna, intentar recargar
+        if (originalSrc.includes('/api/images/')) {
+            console.log(`🔄 Recargando URL interna: ${originalSrc}`);
+            setTimeout(() => {
+                imgElement.src = originalSrc + '?retry=' + Date.now();
+            }, 1000);
+            return;
+        }
+        
+        // Estrategia 2: Si falló todo, mostrar placeholder
+        showImagePlaceholder(imgElement, filename, errorMsg || 'Error de carga');
+    }
+
+    function showImagePlaceholder(imgElement, filename, errorMsg) {
+        // Ocultar imagen original
+        imgElement.style.display = 'none';
+        
+        // Mostrar placeholder
+        const placeholder = imgElement.nextElementSibling;
+        if (placeholder) {
+            placeholder.style.display = 'flex';
+            
+            // Agregar información de error al placeholder
+            const errorInfo = placeholder.querySelector('.error-info');
+            if (errorInfo) {
+                errorInfo.textContent = `${filename}`;
+                errorInfo.title = errorMsg;
+            }
+        }
+        
+        console.log(`🔧 Placeholder mostrado para: ${filename} - ${errorMsg}`);
+    }
+
+    function retryImageLoad(imgElement, maxRetries = 2) {
+        const retryCount = parseInt(imgElement.dataset.retryCount || '0');
+        
+        if (retryCount < maxRetries) {
+            imgElement.dataset.retryCount = (retryCount + 1).toString();
+            console.log(`🔄 Reintentando carga de imagen (${retryCount + 1}/${maxRetries})`);
+            
+            setTimeout(() => {
+                const originalSrc = imgElement.dataset.originalSrc || imgElement.src;
+                imgElement.src = originalSrc + '?retry=' + Date.now();
+            }, 1000 * (retryCount + 1)); // Esperar más tiempo en cada intento
+        } else {
+            console.log(`❌ Máximo de reintentos alcanzado para imagen`);
+            const filename = imgElement.alt || 'imagen';
+            showImagePlaceholder(imgElement, filename, 'Error después de reintentos');
+        }
+    }
+
+    function showImageLoadingStats() {
+        // Función para mostrar estadísticas de carga de imágenes (debugging)
+        const allImages = document.querySelectorAll('img[src*="amazonaws.com"], img[src*="s3"]');
+        const loadedImages = Array.from(allImages).filter(img => img.complete && img.naturalHeight !== 0);
+        const failedImages = Array.from(allImages).filter(img => img.style.display === 'none');
+        
+        console.log(`📊 Estadísticas de imágenes:`);
+        console.log(`   Total: ${allImages.length}`);
+        console.log(`   Cargadas: ${loadedImages.length}`);
+        console.log(`   Fallidas: ${failedImages.length}`);
+        
+        return {
+            total: allImages.length,
+            loaded: loadedImages.length,
+            failed: failedImages.length
+        };
+    }
+
+    // Event Listeners para la galería
+    document.addEventListener('DOMContentLoaded', function() {
+        // Botón cerrar
+        const closeGallery = document.getElementById('closeGallery');
+        if (closeGallery) {
+            closeGallery.addEventListener('click', closeImageGallery);
+        }
+        
+        // Navegación
+        const prevButton = document.getElementById('prevImage');
+        const nextButton = document.getElementById('nextImage');
+        
+        if (prevButton) {
+            prevButton.addEventListener('click', prevImage);
+        }
+        
+        if (nextButton) {
+            nextButton.addEventListener('click', nextImage);
+        }
+        
+        // Event listener para abrir galería (usando delegación de eventos)
+        document.addEventListener('click', function(e) {
+            const trigger = e.target.closest('.image-gallery-trigger');
+            if (trigger) {
+                e.preventDefault();
+                e.stopPropagation();
+                
+                console.log('🖼️ Click detectado en trigger de galería');
+                
+                try {
+                    const imagesData = trigger.getAttribute('data-images');
+                    const indexData = trigger.getAttribute('data-index');
+                    
+                    console.log('🖼️ Data images:', imagesData);
+                    console.log('🖼️ Data index:', indexData);
+                    
+                    if (imagesData && indexData !== null) {
+                        const images = JSON.parse(imagesData);
+                        const index = parseInt(indexData);
+                        
+                        console.log('🖼️ Imágenes parseadas:', images);
+                        console.log('🖼️ Índice parseado:', index);
+                        
+                        openImageGallery(images, index);
+                    } else {
+                        console.error('❌ Error: No se pudieron obtener los datos de la imagen');
+                    }
+                } catch (error) {
+                    console.error('❌ Error al procesar click en galería:', error);
+                }
+            }
+        });
+        
+        // Cerrar con ESC
+        document.addEventListener('keydown', function(e) {
+            if (e.key === 'Escape') {
+                closeImageGallery();
+            } else if (e.key === 'ArrowLeft') {
+                prevImage();
+            } else if (e.key === 'ArrowRight') {
+                nextImage();
+            }
+        });
+        
+        // Cerrar al hacer clic en el fondo
+        const modal = document.getElementById('imageGalleryModal');
+        if (modal) {
+            modal.addEventListener('click', function(e) {
+                if (e.target === modal) {
+                    closeImageGallery();
+                }
+            });
+        }
+    });